@@ -56,13 +56,28 @@ def get_host() -> str:
         return "desconhecido"
 
 
+# =========================
+#   Base local da Receita (opcional)
+# =========================
+@st.cache_resource(show_spinner="Carregando índice local da Receita...")
+def get_local_index(parquet_path: str):
+    """Abre (e constrói, se preciso) o índice offline do ESTABELECIMENTO.parquet."""
+    if not parquet_path or not Path(parquet_path).exists():
+        return None
+    try:
+        from cnpj_local import LocalCNPJIndex
+    except ImportError:
+        return None
+    return LocalCNPJIndex(parquet_path)
+
+
 # =========================
 #   Streamlit UI
 # =========================
 st.set_page_config(page_title="BIA – Consulta CNPJ", layout="centered")
 
 st.title("🔎 BIA – Consulta de CNPJ (SDR)")
-st.caption("Consulta via BrasilAPI com fallback para MinhaReceita. Log local habilitado (metadados).")
+st.caption("Consulta na base local da Receita (se disponível), depois BrasilAPI com fallback para MinhaReceita. Log local habilitado (metadados).")
 
 with st.expander("⚙️ Configurações", expanded=False):
     prefer = st.selectbox("Fonte preferida", ["brasilapi", "minhareceita"], index=0)
@@ -70,6 +85,10 @@ with st.expander("⚙️ Configurações", expanded=False):
     retries = st.slider("Re-tentativas (rede/429)", min_value=0, max_value=6, value=4, step=1)
     timeout = st.slider("Timeout HTTP (segundos)", min_value=5, max_value=60, value=20, step=5)
     mostrar_raw = st.checkbox("Mostrar JSON bruto (debug)", value=False)
+    base_local = st.text_input(
+        "Base local da Receita (Parquet)",
+        value=os.getenv("BIA_CNPJ_PARQUET", "ESTABELECIMENTO.parquet"),
+    )
 
 st.write("Cole um ou mais CNPJs (um por linha):")
 
@@ -183,7 +202,12 @@ if btn:
 
     st.write(f"📦 Total para consultar: **{len(cnpjs)}**")
 
-    client = CNPJClient(timeout=timeout, sleep_seconds=sleep, max_retries=retries)
+    client = CNPJClient(
+        timeout=timeout,
+        sleep_seconds=sleep,
+        max_retries=retries,
+        local_index=get_local_index(base_local),
+    )
 
     for idx, cnpj in enumerate(cnpjs, start=1):
         with st.spinner(f"[{idx}/{len(cnpjs)}] Consultando {format_cnpj(only_digits(cnpj)) or cnpj}..."):
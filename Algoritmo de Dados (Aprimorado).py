@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 from sqlalchemy import create_engine
@@ -6,8 +7,11 @@ from PIL import Image, ImageDraw, ImageFont
 import pywhatkit as kit
 import os
 
+from snapshot_kpis import COLUNAS_CHAVE, converter_datas, ler_abas, mascara_vigencia, normalizar_nomes, obter_snapshot, quadro_do_mes
+
 # --- CONFIGURAÇÕES ---
 ARQUIVO = r"C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\Scripts Python\BASE DE DADOS.xlsx"
+SNAPSHOT = os.path.join(os.path.dirname(ARQUIVO), "Snapshot KPIs - Gestao a Vista.parquet")
 DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME = "root", "root", "localhost", 3306, "dvwarehouse"
 WHATSAPP_GROUP_ID = "DQda6YiLMXTLbI2CfRfQTr"
 
@@ -36,39 +40,47 @@ def calcular_dias_uteis_totais(ano, mes):
     datas = pd.date_range(start=f"{ano}-{mes}-01", end=f"{ano}-{mes}-{fim}")
     return len(datas[datas.dayofweek < 5])
 
-def processar_orion():
-    print("\n" + "="*30)
-    mes_ref = int(input("Digite o MÊS desejado (1-12): "))
-    ano_ref = int(input("Digite o ANO desejado (ex: 2025): "))
-    print("="*30 + "\n")
+def calcular_snapshot():
+    """Faturado, únicos, conversão e TM de cada vendedora em todos os meses, em uma leitura da planilha."""
+    abas = ler_abas(ARQUIVO, ["FATURADO", "CADASTRO"])
+    df_fato, df_cad = abas["FATURADO"], abas["CADASTRO"]
+    df_cad['Apelido (Vendedor)'] = normalizar_nomes(df_cad['Apelido (Vendedor)'])
+
+    # 1. Datas convertidas uma vez; vigência aplicada como intervalo de meses
+    datas = converter_datas(df_fato['Dt. Neg.'])
+    vendas = pd.DataFrame({
+        'NOME': normalizar_nomes(df_fato['Apelido (Vendedor)']),
+        'ANO': datas.dt.year, 'MES': datas.dt.month,
+        'Vlr. Nota': df_fato['Vlr. Nota'], 'Parceiro': df_fato['Parceiro'],
+    }).dropna(subset=['ANO', 'MES'])
+    vendas = vendas[mascara_vigencia(vendas['NOME'], vendas['MES'], VIGENCIA)]
 
-    engine = create_engine(f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-    
-    # 1. Leitura e ETL
-    df_fato = pd.read_excel(ARQUIVO, sheet_name="FATURADO")
-    df_cad = pd.read_excel(ARQUIVO, sheet_name="CADASTRO")
-    df_fato['Apelido (Vendedor)'] = df_fato['Apelido (Vendedor)'].astype(str).str.strip().str.upper()
-    df_cad['Apelido (Vendedor)'] = df_cad['Apelido (Vendedor)'].astype(str).str.strip().str.upper()
-    df_fato['Dt. Neg.'] = pd.to_datetime(df_fato['Dt. Neg.'], errors='coerce')
-    vendas = df_fato[(df_fato['Dt. Neg.'].dt.month == mes_ref) & (df_fato['Dt. Neg.'].dt.year == ano_ref)].copy()
-    
     col_ab = df_cad.columns[27]
-    ativos_base = df_cad[df_cad[col_ab].astype(str).str.strip().str.upper() == 'BASE ATIVA'].groupby('Apelido (Vendedor)')['Cód. Parceiro'].nunique().reset_index()
-    ativos_base.columns = ['Apelido (Vendedor)', 'Qtd_Ativos']
+    ativos_base = df_cad[df_cad[col_ab].astype(str).str.strip().str.upper() == 'BASE ATIVA'].groupby('Apelido (Vendedor)')['Cód. Parceiro'].nunique()
 
-    quadro = vendas.groupby('Apelido (Vendedor)').agg(Faturado=('Vlr. Nota', 'sum'), Unicos=('Parceiro', 'nunique')).reset_index()
-    vendedoras_ativas = [v for v, (i, f) in VIGENCIA.items() if i <= mes_ref <= f]
-    quadro = quadro[quadro['Apelido (Vendedor)'].isin(vendedoras_ativas)]
-    quadro = pd.merge(quadro, ativos_base, on='Apelido (Vendedor)', how='left').fillna(0)
-    
-    m_glob = METAS_FAT.get(mes_ref, 0)
-    m_kpi = METAS_KPIS.get(mes_ref)
-    
+    quadro = vendas.groupby(['NOME', 'ANO', 'MES']).agg(Faturado=('Vlr. Nota', 'sum'), Unicos=('Parceiro', 'nunique')).reset_index()
+    quadro[['ANO', 'MES']] = quadro[['ANO', 'MES']].astype(int)
+    quadro['Qtd_Ativos'] = quadro['NOME'].map(ativos_base).fillna(0)
     quadro['Taxa_Conv'] = (quadro['Unicos'] / quadro['Qtd_Ativos'] * 100).replace([np.inf, -np.inf], 0).round(1)
     quadro['TM'] = (quadro['Faturado'] / quadro['Unicos']).replace([np.inf, -np.inf], 0).round(2)
-    quadro = quadro.sort_values(by='Faturado', ascending=False)
 
-    # 2. Geração da Imagem
+    # Metas do mês em cada linha
+    quadro['Meta_Global'] = quadro['MES'].map(METAS_FAT).fillna(0)
+    quadro['Meta_Vendedora'] = quadro['Meta_Global'] / 7
+    quadro['Meta_Conv'] = quadro['MES'].map({m: k['conv'] for m, k in METAS_KPIS.items()})
+    quadro['Meta_TM'] = quadro['MES'].map({m: k['tm'] for m, k in METAS_KPIS.items()})
+    quadro['TIPO'] = 'VENDAS'
+    return quadro[COLUNAS_CHAVE + [c for c in quadro.columns if c not in COLUNAS_CHAVE]]
+
+def obter_snapshot_kpis(forcar=False):
+    parametros = {'metas_fat': METAS_FAT, 'metas_kpis': METAS_KPIS, 'vigencia': VIGENCIA}
+    return obter_snapshot(SNAPSHOT, ARQUIVO, calcular_snapshot, parametros, forcar)
+
+def gerar_imagem(quadro, mes_ref, ano_ref, img_path="drop_orion_final.png"):
+    """Desenha o quadro do mês (lido do snapshot, já ordenado por faturado)."""
+    m_glob = METAS_FAT.get(mes_ref, 0)
+    m_kpi = METAS_KPIS.get(mes_ref)
+
     largura = 800
     altura = 1100
     img = Image.new('RGB', (largura, altura), color=(255, 255, 255))
@@ -115,10 +127,27 @@ def processar_orion():
         
         y_rank += 110 # Espaço entre blocos
 
-    # 3. Preview e Exportação
-    img_path = "drop_orion_final.png"
     img.save(img_path)
+    return img
+
+def processar_orion(mes_ref=None, ano_ref=None, reconstruir=False):
+    print("\n" + "="*30)
+    if mes_ref is None: mes_ref = int(input("Digite o MÊS desejado (1-12): "))
+    if ano_ref is None: ano_ref = int(input("Digite o ANO desejado (ex: 2025): "))
+    print("="*30 + "\n")
+
+    engine = create_engine(f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
     
+    # 1. Quadro do mês a partir do snapshot (o Excel só é lido quando muda)
+    snapshot = obter_snapshot_kpis(reconstruir)
+    quadro = quadro_do_mes(snapshot, 'VENDAS', ano_ref, mes_ref, ['Faturado', 'Unicos', 'Qtd_Ativos', 'Taxa_Conv', 'TM'])
+    quadro = quadro.sort_values(by='Faturado', ascending=False)
+
+    # 2. Geração da Imagem
+    img_path = "drop_orion_final.png"
+    img = gerar_imagem(quadro, mes_ref, ano_ref, img_path)
+
+    # 3. Preview e Exportação
     print("\n[ÓRION] Gerando PREVIEW da imagem...")
     img.show() # ABRE A IMAGEM PARA VOCÊ VER
     
@@ -128,4 +157,9 @@ def processar_orion():
         kit.sendwhatmsg_to_group_instantly(WHATSAPP_GROUP_ID, "Gestão à Vista Multimarcas atualizada:", wait_time=15)
 
 if __name__ == "__main__":
-    processar_orion()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Gestão à vista - multimarcas")
+    parser.add_argument("--mes", type=int, choices=range(1, 13))
+    parser.add_argument("--ano", type=int)
+    parser.add_argument("--reconstruir", action="store_true", help="recalcula o snapshot mesmo sem mudança na planilha")
+    args = parser.parse_args()
+    processar_orion(args.mes, args.ano, args.reconstruir)
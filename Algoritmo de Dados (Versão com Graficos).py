@@ -1,15 +1,32 @@
+import argparse
+import io
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont 
 import os
 
+from snapshot_kpis import (COLUNAS_CHAVE, converter_datas, ler_abas, mascara_vigencia, normalizar_nomes,
+                           obter_snapshot, quadro_do_mes, vigentes_por_mes)
+
 # --- CONFIGURAÇÕES ---
 ARQUIVO = r"C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\Scripts Python\BASE DE DADOS.xlsx"
+SNAPSHOT = os.path.join(os.path.dirname(ARQUIVO), "Snapshot KPIs - Graficos.parquet")
+PASTA_GRAFICOS = os.path.join(os.path.dirname(ARQUIVO), "Graficos KPIs")
+
+# Layout dos gráficos
+LARGURA_GRAFICO, RECUO_X = 1100, 320
+ALTURA_CABECALHO, ALTURA_LINHA = 110, 65
+MINIMO_PARALELO = 10  # abaixo disso o pool custa mais do que economiza
 
 MESES_EXTENSO = {
     1: "JANEIRO", 2: "FEVEREIRO", 3: "MARÇO", 4: "ABRIL", 5: "MAIO", 6: "JUNHO",
     7: "JULHO", 8: "AGOSTO", 9: "SETEMBRO", 10: "OUTUBRO", 11: "NOVEMBRO", 12: "DEZEMBRO"
 }
+MES_POR_EXTENSO = {nome: num for num, nome in MESES_EXTENSO.items()}
 
 # Metas e Vigências
 METAS_FAT_TOTAL = {12: 2092860.0}
@@ -22,90 +39,247 @@ VIG_VEND = {"ERIKHA": (1,12), "GLENDASOUZA": (1,12), "ISABELLASILVA": (1,12), "L
 def formatar_brl(valor):
     return f"{valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
 
-def desenhar_grafico(df, col_valor, titulo, meta, meta_display, arq_nome, prefix="", sufixo=""):
-    if df.empty: return
-    df_plot = df.sort_values(by=col_valor, ascending=False)
-    largura, recuo_x = 1100, 320
-    altura = 160 + (len(df_plot) * 65)
-    img = Image.new('RGB', (largura, altura), (255,255,255))
-    draw = ImageDraw.Draw(img)
+@lru_cache(maxsize=None)
+def carregar_fontes():
+    """Fontes carregadas uma vez por processo: (título, rótulo, valor)."""
     try:
-        f_sub = ImageFont.truetype("arial.ttf", 34); f_lab = ImageFont.truetype("arial.ttf", 24); f_val = ImageFont.truetype("arialbd.ttf", 22)
-    except:
-        f_sub = f_lab = f_val = ImageFont.load_default()
+        return ImageFont.truetype("arial.ttf", 34), ImageFont.truetype("arial.ttf", 24), ImageFont.truetype("arialbd.ttf", 22)
+    except OSError:
+        padrao = ImageFont.load_default()
+        return padrao, padrao, padrao
+
+@lru_cache(maxsize=4096)
+def largura_rotulo(nome):
+    return carregar_fontes()[1].getbbox(nome)[2]
+
+@lru_cache(maxsize=128)
+def cabecalho_grafico(titulo, meta_display):
+    """Faixa do título (pré-desenhada) reaproveitada por todo gráfico do mesmo tipo e meta."""
+    img = Image.new('RGB', (LARGURA_GRAFICO, ALTURA_CABECALHO), (255,255,255))
+    ImageDraw.Draw(img).text((40, 35), f"{titulo} | Meta: {meta_display}", fill=(0, 80, 0), font=carregar_fontes()[0])
+    return img
+
+def renderizar_grafico(nomes, valores, titulo, meta, meta_display, prefix="", sufixo=""):
+    """Barras horizontais em ordem decrescente; verde quem bateu a meta."""
+    valores = np.asarray(valores, dtype=float)
+    ordem = np.argsort(-valores, kind="stable")
+    nomes = [str(nomes[i])[:20] for i in ordem]
+    valores = valores[ordem]
+
+    img = Image.new('RGB', (LARGURA_GRAFICO, 160 + len(nomes) * ALTURA_LINHA), (255,255,255))
+    img.paste(cabecalho_grafico(titulo, meta_display), (0, 0))
+    draw = ImageDraw.Draw(img)
+    _, f_lab, f_val = carregar_fontes()
 
-    draw.text((40, 35), f"{titulo} | Meta: {meta_display}", fill=(0, 80, 0), font=f_sub)
-    y, max_v = 110, max(df_plot[col_valor].max() if not df_plot.empty else 0, meta * 1.1, 1)
-    espaco = largura - recuo_x - 220
+    max_v = max(valores.max() if len(valores) else 0, meta * 1.1, 1)
+    espaco = LARGURA_GRAFICO - RECUO_X - 220
+    larguras_barra = valores / max_v * espaco
+    larguras_nome = [largura_rotulo(nome) for nome in nomes]
 
-    for row in df_plot.itertuples():
-        val = getattr(row, col_valor)
+    y = ALTURA_CABECALHO
+    for nome, val, larg_b, larg_n in zip(nomes, valores, larguras_barra, larguras_nome):
         cor = (0, 128, 0) if val >= meta else (200, 0, 0)
-        larg_b = (val / max_v) * espaco
-        draw.rectangle([recuo_x, y, recuo_x + larg_b, y + 40], fill=cor)
-        nome = str(row[1])[:20]
-        draw.text((recuo_x - 15 - draw.textbbox((0,0), nome, font=f_lab)[2], y + 5), nome, (0,0,0), font=f_lab)
+        draw.rectangle([RECUO_X, y, RECUO_X + larg_b, y + 40], fill=cor)
+        draw.text((RECUO_X - 15 - larg_n, y + 5), nome, (0,0,0), font=f_lab)
         
         texto_exibicao = f"{prefix}{formatar_brl(val)}{sufixo}" if prefix == "R$ " else f"{val:.1f}{sufixo}" if sufixo == "%" else f"{int(val)}"
-        draw.text((recuo_x + larg_b + 15, y + 7), texto_exibicao, (0,0,0), font=f_val)
-        y += 65
+        draw.text((RECUO_X + larg_b + 15, y + 7), texto_exibicao, (0,0,0), font=f_val)
+        y += ALTURA_LINHA
+    return img
+
+def desenhar_grafico(df, col_valor, titulo, meta, meta_display, arq_nome, prefix="", sufixo=""):
+    if df.empty: return
+    img = renderizar_grafico(df.iloc[:, 0].tolist(), df[col_valor].to_numpy(), titulo, meta, meta_display, prefix, sufixo)
     img.save(arq_nome)
 
-def processar_orion():
-    mes_num = int(input("Mês (1-12): ")); ano = str(input("Ano (AAAA): "))
-    mes_extenso = MESES_EXTENSO.get(mes_num)
-    padrao_mes = f"-{mes_num:02d}-"
-
-    df_ped = pd.read_excel(ARQUIVO, sheet_name="PEDIDO")
-    df_cad = pd.read_excel(ARQUIVO, sheet_name="CADASTRO")
-    df_fato = pd.read_excel(ARQUIVO, sheet_name="FATURADO")
-
-    # --- SDR ---
-    df_ped['DATA_STR'] = df_ped.iloc[:, 0].astype(str)
-    p_mes = df_ped[(df_ped['DATA_STR'].str.contains(ano)) & (df_ped.iloc[:, 20].astype(str).str.strip().str.upper() == mes_extenso)].copy()
-    p_mes.iloc[:, 18] = pd.to_numeric(p_mes.iloc[:, 18], errors='coerce').fillna(0)
-    sdr_prod = p_mes.groupby('Nome SDR').agg(Lojas_Pedido=(df_ped.columns[18], 'sum')).reset_index()
-
-    df_cad['DATA_CAD_STR'] = df_cad.iloc[:, 24].astype(str)
-    c_mes = df_cad[(df_cad['DATA_CAD_STR'].str.contains(ano)) & (df_cad['DATA_CAD_STR'].str.contains(padrao_mes))].copy()
-    sdr_cad = c_mes.groupby('SDR').size().reset_index(name='Lojas_Cadastradas')
-
-    for d, c in [(sdr_prod, 'Nome SDR'), (sdr_cad, 'SDR')]: d[c] = d[c].astype(str).str.strip().str.upper()
-    tab_sdr = pd.merge(sdr_prod, sdr_cad, left_on='Nome SDR', right_on='SDR', how='outer').fillna(0)
-    tab_sdr['Final_SDR'] = np.where(tab_sdr['Nome SDR'] != "0", tab_sdr['Nome SDR'], tab_sdr['SDR'])
-    lista_s_ativas = [v for v, (i, f) in VIG_SDR.items() if i <= mes_num <= f]
-    tab_sdr = tab_sdr[tab_sdr['Final_SDR'].isin(lista_s_ativas)]
+def _png_grafico(tarefa):
+    """Worker do pool: devolve (nome do arquivo, bytes do PNG)."""
+    args = {k: v for k, v in tarefa.items() if k != 'arquivo'}
+    buffer = io.BytesIO()
+    renderizar_grafico(**args).save(buffer, format="PNG")
+    return tarefa['arquivo'], buffer.getvalue()
+
+def renderizar_lote(tarefas, pasta=".", arquivo_zip=None, workers=None):
+    """Renderiza gráficos independentes (em paralelo a partir de MINIMO_PARALELO) para a pasta ou um ZIP."""
+    if len(tarefas) >= MINIMO_PARALELO:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pngs = list(pool.map(_png_grafico, tarefas, chunksize=4))
+    else:
+        pngs = list(map(_png_grafico, tarefas))
+
+    if arquivo_zip is not None:
+        # PNG já é comprimido: ZIP só armazena
+        with zipfile.ZipFile(arquivo_zip, "w", compression=zipfile.ZIP_STORED) as zf:
+            for nome, dados in pngs:
+                zf.writestr(nome, dados)
+        return [arquivo_zip]
+
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+    for nome, dados in pngs:
+        caminho = os.path.join(pasta, nome)
+        with open(caminho, "wb") as f:
+            f.write(dados)
+        caminhos.append(caminho)
+    return caminhos
+
+def metas_mensais():
+    """Metas de cada mês (índice 1..12) já divididas pelas pessoas vigentes no mês."""
+    vend_ativas, sdr_ativas = vigentes_por_mes(VIG_VEND), vigentes_por_mes(VIG_SDR)
+    linhas = {}
+    for mes in range(1, 13):
+        n_v, n_s = vend_ativas[mes], sdr_ativas[mes]
+        kpi_v = METAS_VEND_KPI.get(mes, METAS_VEND_KPI[12])
+        sdr = METAS_SDR_TOTAL.get(mes, METAS_SDR_TOTAL[12])
+        linhas[mes] = {
+            'Meta_Faturado': np.ceil(METAS_FAT_TOTAL.get(mes, 0) / n_v) if n_v else 0,
+            'Meta_Conv_Vendas': kpi_v['conv'],
+            'Meta_Lojas_Pedido': np.ceil(sdr['lojas'] / n_s) if n_s else 0,
+            'Meta_Lojas_Cadastradas': np.ceil(sdr['cad'] / n_s) if n_s else 0,
+            'Meta_Conv_SDR': sdr['conv'],
+        }
+    return pd.DataFrame.from_dict(linhas, orient='index')
+
+def calcular_snapshot():
+    """KPIs de todas as SDRs e vendedoras em todos os meses, em uma leitura da planilha."""
+    abas = ler_abas(ARQUIVO, ["PEDIDO", "CADASTRO", "FATURADO"])
+    df_ped, df_cad, df_fato = abas["PEDIDO"], abas["CADASTRO"], abas["FATURADO"]
+    chaves = ['NOME', 'ANO', 'MES']
+
+    # --- SDR --- (ano pela data do pedido, mês pela coluna de mês por extenso)
+    ped = pd.DataFrame({
+        'NOME': normalizar_nomes(df_ped['Nome SDR']),
+        'ANO': converter_datas(df_ped.iloc[:, 0]).dt.year,
+        'MES': df_ped.iloc[:, 20].astype(str).str.strip().str.upper().map(MES_POR_EXTENSO),
+        'Lojas_Pedido': pd.to_numeric(df_ped.iloc[:, 18], errors='coerce').fillna(0),
+    }).dropna(subset=['ANO', 'MES'])
+    sdr_prod = ped.groupby(chaves)['Lojas_Pedido'].sum()
+
+    data_cad = converter_datas(df_cad.iloc[:, 24])
+    cad = pd.DataFrame({'NOME': normalizar_nomes(df_cad['SDR']), 'ANO': data_cad.dt.year, 'MES': data_cad.dt.month})
+    sdr_cad = cad.dropna(subset=['ANO', 'MES']).groupby(chaves).size().rename('Lojas_Cadastradas')
+
+    tab_sdr = pd.concat([sdr_prod, sdr_cad], axis=1).fillna(0).reset_index()
+    tab_sdr = tab_sdr[mascara_vigencia(tab_sdr['NOME'], tab_sdr['MES'], VIG_SDR)]
     tab_sdr['Conv_SDR'] = (tab_sdr['Lojas_Pedido'] / tab_sdr['Lojas_Cadastradas'] * 100).replace([np.inf, -np.inf], 0).fillna(0)
 
     # --- VENDEDORES ---
-    df_fato['DATA_FATO_STR'] = df_fato['Dt. Neg.'].astype(str)
-    v_mes = df_fato[(df_fato['DATA_FATO_STR'].str.contains(ano)) & (df_fato['DATA_FATO_STR'].str.contains(padrao_mes))].copy()
-    q_v = v_mes.groupby('Apelido (Vendedor)').agg(Faturado=('Vlr. Nota', 'sum'), Clientes=('Parceiro', 'nunique')).reset_index()
-    
+    data_fato = converter_datas(df_fato['Dt. Neg.'])
+    fato = pd.DataFrame({
+        'NOME': normalizar_nomes(df_fato['Apelido (Vendedor)']),
+        'ANO': data_fato.dt.year, 'MES': data_fato.dt.month,
+        'Vlr. Nota': df_fato['Vlr. Nota'], 'Parceiro': df_fato['Parceiro'],
+    }).dropna(subset=['ANO', 'MES'])
+    fato = fato[mascara_vigencia(fato['NOME'], fato['MES'], VIG_VEND)]
+    tab_vendas = fato.groupby(chaves).agg(Faturado=('Vlr. Nota', 'sum'), Clientes=('Parceiro', 'nunique')).reset_index()
+
     base_ativa = df_cad[df_cad['BASE DE ATIVOS'].astype(str).str.contains('BASE ATIVA', case=False, na=False)]
-    ativos_v = base_ativa.groupby('Apelido (Vendedor)').size().reset_index(name='Total_Base')
-    
-    lista_v_ativas = [v for v, (i, f) in VIG_VEND.items() if i <= mes_num <= f]
-    tab_vendas = pd.merge(q_v, ativos_v, on='Apelido (Vendedor)', how='left').fillna(0)
-    tab_vendas['Apelido_Upper'] = tab_vendas['Apelido (Vendedor)'].astype(str).str.strip().str.upper()
-    tab_vendas = tab_vendas[tab_vendas['Apelido_Upper'].isin(lista_v_ativas)]
-    tab_vendas['Conv_Vendas'] = (tab_vendas['Clientes'] / tab_vendas['Total_Base'] * 100).fillna(0)
-
-    # --- METAS ---
-    meta_v_fat = np.ceil(METAS_FAT_TOTAL.get(mes_num, 0) / len(lista_v_ativas)) if lista_v_ativas else 0
-    meta_s_lojas = np.ceil(METAS_SDR_TOTAL[12]['lojas'] / len(lista_s_ativas)) if lista_s_ativas else 0
-    meta_s_cad = np.ceil(METAS_SDR_TOTAL[12]['cad'] / len(lista_s_ativas)) if lista_s_ativas else 0
-
-    # --- GERAÇÃO ---
-    desenhar_grafico(tab_vendas, 'Faturado', "VENDAS: FATURAMENTO", meta_v_fat, f"R$ {formatar_brl(meta_v_fat)}", "v_fat.png", prefix="R$ ")
-    desenhar_grafico(tab_vendas, 'Conv_Vendas', "VENDAS: % CONV. BASE", METAS_VEND_KPI[12]['conv'], f"{METAS_VEND_KPI[12]['conv']}%", "v_conv.png", sufixo="%")
-    desenhar_grafico(tab_sdr, 'Lojas_Pedido', "SDR: LOJAS C/ PEDIDO", meta_s_lojas, str(int(meta_s_lojas)), "s_lojas.png")
-    desenhar_grafico(tab_sdr, 'Lojas_Cadastradas', "SDR: NOVOS CADASTROS", meta_s_cad, str(int(meta_s_cad)), "s_cad.png")
-    desenhar_grafico(tab_sdr, 'Conv_SDR', "SDR: % CONV. PROSPECÇÃO", METAS_SDR_TOTAL[12]['conv'], f"{METAS_SDR_TOTAL[12]['conv']}%", "s_conv.png", sufixo="%")
+    total_base = normalizar_nomes(base_ativa['Apelido (Vendedor)']).value_counts()
+    tab_vendas['Total_Base'] = tab_vendas['NOME'].map(total_base).fillna(0)
+    tab_vendas['Conv_Vendas'] = (tab_vendas['Clientes'] / tab_vendas['Total_Base'] * 100).replace([np.inf, -np.inf], 0).fillna(0)
+
+    # --- METAS (uma linha por mês, levada a cada pessoa pelo mês) ---
+    snapshot = pd.concat([tab_vendas.assign(TIPO='VENDAS'), tab_sdr.assign(TIPO='SDR')], ignore_index=True)
+    snapshot[['ANO', 'MES']] = snapshot[['ANO', 'MES']].astype(int)
+    snapshot = snapshot.join(metas_mensais(), on='MES')
+    return snapshot[COLUNAS_CHAVE + [c for c in snapshot.columns if c not in COLUNAS_CHAVE]]
+
+def obter_snapshot_kpis(forcar=False):
+    parametros = {'metas_fat': METAS_FAT_TOTAL, 'metas_vend': METAS_VEND_KPI, 'metas_sdr': METAS_SDR_TOTAL,
+                  'vig_sdr': VIG_SDR, 'vig_vend': VIG_VEND}
+    return obter_snapshot(SNAPSHOT, ARQUIVO, calcular_snapshot, parametros, forcar)
+
+def tarefas_do_mes(snapshot, mes_num, ano, prefixo=""):
+    """Os 5 gráficos do mês como tarefas independentes (gráficos sem dados ficam de fora)."""
+    tab_vendas = quadro_do_mes(snapshot, 'VENDAS', ano, mes_num, ['Faturado', 'Conv_Vendas'])
+    tab_sdr = quadro_do_mes(snapshot, 'SDR', ano, mes_num, ['Lojas_Pedido', 'Lojas_Cadastradas', 'Conv_SDR'])
+    metas = metas_mensais().loc[mes_num]
+
+    graficos = [
+        (tab_vendas, 'Faturado', "VENDAS: FATURAMENTO", metas['Meta_Faturado'], f"R$ {formatar_brl(metas['Meta_Faturado'])}", "v_fat.png", "R$ ", ""),
+        (tab_vendas, 'Conv_Vendas', "VENDAS: % CONV. BASE", metas['Meta_Conv_Vendas'], f"{metas['Meta_Conv_Vendas']}%", "v_conv.png", "", "%"),
+        (tab_sdr, 'Lojas_Pedido', "SDR: LOJAS C/ PEDIDO", metas['Meta_Lojas_Pedido'], str(int(metas['Meta_Lojas_Pedido'])), "s_lojas.png", "", ""),
+        (tab_sdr, 'Lojas_Cadastradas', "SDR: NOVOS CADASTROS", metas['Meta_Lojas_Cadastradas'], str(int(metas['Meta_Lojas_Cadastradas'])), "s_cad.png", "", ""),
+        (tab_sdr, 'Conv_SDR', "SDR: % CONV. PROSPECÇÃO", metas['Meta_Conv_SDR'], f"{metas['Meta_Conv_SDR']}%", "s_conv.png", "", "%"),
+    ]
+    return [
+        {'arquivo': f"{prefixo}{arq}", 'nomes': df['NOME'].tolist(), 'valores': df[col].to_numpy(dtype=float),
+         'titulo': titulo, 'meta': float(meta), 'meta_display': meta_display, 'prefix': prefix, 'sufixo': sufixo}
+        for df, col, titulo, meta, meta_display, arq, prefix, sufixo in graficos if not df.empty
+    ]
+
+def gerar_graficos(snapshot, mes_num, ano):
+    """Gráficos do mês lidos do snapshot (sem abrir o Excel)."""
+    return renderizar_lote(tarefas_do_mes(snapshot, mes_num, ano))
+
+def gerar_graficos_ano(snapshot, ano, pasta=PASTA_GRAFICOS, arquivo_zip=None, workers=None):
+    """Os 12 meses do ano de uma vez, renderizados em paralelo."""
+    t0 = time.perf_counter()
+    tarefas = [t for mes in range(1, 13) for t in tarefas_do_mes(snapshot, mes, ano, prefixo=f"{ano}-{mes:02d}_")]
+    saida = renderizar_lote(tarefas, pasta, arquivo_zip, workers)
+    print(f"[ÓRION] {len(tarefas)} gráficos de {ano} em {time.perf_counter() - t0:.1f}s → {arquivo_zip or pasta}")
+    return saida
+
+def benchmark_renderizacao(workers=None, pasta="benchmark_graficos"):
+    """Um ano de painéis (12 meses x 5 gráficos) com dados sintéticos: sem cache, com cache, em paralelo e em ZIP."""
+    rng = np.random.default_rng(42)
+    tarefas = []
+    for mes in range(1, 13):
+        for titulo, nomes, escala, sufixo in [("VENDAS: FATURAMENTO", list(VIG_VEND), 400000, ""), ("VENDAS: % CONV. BASE", list(VIG_VEND), 40, "%"),
+                                              ("SDR: LOJAS C/ PEDIDO", list(VIG_SDR), 30, ""), ("SDR: NOVOS CADASTROS", list(VIG_SDR), 40, ""),
+                                              ("SDR: % CONV. PROSPECÇÃO", list(VIG_SDR), 100, "%")]:
+            meta = escala * 0.6
+            tarefas.append({'arquivo': f"2025-{mes:02d}_{len(tarefas)}.png", 'nomes': nomes, 'valores': rng.random(len(nomes)) * escala,
+                            'titulo': titulo, 'meta': meta, 'meta_display': f"{meta:.1f}{sufixo}",
+                            'prefix': "R$ " if escala == 400000 else "", 'sufixo': sufixo})
+
+    def sem_cache():
+        for t in tarefas:
+            carregar_fontes.cache_clear(); largura_rotulo.cache_clear(); cabecalho_grafico.cache_clear()
+            _png_grafico(t)
+
+    medicoes = {}
+    for nome, funcao in [("serial, sem cache (como antes)", sem_cache),
+                         ("serial, fontes/cabeçalhos em cache", lambda: [_png_grafico(t) for t in tarefas]),
+                         ("pool de processos -> pasta", lambda: renderizar_lote(tarefas, pasta, workers=workers)),
+                         ("pool de processos -> ZIP em memória", lambda: renderizar_lote(tarefas, arquivo_zip=io.BytesIO(), workers=workers))]:
+        t0 = time.perf_counter()
+        funcao()
+        medicoes[nome] = time.perf_counter() - t0
+
+    print(f"\n[BENCHMARK] {len(tarefas)} gráficos ({os.cpu_count()} CPU)")
+    base = next(iter(medicoes.values()))
+    for nome, seg in medicoes.items():
+        print(f"  {nome:<38} {seg:6.2f}s  ({base / seg:4.1f}x)")
+
+def processar_orion(mes_num=None, ano=None, reconstruir=False, abrir=True):
+    if mes_num is None: mes_num = int(input("Mês (1-12): "))
+    if ano is None: ano = int(input("Ano (AAAA): "))
+
+    snapshot = obter_snapshot_kpis(reconstruir)
+    gerar_graficos(snapshot, mes_num, ano)
 
     print(f"\n[ÓRION] Processado com sucesso.")
-    for f in ["v_fat.png", "v_conv.png", "s_lojas.png", "s_cad.png", "s_conv.png"]: 
-        if os.path.exists(f): os.startfile(f)
+    if abrir:
+        for f in ["v_fat.png", "v_conv.png", "s_lojas.png", "s_cad.png", "s_conv.png"]: 
+            if os.path.exists(f): os.startfile(f)
 
 if __name__ == "__main__":
-    processar_orion()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Gráficos de desempenho (vendas e SDR)")
+    parser.add_argument("--mes", type=int, choices=range(1, 13))
+    parser.add_argument("--ano", type=int)
+    parser.add_argument("--reconstruir", action="store_true", help="recalcula o snapshot mesmo sem mudança na planilha")
+    parser.add_argument("--nao-abrir", action="store_true", help="só grava as imagens")
+    parser.add_argument("--ano-inteiro", action="store_true", help="gera os gráficos dos 12 meses de --ano")
+    parser.add_argument("--zip", help="grava os gráficos do ano em um arquivo ZIP em vez da pasta")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--benchmark", action="store_true", help="renderiza um ano de painéis sintéticos e compara os modos")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_renderizacao(args.workers)
+    elif args.ano_inteiro:
+        ano = args.ano or int(input("Ano (AAAA): "))
+        gerar_graficos_ano(obter_snapshot_kpis(args.reconstruir), ano, arquivo_zip=args.zip, workers=args.workers)
+    else:
+        processar_orion(args.mes, args.ano, args.reconstruir, not args.nao_abrir)
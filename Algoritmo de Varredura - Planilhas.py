@@ -1,6 +1,23 @@
+import argparse
+import importlib.util
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-import unicodedata
+
+from excel_writer import escrever_excel_formatado
+from similaridade import agrupar_similares
+
+ARQUIVO_PADRAO = 'INVENTARIO CD ESMERALDAS ETL.xlsx'
+ARQUIVO_SAIDA = 'INVENTARIO_CONSOLIDADO_ORION_V6.xlsx'
+LINHAS_BUSCA_CABECALHO = 50
+
+# calamine (Rust) lê o xlsx bem mais rápido que o openpyxl; usado se estiver instalado
+MOTOR_EXCEL = "calamine" if importlib.util.find_spec("python_calamine") else None
 
 def limpar_valor_seguro(valor):
     """
@@ -29,49 +46,52 @@ dicionario_bruto = {
 
 MAPA_NORMALIZADO = {k: [limpar_valor_seguro(v) for v in lista] for k, lista in dicionario_bruto.items()}
 
-def extrair_dados_aba(xls, nome_aba):
-    # Carrega as primeiras 50 linhas para busca
-    df_busca = pd.read_excel(xls, sheet_name=nome_aba, header=None, nrows=50)
-    
-    linha_mestre = None
-    mapeamento = {}
+# Lookup compilado: sinônimo normalizado -> categorias candidatas (na ordem do dicionário).
+# "ESTOQUE" é sinônimo de QTDE e de DEPOSITO; fica com a primeira ainda livre na linha.
+SINONIMOS = {}
+for _categoria, _lista in MAPA_NORMALIZADO.items():
+    for _sinonimo in _lista:
+        if _categoria not in SINONIMOS.setdefault(_sinonimo, ()):
+            SINONIMOS[_sinonimo] += (_categoria,)
+
+def localizar_cabecalho(df_bruto):
+    """
+    Procura a linha de cabeçalho nas primeiras linhas já carregadas.
+    Cada valor distinto é normalizado uma única vez.
+    Retorna (linha, {posição da coluna: categoria}) ou (None, {}).
+    """
+    bloco = df_bruto.iloc[:LINHAS_BUSCA_CABECALHO]
+    if bloco.empty:
+        return None, {}
+
+    valores = bloco.to_numpy(dtype=object)
+    normalizados = {v: limpar_valor_seguro(v) for v in pd.unique(valores.ravel())}
 
-    # Percorre cada linha
-    for idx_linha, row in df_busca.iterrows():
-        temp_map = {}
+    for idx_linha, row in enumerate(valores):
+        mapeamento = {}
         achados = set()
-        
-        # Percorre cada célula da linha de forma isolada
         for idx_col, celula in enumerate(row):
-            valor_limpo = limpar_valor_seguro(celula)
-            
-            for categoria, sinonimos in MAPA_NORMALIZADO.items():
-                if valor_limpo in sinonimos and categoria not in achados:
-                    temp_map[idx_col] = categoria
+            for categoria in SINONIMOS.get(normalizados.get(celula, ""), ()):
+                if categoria not in achados:
+                    mapeamento[idx_col] = categoria
                     achados.add(categoria)
-        
+                    break
+
         # Critério de sucesso: achou SKU e QTDE
         if "SKU" in achados and "QTDE" in achados:
-            linha_mestre = idx_linha
-            mapeamento = temp_map
-            break
-            
+            return idx_linha, mapeamento
+
+    return None, {}
+
+def extrair_dados_aba(df_bruto, nome_aba):
+    """Detecta o cabeçalho e fatia o corpo do mesmo buffer (a aba é lida uma vez só)."""
+    linha_mestre, mapeamento = localizar_cabecalho(df_bruto)
     if linha_mestre is None:
         return None
 
-    # Re-leitura focada na linha correta
-    df_real = pd.read_excel(xls, sheet_name=nome_aba, skiprows=linha_mestre)
-    
-    # Faz o de-para das colunas reais para as oficiais
-    colunas_originais = df_real.columns
-    renomear_dict = {}
-    for pos, cat in mapeamento.items():
-        if pos < len(colunas_originais):
-            renomear_dict[colunas_originais[pos]] = cat
-
-    # Seleção segura
-    df_limpo = df_real[list(renomear_dict.keys())].copy()
-    df_limpo = df_limpo.rename(columns=renomear_dict)
+    posicoes = list(mapeamento)
+    df_limpo = df_bruto.iloc[linha_mestre + 1:, posicoes].copy()
+    df_limpo.columns = [mapeamento[p] for p in posicoes]
 
     # Garantia de colunas obrigatórias
     if 'DEPOSITO' not in df_limpo.columns: df_limpo['DEPOSITO'] = nome_aba
@@ -79,47 +99,107 @@ def extrair_dados_aba(xls, nome_aba):
     
     return df_limpo[['SKU', 'DESCRICAO', 'DEPOSITO', 'QTDE']]
 
-def executar_consolidacao():
-    arquivo = 'INVENTARIO CD ESMERALDAS ETL.xlsx'
+def processar_arquivo(arquivo):
+    """
+    Lê todas as abas de um workbook numa única passada (células brutas, sem cabeçalho)
+    e extrai cada uma. Roda dentro do pool: devolve dados, mensagens e tempos.
+    """
+    t0 = time.perf_counter()
+    mensagens = []
+    partes = []
+
+    abas = pd.read_excel(arquivo, sheet_name=None, header=None, engine=MOTOR_EXCEL)
+    t_leitura = time.perf_counter() - t0
+
+    for aba, df_bruto in abas.items():
+        try:
+            resultado_aba = extrair_dados_aba(df_bruto, aba)
+            if resultado_aba is not None:
+                resultado_aba['ORIGEM_ABA'] = aba
+                resultado_aba['ORIGEM_ARQUIVO'] = Path(arquivo).name
+                partes.append(resultado_aba)
+                mensagens.append(f"✅ Aba '{aba}': Extraída ({len(resultado_aba)} linhas).")
+            else:
+                mensagens.append(f"⚠️ Aba '{aba}': SKU/QTDE não localizados.")
+        except Exception as e_aba:
+            mensagens.append(f"❌ Falha técnica na aba '{aba}': {e_aba}")
+
+    df = pd.concat(partes, ignore_index=True) if partes else None
+    return df, mensagens, t_leitura, time.perf_counter() - t0
+
+def listar_arquivos(caminhos):
+    arquivos = []
+    for caminho in map(Path, caminhos):
+        if caminho.is_dir():
+            arquivos.extend(sorted(p for p in caminho.glob("*.xls*") if not p.name.startswith("~$")))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+def executar_consolidacao(caminhos=(ARQUIVO_PADRAO,), saida=ARQUIVO_SAIDA, workers=None, casamento=True):
+    # Rodando sobre a mesma pasta, o consolidado anterior não entra como insumo
+    arquivos = [a for a in listar_arquivos(caminhos) if a.resolve() != Path(saida).resolve()]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(arquivos) or 1))
     print(f"--- Iniciando Consolidação Blindada (V6) ---")
-    
-    try:
-        xls = pd.ExcelFile(arquivo)
-        final_list = []
+    print(f"{len(arquivos)} arquivo(s), {workers} processo(s)")
+
+    t0 = time.perf_counter()
+    final_list = []
 
-        for aba in xls.sheet_names:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(processar_arquivo, str(a)): a for a in arquivos}
+        for futuro in as_completed(futuros):
+            arquivo = futuros[futuro]
             try:
-                resultado_aba = extrair_dados_aba(xls, aba)
-                if resultado_aba is not None:
-                    resultado_aba['ORIGEM_ABA'] = aba
-                    final_list.append(resultado_aba)
-                    print(f"✅ Aba '{aba}': Extraída.")
-                else:
-                    print(f"⚠️ Aba '{aba}': SKU/QTDE não localizados.")
-            except Exception as e_aba:
-                print(f"❌ Falha técnica na aba '{aba}': {e_aba}")
-
-        if final_list:
-            df_full = pd.concat(final_list, ignore_index=True)
-            
-            # Limpeza final de valores de SKU (Lidando com .0 do Excel)
-            df_full['SKU'] = df_full['SKU'].apply(lambda x: str(x).replace('.0', '').strip().upper() if pd.notna(x) else "")
-            df_full['QTDE'] = pd.to_numeric(df_full['QTDE'], errors='coerce').fillna(0)
-            
-            df_full = df_full[df_full['SKU'] != ""]
-            df_full = df_full.rename(columns={'DESCRICAO': 'DESCRIÇÃO', 'DEPOSITO': 'DEPÓSITO'})
-            
-            # Ordenação e ID
-            df_full = df_full.sort_values(by=['DEPÓSITO', 'SKU']).reset_index(drop=True)
-            df_full.insert(0, 'ID', df_full.index + 1)
-            
-            df_full.to_excel('INVENTARIO_CONSOLIDADO_ORION_V6.xlsx', index=False)
-            print(f"\n🚀 SUCESSO! {len(df_full)} registros processados.")
-        else:
-            print("\nNenhum dado capturado.")
+                df, mensagens, t_leitura, t_total = futuro.result()
+            except Exception as e_arquivo:
+                print(f"\nERRO CRÍTICO NO ARQUIVO {arquivo.name}: {e_arquivo}")
+                continue
 
-    except Exception as e_geral:
-        print(f"\nERRO CRÍTICO NO ARQUIVO: {e_geral}")
+            print(f"\n📄 {arquivo.name}: leitura {t_leitura:.2f}s | total {t_total:.2f}s")
+            for msg in mensagens:
+                print(f"   {msg}")
+            if df is not None:
+                final_list.append(df)
+
+    if final_list:
+        df_full = pd.concat(final_list, ignore_index=True)
+        
+        # Limpeza final de valores de SKU (Lidando com .0 do Excel)
+        sku = df_full['SKU'].astype("string").str.strip().str.upper().str.replace(r'\.0$', '', regex=True)
+        df_full['SKU'] = sku.fillna("")
+        df_full['QTDE'] = pd.to_numeric(df_full['QTDE'], errors='coerce').fillna(0)
+        
+        df_full = df_full[df_full['SKU'] != ""]
+        df_full = df_full.rename(columns={'DESCRICAO': 'DESCRIÇÃO', 'DEPOSITO': 'DEPÓSITO'})
+
+        # Casamento de produtos entre filiais: descrições com grafia diferente (acentos,
+        # espaços, abreviações) ou mesmo SKU caem no mesmo cluster
+        if casamento:
+            t_match = time.perf_counter()
+            df_full = df_full.join(agrupar_similares(df_full['DESCRIÇÃO'], skus=df_full['SKU']))
+            contagem = df_full.groupby(['CLUSTER_PRODUTO', 'SKU']).size().rename('n').reset_index()
+            canonico = contagem.sort_values(['CLUSTER_PRODUTO', 'n', 'SKU'], ascending=[True, False, True])
+            canonico = canonico.drop_duplicates('CLUSTER_PRODUTO').set_index('CLUSTER_PRODUTO')['SKU']
+            df_full['SKU_CANONICO'] = df_full['CLUSTER_PRODUTO'].map(canonico)
+            print(f"🔗 Casamento: {df_full['SKU'].nunique()} SKUs -> {df_full['CLUSTER_PRODUTO'].nunique()} produtos "
+                  f"({time.perf_counter() - t_match:.1f}s)")
+        
+        # Ordenação e ID
+        df_full = df_full.sort_values(by=['DEPÓSITO', 'SKU']).reset_index(drop=True)
+        df_full.insert(0, 'ID', df_full.index + 1)
+        
+        # Escrita em streaming: o to_excel padrão levava mais tempo que a leitura de todos os arquivos
+        escrever_excel_formatado(df_full, saida, aba="Sheet1", texto_longo_esquerda=None)
+        print(f"\n🚀 SUCESSO! {len(df_full)} registros processados em {time.perf_counter() - t0:.1f}s.")
+    else:
+        print("\nNenhum dado capturado.")
 
 if __name__ == "__main__":
-    executar_consolidacao()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Consolida inventários de várias planilhas/abas")
+    parser.add_argument("caminhos", nargs="*", default=[ARQUIVO_PADRAO], help="arquivos .xlsx ou pastas")
+    parser.add_argument("--saida", default=ARQUIVO_SAIDA)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sem-casamento", action="store_true", help="não agrupa descrições similares")
+    args = parser.parse_args()
+    executar_consolidacao(args.caminhos, args.saida, args.workers, casamento=not args.sem_casamento)
@@ -1,10 +1,17 @@
+import argparse
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import load_workbook
-from openpyxl.drawing.image import Image as OpenpyxlImage
 from openpyxl.styles import PatternFill, Font, Alignment
 import time
 
+from cubo_ranking import (
+    assinatura_arquivo, combinacoes_filtro, construir_cubo, consultar_cubo, obter_cubo, rotulo_filtros,
+    trecho_nome_arquivo,
+)
+from imagens_produtos import IndiceImagens, normalizar_codigo
+
 # ==========================================================
 # 🔧 CONFIGURAÇÕES E COLUNAS CHAVE
 # ==========================================================
@@ -27,6 +34,11 @@ COLUNAS_CHAVE = {
 DIRETORIO_BASE = os.path.abspath(r'C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\Scripts Python')
 ARQUIVO_BASE_SANKHYA = os.path.join(DIRETORIO_BASE, 'Base de Produtos Mais Vendidos - Showroom.xlsx')
 DIRETORIO_IMAGENS = os.path.join(DIRETORIO_BASE, 'IMAGENS')
+TAMANHO_FOTO = (80, 80)  # pixels da célula da foto
+PASTA_LOTE = os.path.join(DIRETORIO_BASE, 'Relatorios Mais Vendidos - Showroom')
+
+DIMENSOES_FILTRO = ['COD_UF', 'REGIAO', 'INSIDE_SALES']
+TOP_CATEGORIA = 40
 
 SUBGRUPOS_PARA_PERGUNTAR = ['CHINELO', 'SACOLAS', 'REVENDA', 'MARY KAY']
 
@@ -34,15 +46,11 @@ SUBGRUPOS_PARA_PERGUNTAR = ['CHINELO', 'SACOLAS', 'REVENDA', 'MARY KAY']
 # 🚀 FUNÇÃO PRINCIPAL
 # ==========================================================
 
-def consolidar_relatorio(filtros: dict):
-
+def ler_base() -> pd.DataFrame:
+    """Planilha do Sankhya com colunas renomeadas e texto padronizado."""
     # 1) Ler a base
-    try:
-        df_bruto = pd.read_excel(ARQUIVO_BASE_SANKHYA, sheet_name='BASE PRODUTOS')
-        print(f"Base Sankhya lida com sucesso. Total de {len(df_bruto)} linhas.")
-    except Exception as e:
-        print(f"❌ ERRO ao ler planilha: {e}")
-        return
+    df_bruto = pd.read_excel(ARQUIVO_BASE_SANKHYA, sheet_name='BASE PRODUTOS')
+    print(f"Base Sankhya lida com sucesso. Total de {len(df_bruto)} linhas.")
 
     df_bruto.columns = df_bruto.columns.str.strip()
 
@@ -81,68 +89,127 @@ def consolidar_relatorio(filtros: dict):
         if col in df_bruto.columns:
             df_bruto[col] = pd.to_numeric(df_bruto[col], errors='coerce').fillna(0)
 
+    for col in DIMENSOES_FILTRO:
+        if col not in df_bruto.columns:
+            df_bruto[col] = pd.NA
+
+    return df_bruto
+
+
+def perguntar_exclusoes() -> list:
     # 4) EXCLUSÃO INTERATIVA DE SUBGRUPOS
-    if 'SUBGRUPO' in df_bruto.columns:
-        print("\n--- VALIDAÇÃO DE EXCLUSÃO DE SUBGRUPOS ---")
-        subgrupos_a_excluir = []
-        for sg in SUBGRUPOS_PARA_PERGUNTAR:
-            resp = input(f"Deseja EXCLUIR o subgrupo '{sg}' do relatório? (S/N): ").strip().upper()
-            if resp == 'S':
-                subgrupos_a_excluir.append(sg)
-        
-        if subgrupos_a_excluir:
-            antes = len(df_bruto)
-            df_bruto = df_bruto[~df_bruto['SUBGRUPO'].isin(subgrupos_a_excluir)]
-            print(f"→ Aplicado: {antes - len(df_bruto)} linhas removidas ({', '.join(subgrupos_a_excluir)}).")
+    print("\n--- VALIDAÇÃO DE EXCLUSÃO DE SUBGRUPOS ---")
+    subgrupos_a_excluir = []
+    for sg in SUBGRUPOS_PARA_PERGUNTAR:
+        resp = input(f"Deseja EXCLUIR o subgrupo '{sg}' do relatório? (S/N): ").strip().upper()
+        if resp == 'S':
+            subgrupos_a_excluir.append(sg)
+    return subgrupos_a_excluir
+
+
+def caminho_cubo(subgrupos_a_excluir: list) -> str:
+    """Um cubo por conjunto de subgrupos excluídos (cada resposta do menu reaproveita o seu)."""
+    sufixo = '+'.join(sorted(subgrupos_a_excluir)) or 'COMPLETO'
+    return os.path.join(DIRETORIO_BASE, f'Cubo Mais Vendidos - Showroom ({sufixo}).parquet')
+
+
+def construir_cubo_showroom(subgrupos_a_excluir: list) -> pd.DataFrame:
+    """Top 40 por categoria para toda combinação de UF x Região x Inside Sales (e com/sem estoque)."""
+    df_bruto = ler_base()
+    if subgrupos_a_excluir and 'SUBGRUPO' in df_bruto.columns:
+        antes = len(df_bruto)
+        df_bruto = df_bruto[~df_bruto['SUBGRUPO'].isin(subgrupos_a_excluir)]
+        print(f"→ Aplicado: {antes - len(df_bruto)} linhas removidas ({', '.join(subgrupos_a_excluir)}).")
+
+    com_estoque = None
+    if 'ESTOQUE' in df_bruto.columns:
+        com_estoque = pd.to_numeric(df_bruto['ESTOQUE'], errors='coerce').fillna(0) > 0
+
+    # Rank denso por categoria; empates seguem a ordem do agrupamento (referência, código, descrição)
+    produto = ['REFERENCIA_PRODUTO', 'CODIGO_SANKHYA', 'DESCRICAO_PRODUTO']
+    return construir_cubo(
+        df_bruto, DIMENSOES_FILTRO, produto=produto, categoria='CATEGORIA', medida='QTD_VENDIDA',
+        top=TOP_CATEGORIA, desempate=produto, estoque=com_estoque,
+    )
+
+
+def carregar_cubo_showroom(subgrupos_a_excluir: list, forcar: bool = False) -> pd.DataFrame:
+    """Cubo salvo em Parquet; só é refeito quando a planilha muda."""
+    metadados = {
+        'origem': assinatura_arquivo(ARQUIVO_BASE_SANKHYA),
+        'excluidos': sorted(subgrupos_a_excluir),
+        'top': TOP_CATEGORIA,
+    }
+    return obter_cubo(caminho_cubo(subgrupos_a_excluir), metadados,
+                      lambda: construir_cubo_showroom(subgrupos_a_excluir), forcar)
+
+
+def ranking_do_cubo(cubo: pd.DataFrame, filtros: dict, so_com_estoque: bool) -> pd.DataFrame:
+    df = consultar_cubo(cubo, DIMENSOES_FILTRO, filtros, 'CATEGORIA',
+                        categoria=filtros.get('CATEGORIA'), so_com_estoque=so_com_estoque)
+    df = df.rename(columns={'QTD_VENDIDA': 'VENDAS_TOTAIS', 'RANK_DENSO': 'RANK_CATEGORIA'})
+    return df.sort_values(['CATEGORIA', 'RANKING']).reset_index(drop=True)
+
+
+def consolidar_relatorio(filtros: dict):
+
+    subgrupos_a_excluir = perguntar_exclusoes()
+    try:
+        cubo = carregar_cubo_showroom(subgrupos_a_excluir)
+    except Exception as e:
+        print(f"❌ ERRO ao ler planilha: {e}")
+        return
 
     # 5) Filtros interativos
-    df_filtrado = df_bruto.copy()
     for coluna, valor in filtros.items():
-        if valor and coluna in df_filtrado.columns:
-            v = str(valor).upper().strip()
-            print(f"→ Filtro: {coluna} = {v}")
-            df_filtrado = df_filtrado[df_filtrado[coluna] == v]
+        if valor:
+            print(f"→ Filtro: {coluna} = {str(valor).upper().strip()}")
 
-    if df_filtrado.empty:
+    if ranking_do_cubo(cubo, filtros, so_com_estoque=False).empty:
         print("⚠️ Nenhum dado encontrado após aplicar filtros.")
         return
 
     # 5.1) Filtro de estoque
     opcao_estoque = input("\nDeseja excluir produtos sem estoque? (S/N): ").strip().upper()
-    if opcao_estoque == "S":
-        if 'ESTOQUE' in df_filtrado.columns:
-            antes = len(df_filtrado)
-            df_filtrado = df_filtrado[df_filtrado['ESTOQUE'] > 0]
-            print(f"→ Estoque aplicado: {antes - len(df_filtrado)} produtos removidos.")
-
-    # 6) Consolidação e ranking
-    df_agrup = df_filtrado.groupby(
-        ['REFERENCIA_PRODUTO', 'CODIGO_SANKHYA', 'DESCRICAO_PRODUTO', 'CATEGORIA']
-    ).agg(VENDAS_TOTAIS=('QTD_VENDIDA', 'sum')).reset_index()
-
-    df_agrup['RANK_CATEGORIA'] = df_agrup.groupby('CATEGORIA')['VENDAS_TOTAIS'].rank(
-        method='dense', ascending=False
-    ).astype(int)
-
-    df_top10 = (
-        df_agrup[df_agrup['RANK_CATEGORIA'] <= 40]
-        .sort_values(by=['CATEGORIA', 'RANK_CATEGORIA', 'VENDAS_TOTAIS'], ascending=[True, True, False])
-        .groupby('CATEGORIA')
-        .head(40)
-        .reset_index(drop=True)
-    )
+
+    # 6) Ranking (rank denso <= 40, no máximo 40 itens por categoria) lido do cubo
+    df_top10 = ranking_do_cubo(cubo, filtros, so_com_estoque=opcao_estoque == "S")
 
     exportar_e_formatar(df_top10, filtros)
 
+
+def exportar_todas_combinacoes(subgrupos_a_excluir: list, so_com_estoque: bool = False,
+                               workers: int | None = None, forcar_cubo: bool = False):
+    """Modo não interativo: um relatório por combinação do cubo (geral, UF, Região, Inside Sales e cruzamentos)."""
+    t0 = time.perf_counter()
+    cubo = carregar_cubo_showroom(subgrupos_a_excluir, forcar_cubo)
+    tarefas = []
+    for filtros in combinacoes_filtro(cubo, DIMENSOES_FILTRO):
+        df = ranking_do_cubo(cubo, filtros, so_com_estoque)
+        if not df.empty:
+            tarefas.append((df, filtros))
+    print(f"📊 {len(tarefas)} combinações consultadas no cubo em {time.perf_counter() - t0:.2f}s")
+
+    # Miniaturas preparadas uma vez; os processos só leem do cache
+    codigos = pd.concat([df['CODIGO_SANKHYA'] for df, _ in tarefas]).unique() if tarefas else []
+    IndiceImagens(DIRETORIO_IMAGENS).preparar_miniaturas(codigos, *TAMANHO_FOTO)
+
+    os.makedirs(PASTA_LOTE, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [pool.submit(exportar_e_formatar, df, filtros, PASTA_LOTE) for df, filtros in tarefas]
+        for futuro in futuros:
+            futuro.result()
+    print(f"✨ {len(tarefas)} relatório(s) em '{PASTA_LOTE}' ({time.perf_counter() - t0:.1f}s no total)")
+
 # ==========================================================
 # 🎨 EXPORTAÇÃO E FORMATAÇÃO (ESTÉTICA COMPLETA)
 # ==========================================================
 
-def exportar_e_formatar(df_dados, filtros):
-    uf = filtros.get('COD_UF', '') or filtros.get('REGIAO', '') or filtros.get('INSIDE_SALES', 'GERAL')
+def exportar_e_formatar(df_dados, filtros, pasta=DIRETORIO_BASE):
+    uf = rotulo_filtros(filtros, DIMENSOES_FILTRO)
     cat = filtros.get('CATEGORIA', 'TODAS')
-    nome_arquivo = f"Relatorio_Top10_{uf}_{cat}_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
-    caminho_saida = os.path.join(DIRETORIO_BASE, nome_arquivo)
+    nome_arquivo = f"Relatorio_Top10_{uf}_{trecho_nome_arquivo(cat)}_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
+    caminho_saida = os.path.join(pasta, nome_arquivo)
 
     df_export = df_dados.copy()
     df_export['Rótulos de Linha'] = df_export['REFERENCIA_PRODUTO']
@@ -192,23 +259,16 @@ def exportar_e_formatar(df_dados, filtros):
                 cell.alignment = style_center
 
         print("\n→ Inserindo imagens no Excel...")
+        indice = IndiceImagens(DIRETORIO_IMAGENS)
+        miniaturas = indice.miniaturas_em_memoria(df_dados['CODIGO_SANKHYA'], *TAMANHO_FOTO)
         for index, row in df_dados.iterrows():
-            codigo = str(row['CODIGO_SANKHYA']).strip()
-            img_path = None
-            for ext in ['.jpg', '.png', '.jpeg']:
-                p = os.path.join(DIRETORIO_IMAGENS, f"{codigo}{ext}")
-                if os.path.exists(p):
-                    img_path = p
-                    break
+            codigo = normalizar_codigo(row['CODIGO_SANKHYA'])
 
             row_excel = index + 3
-            if img_path:
-                try:
-                    img = OpenpyxlImage(img_path)
-                    img.width, img.height = 80, 80
-                    ws.add_image(img, f'D{row_excel}')
-                except Exception:
-                    ws.cell(row=row_excel, column=4, value="Erro Img")
+            if codigo in miniaturas:
+                ws.add_image(miniaturas[codigo].para_openpyxl(), f'D{row_excel}')
+            elif codigo in indice:
+                ws.cell(row=row_excel, column=4, value="Erro Img")
             else:
                 ws.cell(row=row_excel, column=4, value="S/ Img")
 
@@ -219,17 +279,29 @@ def exportar_e_formatar(df_dados, filtros):
         print(f"❌ Erro na formatação: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório dos mais vendidos - Showroom")
+    parser.add_argument("--exportar-tudo", action="store_true",
+                        help="gera, sem perguntas, um relatório por combinação de UF, Região e Inside Sales do cubo")
+    parser.add_argument("--excluir", nargs="*", default=[], type=str.upper, choices=SUBGRUPOS_PARA_PERGUNTAR,
+                        help="subgrupos excluídos no modo --exportar-tudo")
+    parser.add_argument("--so-com-estoque", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--reconstruir-cubo", action="store_true", help="refaz o cubo mesmo sem mudança na planilha")
+    args = parser.parse_args()
+
     os.makedirs(DIRETORIO_IMAGENS, exist_ok=True)
-    print("\n1-UF | 2-Região | 3-Inside Sales")
-    opcao = input("Opção: ").strip()
-    filtros = {}
-    if opcao == "1":
-        filtros['COD_UF'] = input("Informe UF: ").strip()
-    elif opcao == "2":
-        filtros['REGIAO'] = input("Informe Região: ").strip()
-    elif opcao == "3":
-        filtros['INSIDE_SALES'] = input("Informe Inside Sales: ").strip()
-    
-    filtros['CATEGORIA'] = input("Categoria: ").strip()
-    consolidar_relatorio(filtros)
-    
\ No newline at end of file
+    if args.exportar_tudo:
+        exportar_todas_combinacoes(args.excluir, args.so_com_estoque, args.workers, args.reconstruir_cubo)
+    else:
+        print("\n1-UF | 2-Região | 3-Inside Sales")
+        opcao = input("Opção: ").strip()
+        filtros = {}
+        if opcao == "1":
+            filtros['COD_UF'] = input("Informe UF: ").strip()
+        elif opcao == "2":
+            filtros['REGIAO'] = input("Informe Região: ").strip()
+        elif opcao == "3":
+            filtros['INSIDE_SALES'] = input("Informe Inside Sales: ").strip()
+        
+        filtros['CATEGORIA'] = input("Categoria: ").strip()
+        consolidar_relatorio(filtros)
@@ -1,10 +1,17 @@
+import argparse
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import load_workbook
-from openpyxl.drawing.image import Image as OpenpyxlImage
 from openpyxl.styles import PatternFill, Font, Alignment
 import time
 
+from cubo_ranking import (
+    assinatura_arquivo, combinacoes_filtro, construir_cubo, consultar_cubo, obter_cubo, rotulo_filtros,
+    trecho_nome_arquivo,
+)
+from imagens_produtos import IndiceImagens, normalizar_codigo
+
 # ==========================================================
 # 🔧 CONFIGURAÇÕES
 # ==========================================================
@@ -26,6 +33,12 @@ COLUNAS_CHAVE = {
 DIRETORIO_BASE = os.path.abspath(r'C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\Scripts Python')
 ARQUIVO_BASE_SANKHYA = os.path.join(DIRETORIO_BASE, 'Base de Produtos Mais Vendidos.xlsx')
 DIRETORIO_IMAGENS = os.path.join(DIRETORIO_BASE, 'IMAGENS')
+TAMANHO_FOTO = (100, 100)  # pixels da célula da foto
+ARQUIVO_CUBO = os.path.join(DIRETORIO_BASE, 'Cubo Mais Vendidos.parquet')
+PASTA_LOTE = os.path.join(DIRETORIO_BASE, 'Relatorios Mais Vendidos')
+
+DIMENSOES_FILTRO = ['COD_UF', 'REGIAO', 'ESTADO_IS']
+TOP_MAXIMO = 40  # maior Top oferecido no menu
 
 # Lista de exclusão rigorosa
 SUBGRUPOS_EXCLUIDOS = ['CHINELO', 'SACOLAS', 'REVENDA', 'MARY KAY']
@@ -34,13 +47,10 @@ SUBGRUPOS_EXCLUIDOS = ['CHINELO', 'SACOLAS', 'REVENDA', 'MARY KAY']
 # 🚀 FUNÇÃO PRINCIPAL
 # ==========================================================
 
-def consolidar_relatorio(filtros: dict, top_n: int):
-    try:
-        df_bruto = pd.read_excel(ARQUIVO_BASE_SANKHYA, sheet_name='BASE PRODUTOS')
-        print(f"\n[DEBUG] Base carregada: {len(df_bruto)} linhas.")
-    except Exception as e:
-        print(f"❌ Erro ao ler Excel: {e}")
-        return
+def ler_base() -> pd.DataFrame:
+    """Planilha do Sankhya com as colunas renomeadas e a lista negra já aplicada."""
+    df_bruto = pd.read_excel(ARQUIVO_BASE_SANKHYA, sheet_name='BASE PRODUTOS')
+    print(f"\n[DEBUG] Base carregada: {len(df_bruto)} linhas.")
 
     # Limpeza de cabeçalho
     df_bruto.columns = df_bruto.columns.str.strip()
@@ -62,34 +72,57 @@ def consolidar_relatorio(filtros: dict, top_n: int):
         df_bruto = df_bruto[~df_bruto['DESCRICAO'].str.contains(termo, na=False)]
     
     print(f"[DEBUG] Linhas removidas pela lista negra ({', '.join(termos_proibidos)}): {antes_excl - len(df_bruto)}")
+    return df_bruto
+
+
+def construir_cubo_vendas() -> pd.DataFrame:
+    """Top 40 por categoria para toda combinação de UF x Região x Inside Sales (e com/sem estoque)."""
+    df = ler_base()
+    for col in DIMENSOES_FILTRO:
+        df[col] = df[col].astype(str).str.upper().str.strip()
+    df['QUANTIDADE'] = pd.to_numeric(df['QUANTIDADE'], errors='coerce').fillna(0)
+    com_estoque = pd.to_numeric(df['ESTOQUE'], errors='coerce').fillna(0) > 0
+
+    return construir_cubo(
+        df, DIMENSOES_FILTRO,
+        produto=['REFERENCIA', 'COD_PRODUTO', 'DESCRICAO'],
+        categoria='CATEGORIA', medida='QUANTIDADE', top=TOP_MAXIMO,
+        desempate=['COD_PRODUTO'], estoque=com_estoque,
+    )
 
-    # --- FILTROS DE USUÁRIO ---
-    df_filtrado = df_bruto.copy()
-    for col, val in filtros.items():
-        if val and col in df_filtrado.columns:
-            v_upper = str(val).upper().strip()
-            df_filtrado = df_filtrado[df_filtrado[col].astype(str).str.upper() == v_upper]
-            print(f"[DEBUG] Filtro {col}={v_upper}: Restam {len(df_filtrado)} linhas.")
 
-    # Filtro de Estoque
-    if input("\nExcluir sem estoque? (S/N): ").strip().upper() == "S":
-        df_filtrado = df_filtrado[pd.to_numeric(df_filtrado['ESTOQUE'], errors='coerce').fillna(0) > 0]
-        print(f"[DEBUG] Após filtro de estoque: {len(df_filtrado)} linhas.")
+def carregar_cubo_vendas(forcar: bool = False) -> pd.DataFrame:
+    """Cubo salvo em Parquet; só é refeito quando a planilha (ou a lista negra) muda."""
+    metadados = {
+        'origem': assinatura_arquivo(ARQUIVO_BASE_SANKHYA),
+        'excluidos': [str(t).upper().strip() for t in SUBGRUPOS_EXCLUIDOS],
+        'top': TOP_MAXIMO,
+    }
+    return obter_cubo(ARQUIVO_CUBO, metadados, construir_cubo_vendas, forcar)
 
-    # --- AJUSTE SOLICITADO: RANKING E CORTE EXATO ---
-    df_agrup = df_filtrado.groupby(['REFERENCIA', 'COD_PRODUTO', 'DESCRICAO', 'CATEGORIA']).agg({'QUANTIDADE': 'sum'}).reset_index()
-    
-    # Ordena por quantidade descrescente e usa o código como desempate para garantir o corte exato
-    df_final = (
-        df_agrup.sort_values(by=['CATEGORIA', 'QUANTIDADE', 'COD_PRODUTO'], ascending=[True, False, True])
-        .groupby('CATEGORIA')
-        .head(top_n)
-        .reset_index(drop=True)
-    )
 
-    # Cria o ranking sequencial limpo
-    df_final['RANKING'] = df_final.groupby('CATEGORIA').cumcount() + 1
-    # ------------------------------------------------
+def ranking_do_cubo(cubo: pd.DataFrame, filtros: dict, top_n: int, so_com_estoque: bool) -> pd.DataFrame:
+    df = consultar_cubo(cubo, DIMENSOES_FILTRO, filtros, 'CATEGORIA',
+                        categoria=filtros.get('CATEGORIA'), so_com_estoque=so_com_estoque, top_n=top_n)
+    return df.sort_values(['CATEGORIA', 'RANKING']).reset_index(drop=True)
+
+
+def consolidar_relatorio(filtros: dict, top_n: int):
+    try:
+        cubo = carregar_cubo_vendas()
+    except Exception as e:
+        print(f"❌ Erro ao ler Excel: {e}")
+        return
+
+    for col in DIMENSOES_FILTRO + ['CATEGORIA']:
+        if filtros.get(col):
+            print(f"[DEBUG] Filtro {col}={str(filtros[col]).upper().strip()}")
+
+    # Filtro de Estoque
+    so_com_estoque = input("\nExcluir sem estoque? (S/N): ").strip().upper() == "S"
+
+    # Ranking sequencial por categoria (quantidade desc, código como desempate), lido do cubo
+    df_final = ranking_do_cubo(cubo, filtros, top_n, so_com_estoque)
 
     print(f"\n✅ Relatório processado com Top {top_n}. Itens finais: {len(df_final)}")
     
@@ -98,11 +131,35 @@ def consolidar_relatorio(filtros: dict, top_n: int):
     else:
         print("⚠️ Nenhum dado restou após os filtros.")
 
-def exportar_excel(df, filtros, top_n):
-    uf = filtros.get('COD_UF') or filtros.get('REGIAO') or filtros.get('ESTADO_IS') or 'GERAL'
-    cat = filtros.get('CATEGORIA', 'GERAL')
-    nome_arq = f"Relatorio_Top{top_n}_{uf}_{cat}_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
-    caminho = os.path.join(DIRETORIO_BASE, nome_arq)
+
+def exportar_todas_combinacoes(top_n: int, so_com_estoque: bool = False, workers: int | None = None,
+                               forcar_cubo: bool = False):
+    """Modo não interativo: um relatório por combinação do cubo (geral, UF, Região, Inside Sales e cruzamentos)."""
+    t0 = time.perf_counter()
+    cubo = carregar_cubo_vendas(forcar_cubo)
+    tarefas = []
+    for filtros in combinacoes_filtro(cubo, DIMENSOES_FILTRO):
+        df = ranking_do_cubo(cubo, filtros, top_n, so_com_estoque)
+        if len(df) > 0:
+            tarefas.append((df, filtros))
+    print(f"📊 {len(tarefas)} combinações consultadas no cubo em {time.perf_counter() - t0:.2f}s")
+
+    # Miniaturas preparadas uma vez; os processos só leem do cache
+    codigos = pd.concat([df['COD_PRODUTO'] for df, _ in tarefas]).unique() if tarefas else []
+    IndiceImagens(DIRETORIO_IMAGENS).preparar_miniaturas(codigos, *TAMANHO_FOTO)
+
+    os.makedirs(PASTA_LOTE, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [pool.submit(exportar_excel, df, filtros, top_n, PASTA_LOTE) for df, filtros in tarefas]
+        for futuro in futuros:
+            futuro.result()
+    print(f"✨ {len(tarefas)} relatório(s) em '{PASTA_LOTE}' ({time.perf_counter() - t0:.1f}s no total)")
+
+def exportar_excel(df, filtros, top_n, pasta=DIRETORIO_BASE):
+    uf = rotulo_filtros(filtros, DIMENSOES_FILTRO)
+    cat = filtros.get('CATEGORIA') or 'GERAL'
+    nome_arq = f"Relatorio_Top{top_n}_{uf}_{trecho_nome_arquivo(cat)}_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
+    caminho = os.path.join(pasta, nome_arq)
 
     df_f = df[['REFERENCIA', 'COD_PRODUTO', 'DESCRICAO', 'RANKING', 'QUANTIDADE']].copy()
     df_f.columns = ['Rótulos de Linha', 'Cod. Sankhya', 'Descrição', 'Ranking', 'VENDAS_TOTAIS']
@@ -128,7 +185,8 @@ def exportar_excel(df, filtros, top_n):
     ws['A1'].fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
     ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
 
-    # Inserir Imagens e Formatar Células
+    # Inserir Imagens e Formatar Células (miniaturas do cache, no tamanho da célula)
+    miniaturas = IndiceImagens(DIRETORIO_IMAGENS).miniaturas_em_memoria(df['COD_PRODUTO'], *TAMANHO_FOTO)
     for i, row in df.reset_index(drop=True).iterrows():
         r_idx = i + 3
         ws.row_dimensions[r_idx].height = 60 
@@ -136,27 +194,35 @@ def exportar_excel(df, filtros, top_n):
         for col_num in range(1, 7):
             ws.cell(row=r_idx, column=col_num).alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
 
-        cod = str(row['COD_PRODUTO']).strip()
-        for ext in ['.jpg', '.png', '.jpeg']:
-            p = os.path.join(DIRETORIO_IMAGENS, f"{cod}{ext}")
-            if os.path.exists(p):
-                img = OpenpyxlImage(p)
-                img.width, img.height = 100, 100 
-                ws.add_image(img, f'D{r_idx}')
-                break
+        miniatura = miniaturas.get(normalizar_codigo(row['COD_PRODUTO']))
+        if miniatura:
+            ws.add_image(miniatura.para_openpyxl(), f'D{r_idx}')
     
     wb.save(caminho)
     print(f"🚀 Sucesso! Arquivo gerado: {nome_arq}")
 
 if __name__ == "__main__":
-    print("\n1-UF | 2-Região | 3-Inside Sales")
-    op = input("Opção: ")
-    top = int(input("Deseja Top 10, 20, 30 ou 40? "))
-    
-    f = {'CATEGORIA': input("Categoria: ")}
-    if op == "1": f['COD_UF'] = input("UF: ")
-    elif op == "2": f['REGIAO'] = input("Região: ")
-    elif op == "3": f['ESTADO_IS'] = input("Vendedora: ")
-    
-    consolidar_relatorio(f, top)
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Relatório dos produtos mais vendidos")
+    parser.add_argument("--exportar-tudo", action="store_true",
+                        help="gera, sem perguntas, um relatório por combinação de UF, Região e Inside Sales do cubo")
+    parser.add_argument("--top", type=int, choices=[10, 20, 30, 40], default=10)
+    parser.add_argument("--so-com-estoque", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--reconstruir-cubo", action="store_true", help="refaz o cubo mesmo sem mudança na planilha")
+    args = parser.parse_args()
+
+    if args.exportar_tudo:
+        exportar_todas_combinacoes(args.top, args.so_com_estoque, args.workers, args.reconstruir_cubo)
+    else:
+        if args.reconstruir_cubo:
+            carregar_cubo_vendas(forcar=True)
+        print("\n1-UF | 2-Região | 3-Inside Sales")
+        op = input("Opção: ")
+        top = int(input("Deseja Top 10, 20, 30 ou 40? "))
+        
+        f = {'CATEGORIA': input("Categoria: ")}
+        if op == "1": f['COD_UF'] = input("UF: ")
+        elif op == "2": f['REGIAO'] = input("Região: ")
+        elif op == "3": f['ESTADO_IS'] = input("Vendedora: ")
+        
+        consolidar_relatorio(f, top)
@@ -1,9 +1,11 @@
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import numpy as np
 import openpyxl
 import shutil
 import os
+import time
+import importlib.util
 
 # 1. DEFINIÇÕES GLOBAIS
 NOME_ARQUIVO_ENTRADA = '9 - CRM MM - Set.25.xlsx'
@@ -23,7 +25,13 @@ COLUNAS_DATA_CONGELAR = [
     'Dias desde Últim. Contato' # Coluna 'W'
 ]
 
-# --- FUNÇÕES AUXILIARES (Manter inalteradas se não forem a causa do erro) ---
+# Leitura dos valores calculados: calamine (Rust) se instalado, senão openpyxl
+MOTOR_EXCEL = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+# Valores "vazios" digitados que viram célula vazia
+VALORES_VAZIOS = ['NAN', 'NA', 'N/A', '-', 'NONE', 'NAT']
+
+# --- FUNÇÕES AUXILIARES ---
 
 def aplicar_correcoes_e_limpeza(df):
     """Aplica regras de correção e padronização em um DataFrame (aba única)."""
@@ -32,14 +40,13 @@ def aplicar_correcoes_e_limpeza(df):
     df.columns = df.columns.str.upper().str.strip() 
 
     # --- A. LIMPEZA E PADRONIZAÇÃO DE TEXTO NAS COLUNAS MANUAIS ---
-    for col in COLUNAS_MANUAIS:
-        col_upper = col.upper().strip()
-        if col_upper in df.columns:
-            # Converte para string, remove espaços e padroniza para MAIÚSCULAS
-            df[col_upper] = df[col_upper].astype(str).str.strip().str.upper()
-            
-            # Substitui valores "vazios" digitados por NaN
-            df[col_upper] = df[col_upper].replace({'NAN', 'NA', 'N/A', '-'}, np.nan)
+    # Todas as colunas manuais presentes numa única operação 2D (strip + upper)
+    cols = [c.upper().strip() for c in COLUNAS_MANUAIS if c.upper().strip() in df.columns]
+    if cols:
+        bloco = df[cols].to_numpy(dtype=str)
+        bloco = np.char.upper(np.char.strip(bloco)).astype(object)
+        bloco[np.isin(bloco, VALORES_VAZIOS)] = np.nan
+        df[cols] = pd.DataFrame(bloco, index=df.index, columns=cols)
         
     # --- B. CORREÇÕES ESPECÍFICAS DE PICKLISTS (Exemplo) ---
     if 'STATUS DO LEAD' in df.columns:
@@ -52,33 +59,74 @@ def aplicar_correcoes_e_limpeza(df):
     return df
 
 def congelar_datas(df_limpo, nome_coluna_data):
-    """Aplica a lógica de congelamento, substituindo a data de hoje pela de ontem."""
+    """Aplica a lógica de congelamento, substituindo a data de hoje pela de ontem (máscara única)."""
     
     data_ontem = (datetime.now() - timedelta(days=1)).date()
     data_hoje = datetime.now().date()
     
     # Converte a coluna para data, ignorando erros
-    data_formatada = pd.to_datetime(df_limpo[nome_coluna_data], errors='coerce').dt.date
+    data_formatada = pd.to_datetime(df_limpo[nome_coluna_data], errors='coerce')
 
-    for idx, data_celula in data_formatada.items():
-        if data_celula == data_hoje:
-            df_limpo.loc[idx, nome_coluna_data] = data_ontem
-        elif pd.isna(data_celula):
-             df_limpo.loc[idx, nome_coluna_data] = None
+    coluna = df_limpo[nome_coluna_data].astype(object)
+    coluna = coluna.mask(data_formatada.dt.date == data_hoje, data_ontem)
+    coluna = coluna.mask(data_formatada.isna(), None)
+    df_limpo[nome_coluna_data] = coluna
 
     return df_limpo
 
+def valores_diferentes(novos, antigos):
+    """Máscara de células alteradas (NaN x NaN conta como igual)."""
+    novos = pd.Series(novos, dtype=object).reset_index(drop=True)
+    antigos = pd.Series(antigos, dtype=object).reset_index(drop=True)
+    ambos_vazios = novos.isna() & antigos.isna()
+    iguais = novos.eq(antigos) | ambos_vazios
+    # datas x datetime do Excel: compara pelo valor de data
+    datas = novos.map(lambda v: isinstance(v, (datetime, date))) & antigos.map(lambda v: isinstance(v, (datetime, date)))
+    if datas.any():
+        iguais[datas] = pd.to_datetime(novos[datas]).eq(pd.to_datetime(antigos[datas]))
+    return (~iguais).to_numpy(dtype=bool, copy=True)
+
+def blocos_contiguos(mascara):
+    """Sequências [ini, fim] de posições True (linhas alteradas vizinhas)."""
+    pos = np.flatnonzero(mascara)
+    if not len(pos):
+        return []
+    quebras = np.flatnonzero(np.diff(pos) > 1)
+    return list(zip(np.r_[pos[0], pos[quebras + 1]].tolist(), np.r_[pos[quebras], pos[-1]].tolist()))
+
+def escrever_coluna(ws, excel_col, valores, mascara):
+    """Grava só as faixas contíguas marcadas na máscara. Retorna o número de células gravadas."""
+    gravadas = 0
+    for ini, fim in blocos_contiguos(mascara):
+        for pos in range(ini, fim + 1):
+            valor = valores[pos]
+            # ws.cell(..., value=None) não apaga a célula: atribui direto no .value
+            ws.cell(row=pos + 2, column=excel_col).value = None if pd.isna(valor) else valor  # Dados começam na linha 2
+        gravadas += fim - ini + 1
+    return gravadas
+
+def celulas_com_formula(ws, excel_col, n_linhas):
+    """Máscara das células da coluna que ainda têm fórmula (precisam ser congeladas)."""
+    valores = next(ws.iter_cols(min_col=excel_col, max_col=excel_col, min_row=2,
+                                max_row=n_linhas + 1, values_only=True), ())
+    formula = np.zeros(n_linhas, dtype=bool)
+    for i, v in enumerate(valores):
+        formula[i] = isinstance(v, str) and v.startswith('=')
+    return formula
+
 
 # --- FUNÇÃO PRINCIPAL CORRIGIDA ---
 
 def processar_crm_com_formatacao(nome_arquivo):
-    """Lê o arquivo, processa todas as abas, sobrescreve dados mantendo a formatação."""
+    """Lê o arquivo, processa todas as abas, sobrescreve só as células alteradas mantendo a formatação."""
     
     # CUIDADO: O código irá criar um backup e depois SOBRESCREVER o arquivo original.
     data_backup = datetime.now().strftime("%Y%m%d_%H%M%S")
     nome_backup = f'CRM_BACKUP_{data_backup}.xlsx'
 
     try:
+        t0 = time.perf_counter()
+
         # 0. Criar backup do arquivo original
         shutil.copy(nome_arquivo, nome_backup)
         print(f"Backup criado com sucesso: {nome_backup}")
@@ -86,17 +134,27 @@ def processar_crm_com_formatacao(nome_arquivo):
         # 1. Abrir o arquivo original com openpyxl (modo de escrita e leitura)
         # Ignoramos warnings de validação de dados, pois não afetam a escrita
         book = openpyxl.load_workbook(nome_arquivo)
+
+        # Valores (já calculados) de todas as abas de SDR numa única leitura.
+        # Só célula vazia vira NaN: textos como "nan" ou "N/A" precisam chegar à limpeza
+        # como texto, senão a comparação não os vê e o placeholder fica na planilha.
+        abas_presentes = [a for a in NOMES_ABAS if a in book.sheetnames]
+        dados = pd.read_excel(nome_arquivo, sheet_name=abas_presentes, engine=MOTOR_EXCEL,
+                              keep_default_na=False, na_values=[""]) if abas_presentes else {}
         
         abas_processadas = 0
+        total_alteradas = 0
+        colunas_data = {c.upper().strip() for c in COLUNAS_DATA_CONGELAR}
 
         # 2. Loop principal para processar cada aba de SDR
         for aba_nome in NOMES_ABAS:
             if aba_nome in book.sheetnames:
                 print(f"-> Corrigindo dados na aba: {aba_nome}...")
                 
-                # --- A. LEITURA E LIMPEZA COM PANDAS ---
-                df_aba = pd.read_excel(nome_arquivo, sheet_name=aba_nome)
+                # --- A. LIMPEZA COM PANDAS ---
+                df_aba = dados[aba_nome]
                 df_aba_limpo = aplicar_correcoes_e_limpeza(df_aba.copy())
+                df_original = df_aba.set_axis(df_aba_limpo.columns, axis=1)
                 
                 # Aplica o congelamento de datas
                 for col_data in COLUNAS_DATA_CONGELAR:
@@ -104,52 +162,43 @@ def processar_crm_com_formatacao(nome_arquivo):
                     if col_upper in df_aba_limpo.columns:
                         df_aba_limpo = congelar_datas(df_aba_limpo, col_upper)
                 
-                # --- B. SOBRESCREVER DADOS NA PLANILHA COM OPENPYXL ---
+                # --- B. SOBRESCREVER SÓ AS CÉLULAS ALTERADAS COM OPENPYXL ---
                 ws = book[aba_nome]
                 
-                # CORREÇÃO CRÍTICA: Trata células de cabeçalho nulas (None)
-                # Garante que .upper() e .strip() só sejam aplicados a strings válidas.
-                header = []
-                for cell in ws[1]:
-                    value = cell.value
-                    if value is not None:
-                        header.append(str(value).upper().strip())
-                    else:
-                        header.append(None) # Mantém a posição se a célula estiver vazia
-                
-                # Mapeamento para encontrar o índice correto da coluna no Excel (1-based)
-                # Filtra apenas colunas com nome válido
+                # Trata células de cabeçalho nulas (None) mantendo a posição
+                header = [str(c.value).upper().strip() if c.value is not None else None for c in ws[1]]
                 col_map = {name: idx + 1 for idx, name in enumerate(header) if name is not None}
 
-                # Colunas para sobrescrever (todas as colunas do DataFrame limpo)
-                cols_to_write = df_aba_limpo.columns
-                
-                # Itera sobre as linhas do DataFrame corrigido (começa da linha 2 do Excel)
-                for r_idx, row_series in df_aba_limpo.iterrows():
-                    excel_row = r_idx + 2 # Dados começam na linha 2 do Excel
-                    
-                    # Itera sobre cada coluna corrigida
-                    for col_name in cols_to_write:
-                        # Verifica se o nome da coluna corrigida existe no mapeamento do Excel
-                        if col_name in col_map:
-                            excel_col = col_map[col_name]
-                            new_value = row_series[col_name]
-                            
-                            # Se o valor é NaN (Pandas para "vazio"), escreve None no Excel
-                            if pd.isna(new_value):
-                                ws.cell(row=excel_row, column=excel_col, value=None)
-                            else:
-                                ws.cell(row=excel_row, column=excel_col, value=new_value)
-
+                alteradas = 0
+                n_linhas = len(df_aba_limpo)
+                colunas_escrita = [c for c in COLUNAS_MANUAIS if c.upper().strip() in df_aba_limpo.columns]
+                colunas_escrita = [c.upper().strip() for c in colunas_escrita] + sorted(colunas_data & set(df_aba_limpo.columns))
+                for col_name in dict.fromkeys(colunas_escrita):
+                    if col_name not in col_map:
+                        continue
+                    excel_col = col_map[col_name]
+                    novos = df_aba_limpo[col_name].to_numpy(dtype=object)
+                    mascara = valores_diferentes(novos, df_original[col_name])
+                    if col_name in colunas_data:
+                        # Fórmulas (HOJE() etc.) viram valor fixo mesmo sem mudança de valor
+                        mascara |= celulas_com_formula(ws, excel_col, n_linhas)
+                    alteradas += escrever_coluna(ws, excel_col, novos, mascara)
+
+                print(f"   {alteradas} célula(s) alterada(s)")
+                total_alteradas += alteradas
                 abas_processadas += 1
             else:
                 print(f"Aviso: Aba '{aba_nome}' não encontrada no arquivo.")
 
         # 3. SALVAR O ARQUIVO ORIGINAL (SOBRESCREVENDO COM OS DADOS CORRIGIDOS)
+        if not total_alteradas:
+            os.remove(nome_backup)
+            print(f"\nNenhuma célula mudou ({time.perf_counter() - t0:.1f}s); arquivo mantido e backup descartado.")
+            return
         book.save(nome_arquivo)
         
         print("\n" + "=" * 50)
-        print(f"Sucesso! {abas_processadas} abas corrigidas.")
+        print(f"Sucesso! {abas_processadas} abas corrigidas em {time.perf_counter() - t0:.1f}s.")
         print("A formatação e a aba 'DASH DADOS' foram preservadas.")
         print(f"O arquivo original '{nome_arquivo}' foi atualizado.")
         print("=" * 50)
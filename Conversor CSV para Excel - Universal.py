@@ -1,58 +1,138 @@
+import argparse
 import pandas as pd
 import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from excel_writer import LIMITE_LINHAS_EXCEL, escrever_excel_em_blocos
 
 # --- Configurações ---
 # 1. Defina o nome do seu arquivo CSV de entrada
-arquivo_csv = 'CNAE.csv' 
+arquivo_csv = 'CNAE.csv'
 
 # 2. Defina o nome do arquivo Excel de saída
 arquivo_excel = 'CNAE.xlsx'
 
 # 3. Defina o nome da aba no Excel
+# (acima de 1.048.576 linhas o restante continua em 'CNAE (2)', 'CNAE (3)'...)
 nome_da_aba = 'CNAE'
 
 # 4. Parâmetros do CSV (Importante para CSVs brasileiros)
 # Se seu arquivo usa ponto-e-vírgula, mude para ';'. Se usa vírgula, use ','.
-separador_csv = ';' 
+separador_csv = ';'
 
 # 5. *** NOVO PARÂMETRO: ENCODING ***
 # 'latin-1' ou 'ISO-8859-1' costumam resolver problemas com caracteres acentuados em CSVs brasileiros.
-encoding_csv = 'latin-1' 
+encoding_csv = 'latin-1'
+
+# 6. Leitura em blocos: a memória usada depende do tamanho do bloco, não do arquivo
+linhas_por_bloco = 100_000
+
+# 7. Tipos das colunas, ex.: {'CNAE': 'str', 'QTD': 'Int64'}.
+# Colunas fora do dicionário têm o tipo deduzido do primeiro bloco e fixado para o arquivo todo.
+tipos_colunas = {}
+
+# 8. Opcional: também grava um Parquet com os mesmos dados (None para não gravar)
+arquivo_parquet = None
+
+
+# --- Tipos explícitos ---
+class ErroTipoColuna(Exception):
+    """Um bloco tem valor que não cabe no tipo decidido pelo primeiro bloco."""
+
+def tipo_explicito(serie):
+    """Tipo fixo para a leitura em blocos (inteiros anuláveis; vazios e textos como str)."""
+    if serie.isna().all():
+        return 'str'
+    if pd.api.types.is_bool_dtype(serie):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(serie):
+        return 'Int64'
+    if pd.api.types.is_float_dtype(serie):
+        return 'float64'
+    return 'str'
+
+def inferir_tipos(csv_path, sep, encoding, amostra, tipos=None):
+    """Lê só as primeiras ``amostra`` linhas para decidir o tipo de cada coluna."""
+    inicio = pd.read_csv(csv_path, sep=sep, encoding=encoding, nrows=amostra)
+    return {col: (tipos or {}).get(col) or tipo_explicito(inicio[col]) for col in inicio.columns}
 
 
 # --- Função de Conversão Ajustada ---
-def converter_csv_para_excel(csv_path, excel_path, sheet_name, sep, encoding):
+def converter_csv_para_excel(csv_path, excel_path, sheet_name, sep, encoding,
+                             chunksize=linhas_por_bloco, tipos=None, parquet_path=None,
+                             linhas_por_aba=LIMITE_LINHAS_EXCEL - 1):
     """
-    Lê um arquivo CSV (usando o encoding especificado) e salva em Excel.
+    Lê um arquivo CSV (usando o encoding especificado) em blocos e salva em Excel
+    em modo de memória constante, abrindo novas abas ao atingir o limite de linhas.
+    Com ``parquet_path``, os mesmos blocos também vão para um Parquet.
     """
     if not os.path.exists(csv_path):
         print(f"ERRO: Arquivo CSV não encontrado: {csv_path}")
         return
 
+    escritor_parquet = None
     try:
-        # 1. Ler o arquivo CSV e criar um DataFrame
+        # 1. Tipos decididos uma vez (primeiro bloco), para todos os blocos saírem iguais
         print(f"Lendo o arquivo CSV: {csv_path}...")
-        
-        # *** MUDANÇA AQUI: Adicionando o parâmetro 'encoding' ***
-        df = pd.read_csv(csv_path, sep=sep, encoding=encoding)
-        
-        print(f"Dados lidos. Total de linhas: {len(df)}")
+        dtype = inferir_tipos(csv_path, sep, encoding, chunksize, tipos)
+
+        total = 0
+        def blocos():
+            nonlocal escritor_parquet, total
+            leitor = pd.read_csv(csv_path, sep=sep, encoding=encoding, dtype=dtype, chunksize=chunksize)
+            while True:
+                try:
+                    bloco = next(leitor)
+                except StopIteration:
+                    return
+                except (ValueError, TypeError) as e:
+                    # aqui só roda o parser do CSV: o erro é valor fora do tipo fixado
+                    raise ErroTipoColuna(f"bloco a partir da linha {total + 1}: {e}") from e
+                if parquet_path:
+                    tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+                    if escritor_parquet is None:
+                        escritor_parquet = pq.ParquetWriter(parquet_path, tabela.schema, compression='zstd')
+                    escritor_parquet.write_table(tabela.cast(escritor_parquet.schema))
+                total += len(bloco)
+                print(f"  ... {total:,} linhas".replace(',', '.'), end='\r')
+                yield bloco
 
-        # 2. Escrever o DataFrame no arquivo Excel (.xlsx)
+        # 2. Escrever bloco a bloco no arquivo Excel (.xlsx)
         print(f"Escrevendo dados no Excel: {excel_path}...")
-        
-        df.to_excel(
-            excel_path,
-            sheet_name=sheet_name,
-            index=False,
-            header=True,
-            engine='xlsxwriter'
+        abas = escrever_excel_em_blocos(
+            blocos(), excel_path, aba=sheet_name, linhas_por_aba=linhas_por_aba,
         )
 
+        print(f"\nDados lidos. Total de linhas: {total}")
+        if len(abas) > 1:
+            print(f"Mais linhas que o limite do Excel: dados divididos em {len(abas)} abas:")
+            for nome, linhas in abas:
+                print(f"  - {nome}: {linhas} linhas")
         print(f"\nSucesso! O arquivo foi salvo como: {excel_path}")
-        
+        if parquet_path:
+            print(f"Parquet salvo como: {parquet_path}")
+
+    except ErroTipoColuna as e:
+        print(f"Ocorreu um erro durante a conversão: {e}")
+        print("Dica: uma coluna mudou de tipo depois do primeiro bloco; informe-a em 'tipos_colunas' (ex.: 'str').")
     except Exception as e:
         print(f"Ocorreu um erro durante a conversão: {e}")
+    finally:
+        if escritor_parquet is not None:
+            escritor_parquet.close()
 
 # --- Execução Ajustada ---
-converter_csv_para_excel(arquivo_csv, arquivo_excel, nome_da_aba, separador_csv, encoding_csv)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converte CSV em Excel (em blocos, com divisão automática em abas)")
+    parser.add_argument("csv", nargs="?", default=arquivo_csv)
+    parser.add_argument("--excel", default=None, help="padrão: mesmo nome do CSV com .xlsx")
+    parser.add_argument("--aba", default=nome_da_aba)
+    parser.add_argument("--sep", default=separador_csv)
+    parser.add_argument("--encoding", default=encoding_csv)
+    parser.add_argument("--bloco", type=int, default=linhas_por_bloco, help="linhas por bloco de leitura")
+    parser.add_argument("--parquet", default=arquivo_parquet, help="também grava este Parquet")
+    args = parser.parse_args()
+
+    excel = args.excel or (arquivo_excel if args.csv == arquivo_csv else os.path.splitext(args.csv)[0] + '.xlsx')
+    converter_csv_para_excel(args.csv, excel, args.aba, args.sep, args.encoding,
+                             chunksize=args.bloco, tipos=tipos_colunas, parquet_path=args.parquet)
@@ -1,9 +1,9 @@
 import pandas as pd
 import os
-import xlsxwriter
 import re
 import numpy as np
 import locale
+from excel_writer import exportar_relatorio
 
 # Tentar configurar locale para PT-BR
 try:
@@ -85,75 +85,21 @@ def converter_csv_para_xlsx(caminho_arquivo_csv, caminho_arquivo_xlsx_saida):
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
 
         # =============================
-        # 📊 LINHA DE TOTAL
+        # 📄 EXCEL (FORMATADO) + 📊 LINHA DE TOTAL (SUBTOTAL)
         # =============================
-        total_row = {}
-        for col in df.columns:
-            if col in ['Meta', 'Vendido', 'GAP (R$)', 'Itens', 'TOTAL', 'Quantidade', 'ValorTotal']:
-                total_row[col] = df[col].sum()
-            elif col in ['VLM', 'Atingimento', '%B_P']:
-                total_row[col] = df[col].mean()
-            elif col == df.columns[0]:
-                total_row[col] = 'TOTAL GERAL'
-            else:
-                total_row[col] = ''
-
-        df = pd.concat([df, pd.DataFrame([total_row])], ignore_index=True).fillna(0)
-        idx_total = df.index[-1]
-
-        # =============================
-        # 📄 EXCEL (FORMATADO)
-        # =============================
-        writer = pd.ExcelWriter(caminho_arquivo_xlsx_saida, engine='xlsxwriter')
-        workbook = writer.book
-        worksheet = workbook.add_worksheet('Relatorio')
-
-        # Estilos
-        fmt_base = {'align': 'center', 'valign': 'vcenter', 'font_name': 'Calibri', 'font_size': 9}
-        header_fmt = workbook.add_format({**fmt_base, 'bold': True, 'bg_color': '#000000', 'font_color': '#FFFFFF', 'border': 1})
-        
-        curr_fmt = workbook.add_format({**fmt_base, 'num_format': 'R$ #,##0.00'})
-        perc_fmt = workbook.add_format({**fmt_base, 'num_format': '0.00%'})
-        time_fmt = workbook.add_format({**fmt_base, 'num_format': 'HH:MM:SS'})
-        date_fmt = workbook.add_format({**fmt_base, 'num_format': 'DD/MM/YYYY'})
-        text_fmt = workbook.add_format(fmt_base)
-
-        total_base = {**fmt_base, 'bold': True, 'bg_color': '#000000', 'font_color': '#FFFFFF', 'border': 1}
-        total_curr_fmt = workbook.add_format({**total_base, 'num_format': 'R$ #,##0.00'})
-        total_text_fmt = workbook.add_format(total_base)
-
-        # Escrever Cabeçalho
-        for col_num, value in enumerate(df.columns.values):
-            worksheet.write(0, col_num, value, header_fmt)
-
-        # Escrever Dados
-        for row_num, row_data in df.iterrows():
-            excel_row = row_num + 1
-            is_total = (row_num == idx_total)
-
-            for col_num, value in enumerate(row_data):
-                col_name = df.columns[col_num]
-
-                if is_total:
-                    fmt = total_curr_fmt if col_name in ['Meta', 'Vendido', 'GAP (R$)', 'TOTAL', 'ValorTotal'] else total_text_fmt
-                    worksheet.write(excel_row, col_num, value, fmt)
-                else:
-                    if col_name in ['Meta', 'Vendido', 'GAP (R$)', 'VLM', 'TOTAL', 'ValorTotal']:
-                        worksheet.write(excel_row, col_num, value, curr_fmt)
-                    elif col_name in ['Atingimento', '%B_P']:
-                        worksheet.write(excel_row, col_num, value, perc_fmt)
-                    elif col_name == 'HoraExpedicao':
-                        worksheet.write(excel_row, col_num, value, time_fmt)
-                    elif col_name == 'DATA_CONVERTIDA':
-                        worksheet.write(excel_row, col_num, value, date_fmt)
-                    else:
-                        worksheet.write(excel_row, col_num, value, text_fmt)
-
-        # Ajustar largura
-        for col_num, col_name in enumerate(df.columns):
-            worksheet.set_column(col_num, col_num, 18)
-
-        writer.close()
+        # Formatos por coluna decididos uma vez; escrita coluna a coluna
+        formatos = {col: 'moeda' for col in ['Meta', 'Vendido', 'GAP (R$)', 'VLM', 'TOTAL', 'ValorTotal']}
+        formatos.update({'Atingimento': 'percentual', '%B_P': 'percentual'})
+        formatos.update({'HoraExpedicao': 'hora', 'DATA_CONVERTIDA': 'data'})
+
+        exportar_relatorio(
+            df, caminho_arquivo_xlsx_saida, aba='Relatorio',
+            formatos=formatos,
+            total_soma=[c for c in ['Meta', 'Vendido', 'GAP (R$)', 'Itens', 'TOTAL', 'Quantidade', 'ValorTotal'] if c in df.columns],
+            total_media=[c for c in ['VLM', 'Atingimento', '%B_P'] if c in df.columns],
+            rotulo_total='TOTAL GERAL',
+            largura_fixa=18,
+        )
         print(f"Sucesso! Arquivo gerado: {caminho_arquivo_xlsx_saida}")
 
     except Exception as e:
@@ -1,136 +1,168 @@
-import pandas as pd
+import argparse
+import codecs
+import csv
 import os
 import re
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from excel_writer import escrever_excel_formatado
 
-def formatar_excel(caminho_arquivo):
-    wb = load_workbook(caminho_arquivo)
-    ws = wb.active
-    ws.sheet_view.showGridLines = False
+TAMANHO_AMOSTRA = 1 << 20          # 1 MB: suficiente para BOM, encoding e separador
+SEPARADORES = ";,\t|"
 
-    fonte_corpo = Font(name='Calibri', size=9)
-    fonte_cabecalho = Font(name='Calibri', size=9, bold=True, color="FFFFFF")
-    
-    alinhamento_central = Alignment(horizontal='center', vertical='center')
-    alinhamento_esquerda = Alignment(horizontal='left', vertical='center')
-    
-    preenchimento_preto = PatternFill(start_color='000000', end_color='000000', fill_type='solid')
-
-    # Formatação das linhas de dados
-    for row in ws.iter_rows(min_row=2):  # Pula o cabeçalho inicialmente
-        for cell in row:
-            cell.font = fonte_corpo
-            
-            # Ajuste de alinhamento inteligente para textos longos (ex: nomes de produtos)
-            if cell.value and len(str(cell.value)) > 15:
-                cell.alignment = alinhamento_esquerda
-            else:
-                cell.alignment = alinhamento_central
-
-    # Formatação do cabeçalho (Linha 1)
-    for cell in ws[1]:
-        cell.font = fonte_cabecalho
-        cell.fill = preenchimento_preto
-        cell.alignment = alinhamento_central
-    
-    # Ajuste automático da largura das colunas
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except: pass
-        # Limita a largura máxima para colunas gigantescas não quebrarem o layout
-        ws.column_dimensions[column].width = min(max_length + 3, 50)
+# Padrões de quebras de codificação (Mojibake) e padrões gramaticais, na ordem de prioridade.
+# Entram todos em uma única regex: em cada posição vale o primeiro padrão que casar.
+PADROES_INTERROGACAO = {
+    # Correções cirúrgicas de palavras-chave de inventário, produção e logística
+    r'[eE]rgon\?mico': 'Ergonômico',
+    r'[iI]nforma\?\?o': 'Informação',
+    r'[iI]nforma\?o': 'Informação',
+    r'[pP]re\?\?o': 'Preço',
+    r'[pP]re\?o': 'Preço',
 
-    wb.save(caminho_arquivo)
+    # Padrões comuns de interrogações duplas ou caracteres corrompidos em sistemas legados
+    r'\?\?': 'ç',  # Caso geral de caracteres especiais perdidos
+    r'([aA])\?([oO])': r'\1çã\2', # Captura 'a?o' -> 'ação' (ex: rota?o, inclina?o)
+    r'([aA])\?([asAS])': r'\1ãs', # Captura 'a?as' -> 'ãs'
+    r'([eE])\?([mI])': r'\1ê', # Captura 'e?m' -> 'êm' ou 'e?i' -> 'êi'
+}
+
+# Padrões comuns de exportações de ERPs corrompidas (UTF-8 lido como Windows-1252), trocados literalmente
+MOJIBAKE_UTF8 = {
+    'Ã§Ã£o': 'ção', 'Ã£o': 'ão', 'Ã§': 'ç', 'Ã¡': 'á', 'Ã©': 'é',
+    'Ã\xad': 'í', 'Ã³': 'ó', 'Ãº': 'ú', 'Ãª': 'ê', 'Ã´': 'ô',
+    'Ã\x81': 'Á', 'Ã\x89': 'É', 'Ã\x8d': 'Í', 'Ã\x93': 'Ó', 'Ã\x9a': 'Ú',
+    'Ã\x87': 'Ç', 'Ã\x83': 'Ã', 'Â°': '°', 'Âº': 'º', 'Âª': 'ª'
+}
+
+# Compiladas uma vez: cada padrão vira um grupo nomeado da regex combinada
+_PADROES = [re.compile(p) for p in PADROES_INTERROGACAO]
+_SUBSTITUTOS = list(PADROES_INTERROGACAO.values())
+REGEX_CORRECAO = re.compile("|".join(
+    [f"(?P<p{i}>{p})" for i, p in enumerate(PADROES_INTERROGACAO)]
+    + [f"(?P<m>{'|'.join(map(re.escape, MOJIBAKE_UTF8))})"]
+))
+# Só linhas com '?' ou algum caractere não-ASCII podem mudar
+# (caracteres literais na classe, e não escapes, para valer também no regex do Arrow)
+REGEX_SUSPEITO = '[?\u0080-\U0010ffff]'
+
+
+def _substituir(m):
+    if m.lastgroup == 'm':
+        return MOJIBAKE_UTF8[m.group()]
+    i = int(m.lastgroup[1:])
+    return _PADROES[i].fullmatch(m.group()).expand(_SUBSTITUTOS[i])
+
+
+def detectar_encoding(amostra):
+    """Encoding a partir de uma amostra de bytes: BOM, depois validade UTF-8, depois Windows-1252/Latin-1."""
+    if amostra.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if amostra.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # final=False: um caractere cortado no fim da amostra não conta como erro
+        codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        amostra.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'iso-8859-1'
+
+
+def detectar_separador(texto):
+    """Separador via csv.Sniffer nas primeiras linhas; se falhar, o candidato mais frequente no cabeçalho."""
+    linhas = texto.splitlines()[:50]
+    if len(linhas) > 1 and len(texto) >= TAMANHO_AMOSTRA:
+        linhas = linhas[:-1]  # última linha da amostra pode estar cortada
+    trecho = "\n".join(linhas)
+    try:
+        return csv.Sniffer().sniff(trecho, delimiters=SEPARADORES).delimiter
+    except csv.Error:
+        cabecalho = linhas[0] if linhas else ""
+        return max(SEPARADORES, key=cabecalho.count)
 
 
 def ler_csv_com_varredura(caminho):
-    """Tenta ler o CSV testando os encodings sugeridos."""
-    encodings = [
-        'utf-8-sig',    # UTF-8 com BOM (Evita quebras no Excel)
-        'utf-8',        # UTF-8 padrão
-        'cp1252',       # ANSI / Windows-1252
-        'iso-8859-1',   # Latin-1
-        'utf-16'
-    ]
-    
-    for encoding in encodings:
+    """
+    Detecta encoding e separador em uma amostra do início do arquivo e lê o CSV
+    uma única vez com o leitor em C do pandas.
+    """
+    with open(caminho, 'rb') as f:
+        amostra = f.read(TAMANHO_AMOSTRA)
+    encoding = detectar_encoding(amostra)
+    sep = detectar_separador(amostra.decode(encoding, errors='ignore'))
+    print(f"🔎 Encoding: {encoding} | separador: {sep!r}")
+
+    try:
+        df = pd.read_csv(caminho, encoding=encoding, sep=sep)
+    except UnicodeDecodeError:
+        # byte inválido depois da amostra: UTF-8 era só o começo do arquivo
+        encoding = 'cp1252'
+        print(f"⚠️ Byte fora de UTF-8 após a amostra; relendo com {encoding}")
+        try:
+            df = pd.read_csv(caminho, encoding=encoding, sep=sep)
+        except UnicodeDecodeError:
+            encoding = 'iso-8859-1'
+            df = pd.read_csv(caminho, encoding=encoding, sep=sep)
+    print(f"✔️ Sucesso ao ler com encoding: {encoding}")
+    return df
+
+
+def corrigir_textos(valores):
+    """
+    Correção dos textos distintos de uma coluna:
+    1. ida e volta cp1252 -> UTF-8 (ou Latin-1 -> UTF-8), só se valer para todos os valores;
+    2. regex combinada da biblioteca de acentuação.
+    """
+    for origem in ('cp1252', 'iso-8859-1'):
         try:
-            df = pd.read_csv(caminho, encoding=encoding, sep=None, engine='python')
-            print(f"✔️ Sucesso ao ler com encoding: {encoding}")
-            return df
-        except (UnicodeDecodeError, Exception):
+            valores = [v.encode(origem).decode('utf-8') for v in valores]
+            break
+        except UnicodeError:
             continue
-    
-    raise Exception("Não foi possível converter o arquivo com nenhum dos encodings da lista.")
+    return [REGEX_CORRECAO.sub(_substituir, v) for v in valores]
+
+
+def corrigir_coluna(serie):
+    """Texto sem espaços nas pontas; a correção só roda nos valores distintos das linhas suspeitas."""
+    validos = serie.notna()
+    texto = serie[validos].astype(str)
+    suspeitos = texto.str.contains(REGEX_SUSPEITO, regex=True)
+    if suspeitos.any():
+        codigos, distintos = pd.factorize(texto[suspeitos])
+        corrigidos = np.array(corrigir_textos(list(distintos)), dtype=object)
+        texto = texto.astype(object)
+        texto[suspeitos] = corrigidos[codigos]
+    resultado = pd.Series(None, index=serie.index, dtype=object)
+    resultado[validos] = texto.str.strip()
+    return resultado
 
 
 def tratar_erros_e_caracteres(df):
     """
-    Varre o DataFrame aplicando uma biblioteca robusta de padrões de acentuação corrompidos
+    Varre as colunas de texto aplicando a biblioteca de padrões de acentuação corrompidos
     e correções ortográficas universais para o ecossistema Excel/CSV.
     """
     print("\nIniciando tratamento de caracteres e acentuação com biblioteca robusta...")
-    
-    # BIBLIOTECA EXPANDIDA: Mapeia padrões de quebras de codificação (Mojibake) e padrões gramaticais
-    biblioteca_acentuacao = {
-        # Padrões comuns de interrogações duplas ou caracteres corrompidos em sistemas legados
-        r'\?\?': 'ç',  # Caso geral de caracteres especiais perdidos
-        r'([aA])\?([oO])': r'\1ão', # Captura 'a?o' -> 'ão' (ex: rota??o, rota?o, inclina?o)
-        r'([aA])\?([asAS])': r'\1ãs', # Captura 'a?as' -> 'ãs'
-        r'([eE])\?([mI])': r'\1ê', # Captura 'e?m' -> 'êm' ou 'e?i' -> 'êi'
-        
-        # Correções cirúrgicas de palavras-chave de inventário, produção e logística
-        r'[eE]rgon\?[mI]nico': 'Ergonômico',
-        r'ergon\?[mI]nico': 'ergonômico',
-        r'[iI]nforma\?\?o': 'Informação',
-        r'[iI]nforma\?o': 'Informação',
-        r'[pP]re\?\?o': 'Preço',
-        r'[pP]re\?o': 'Preço',
-        
-        # Padrões comuns de exportações de ERPs corrompidas (UTF-8 lido como Windows-1252)
-        'Ã§Ã£o': 'ção', 'Ã£o': 'ão', 'Ã§': 'ç', 'Ã¡': 'á', 'Ã©': 'é', 
-        'Ã\xad': 'í', 'Ã³': 'ó', 'Ãº': 'ú', 'Ãª': 'ê', 'Ã´': 'ô',
-        'Ã\x81': 'Á', 'Ã\x89': 'É', 'Ã\x8d': 'Í', 'Ã\x93': 'Ó', 'Ã\x9a': 'Ú',
-        'Ã\x87': 'Ç', 'Ã\x83': 'Ã', 'Â°': '°', 'Âº': 'º', 'Âª': 'ª'
-    }
 
     for col in df.columns:
         # Aplicar correções apenas em colunas que contêm texto
-        if df[col].dtype == 'object':
-            
-            # 1. Correção de Encoding em nível de byte (se a string veio como ISO pura ou CP1252)
+        if not (df[col].dtype == object or pd.api.types.is_string_dtype(df[col])):
+            continue
+        df[col] = corrigir_coluna(df[col])
+
+        # Inteligência de Data (Converte colunas de data para o formato real, se a coluna inteira converter)
+        if 'data' in str(col).lower() or 'dt_' in str(col).lower():
             try:
-                df[col] = df[col].apply(lambda x: x.encode('cp1252').decode('utf-8') if isinstance(x, str) else x)
-            except:
-                try:
-                    df[col] = df[col].apply(lambda x: x.encode('iso-8859-1').decode('utf-8') if isinstance(x, str) else x)
-                except:
-                    pass
-            
-            # Converte para string para aplicar as substituições em lote
-            df[col] = df[col].astype(str)
-
-            # 2. Varredura da nossa biblioteca usando Regex (Expressões Regulares)
-            # Isso mata variações como 'rotação', 'inclinação', 'combinação' usando uma regra só
-            for padrao, correto in biblioteca_acentuacao.items():
-                df[col] = df[col].str.replace(padrao, correto, regex=True)
-                
-            # 3. Limpeza de espaços em branco nas pontas e remoção de strings de erro 'nan'
-            df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
-            df[col] = df[col].replace('nan', None) # Corrige efeito colateral do astype(str) em nulos
-            
-            # 4. Inteligência de Data (Converte colunas de data para o formato real)
-            if 'data' in col.lower() or 'dt_' in col.lower():
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='ignore', dayfirst=True)
-                except:
-                    pass
+                df[col] = pd.to_datetime(df[col], dayfirst=True)
+            except (ValueError, TypeError):
+                pass
 
     print("✔️ Varredura da biblioteca de acentuação e limpeza concluídas!")
     return df
@@ -182,8 +214,8 @@ def converter_arquivos():
 
         # --- 3. EXPORTAÇÃO E GRAVAÇÃO FINAL ---
         if ext_saida in ['.xlsx', '.xlsm']:
-            df.to_excel(caminho_saida, index=False)
-            formatar_excel(caminho_saida)
+            # Dados + estilo em uma única passada (sem reabrir com openpyxl)
+            escrever_excel_formatado(df, caminho_saida, aba="Sheet1")
         elif ext_saida == '.parquet':
             df.to_parquet(caminho_saida)
         elif ext_saida == '.csv':
@@ -194,5 +226,48 @@ def converter_arquivos():
     except Exception as e:
         print(f"\n❌ Erro crítico: {e}")
 
+def benchmark(linhas=500_000):
+    """CSV sintético em Windows-1252 com mojibake: leitura antiga (5 encodings, engine python) x nova."""
+    rng = np.random.default_rng(0)
+    textos = np.array(['Informação', 'Preço', 'rota?o', 'ConfiguraÃ§Ã£o', 'Ergon?mico', 'Cabo HDMI', 'Ã¡gua'])
+    df = pd.DataFrame({
+        'ID': np.arange(linhas),
+        'DESCRICAO': textos[rng.integers(0, len(textos), linhas)],
+        'SKU': [f"SKU{i:07d}" for i in rng.integers(0, 10**6, linhas)],
+        'VALOR': rng.random(linhas).round(2) * 100,
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, 'base.csv')
+        df.to_csv(caminho, sep=';', index=False, encoding='cp1252')
+        tamanho = os.path.getsize(caminho) / 1e6
+
+        t0 = time.perf_counter()
+        for encoding in ['utf-8-sig', 'utf-8', 'cp1252']:  # como a versão antiga: falha em UTF-8 e relê
+            try:
+                pd.read_csv(caminho, encoding=encoding, sep=None, engine='python')
+                break
+            except UnicodeDecodeError:
+                continue
+        t_antigo = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        lido = ler_csv_com_varredura(caminho)
+        t_leitura = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        tratado = tratar_erros_e_caracteres(lido)
+        t_tratamento = time.perf_counter() - t0
+
+    print(f"\n[BENCHMARK] {linhas} linhas ({tamanho:.0f} MB)")
+    print(f"  leitura antiga (varredura de encodings): {t_antigo:6.2f}s")
+    print(f"  leitura nova (amostra + 1 leitura):      {t_leitura:6.2f}s  ({tamanho / t_leitura:.0f} MB/s)")
+    print(f"  tratamento de caracteres:                {t_tratamento:6.2f}s")
+    print(f"  exemplos corrigidos: {sorted(tratado['DESCRICAO'].unique())}")
+
 if __name__ == "__main__":
-    converter_arquivos()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Converte CSV/Parquet/Excel corrigindo encoding e acentuação")
+    parser.add_argument("--benchmark", action="store_true", help="mede leitura e tratamento em um CSV sintético")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark()
+    else:
+        converter_arquivos()
\ No newline at end of file
@@ -1,7 +1,19 @@
-import xlwings as xw
-from datetime import datetime, date, timedelta
+import argparse
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+from copy import copy
+from datetime import date
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
 # =========================
 # CONFIGURAÇÕES GERAIS
 # =========================
@@ -20,41 +32,205 @@ COL_STATUS_LEAD = "X"   # STATUS DO LEAD
 COL_PRIORIDADE = "Y"    # PRIORIDADE (nova)
 COL_MOTIVO = "Z"        # MOTIVO DO STATUS (nova)
 
+# Bloco lido de uma vez (C..Z) e colunas devolvidas à planilha
+COL_INICIO, COL_FIM = COL_DATA, COL_MOTIVO
+COLUNAS_SAIDA = [COL_DATA, COL_DATA_PROX, COL_STATUS_AGENDA, COL_SLA, COL_STATUS_LEAD]
+COLUNAS_DATA = {COL_DATA, COL_DATA_PROX, COL_SLA}
+
+LISTA_PRIORIDADE = ["ALTA", "MÉDIA", "BAIXA"]
+LISTA_MOTIVO = ["SEM INTERESSE", "SEM PERFIL", "DESISTIU", "NÃO RESPONDE", "NÃO ATENDEU", "OUTROS"]
+MOTIVOS_LEAD_MORTO = ["SEM INTERESSE", "SEM PERFIL", "DESISTIU"]
+
+# Prioridade -> dias até o próximo contato / janela máxima para LEAD ATIVO
+DIAS_PROX_CONTATO = {"ALTA": 3, "MÉDIA": 7, "MEDIA": 7, "BAIXA": 15}
+JANELA_LEAD_ATIVO = {"ALTA": 10, "MÉDIA": 20, "MEDIA": 20, "BAIXA": 30}
+
+EPOCA_EXCEL = pd.Timestamp("1899-12-30")
+SERIAL_MINIMO, SERIAL_MAXIMO = -693593, 2958465   # 01/01/0001 a 31/12/9999 (0 = 30/12/1899)
+FORMATO_DATA = "DD/MM/YYYY"
+
 
 # =========================
 # FUNÇÕES AUXILIARES
 # =========================
 
-def to_date(value):
-    """Converte valor de célula para date, se possível."""
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value.date()
-    if isinstance(value, date):
-        return value
-    if isinstance(value, (int, float)):
-        # Em geral xlwings já retorna datetime, mas deixo proteção
-        try:
-            base = date(1899, 12, 30)
-            return base + timedelta(days=int(value))
-        except Exception:
-            return None
-    if isinstance(value, str):
-        txt = value.strip()
-        for fmt in ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"):
-            try:
-                return datetime.strptime(txt, fmt).date()
-            except Exception:
-                pass
-    return None
+def para_datas(serie):
+    """
+    Converte a coluna inteira para datetime64 (NaT quando não for data):
+    datetime/date, número serial do Excel e textos dd/mm/aaaa, aaaa-mm-dd, dd-mm-aaaa.
+    """
+    s = pd.Series(serie, dtype=object)
+    eh_data = s.map(lambda v: isinstance(v, date)).to_numpy(dtype=bool)
+    resultado = pd.to_datetime(s.where(eh_data), errors="coerce").dt.normalize()
+
+    # Só números de verdade (textos como "45000" não são serial) e dentro da faixa de
+    # datas do Python (0 e negativos continuam datas de 1899, como sempre foram);
+    # um telefone na coluna de data vira NaT
+    eh_numero = s.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, bool)).to_numpy(dtype=bool)
+    numeros = pd.to_numeric(s.where(eh_numero), errors="coerce")
+    numeros = numeros.where((numeros >= SERIAL_MINIMO) & (numeros <= SERIAL_MAXIMO))
+    seriais = EPOCA_EXCEL + pd.to_timedelta(np.floor(numeros), unit="D")
+    resultado = resultado.fillna(seriais)
+
+    textos = s.where(s.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)).str.strip()
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"):
+        resultado = resultado.fillna(pd.to_datetime(textos, format=fmt, errors="coerce"))
+    return resultado
+
 
+def normalizar_texto(serie):
+    return pd.Series(serie, dtype=object).fillna("").astype(str).str.strip().str.upper()
 
-def normalizar_texto(valor):
-    if valor is None:
-        return ""
-    return str(valor).strip().upper()
 
+def vazio(serie):
+    s = pd.Series(serie, dtype=object)
+    return s.isna() | (s.astype(str).str.strip() == "")
+
+
+def corrigir_bloco(df, hoje=None):
+    """
+    Aplica as regras do CRM sobre o bloco C..Z (colunas nomeadas pela letra).
+    Retorna (novos valores das COLUNAS_SAIDA, máscara de células alteradas).
+    Puramente vetorizado: nenhuma chamada ao Excel aqui.
+    """
+    hoje = pd.Timestamp(hoje or date.today()).normalize()
+    ativo = ~vazio(df[COL_NOME])  # Nome do Cliente (gatilho de linha ativa)
+
+    # -------- 1) DATA (C) – congelar / preencher se linha nova --------
+    data = para_datas(df[COL_DATA])
+    data_nova = ativo & data.isna()
+    data = data.mask(data_nova, hoje)
+    dias_sem_contato = (hoje - data).dt.days
+
+    # -------- 2) PRIORIDADE (Y) --------
+    prioridade = normalizar_texto(df[COL_PRIORIDADE])
+
+    # -------- 3) DATA DO PRÓXIMO CONTATO (U) --------
+    delta = prioridade.map(DIAS_PROX_CONTATO)
+    prox_nova = ativo & vazio(df[COL_DATA_PROX]) & delta.notna()
+    prox = hoje + pd.to_timedelta(delta, unit="D")
+
+    # -------- 4) STATUS DA AGENDA (V) --------
+    tem_dias = ativo & dias_sem_contato.notna()
+    status_agenda = pd.Series(
+        np.where(dias_sem_contato >= 4, "ATRASADO", "AGUARDAR PROX. CONTATO"), index=df.index, dtype=object
+    )
+
+    # -------- 5) SLA ATENDIMENTO (W) --------
+    sla_novo = ativo & data.notna() & vazio(df[COL_SLA])
+    sla = data + pd.Timedelta(days=2)
+
+    # -------- 6) STATUS DO LEAD (X) – LEAD ATIVO / LEAD MORTO --------
+    motivo = normalizar_texto(df[COL_MOTIVO])
+    morto_motivo = motivo.str.contains("|".join(MOTIVOS_LEAD_MORTO), regex=True)
+    janela = prioridade.map(JANELA_LEAD_ATIVO)
+    lead_status = pd.Series(np.select(
+        [morto_motivo, dias_sem_contato > 45, dias_sem_contato <= janela],
+        ["LEAD MORTO", "LEAD MORTO", "LEAD ATIVO"],
+        default="",
+    ), index=df.index, dtype=object)
+    lead_definido = ativo & (lead_status != "")
+
+    novos = pd.DataFrame({
+        COL_DATA: data.where(data_nova),
+        COL_DATA_PROX: prox.where(prox_nova),
+        COL_STATUS_AGENDA: status_agenda.where(tem_dias),
+        COL_SLA: sla.where(sla_novo),
+        COL_STATUS_LEAD: lead_status.where(lead_definido),
+    }, index=df.index)
+    mascara = pd.DataFrame({
+        COL_DATA: data_nova,
+        COL_DATA_PROX: prox_nova,
+        COL_STATUS_AGENDA: tem_dias & (status_agenda != df[COL_STATUS_AGENDA]),
+        COL_SLA: sla_novo,
+        COL_STATUS_LEAD: lead_definido & (lead_status != df[COL_STATUS_LEAD]),
+    }, index=df.index)
+    return novos, mascara
+
+
+def blocos_contiguos(mascara):
+    """Sequências [ini, fim] de posições True: cada uma vira uma única atribuição de Range."""
+    pos = np.flatnonzero(np.asarray(mascara, dtype=bool))
+    if not len(pos):
+        return []
+    quebras = np.flatnonzero(np.diff(pos) > 1)
+    inicios = np.r_[pos[0], pos[quebras + 1]]
+    fins = np.r_[pos[quebras], pos[-1]]
+    return list(zip(inicios.tolist(), fins.tolist()))
+
+
+def valores_celula(serie, coluna):
+    """Valores Python para gravar no Excel (datas como date, NaN como None)."""
+    if coluna in COLUNAS_DATA:
+        return [None if pd.isna(v) else v.date() for v in serie]
+    return [None if pd.isna(v) else v for v in serie]
+
+
+def bloco_para_dataframe(linhas):
+    letras = [get_column_letter(c) for c in range(column_index_from_string(COL_INICIO),
+                                                  column_index_from_string(COL_FIM) + 1)]
+    return pd.DataFrame(list(linhas), columns=letras, dtype=object)
+
+
+# =========================
+# MOTOR OPENPYXL (LINUX / SEM EXCEL)
+# =========================
+
+def validacao_por_coluna(ws, coluna, lista, max_row):
+    """Uma validação de lista para o intervalo inteiro da coluna (substitui a anterior)."""
+    idx = column_index_from_string(coluna)
+    ws.data_validations.dataValidation = [
+        dv for dv in ws.data_validations.dataValidation
+        if not any(r.min_col == idx and r.max_col == idx for r in dv.sqref.ranges)
+    ]
+    dv = DataValidation(type="list", formula1='"' + ",".join(lista) + '"', allow_blank=True,
+                        errorStyle="stop", showErrorMessage=True)
+    dv.add(f"{coluna}2:{coluna}{max_row}")
+    ws.add_data_validation(dv)
+
+
+def garantir_colunas_prioridade_motivo_openpyxl(ws, max_row):
+    ws[f"{COL_PRIORIDADE}1"] = "PRIORIDADE"
+    ws[f"{COL_MOTIVO}1"] = "MOTIVO DO STATUS"
+
+    # Copiar estilo do cabeçalho X1 para Y1 e Z1 (só estética)
+    modelo = ws[f"{COL_STATUS_LEAD}1"]
+    if modelo.has_style:
+        for col in (COL_PRIORIDADE, COL_MOTIVO):
+            ws[f"{col}1"]._style = copy(modelo._style)
+
+    validacao_por_coluna(ws, COL_PRIORIDADE, LISTA_PRIORIDADE, max_row)
+    validacao_por_coluna(ws, COL_MOTIVO, LISTA_MOTIVO, max_row)
+
+
+def processar_aba_openpyxl(ws, hoje=None):
+    max_row = ws.max_row
+    if max_row < 2:
+        return 0
+    garantir_colunas_prioridade_motivo_openpyxl(ws, max_row)
+
+    linhas = ws.iter_rows(min_row=2, max_row=max_row,
+                          min_col=column_index_from_string(COL_INICIO),
+                          max_col=column_index_from_string(COL_FIM), values_only=True)
+    df = bloco_para_dataframe(linhas)
+    novos, mascara = corrigir_bloco(df, hoje)
+
+    alteradas = 0
+    for col in COLUNAS_SAIDA:
+        idx = column_index_from_string(col)
+        valores = valores_celula(novos[col], col)
+        for ini, fim in blocos_contiguos(mascara[col]):
+            for pos in range(ini, fim + 1):
+                celula = ws.cell(row=pos + 2, column=idx, value=valores[pos])
+                if col in COLUNAS_DATA and celula.number_format in ("General", "yyyy-mm-dd"):
+                    celula.number_format = FORMATO_DATA
+            alteradas += fim - ini + 1
+    return alteradas
+
+
+# =========================
+# MOTOR XLWINGS (WINDOWS / EXCEL ABERTO)
+# =========================
 
 def obter_ultima_linha(ws):
     """Retorna última linha usada na aba."""
@@ -64,146 +240,78 @@ def obter_ultima_linha(ws):
         return ws.range("A" + str(ws.cells.last_cell.row)).end("up").row
 
 
-def garantir_colunas_prioridade_motivo(ws):
+def garantir_colunas_prioridade_motivo_xlwings(ws, max_row):
     """
     Garante que as colunas Y e Z existam com os cabeçalhos corretos
-    e aplica validação de dados (picklist) nas linhas de dados.
+    e aplica validação de dados (picklist) no intervalo de dados.
     """
-    # Cabeçalhos
     ws.range(f"{COL_PRIORIDADE}1").value = "PRIORIDADE"
     ws.range(f"{COL_MOTIVO}1").value = "MOTIVO DO STATUS"
 
-    # Copiar estilo da coluna X1 para Y1 e Z1 (opcional, só estética)
     try:
-        cab_status = ws.range(f"{COL_STATUS_LEAD}1")
-        cab_status.api.Copy()
-        ws.range(f"{COL_PRIORIDADE}1").api.PasteSpecial(Paste=-4104)  # xlPasteFormats
-        ws.range(f"{COL_MOTIVO}1").api.PasteSpecial(Paste=-4104)
+        ws.range(f"{COL_STATUS_LEAD}1").api.Copy()
+        ws.range(f"{COL_PRIORIDADE}1:{COL_MOTIVO}1").api.PasteSpecial(Paste=-4104)  # xlPasteFormats
     except Exception:
-        # Se der qualquer coisa, ignora – é só estética
         pass
 
+    for col, lista in ((COL_PRIORIDADE, LISTA_PRIORIDADE), (COL_MOTIVO, LISTA_MOTIVO)):
+        try:
+            rng = ws.range(f"{col}2:{col}{max_row}")
+            rng.api.Validation.Delete()
+            rng.api.Validation.Add(Type=3, AlertStyle=1, Operator=1, Formula1=",".join(lista))  # xlValidateList
+        except Exception:
+            pass
+
+
+def processar_aba_xlwings(ws, hoje=None):
     max_row = obter_ultima_linha(ws)
+    if max_row < 2:
+        return 0
+    garantir_colunas_prioridade_motivo_xlwings(ws, max_row)
 
-    # Validação de dados (PRIORIDADE)
-    try:
-        rng_prioridade = ws.range(f"{COL_PRIORIDADE}2:{COL_PRIORIDADE}{max_row}")
-        rng_prioridade.api.Validation.Delete()
-        rng_prioridade.api.Validation.Add(
-            Type=3,  # xlValidateList
-            AlertStyle=1,  # xlValidAlertStop
-            Operator=1,
-            Formula1="ALTA,MÉDIA,BAIXA"
-        )
-    except Exception:
-        pass
+    # Uma chamada COM para ler o bloco inteiro
+    valores = ws.range(f"{COL_INICIO}2:{COL_FIM}{max_row}").options(ndim=2).value
+    df = bloco_para_dataframe(valores)
+    novos, mascara = corrigir_bloco(df, hoje)
 
-    # Validação de dados (MOTIVO)
-    try:
-        rng_motivo = ws.range(f"{COL_MOTIVO}2:{COL_MOTIVO}{max_row}")
-        rng_motivo.api.Validation.Delete()
-        rng_motivo.api.Validation.Add(
-            Type=3,  # xlValidateList
-            AlertStyle=1,
-            Operator=1,
-            Formula1="SEM INTERESSE,SEM PERFIL,DESISTIU,NÃO RESPONDE,NÃO ATENDEU,OUTROS"
-        )
-    except Exception:
-        pass
+    alteradas = 0
+    for col in COLUNAS_SAIDA:
+        valores_col = valores_celula(novos[col], col)
+        # Uma atribuição por sequência contígua de células alteradas (não por célula)
+        for ini, fim in blocos_contiguos(mascara[col]):
+            ws.range(f"{col}{ini + 2}:{col}{fim + 2}").options(transpose=True).value = valores_col[ini:fim + 1]
+            alteradas += fim - ini + 1
+    return alteradas
 
 
 # =========================
-# PROCESSAMENTO POR ABA
+# GRAVAÇÃO SEGURA (OPENPYXL)
 # =========================
 
-def processar_aba(ws):
-    hoje = date.today()
-    max_row = obter_ultima_linha(ws)
+def caminho_backup(arquivo):
+    return arquivo.with_name(f"{arquivo.stem} - backup{arquivo.suffix}")
+
 
-    # Garante existência de PRIORIDADE e MOTIVO + validação
-    garantir_colunas_prioridade_motivo(ws)
-
-    for row in range(2, max_row + 1):
-
-        # Nome do Cliente (gatilho de linha ativa)
-        cel_nome = ws.range(f"{COL_NOME}{row}")
-        nome_val = cel_nome.value
-
-        if nome_val is None or str(nome_val).strip() == "":
-            continue  # linha vazia / sem lead
-
-        # -------- 1) DATA (C) – congelar / preencher se linha nova --------
-        cel_data = ws.range(f"{COL_DATA}{row}")
-        data_val = to_date(cel_data.value)
-
-        if data_val is None:
-            # Nova linha (nome preenchido e sem data) -> grava hoje
-            data_val = hoje
-            cel_data.value = hoje
-
-        # Dias desde o último contato
-        dias_sem_contato = (hoje - data_val).days if data_val is not None else None
-
-        # -------- 2) PRIORIDADE (Y) --------
-        cel_prior = ws.range(f"{COL_PRIORIDADE}{row}")
-        prioridade_val = normalizar_texto(cel_prior.value)
-
-        # -------- 3) DATA DO PRÓXIMO CONTATO (U) --------
-        cel_prox = ws.range(f"{COL_DATA_PROX}{row}")
-        prox_val = cel_prox.value
-
-        if (prox_val is None or str(prox_val).strip() == "") and prioridade_val != "":
-            delta = None
-            if prioridade_val == "ALTA":
-                delta = 3
-            elif prioridade_val in ("MÉDIA", "MEDIA"):
-                delta = 7
-            elif prioridade_val == "BAIXA":
-                delta = 15
-
-            if delta is not None:
-                cel_prox.value = hoje + timedelta(days=delta)
-
-        # -------- 4) STATUS DA AGENDA (V) --------
-        cel_status_agenda = ws.range(f"{COL_STATUS_AGENDA}{row}")
-        if dias_sem_contato is not None:
-            if dias_sem_contato >= 4:
-                cel_status_agenda.value = "ATRASADO"
-            else:
-                cel_status_agenda.value = "AGUARDAR PROX. CONTATO"
-
-        # -------- 5) SLA ATENDIMENTO (W) --------
-        cel_sla = ws.range(f"{COL_SLA}{row}")
-        sla_val = cel_sla.value
-        if data_val is not None and (sla_val is None or str(sla_val).strip() == ""):
-            cel_sla.value = data_val + timedelta(days=2)
-
-        # -------- 6) STATUS DO LEAD (X) – LEAD ATIVO / LEAD MORTO --------
-        cel_status_lead = ws.range(f"{COL_STATUS_LEAD}{row}")
-        cel_motivo = ws.range(f"{COL_MOTIVO}{row}")
-        motivo_txt = normalizar_texto(cel_motivo.value)
-
-        lead_status = None
-
-        # LEAD MORTO por motivo
-        if any(p in motivo_txt for p in ["SEM INTERESSE", "SEM PERFIL", "DESISTIU"]):
-            lead_status = "LEAD MORTO"
-        else:
-            # LEAD MORTO por tempo
-            if dias_sem_contato is not None and dias_sem_contato > 45:
-                lead_status = "LEAD MORTO"
-            else:
-                # LEAD ATIVO pelas regras de prioridade + tempo
-                if dias_sem_contato is not None:
-                    if prioridade_val == "ALTA" and dias_sem_contato <= 10:
-                        lead_status = "LEAD ATIVO"
-                    elif prioridade_val in ("MÉDIA", "MEDIA") and dias_sem_contato <= 20:
-                        lead_status = "LEAD ATIVO"
-                    elif prioridade_val == "BAIXA" and dias_sem_contato <= 30:
-                        lead_status = "LEAD ATIVO"
-
-        if lead_status is not None:
-            cel_status_lead.value = lead_status
+def salvar_com_troca(wb, arquivo):
+    """
+    Grava em um arquivo temporário na mesma pasta e só então troca pelo original,
+    guardando antes uma cópia do original (o openpyxl não preserva dinâmicas,
+    segmentações e vínculos externos). Se a gravação falhar, o original fica intacto.
+    """
+    fd, temporario = tempfile.mkstemp(prefix=f"~{arquivo.stem}.", suffix=arquivo.suffix, dir=arquivo.parent)
+    os.close(fd)
+    try:
+        wb.save(temporario)
+        shutil.copy2(arquivo, caminho_backup(arquivo))
+        os.replace(temporario, arquivo)
+    except BaseException:
+        Path(temporario).unlink(missing_ok=True)
+        raise
+
+
+def motor_padrao():
+    """xlwings quando há Excel (preserva tudo o que o arquivo tiver); senão openpyxl."""
+    return "xlwings" if importlib.util.find_spec("xlwings") else "openpyxl"
 
 
 # =========================
@@ -211,38 +319,58 @@ def processar_aba(ws):
 # =========================
 
 def main():
+    parser = argparse.ArgumentParser(description="Atualização de datas e status do CRM Multimarcas")
+    parser.add_argument("arquivo", nargs="?", default=str(ARQUIVO_CRM))
+    parser.add_argument("--motor", choices=["xlwings", "openpyxl"], default=None,
+                        help="xlwings (Excel, Windows) ou openpyxl (sem Excel); padrão: xlwings se instalado")
+    args = parser.parse_args()
+    arquivo = Path(args.arquivo)
+
+    motor = args.motor or motor_padrao()
     print("===================================================")
-    print("🚀 ATUALIZAÇÃO DE DATAS E STATUS - CRM MULTIMARCAS (xlwings)")
-    print(f"Arquivo: {ARQUIVO_CRM}")
+    print(f"🚀 ATUALIZAÇÃO DE DATAS E STATUS - CRM MULTIMARCAS ({motor})")
+    print(f"Arquivo: {arquivo}")
     print("===================================================")
 
-    if not ARQUIVO_CRM.exists():
+    if not arquivo.exists():
         print("❌ Arquivo não encontrado. Verifique o nome/caminho e rode de dentro da pasta correta.")
         return
 
-    # Excel invisível (conforme você pediu)
-    app = xw.App(visible=False, add_book=False)
-    try:
-        wb = app.books.open(str(ARQUIVO_CRM))
+    t0 = time.perf_counter()
+    if motor == "xlwings":
+        import xlwings as xw
 
+        # Excel invisível
+        app = xw.App(visible=False, add_book=False)
+        try:
+            wb = app.books.open(str(arquivo))
+            nomes = [s.name for s in wb.sheets]
+            for aba in SDR_ABAS:
+                if aba not in nomes:
+                    print(f"⚠ Aba '{aba}' não encontrada, ignorando...")
+                    continue
+                print(f"\n▶ Processando aba: {aba}...")
+                alteradas = processar_aba_xlwings(wb.sheets[aba])
+                print(f"✅ Aba '{aba}' atualizada ({alteradas} células).")
+            wb.save()
+            wb.close()
+        finally:
+            app.quit()
+    else:
+        wb = load_workbook(arquivo, keep_vba=arquivo.suffix.lower() == ".xlsm")
         for aba in SDR_ABAS:
-            if aba not in [s.name for s in wb.sheets]:
+            if aba not in wb.sheetnames:
                 print(f"⚠ Aba '{aba}' não encontrada, ignorando...")
                 continue
-
             print(f"\n▶ Processando aba: {aba}...")
-            ws = wb.sheets[aba]
-            processar_aba(ws)
-            print(f"✅ Aba '{aba}' atualizada.")
-
-        wb.save()
-        wb.close()
-        print("\n🎉 Atualização concluída com sucesso!")
-        print("Datas, agenda, SLA e STATUS DO LEAD foram atualizados.")
-        print("Colunas PRIORIDADE e MOTIVO DO STATUS criadas com validação de dados.")
-
-    finally:
-        app.quit()
+            alteradas = processar_aba_openpyxl(wb[aba])
+            print(f"✅ Aba '{aba}' atualizada ({alteradas} células).")
+        salvar_com_troca(wb, arquivo)
+        print(f"💾 Cópia do arquivo original: {caminho_backup(arquivo)}")
+
+    print(f"\n🎉 Atualização concluída com sucesso em {time.perf_counter() - t0:.1f}s!")
+    print("Datas, agenda, SLA e STATUS DO LEAD foram atualizados.")
+    print("Colunas PRIORIDADE e MOTIVO DO STATUS criadas com validação de dados.")
 
 
 if __name__ == "__main__":
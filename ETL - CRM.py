@@ -2,11 +2,20 @@
 # 🧠 ETL CRM MULTIMARCAS - VERSÃO FINAL 2025 (ULTRA-STABLE)
 # ===============================================================
 
+import argparse
+import importlib.util
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
 
+from excel_writer import escrever_excel_formatado
+from similaridade import componentes, matriz_features, pares_candidatos, pontuar_pares
+
 # ===============================================================
 # 🎯 CONFIGURAÇÕES
 # ===============================================================
@@ -24,9 +33,53 @@ PBI_DIM_CIDADE = Path("BASE_PBI_DIM_CIDADE.xlsx")
 PBI_DIM_SDR = Path("BASE_PBI_DIM_SDR.xlsx")
 PBI_DIM_STATUS = Path("BASE_PBI_DIM_STATUS.xlsx")
 
+# Formato das bases do Power BI: "xlsx" (padrão, compatível com os relatórios
+# atuais), "parquet" ou "csv" (o Power BI lê os dois nativamente e bem mais rápido).
+# A extensão dos caminhos PBI_* acompanha o formato escolhido.
+FORMATO_PBI = "xlsx"
+FORMATOS_PBI = ["xlsx", "parquet", "csv"]
+
+# Processos gravando arquivos em paralelo (None = um por núcleo)
+EXPORT_WORKERS = None
+
 SDR_SHEETS = ["ANDRÉ", "DUDA", "RAIANE", "ROBERTA", "SCARLAT", "TARVYLLA"]
 IBGE_SHEET = "BASE DE CIDADES IBGE"
 
+# calamine (Rust) é bem mais rápido que o openpyxl para ler; usado se estiver instalado
+MOTOR_EXCEL = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+# Nomes oficiais das colunas das abas SDR. Variações de caixa, acento e espaços
+# entre abas ("Status do lead ", "STATUS DO LEAD") são mapeadas para estes nomes.
+COLUNAS_SDR = [
+    "ID", "DATA", "Nome do Cliente", "Contato", "CNPJ", "Instagram",
+    "Status do Lead", "Fonte do Lead", "Status Conclusão", "Cidade", "UF",
+    "Data do Próximo Contato", "Dias desde Últim. Contato", "MOTIVO",
+]
+COLUNAS_DATA_SDR = ["DATA", "Data do Próximo Contato"]
+
+# Deduplicação de leads entre SDRs: só registros que dividem um bloco
+# (CNPJ, últimos 8 dígitos do telefone ou cidade + fonética do nome) são comparados.
+LIMIAR_NOME_TELEFONE = 0.50   # mesmo telefone: basta o nome ser parecido
+LIMIAR_NOME_CIDADE = 0.85     # só cidade + nome: exige nome quase igual
+MAX_BLOCO_LEADS = 200         # blocos maiores (telefone genérico, nome comum) são ignorados
+
+# Telefones/CNPJs de preenchimento (00000000, 11111111111111...)
+DIGITOS_REPETIDOS = {d * k for d in "0123456789" for k in (8, 11, 14)}
+
+# Palavras que não identificam a loja (sufixos societários e termos do ramo)
+PALAVRAS_GENERICAS_NOME = [
+    "LTDA", "ME", "EPP", "EIRELI", "MEI", "SA", "S A", "CIA",
+    "LOJA", "LOJAS", "MODA", "MODAS", "BOUTIQUE", "MULTIMARCAS", "MULTIMARCA",
+    "COMERCIO", "CONFECCAO", "CONFECCOES", "STORE", "DE", "DA", "DO", "DAS", "DOS", "E",
+]
+
+# Regras fonéticas (soundex adaptado ao português), aplicadas na ordem
+REGRAS_FONETICAS = [
+    (r"PH", "F"), (r"CH|SH", "X"), (r"LH", "L"), (r"NH", "N"),
+    (r"QU|CK|Q", "K"), (r"C(?=[EI])", "S"), (r"C", "K"), (r"G(?=[EI])", "J"),
+    (r"SS|Z", "S"), (r"W", "V"), (r"Y", "I"), (r"H", ""),
+]
+
 
 # ===============================================================
 # 🧩 FUNÇÕES AUXILIARES
@@ -52,26 +105,92 @@ def clean_cnpj(cnpj: str) -> str:
     return digits if digits else np.nan
 
 
-def build_city_key(city: str, uf: str) -> str:
-    city_norm = normalize_text(city)
-    uf_norm = normalize_text(uf)
-    if pd.isna(city_norm) or pd.isna(uf_norm):
-        return np.nan
-    return f"{city_norm}|{uf_norm}"
+def normalize_column(serie: pd.Series) -> pd.Series:
+    """normalize_text aplicado à coluna inteira (nulos continuam nulos)."""
+    return serie.where(serie.isna(), serie.astype(str).str.strip().str.upper())
+
+
+def build_city_key(city: pd.Series, uf: pd.Series) -> pd.Series:
+    """CIDADE|UF por concatenação de colunas; nulo se cidade ou UF faltarem."""
+    city_norm = normalize_column(city)
+    uf_norm = normalize_column(uf)
+    chave = city_norm.astype(object) + "|" + uf_norm.astype(object)
+    return chave.where(city_norm.notna() & uf_norm.notna(), np.nan)
 
 
 # ===============================================================
 # 📥 LEITURA SDR
 # ===============================================================
 
-def load_and_concatenate_sdr_sheets(input_file: Path, sheets: list) -> pd.DataFrame:
-    frames = []
+def chave_coluna(nome) -> str:
+    """Chave de comparação de cabeçalho: sem acento, maiúscula, espaços colapsados."""
+    texto = unicodedata.normalize("NFKD", str(nome))
+    texto = "".join(ch for ch in texto if not unicodedata.combining(ch))
+    return " ".join(texto.upper().split())
+
+
+MAPA_COLUNAS_SDR = {chave_coluna(c): c for c in COLUNAS_SDR}
+
+
+def open_workbook(input_file: Path) -> pd.ExcelFile:
+    """Abre o arquivo uma única vez (zip, shared strings e estilos parseados uma vez só)."""
+    return pd.ExcelFile(input_file, engine=MOTOR_EXCEL)
+
+
+def harmonize_columns(frames: dict) -> dict:
+    """
+    Renomeia as colunas de todas as abas com um único mapeamento: nomes
+    conhecidos viram o nome oficial; os demais ficam com a 1ª grafia encontrada.
+    """
+    mapa = dict(MAPA_COLUNAS_SDR)
+    for df in frames.values():
+        for col in df.columns:
+            mapa.setdefault(chave_coluna(col), col)
+    return {
+        aba: df.rename(columns={c: mapa[chave_coluna(c)] for c in df.columns})
+        for aba, df in frames.items()
+    }
+
+
+def harmonize_dtypes(frames: dict) -> dict:
+    """
+    Tipos consistentes antes do concat: colunas de data viram datetime em todas as
+    abas e colunas 100% vazias são descartadas na aba quando outra aba tem dados
+    nelas (o concat preenche com NaN), evitando que uma aba vazia rebaixe a coluna
+    inteira para object. Coluna vazia em todas as abas é mantida.
+    """
+    frames = {aba: df.loc[:, ~df.columns.duplicated()] for aba, df in frames.items()}
+    com_dados = set()
+    for df in frames.values():
+        com_dados.update(df.columns[df.notna().any()])
+
+    ajustados = {}
+    for aba, df in frames.items():
+        vazias = df.columns[df.isna().all()]
+        df = df.drop(columns=[c for c in vazias if c in com_dados])
+        for col in COLUNAS_DATA_SDR:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        ajustados[aba] = df
+    return ajustados
+
+
+def load_and_concatenate_sdr_sheets(input_file, sheets: list) -> pd.DataFrame:
+    """Lê todas as abas SDR da mesma instância do arquivo e concatena com colunas/tipos harmonizados."""
+    xls = input_file if isinstance(input_file, pd.ExcelFile) else open_workbook(input_file)
+
+    encontradas = [s for s in sheets if s in xls.sheet_names]
     for sheet in sheets:
-        print(f"Lendo aba: {sheet}...")
-        df = pd.read_excel(input_file, sheet_name=sheet)
+        if sheet not in encontradas:
+            print(f"⚠ Aba {sheet} não encontrada, ignorando...")
+    print(f"Lendo abas: {', '.join(encontradas)}...")
+
+    frames = xls.parse(sheet_name=encontradas)
+    frames = harmonize_dtypes(harmonize_columns(frames))
+    for sheet, df in frames.items():
         df["NomeSDR"] = sheet.upper().replace(" ", "")
-        frames.append(df)
-    full = pd.concat(frames, ignore_index=True)
+
+    full = pd.concat(frames.values(), ignore_index=True)
     print(f"Total de linhas (todas as abas SDR): {len(full)}")
     return full
 
@@ -102,11 +221,9 @@ def basic_cleaning(df: pd.DataFrame) -> pd.DataFrame:
     df["CNPJ_limpo"] = df["CNPJ"].apply(clean_cnpj)
 
     # Localização
-    df["Cidade_norm"] = df["Cidade"].apply(normalize_text)
-    df["UF_norm"] = df["UF"].apply(normalize_text)
-    df["CHAVE_CIDADE_UF"] = df.apply(
-        lambda r: build_city_key(r["Cidade"], r["UF"]), axis=1
-    )
+    df["Cidade_norm"] = normalize_column(df["Cidade"])
+    df["UF_norm"] = normalize_column(df["UF"])
+    df["CHAVE_CIDADE_UF"] = build_city_key(df["Cidade"], df["UF"])
 
     # Dias sem contato
     hoje = pd.Timestamp.today().normalize()
@@ -115,22 +232,172 @@ def basic_cleaning(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# ===============================================================
+# 🔁 DEDUPLICAÇÃO DE LEADS
+# ===============================================================
+
+def normalize_names(nomes: pd.Series) -> pd.Series:
+    """Nome sem acentos, pontuação, sufixos societários e termos genéricos do ramo."""
+    s = (
+        nomes.astype("string").fillna("")
+        .str.upper()
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("ascii")
+        .str.replace(r"[^A-Z0-9]+", " ", regex=True)
+    )
+    genericas = r"\b(?:" + "|".join(PALAVRAS_GENERICAS_NOME) + r")\b"
+    limpo = s.str.replace(genericas, " ", regex=True).str.split().str.join(" ")
+    # Nome formado só por termos genéricos ("LOJA DA MODA") fica como veio
+    return limpo.where(limpo != "", s.str.split().str.join(" ")).astype(str)
+
+
+def phonetic_key(nomes: pd.Series) -> pd.DataFrame:
+    """Código fonético (4 caracteres) dos dois primeiros tokens, coluna inteira de uma vez."""
+    s = nomes.astype(object)  # regex do Python (a do Arrow não aceita retrorreferência)
+    for padrao, troca in REGRAS_FONETICAS:
+        s = s.str.replace(padrao, troca, regex=True)
+    # Vogais só contam no início da palavra; letras repetidas colapsam
+    s = s.str.replace(r"\B[AEIOU]", "", regex=True).str.replace(r"(\w)\1+", r"\1", regex=True)
+    return s.str.extract(r"^(\S{1,4})\S*(?:\s+(\S{1,4}))?").fillna("")
+
+
+def lead_blocking_keys(cnpj: pd.Series, fone: pd.Series, cidade: pd.Series, fonetica: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha (id, chave) por chave de bloco de cada lead: C:<cnpj>, F:<fone8>, N:<cidade>|<fonética>."""
+    ids = np.arange(len(cnpj))
+    partes = []
+    for prefixo, valores in (("C:", cnpj), ("F:", fone)):
+        valido = valores.notna().to_numpy()
+        partes.append(pd.DataFrame({"id": ids[valido], "chave": prefixo + valores[valido].to_numpy(dtype=object)}))
+
+    for token in fonetica.columns:
+        codigo = fonetica[token]
+        valido = cidade.notna().to_numpy() & (codigo != "").to_numpy()
+        chave = "N:" + cidade[valido].to_numpy(dtype=object) + "|" + codigo[valido].to_numpy(dtype=object)
+        partes.append(pd.DataFrame({"id": ids[valido], "chave": chave}))
+
+    return pd.concat(partes, ignore_index=True).drop_duplicates()
+
+
+def deduplicate_leads(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Marca o mesmo lead cadastrado por SDRs diferentes (ou duas vezes pelo mesmo).
+
+    Pares são ligados por CNPJ igual, telefone igual com nome parecido ou
+    cidade igual com nome quase igual; CNPJs válidos diferentes nunca se
+    ligam. O sobrevivente de cada grupo é o registro com o contato mais
+    recente (DATA). Acrescenta LEAD_CANONICO (SDR-ID do sobrevivente),
+    LEAD_SOBREVIVENTE, QTD_REGISTROS_LEAD e REGRA_DUPLICIDADE.
+    """
+    df = df.copy()
+    n = len(df)
+    t0 = time.perf_counter()
+
+    cnpj = df["CNPJ_limpo"].astype("string")
+    # CNPJ gravado como número perde os zeros à esquerda; 11 dígitos é CPF
+    cnpj = cnpj.where(cnpj.str.len() < 12, cnpj.str.zfill(14))
+    cnpj = cnpj.where(cnpj.str.len().isin([11, 14]) & ~cnpj.isin(DIGITOS_REPETIDOS))
+
+    fone = df["Contato_limpo"].astype("string").str[-8:]
+    fone = fone.where((fone.str.len() == 8) & ~fone.isin(DIGITOS_REPETIDOS))
+
+    cidade = df["CHAVE_CIDADE_UF"].astype("string")
+
+    # Fonética e features calculadas por nome distinto e espalhadas para as linhas
+    nome_id, nomes_unicos = pd.factorize(normalize_names(df["Nome do Cliente"]))
+    nomes_unicos = pd.Series(nomes_unicos, dtype=object)
+    fonetica = phonetic_key(nomes_unicos).iloc[nome_id].reset_index(drop=True)
+
+    i, j = pares_candidatos(lead_blocking_keys(cnpj, fone, cidade, fonetica), max_bloco=MAX_BLOCO_LEADS)
+
+    indptr, indices = matriz_features(nomes_unicos)
+    score = pontuar_pares(nome_id[i], nome_id[j], indptr, indices)
+
+    def lados(serie: pd.Series):
+        valores = serie.to_numpy(dtype=object, na_value=None)
+        return valores[i], valores[j]
+
+    def iguais(serie: pd.Series) -> np.ndarray:
+        a, b = lados(serie)
+        return (a == b) & pd.notna(a)
+
+    mesmo_cnpj = iguais(cnpj)
+    cnpj_diferente = pd.notna(lados(cnpj)[0]) & pd.notna(lados(cnpj)[1]) & ~mesmo_cnpj
+    regra = np.select(
+        [mesmo_cnpj, iguais(fone) & (score >= LIMIAR_NOME_TELEFONE), iguais(cidade) & (score >= LIMIAR_NOME_CIDADE)],
+        [0, 1, 2],
+        default=3,
+    )
+    ligado = (regra < 3) & ~cnpj_diferente
+    ei, ej, regra = i[ligado], j[ligado], regra[ligado]
+
+    grupo = pd.factorize(componentes(n, ei, ej))[0]
+
+    # Regra mais forte que ligou cada registro (CNPJ > TELEFONE > NOME + CIDADE)
+    melhor = np.full(n, 3)
+    np.minimum.at(melhor, ei, regra)
+    np.minimum.at(melhor, ej, regra)
+
+    # Sobrevivente: contato mais recente; empate fica com o primeiro registro
+    ordem = pd.DataFrame({"grupo": grupo, "data": df["DATA"].to_numpy(), "pos": np.arange(n)})
+    ordem = ordem.sort_values(["grupo", "data", "pos"], ascending=[True, False, True], na_position="last")
+    sobrevivente = ordem.drop_duplicates("grupo").set_index("grupo")["pos"].reindex(range(grupo.max() + 1 if n else 0))
+    pos_sobrevivente = sobrevivente.to_numpy()[grupo]
+
+    id_lead = df["NomeSDR"].astype(str) + "-" + df["ID"].astype(str).str.replace(r"\.0$", "", regex=True)
+    df["LEAD_CANONICO"] = id_lead.to_numpy()[pos_sobrevivente]
+    df["LEAD_SOBREVIVENTE"] = pos_sobrevivente == np.arange(n)
+    df["QTD_REGISTROS_LEAD"] = np.bincount(grupo, minlength=grupo.max() + 1 if n else 0)[grupo]
+    df["REGRA_DUPLICIDADE"] = np.array(["CNPJ", "TELEFONE", "NOME + CIDADE", ""], dtype=object)[melhor]
+
+    duplicados = int((df["QTD_REGISTROS_LEAD"] > 1).sum())
+    print(f"Deduplicação: {len(i)} pares comparados, {duplicados} registros em grupos duplicados, "
+          f"{int(df['LEAD_SOBREVIVENTE'].sum())} leads únicos ({time.perf_counter() - t0:.1f}s)")
+    return df
+
+
+# Campos de contato completados a partir dos duplicados quando o sobrevivente não os tem
+CAMPOS_CONSOLIDADOS_LEAD = ["CNPJ", "CNPJ_limpo", "Contato", "Contato_limpo", "Instagram"]
+
+
+def consolidate_leads(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Uma linha por lead (o sobrevivente de cada LEAD_CANONICO), para as métricas
+    não contarem o mesmo lead várias vezes. CNPJ, telefone e Instagram vazios no
+    sobrevivente são completados com o valor do registro mais recente do grupo.
+    """
+    if "LEAD_SOBREVIVENTE" not in df.columns:
+        return df.copy()
+
+    unicos = df.loc[df["LEAD_SOBREVIVENTE"]].copy()
+    campos = [c for c in CAMPOS_CONSOLIDADOS_LEAD if c in df.columns]
+    grupos = df.loc[df["QTD_REGISTROS_LEAD"] > 1]
+    if campos and len(grupos):
+        # sobrevivente primeiro, depois do contato mais recente ao mais antigo; first() pula nulos
+        ordem = grupos.sort_values(["LEAD_SOBREVIVENTE", "DATA"], ascending=[False, False], na_position="last")
+        preenchidos = ordem.groupby("LEAD_CANONICO", sort=False)[campos].first()
+        chaves = unicos["LEAD_CANONICO"]
+        for campo in campos:
+            unicos[campo] = unicos[campo].where(unicos[campo].notna(), chaves.map(preenchidos[campo]))
+
+    print(f"Leads únicos para métricas: {len(unicos)} de {len(df)} registros")
+    return unicos
+
+
 # ===============================================================
 # 🌍 IBGE
 # ===============================================================
 
-def load_ibge_base(input_file: Path) -> pd.DataFrame:
+def load_ibge_base(input_file) -> pd.DataFrame:
     print("Lendo base IBGE: aba 'BASE DE CIDADES IBGE'...")
-    ibge = pd.read_excel(input_file, sheet_name=IBGE_SHEET)
+    ibge = pd.read_excel(input_file, sheet_name=IBGE_SHEET)  # aceita caminho ou o ExcelFile já aberto
 
     ibge = ibge[ibge["NOME DO MUNICÍPIO"].notna()].copy()
 
-    ibge["Cidade_norm"] = ibge["NOME DO MUNICÍPIO"].apply(normalize_text)
-    ibge["UF_norm"] = ibge["UF"].apply(normalize_text)
+    ibge["Cidade_norm"] = normalize_column(ibge["NOME DO MUNICÍPIO"])
+    ibge["UF_norm"] = normalize_column(ibge["UF"])
 
-    ibge["CHAVE_CIDADE_UF"] = ibge.apply(
-        lambda r: build_city_key(r["NOME DO MUNICÍPIO"], r["UF"]), axis=1
-    )
+    ibge["CHAVE_CIDADE_UF"] = build_city_key(ibge["NOME DO MUNICÍPIO"], ibge["UF"])
 
     print(f"Total de cidades IBGE consideradas: {len(ibge)}")
     return ibge
@@ -166,92 +433,200 @@ def enrich_with_ibge(df: pd.DataFrame, ibge: pd.DataFrame) -> pd.DataFrame:
 # 🟥 PRIORIDADE + FAROL
 # ===============================================================
 
+# Regras de pontuação: (grupo, regra, condições em AND, pontos).
+# Dentro de cada grupo vale a PRIMEIRA regra que casar (mesma lógica do if/elif);
+# os grupos se somam. Condição = (variável, operador, valor).
+REGRAS_PRIORIDADE = [
+    # 1. Dias sem contato
+    ("DIAS", "sem data de contato", [("dias", "nulo", None)], 4),
+    ("DIAS", "mais de 30 dias", [("dias", ">", 30)], 3),
+    ("DIAS", "15 a 30 dias", [("dias", ">=", 15), ("dias", "<=", 30)], 2),
+    ("DIAS", "7 a 14 dias", [("dias", ">=", 7), ("dias", "<", 15)], 1),
+
+    # 2. Status
+    ("STATUS", "prospecção", [("status", "contem", "PROSPEC")], 3),
+    ("STATUS", "negociação", [("status", "contem", "NEGOCIA")], 2),
+    ("STATUS", "cadastro/crédito", [("status", "contem", ("CADAST", "CRÉDITO"))], 1),
+    ("STATUS", "restrição", [("status", "contem", "RESTRI")], -2),
+    ("STATUS", "sem perfil/interesse", [("status", "contem", ("SEM PERFIL", "SEM INTERESSE", "DESIST"))], -5),
+
+    # 3. População
+    ("POPULACAO", "mais de 100 mil hab.", [("populacao", ">", 100000)], 3),
+    ("POPULACAO", "50 a 100 mil hab.", [("populacao", ">=", 50000), ("populacao", "<=", 100000)], 2),
+    ("POPULACAO", "30 a 50 mil hab.", [("populacao", ">=", 30000), ("populacao", "<", 50000)], 1),
+    ("POPULACAO", "menos de 10 mil hab.", [("populacao", "<", 10000)], -2),
+
+    # 4. Concorrência
+    ("CONCORRENCIA", "sem concorrência", [("franquia", "!=", "SIM"), ("multimarcas", "!=", "SIM")], 3),
+    ("CONCORRENCIA", "franquia e multimarcas", [("franquia", "==", "SIM"), ("multimarcas", "==", "SIM")], -3),
+    ("CONCORRENCIA", "tem franquia", [("franquia", "==", "SIM")], -3),
+    ("CONCORRENCIA", "tem multimarcas", [("multimarcas", "==", "SIM")], -2),
+]
+
+# (score mínimo, prioridade, farol) em ordem decrescente; abaixo de todos: BAIXA/VERDE
+FAIXAS_PRIORIDADE = [
+    (7, "ALTA", "VERMELHO"),
+    (3, "MÉDIA", "AMARELO"),
+]
+
+
+def _variaveis_prioridade(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas usadas pelas regras, já no formato de comparação (texto em maiúsculas)."""
+    vazio = pd.Series("", index=df.index)
+    return pd.DataFrame({
+        "dias": pd.to_numeric(df["Dias desde o Ultim. Contato"], errors="coerce"),
+        "status": df["Status do Lead"].astype(str).str.upper(),
+        "populacao": pd.to_numeric(df["POPULAÇÃO ESTIMADA"], errors="coerce"),
+        "franquia": df["TEM FRANQUIA"].astype(str).str.upper() if "TEM FRANQUIA" in df.columns else vazio,
+        "multimarcas": df["TEM MULTIMARCAS?"].astype(str).str.upper() if "TEM MULTIMARCAS?" in df.columns else vazio,
+    }, index=df.index)
+
+
+def _avaliar_condicao(variaveis: pd.DataFrame, variavel: str, operador: str, valor) -> np.ndarray:
+    col = variaveis[variavel]
+    if operador == "nulo":
+        mask = col.isna()
+    elif operador == "contem":
+        termos = valor if isinstance(valor, tuple) else (valor,)
+        mask = col.str.contains("|".join(termos), regex=True, na=False)
+    elif operador == "==":
+        mask = col == valor
+    elif operador == "!=":
+        mask = col != valor
+    elif operador == ">":
+        mask = col > valor
+    elif operador == ">=":
+        mask = col >= valor
+    elif operador == "<":
+        mask = col < valor
+    elif operador == "<=":
+        mask = col <= valor
+    else:
+        raise ValueError(f"Operador desconhecido: {operador}")
+    return mask.to_numpy(dtype=bool)
+
+
 def compute_priority(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score por regras declarativas (REGRAS_PRIORIDADE), avaliadas com máscaras e np.select.
+    Explicável: PTS_<GRUPO> guarda a contribuição de cada grupo e MOTIVO_SCORE as regras aplicadas.
+    """
     df = df.copy()
+    variaveis = _variaveis_prioridade(df)
+
+    grupos = list(dict.fromkeys(grupo for grupo, *_ in REGRAS_PRIORIDADE))
+    score = np.zeros(len(df), dtype=int)
+    motivos = pd.Series("", index=df.index)
+
+    for grupo in grupos:
+        regras = [r for r in REGRAS_PRIORIDADE if r[0] == grupo]
+        condicoes = [
+            np.logical_and.reduce([_avaliar_condicao(variaveis, *c) for c in clausulas])
+            for _, _, clausulas, _ in regras
+        ]
+        pontos = np.select(condicoes, [p for *_, p in regras], default=0)
+        nomes = np.select(condicoes, [f"{nome} ({p:+d})" for _, nome, _, p in regras], default="")
+
+        df[f"PTS_{grupo}"] = pontos
+        score += pontos
+        nomes = pd.Series(nomes, index=df.index)
+        motivos = motivos.where(nomes == "", motivos.where(motivos == "", motivos + "; ") + nomes)
+
+    df["SCORE_FINAL_INTERNAL"] = score
+    df["MOTIVO_SCORE"] = motivos
 
-    score_final = []
-
-    for _, row in df.iterrows():
-        sc = 0
-
-        # 1. Dias sem contato
-        dias = row["Dias desde o Ultim. Contato"]
-        if pd.isna(dias):
-            sc += 4
-        elif dias > 30:
-            sc += 3
-        elif 15 <= dias <= 30:
-            sc += 2
-        elif 7 <= dias < 15:
-            sc += 1
-
-        # 2. Status
-        st = str(row["Status do Lead"]).upper()
-        if "PROSPEC" in st:
-            sc += 3
-        elif "NEGOCIA" in st:
-            sc += 2
-        elif "CADAST" in st or "CRÉDITO" in st:
-            sc += 1
-        elif "RESTRI" in st:
-            sc -= 2
-        elif "SEM PERFIL" in st or "SEM INTERESSE" in st or "DESIST" in st:
-            sc -= 5
-
-        # 3. População
-        pop = row["POPULAÇÃO ESTIMADA"]
-        if pd.notna(pop):
-            if pop > 100000:
-                sc += 3
-            elif 50000 <= pop <= 100000:
-                sc += 2
-            elif 30000 <= pop < 50000:
-                sc += 1
-            elif pop < 10000:
-                sc -= 2
-
-        # 4. Concorrência
-        franq = str(row.get("TEM FRANQUIA", "")).upper()
-        mm = str(row.get("TEM MULTIMARCAS?", "")).upper()
-
-        if franq != "SIM" and mm != "SIM":
-            sc += 3
-        elif franq == "SIM" and mm == "SIM":
-            sc -= 3
-        elif franq == "SIM":
-            sc -= 3
-        elif mm == "SIM":
-            sc -= 2
-
-        score_final.append(sc)
-
-    df["SCORE_FINAL_INTERNAL"] = score_final
-
-    prioridade = []
-    farol = []
-
-    for s in score_final:
-        if s >= 7:
-            prioridade.append("ALTA")
-            farol.append("VERMELHO")
-        elif 3 <= s <= 6:
-            prioridade.append("MÉDIA")
-            farol.append("AMARELO")
-        else:
-            prioridade.append("BAIXA")
-            farol.append("VERDE")
-
-    df["PRIORIDADE_CATEGORIA"] = prioridade
-    df["FAROL"] = farol
+    faixas = [score >= minimo for minimo, _, _ in FAIXAS_PRIORIDADE]
+    df["PRIORIDADE_CATEGORIA"] = np.select(faixas, [p for _, p, _ in FAIXAS_PRIORIDADE], default="BAIXA")
+    df["FAROL"] = np.select(faixas, [f for _, _, f in FAIXAS_PRIORIDADE], default="VERDE")
 
     return df
 
 
+def apply_lead_priority(registros: pd.DataFrame, leads: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copia score, prioridade e PTS_<GRUPO> de cada lead (calculados sobre o registro
+    consolidado) para todos os registros do mesmo LEAD_CANONICO. O CRM tratado e a
+    fato do PBI mantêm todos os registros; quem conta leads filtra LEAD_SOBREVIVENTE.
+    """
+    colunas = [c for c in leads.columns
+               if c in ("SCORE_FINAL_INTERNAL", "MOTIVO_SCORE", "PRIORIDADE_CATEGORIA", "FAROL")
+               or str(c).startswith("PTS_")]
+    if "LEAD_CANONICO" not in registros.columns:
+        return compute_priority(registros)
+
+    prioridade = leads.set_index("LEAD_CANONICO")[colunas]
+    registros = registros.drop(columns=[c for c in colunas if c in registros.columns])
+    return registros.join(prioridade, on="LEAD_CANONICO")
+
+
+# ===============================================================
+# 💾 GRAVAÇÃO PARALELA
+# ===============================================================
+# Cada saída vira uma tarefa (rótulo, função, dados, caminho). As funções de
+# gravação ficam no nível do módulo para serem enviadas aos processos; o tempo
+# total da exportação passa a ser o do maior arquivo, não a soma de todos.
+
+def gravar_tabela(df: pd.DataFrame, caminho: Path) -> float:
+    """Grava ``df`` no formato indicado pela extensão do caminho e devolve os segundos gastos."""
+    t0 = time.perf_counter()
+    sufixo = caminho.suffix.lower()
+    if sufixo == ".xlsx":
+        # xlsxwriter em constant_memory: linhas emitidas em ordem e descartadas
+        escrever_excel_formatado(df, caminho, aba="Sheet1", texto_longo_esquerda=None)
+    elif sufixo == ".csv":
+        df.to_csv(caminho, index=False, sep=";", encoding="utf-8-sig")
+    elif sufixo == ".parquet":
+        # Colunas object misturam tipos (ex.: CNPJ número/texto); o Parquet exige um tipo só
+        texto = {c: "string" for c in df.columns if df[c].dtype == object}
+        df.astype(texto).to_parquet(caminho, index=False)
+    else:
+        raise ValueError(f"Formato de saída não suportado: {caminho}")
+    return time.perf_counter() - t0
+
+
+def gravar_relatorio_excel(abas: dict, caminho: Path) -> float:
+    """Pasta com várias abas pequenas (relatório); mantém o ExcelWriter do pandas."""
+    t0 = time.perf_counter()
+    with pd.ExcelWriter(caminho, engine="xlsxwriter") as writer:
+        for nome, df in abas.items():
+            df.to_excel(writer, sheet_name=nome, index=False)
+    return time.perf_counter() - t0
+
+
+def _peso_tarefa(tarefa) -> int:
+    dados = tarefa[2]
+    frames = dados.values() if isinstance(dados, dict) else [dados]
+    return sum(df.size for df in frames)
+
+
+def executar_exportacao(tarefas: list, workers=EXPORT_WORKERS) -> None:
+    """Grava todas as saídas em processos separados, as maiores primeiro."""
+    t0 = time.perf_counter()
+    tarefas = sorted(tarefas, key=_peso_tarefa, reverse=True)
+    soma = 0.0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(funcao, dados, caminho): (rotulo, caminho)
+                   for rotulo, funcao, dados, caminho in tarefas}
+        for futuro in as_completed(futuros):
+            rotulo, caminho = futuros[futuro]
+            segundos = futuro.result()
+            soma += segundos
+            print(f"{rotulo}: {caminho.resolve()} ({segundos:.1f}s)")
+
+    print(f"⏱️ Exportação: {time.perf_counter() - t0:.1f}s para {len(tarefas)} arquivos "
+          f"(gravação em série somaria {soma:.1f}s)")
+
+
+def caminho_pbi(caminho: Path, formato: str) -> Path:
+    return caminho.with_suffix(f".{formato}")
+
+
 # ===============================================================
 # 📦 EXPORTAÇÃO PRINCIPAL
 # ===============================================================
 
-def export_clean(df: pd.DataFrame) -> pd.DataFrame:
+def export_clean(df: pd.DataFrame, tarefas: list) -> pd.DataFrame:
     cols = [
         "ID", "NomeSDR", "DATA",
         "Nome do Cliente", "Contato_limpo", "Instagram", "CNPJ_limpo",
@@ -261,7 +636,10 @@ def export_clean(df: pd.DataFrame) -> pd.DataFrame:
         "TEM FRANQUIA", "TEM MULTIMARCAS?", "QQTD",
         "Data do Próximo Contato", "Dias desde o Ultim. Contato",
         "MOTIVO" if "MOTIVO" in df.columns else None,
-        "PRIORIDADE_CATEGORIA", "FAROL"
+        "PRIORIDADE_CATEGORIA", "FAROL",
+        "SCORE_FINAL_INTERNAL", "MOTIVO_SCORE",
+        *[c for c in df.columns if str(c).startswith("PTS_")],
+        "LEAD_CANONICO", "LEAD_SOBREVIVENTE", "QTD_REGISTROS_LEAD", "REGRA_DUPLICIDADE",
     ]
 
     cols = [c for c in cols if c in df.columns]
@@ -269,11 +647,8 @@ def export_clean(df: pd.DataFrame) -> pd.DataFrame:
     clean = df[cols].copy()
     print(f"Exportando {len(clean)} linhas e {len(clean.columns)} colunas...")
 
-    clean.to_excel(OUTPUT_EXCEL, index=False)
-    clean.to_csv(OUTPUT_CSV, index=False, sep=";", encoding="utf-8-sig")
-
-    print(f"✅ Arquivo Excel gerado: {OUTPUT_EXCEL.resolve()}")
-    print(f"✅ Arquivo CSV gerado: {OUTPUT_CSV.resolve()}")
+    tarefas.append(("✅ Arquivo Excel gerado", gravar_tabela, clean, OUTPUT_EXCEL))
+    tarefas.append(("✅ Arquivo CSV gerado", gravar_tabela, clean, OUTPUT_CSV))
 
     return clean
 
@@ -282,14 +657,20 @@ def export_clean(df: pd.DataFrame) -> pd.DataFrame:
 # 🧾 RELATÓRIOS (CORRIGIDO)
 # ===============================================================
 
-def generate_reports(df, ibge, txt_path, xlsx_path):
+def generate_reports(df, ibge, txt_path, xlsx_path, tarefas: list, registros=None):
+    """
+    ``df`` tem um registro por lead (consolidate_leads): contagens e abas saem dele.
+    ``registros`` é a tabela completa, com duplicados, usada só no total e na aba de auditoria.
+    """
+    registros = df if registros is None else registros
 
     # ===== TXT =====
     lines = []
     lines.append("===== RELATORIO ETL CRM =====")
     lines.append(f"Data/Hora: {datetime.now()}")
     lines.append("")
-    lines.append(f"Total de leads tratados: {len(df)}")
+    lines.append(f"Total de registros tratados: {len(registros)}")
+    lines.append(f"Leads únicos (após deduplicação): {len(df)}")
 
     if "NomeSDR" in df.columns:
         lines.append("\nLeads por SDR:")
@@ -307,36 +688,43 @@ def generate_reports(df, ibge, txt_path, xlsx_path):
     print(f"✅ Relatório TXT gerado: {txt_path.resolve()}")
 
     # ===== EXCEL =====
-    with pd.ExcelWriter(xlsx_path, engine="xlsxwriter") as writer:
+    # Aba Nulls
+    nulls = df.isna().sum().reset_index()
+    nulls.columns = ["Coluna", "Qtde_Nulls"]
 
-        # Aba Nulls
-        nulls = df.isna().sum().reset_index()
-        nulls.columns = ["Coluna", "Qtde_Nulls"]
-        nulls.to_excel(writer, sheet_name="Nulls", index=False)
+    # Aba cidades sem IBGE (100% segura)
+    uf_cols = [c for c in ["UF", "UF_norm", "UF_IBGE"] if c in df.columns]
 
-        # Aba cidades sem IBGE (100% segura)
-        uf_cols = [c for c in ["UF", "UF_norm", "UF_IBGE"] if c in df.columns]
+    if "Cidade" in df.columns and "NOME DO MUNICÍPIO" in df.columns and uf_cols:
+        uf_col = uf_cols[0]
+        sem_ibge = df[df["NOME DO MUNICÍPIO"].isna()][["Cidade", uf_col]].drop_duplicates()
+    else:
+        sem_ibge = pd.DataFrame({"Aviso": ["Colunas para identificar cidades sem IBGE não disponíveis."]})
 
-        if "Cidade" in df.columns and "NOME DO MUNICÍPIO" in df.columns and uf_cols:
-            uf_col = uf_cols[0]
-            nf = df[df["NOME DO MUNICÍPIO"].isna()][["Cidade", uf_col]].drop_duplicates()
-            nf.to_excel(writer, sheet_name="Cidades_Sem_IBGE", index=False)
-        else:
-            fallback = pd.DataFrame({"Aviso": ["Colunas para identificar cidades sem IBGE não disponíveis."]})
-            fallback.to_excel(writer, sheet_name="Cidades_Sem_IBGE", index=False)
+    abas = {"Nulls": nulls, "Cidades_Sem_IBGE": sem_ibge}
 
-    print(f"✅ Relatório Excel gerado: {xlsx_path.resolve()}")
+    # Auditoria: todos os registros dos grupos de leads duplicados (sobrevivente primeiro)
+    if "QTD_REGISTROS_LEAD" in registros.columns:
+        cols_dup = [c for c in [
+            "LEAD_CANONICO", "LEAD_SOBREVIVENTE", "REGRA_DUPLICIDADE", "NomeSDR", "ID",
+            "Nome do Cliente", "Contato_limpo", "CNPJ_limpo", "Cidade", "UF_norm", "DATA",
+            "Status do Lead",
+        ] if c in registros.columns]
+        abas["Duplicados"] = (
+            registros.loc[registros["QTD_REGISTROS_LEAD"] > 1, cols_dup]
+            .sort_values(["LEAD_CANONICO", "LEAD_SOBREVIVENTE"], ascending=[True, False])
+        )
+    tarefas.append(("✅ Relatório Excel gerado", gravar_relatorio_excel, abas, xlsx_path))
 
 
 # ===============================================================
 # 🟩 BASES PARA POWER BI (CORRIGIDO)
 # ===============================================================
 
-def export_pbi_bases(df):
+def export_pbi_bases(df, tarefas: list, formato: str = FORMATO_PBI):
 
     # ----- FATO -----
-    df.to_excel(PBI_FATO, index=False)
-    print(f"🔷 BASE_PBI_FATO_LEADS gerada: {PBI_FATO.resolve()}")
+    tarefas.append(("🔷 BASE_PBI_FATO_LEADS gerada", gravar_tabela, df, caminho_pbi(PBI_FATO, formato)))
 
     # ----- DIM_CIDADE (100% dinâmica e segura) -----
     possible_cols = [
@@ -352,48 +740,176 @@ def export_pbi_bases(df):
     else:
         dim_cidade = pd.DataFrame({"Aviso": ["Nenhuma coluna válida encontrada para DIM_CIDADE"]})
 
-    dim_cidade.to_excel(PBI_DIM_CIDADE, index=False)
-    print(f"🔷 BASE_PBI_DIM_CIDADE gerada: {PBI_DIM_CIDADE.resolve()}")
+    tarefas.append(("🔷 BASE_PBI_DIM_CIDADE gerada", gravar_tabela, dim_cidade, caminho_pbi(PBI_DIM_CIDADE, formato)))
 
     # ----- DIM_SDR -----
     dim_sdr = df[["NomeSDR"]].drop_duplicates()
-    dim_sdr.to_excel(PBI_DIM_SDR, index=False)
-    print(f"🔷 BASE_PBI_DIM_SDR gerada: {PBI_DIM_SDR.resolve()}")
+    tarefas.append(("🔷 BASE_PBI_DIM_SDR gerada", gravar_tabela, dim_sdr, caminho_pbi(PBI_DIM_SDR, formato)))
 
     # ----- DIM_STATUS -----
     dim_status = df[["Status do Lead"]].drop_duplicates()
-    dim_status.to_excel(PBI_DIM_STATUS, index=False)
-    print(f"🔷 BASE_PBI_DIM_STATUS gerada: {PBI_DIM_STATUS.resolve()}")
+    tarefas.append(("🔷 BASE_PBI_DIM_STATUS gerada", gravar_tabela, dim_status, caminho_pbi(PBI_DIM_STATUS, formato)))
 
 
 # ===============================================================
 # 🏁 MAIN
 # ===============================================================
 
-def main():
+def main(formato_pbi: str = FORMATO_PBI, workers=EXPORT_WORKERS):
     print("===================================================")
     print("🚀 INICIANDO ETL CRM MULTIMARCAS – FINAL CORRIGIDO")
     print("===================================================")
 
-    df_raw = load_and_concatenate_sdr_sheets(INPUT_FILE, SDR_SHEETS)
+    t0 = time.perf_counter()
+    xls = open_workbook(INPUT_FILE)
+    df_raw = load_and_concatenate_sdr_sheets(xls, SDR_SHEETS)
+    ibge = load_ibge_base(xls)
+    xls.close()
+    print(f"⏱️ Leitura do CRM: {time.perf_counter() - t0:.1f}s")
+
     df_leads = filter_real_leads(df_raw)
     df_clean = basic_cleaning(df_leads)
+    df_clean = deduplicate_leads(df_clean)
 
-    ibge = load_ibge_base(INPUT_FILE)
     df_enriched = enrich_with_ibge(df_clean, ibge)
 
-    df_prior = compute_priority(df_enriched)
+    # Contagens e prioridade sobre um registro por lead; o CRM tratado e as bases
+    # do PBI mantêm todos os registros, com LEAD_CANONICO/LEAD_SOBREVIVENTE
+    df_unicos = compute_priority(consolidate_leads(df_enriched))
+    df_prior = apply_lead_priority(df_enriched, df_unicos)
+
+    tarefas = []
+    df_export = export_clean(df_prior, tarefas)
 
-    df_export = export_clean(df_prior)
+    generate_reports(df_unicos, ibge, RELATORIO_TXT, RELATORIO_XLSX, tarefas, registros=df_prior)
 
-    generate_reports(df_prior, ibge, RELATORIO_TXT, RELATORIO_XLSX)
+    export_pbi_bases(df_export, tarefas, formato_pbi)
 
-    export_pbi_bases(df_export)
+    executar_exportacao(tarefas, workers)
 
     print("\n🎉 ETL FINAL executado com sucesso!")
     print("CRM ENXUTO + INTELIGÊNCIA PRONTA PARA POWER BI.")
 
 
+# ===============================================================
+# ⏱️ BENCHMARK DE LEITURA
+# ===============================================================
+
+def gerar_crm_sintetico(destino: Path, linhas_por_aba: int) -> Path:
+    """Arquivo com as 6 abas SDR (cabeçalhos com variações) + base IBGE."""
+    rng = np.random.default_rng(42)
+    variacoes = [str.upper, str.lower, lambda c: c + " ", lambda c: c, lambda c: c.title(), lambda c: " " + c]
+    cidades = [f"CIDADE {i}" for i in range(300)]
+    with pd.ExcelWriter(destino, engine="xlsxwriter") as writer:
+        for i, sheet in enumerate(SDR_SHEETS):
+            n = linhas_por_aba
+            df = pd.DataFrame({
+                "ID": np.arange(n),
+                "DATA": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 300, n), unit="D"),
+                "Nome do Cliente": [f"CLIENTE {k}" for k in rng.integers(0, 10 * n, n)],
+                "Contato": rng.integers(11_900_000_000, 11_999_999_999, n),
+                "CNPJ": rng.integers(10 ** 13, 10 ** 14 - 1, n).astype(str),
+                "Status do Lead": rng.choice(["PROSPECÇÃO", "NEGOCIAÇÃO", "SEM PERFIL", "CADASTRO"], n),
+                "Fonte do Lead": rng.choice(["INSTAGRAM", "INDICAÇÃO", "FEIRA"], n),
+                "Cidade": rng.choice(cidades, n),
+                "UF": rng.choice(["SP", "MG", "RJ"], n),
+                "Data do Próximo Contato": pd.NaT if i == 0 else pd.Timestamp("2025-12-01"),
+            })
+            df.columns = [variacoes[i](c) for c in df.columns]
+            df.to_excel(writer, sheet_name=sheet, index=False)
+        pd.DataFrame({"NOME DO MUNICÍPIO": cidades, "UF": "SP", "POPULAÇÃO ESTIMADA": 50000}).to_excel(
+            writer, sheet_name=IBGE_SHEET, index=False)
+    return destino
+
+
+def benchmark_leitura(linhas_por_aba: int) -> None:
+    destino = gerar_crm_sintetico(Path(f"benchmark_crm_{linhas_por_aba}.xlsx"), linhas_por_aba)
+
+    t0 = time.perf_counter()
+    for sheet in SDR_SHEETS:
+        pd.read_excel(destino, sheet_name=sheet)
+    pd.read_excel(destino, sheet_name=IBGE_SHEET)
+    t_antigo = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    xls = open_workbook(destino)
+    df = load_and_concatenate_sdr_sheets(xls, SDR_SHEETS)
+    load_ibge_base(xls)
+    xls.close()
+    t_novo = time.perf_counter() - t0
+
+    print(f"\n{len(df)} linhas | uma leitura por aba: {t_antigo:.2f}s | arquivo aberto uma vez: {t_novo:.2f}s "
+          f"({t_antigo / t_novo:.1f}x)")
+    print(f"Colunas harmonizadas: {sorted(map(str, df.columns))}")
+
+
+def gerar_leads_sinteticos(n: int, taxa_duplicados: float = 0.2, seed: int = 7) -> pd.DataFrame:
+    """Leads já limpos (saída de basic_cleaning) com cópias alteradas; LOJA_REAL é o gabarito."""
+    rng = np.random.default_rng(seed)
+    n_lojas = int(n / (1 + taxa_duplicados))
+    prefixos = ["BOUTIQUE", "LOJA", "", "", "MODAS", "ESPACO", "ATELIE", "CASA"]
+    nomes = ["MARIA", "JOANA", "BELLA", "CHIC", "ESTILO", "VITORIA", "FLOR", "ARTE", "LUNA", "BRISA",
+             "SOL", "MAR", "GLAMOUR", "ELEGANCE", "PRIME", "NOVA", "BELLE", "AMORA", "CRISTAL", "DIVA"]
+    nome = (rng.choice(prefixos, n_lojas).astype(object) + " " + rng.choice(nomes, n_lojas).astype(object) + " "
+            + rng.choice(nomes, n_lojas).astype(object) + " " + rng.integers(1, 999, n_lojas).astype(str).astype(object))
+    base = pd.DataFrame({
+        "LOJA_REAL": np.arange(n_lojas),
+        "Nome do Cliente": pd.Series(nome).str.strip(),
+        "Contato_limpo": rng.integers(11_900_000_000, 11_999_999_999, n_lojas).astype(str),
+        "CNPJ_limpo": rng.integers(10 ** 13, 10 ** 14 - 1, n_lojas).astype(str),
+        "CHAVE_CIDADE_UF": [f"CIDADE {c}|SP" for c in rng.integers(0, max(n_lojas // 50, 1), n_lojas)],
+    })
+    base.loc[rng.random(n_lojas) < 0.4, "CNPJ_limpo"] = np.nan
+
+    copias = base.sample(n - n_lojas, replace=True, random_state=seed).reset_index(drop=True)
+    variacao = rng.integers(0, 3, len(copias))
+    # 0: telefone com DDD/formato diferente e sem CNPJ; 1: nome com sufixo e caixa diferentes; 2: só nome + cidade
+    copias.loc[variacao == 0, "Contato_limpo"] = "55" + copias.loc[variacao == 0, "Contato_limpo"].str[-9:]
+    copias.loc[variacao == 0, "CNPJ_limpo"] = np.nan
+    copias.loc[variacao == 1, "Nome do Cliente"] = copias.loc[variacao == 1, "Nome do Cliente"].str.title() + " LTDA"
+    copias.loc[variacao == 2, ["Contato_limpo", "CNPJ_limpo"]] = np.nan
+
+    df = pd.concat([base, copias], ignore_index=True)
+    df["NomeSDR"] = rng.choice(SDR_SHEETS, len(df))
+    df["ID"] = np.arange(len(df))
+    df["DATA"] = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 300, len(df)), unit="D")
+    return df
+
+
+def benchmark_deduplicacao(n: int) -> None:
+    df = gerar_leads_sinteticos(n)
+    t0 = time.perf_counter()
+    resultado = deduplicate_leads(df)
+    segundos = time.perf_counter() - t0
+
+    # Pares corretos = mesma loja real; avaliação por contagem de pares dentro dos grupos
+    def pares(chaves: pd.DataFrame) -> int:
+        tamanhos = chaves.value_counts().to_numpy()
+        return int((tamanhos * (tamanhos - 1) // 2).sum())
+
+    previstos = pares(resultado[["LEAD_CANONICO"]])
+    reais = pares(resultado[["LOJA_REAL"]])
+    acertos = pares(resultado[["LEAD_CANONICO", "LOJA_REAL"]])
+    print(f"\n{n} leads em {segundos:.2f}s | precisão {acertos / max(previstos, 1):.1%} | "
+          f"recall {acertos / max(reais, 1):.1%} | {resultado['LEAD_SOBREVIVENTE'].sum()} únicos "
+          f"(gabarito: {resultado['LOJA_REAL'].nunique()})")
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="ETL CRM Multimarcas")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="gera um CRM com 6 abas de N linhas e mede só a leitura")
+    parser.add_argument("--benchmark-dedup", type=int, default=0, metavar="N",
+                        help="gera N leads com duplicados conhecidos e mede a deduplicação")
+    parser.add_argument("--formato-pbi", choices=FORMATOS_PBI, default=FORMATO_PBI,
+                        help="formato das bases do Power BI")
+    parser.add_argument("--workers", type=int, default=EXPORT_WORKERS,
+                        help="processos de gravação (padrão: um por núcleo)")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark_leitura(args.benchmark)
+    elif args.benchmark_dedup:
+        benchmark_deduplicacao(args.benchmark_dedup)
+    else:
+        main(args.formato_pbi, args.workers)
 
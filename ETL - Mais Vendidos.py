@@ -1,8 +1,16 @@
-import mysql.connector
+import argparse
 import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mysql.connector
+import numpy as np
 import pandas as pd
 import xlsxwriter # Importando a biblioteca xlsxwriter
 
+from imagens_produtos import IndiceImagens, normalizar_codigo
+
 # --- Configurações do Banco de Dados ---
 # ATENÇÃO: Substitua com suas credenciais e detalhes do banco de dados
 DB_CONFIG = {
@@ -19,6 +27,22 @@ DB_CONFIG = {
 IMAGENS_FOLDER = r'C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\FOTOS PRODUTOS'
 IMAGEM_EXTENSAO = '.png' # Confirme a extensão das suas imagens (ex: .png, .jpeg)
 
+# Caixa da foto em pixels: coluna de 22 caracteres (~159 px) x linha de 46 pt (~61 px)
+TAMANHO_FOTO = (159, 61)
+
+# --- Configuração do modo lote (todos os períodos em uma consulta) ---
+STAGING_TABLE = 'staging_mix_produtos_vendidos'
+MACROGRUPO = 'SAPATOS'
+TOP_N = 10
+PASTA_LOTE = 'Catalogos Mais Vendidos'
+ARQUIVO_TESTE = 'vendas_teste.sqlite'
+# chave_mes da staging: nome do mês em maiúsculas (lc_time_names = 'pt_BR')
+MESES = ['JANEIRO', 'FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO',
+         'JULHO', 'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
+
+# Colunas do catálogo, na ordem do Excel (a imagem entra numa coluna extra)
+CATALOG_COLUMNS = ['ranking', 'referencia_produto', 'descricao_produto', 'codigo_produto', 'volume_vendido_total']
+
 def get_top_products_from_sp(mes: str, ano: int):
     """
     Conecta ao MySQL, chama a Stored Procedure e retorna os 10 produtos mais vendidos.
@@ -48,43 +72,66 @@ def get_top_products_from_sp(mes: str, ano: int):
             conn.close()
     return products_data
 
-def get_image_path(codigo_produto: str) -> str:
+def write_catalog_sheet(workbook, worksheet, df: pd.DataFrame, miniaturas: dict):
     """
-    Constrói o caminho completo para a imagem de um produto.
-    Assume que as imagens estão nomeadas como 'codigo_produto.extensao'.
+    Escreve o ranking de um período na aba: cabeçalho, linhas com altura fixa
+    e a miniatura do produto na última coluna.
     """
-    # Convertendo o código do produto e a extensão para minúsculas para padronização
-    image_filename_lower = f"{str(codigo_produto).lower()}{IMAGEM_EXTENSAO.lower()}"
-    full_image_path_lower = os.path.join(IMAGENS_FOLDER, image_filename_lower)
-    
-    # --- NOVAS MENSAGENS DE DEPURAÇÃO ---
-    print(f"DEBUG: IMAGENS_FOLDER configurado como: '{IMAGENS_FOLDER}'")
-    print(f"DEBUG: Tentando construir nome do arquivo (lower): '{image_filename_lower}'")
-    print(f"DEBUG: Caminho completo que será verificado: '{full_image_path_lower}'")
-
-    if os.path.exists(full_image_path_lower):
-        print(f"DEBUG: Imagem ENCONTRADA: '{full_image_path_lower}'")
-        return full_image_path_lower
-    else:
-        print(f"DEBUG: Imagem NÃO ENCONTRADA: '{full_image_path_lower}'")
-        
-        # Tenta listar arquivos na pasta para verificar se o nome existe com outra capitalização
-        try:
-            files_in_folder = os.listdir(IMAGENS_FOLDER)
-            found_alternative = False
-            for f_name in files_in_folder:
-                if f_name.lower() == image_filename_lower:
-                    print(f"DEBUG: Encontrado arquivo com capitalização diferente: '{f_name}'")
-                    # Se encontrar, retorna o caminho com a capitalização real do arquivo
-                    return os.path.join(IMAGENS_FOLDER, f_name)
-            if not found_alternative:
-                print(f"DEBUG: Nenhum arquivo correspondente encontrado na pasta '{IMAGENS_FOLDER}'.")
-        except FileNotFoundError:
-            print(f"DEBUG: Erro: A pasta de imagens '{IMAGENS_FOLDER}' não foi encontrada pelo Python.")
-        except Exception as e:
-            print(f"DEBUG: Erro ao listar arquivos na pasta de imagens: {e}")
-
-        return "" # Retorna string vazia se a imagem não for encontrada
+    # Define o formato padrão para o texto (Calibri, tamanho 9)
+    default_text_format = workbook.add_format({'font_name': 'Calibri', 'font_size': 9, 'align': 'center', 'valign': 'vcenter', 'border': 1})
+
+    # Define o formato do cabeçalho (negrito, centralizado, Calibri, tamanho 9)
+    header_format = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1, 'font_name': 'Calibri', 'font_size': 9})
+
+    # Escreve os cabeçalhos das colunas
+    headers = df.columns.tolist()
+    headers.append('Imagem do Produto') # Adiciona o cabeçalho para a coluna de imagem
+
+    for col_num, header in enumerate(headers):
+        worksheet.write(0, col_num, header, header_format)
+
+    # Define a largura exata das colunas (22 unidades de caracteres)
+    for col_idx in range(len(headers)): # Aplica a largura a TODAS as colunas, incluindo a de imagem
+        worksheet.set_column(col_idx, col_idx, 22)
+
+    # Itera sobre os dados e escreve no Excel
+    for row_num, row_data in enumerate(df.itertuples(index=False)):
+        row_data = row_data._asdict()
+        # Escreve os dados das colunas existentes com o formato padrão
+        for col_num, value in enumerate(row_data.values()):
+            worksheet.write(row_num + 1, col_num, value, default_text_format) # +1 para pular a linha do cabeçalho
+
+        # Define a altura exata da linha (46.0 pontos)
+        worksheet.set_row(row_num + 1, 46.0) # Altura da linha definida para 46.0 pontos
+
+        # Insere a imagem na coluna 'Imagem do Produto'
+        miniatura = miniaturas.get(normalizar_codigo(row_data['codigo_produto']))
+
+        if miniatura:
+            try:
+                # Miniatura já no tamanho da célula (22 de largura, 46 de altura), passada em memória;
+                # 'object_position': 2 = mover e dimensionar com as células
+                worksheet.insert_image(
+                    row_num + 1, # Linha (1-indexed)
+                    len(headers) - 1, # Coluna (0-indexed) da 'Imagem do Produto'
+                    f"{row_data['codigo_produto']}.jpg",
+                    miniatura.opcoes_xlsxwriter(x_offset=0, y_offset=0, object_position=2)
+                )
+            except Exception as img_err:
+                print(f"DEBUG: Erro ao inserir imagem para {row_data['codigo_produto']}: {img_err}")
+                worksheet.write(row_num + 1, len(headers) - 1, "Erro na Imagem", default_text_format)
+        else:
+            worksheet.write(row_num + 1, len(headers) - 1, "Imagem não encontrada", default_text_format)
+
+
+def save_catalog(rankings: dict, output_excel_filename: str, miniaturas: dict) -> str:
+    """Grava um arquivo com uma aba por período ({nome da aba: ranking})."""
+    workbook = xlsxwriter.Workbook(output_excel_filename)
+    for sheet_name, df in rankings.items():
+        write_catalog_sheet(workbook, workbook.add_worksheet(sheet_name[:31]), df, miniaturas)
+    workbook.close()
+    return output_excel_filename
+
 
 def generate_product_catalog(mes: str, ano: int, output_excel_filename: str = 'catalogo_produtos.xlsx'):
     """
@@ -99,95 +146,210 @@ def generate_product_catalog(mes: str, ano: int, output_excel_filename: str = 'c
         print("Nenhum produto encontrado para o período e critérios especificados.")
         return
 
-    # Adiciona o caminho local da imagem aos dados
+    # Índice da pasta de imagens (uma varredura, sem distinção de maiúsculas) e
+    # miniaturas no tamanho da célula, lidas do cache em memória
+    indice = IndiceImagens(IMAGENS_FOLDER, extensoes=(IMAGEM_EXTENSAO,))
+    miniaturas = indice.miniaturas_em_memoria([p['codigo_produto'] for p in top_products], *TAMANHO_FOTO)
     for product in top_products:
-        product['Caminho da Imagem'] = get_image_path(product['codigo_produto'])
         if 'FOTO' in product:
             del product['FOTO']
 
     # Cria um DataFrame Pandas para facilitar a manipulação dos dados
     df = pd.DataFrame(top_products)
-
-    # Define a ordem das colunas para o Excel (excluindo 'Caminho da Imagem' que será usada para inserir a imagem)
-    desired_columns_order = [
-        'ranking',
-        'referencia_produto',
-        'descricao_produto',
-        'codigo_produto',
-        'volume_vendido_total'
-    ]
-    df = df[[col for col in desired_columns_order if col in df.columns]]
+    df = df[[col for col in CATALOG_COLUMNS if col in df.columns]]
 
     # --- Exporta para Excel usando XlsxWriter para incorporar imagens ---
     try:
-        # Cria um novo workbook e worksheet
-        workbook = xlsxwriter.Workbook(output_excel_filename)
-        worksheet = workbook.add_worksheet()
-
-        # Define o formato padrão para o texto (Calibri, tamanho 9)
-        default_text_format = workbook.add_format({'font_name': 'Calibri', 'font_size': 9, 'align': 'center', 'valign': 'vcenter', 'border': 1})
-
-        # Define o formato do cabeçalho (negrito, centralizado, Calibri, tamanho 9)
-        header_format = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1, 'font_name': 'Calibri', 'font_size': 9})
-        
-        # Escreve os cabeçalhos das colunas
-        headers = df.columns.tolist()
-        headers.append('Imagem do Produto') # Adiciona o cabeçalho para a coluna de imagem
-
-        for col_num, header in enumerate(headers):
-            worksheet.write(0, col_num, header, header_format)
-        
-        # Define a largura exata das colunas (22 unidades de caracteres)
-        for col_idx in range(len(headers)): # Aplica a largura a TODAS as colunas, incluindo a de imagem
-            worksheet.set_column(col_idx, col_idx, 22)
-
-        # Itera sobre os dados e escreve no Excel
-        for row_num, row_data in df.iterrows():
-            # Escreve os dados das colunas existentes com o formato padrão
-            for col_num, value in enumerate(row_data):
-                worksheet.write(row_num + 1, col_num, value, default_text_format) # +1 para pular a linha do cabeçalho
-
-            # Define a altura exata da linha (46.0 pontos)
-            worksheet.set_row(row_num + 1, 46.0) # Altura da linha definida para 46.0 pontos
-
-            # Insere a imagem na coluna 'Imagem do Produto'
-            image_path = top_products[row_num]['Caminho da Imagem'] # Pega o caminho da imagem da lista original
-
-            if image_path and os.path.exists(image_path): # Verifica novamente se o caminho é válido
-                try:
-                    # Insere a imagem com a propriedade 'object_position': 2 (Move and size with cells)
-                    # A imagem será redimensionada automaticamente para caber na célula
-                    # devido ao 'object_position': 2 e ao tamanho da célula (22 de largura, 46 de altura).
-                    worksheet.insert_image(
-                        row_num + 1, # Linha (1-indexed)
-                        len(headers) - 1, # Coluna (0-indexed) da 'Imagem do Produto'
-                        image_path,
-                        {'x_offset': 0, 'y_offset': 0, # Sem offset para ficar colado à célula
-                         'object_position': 2 # ESSA É A PROPRIEDADE CHAVE: Move and size with cells
-                        }
-                    )
-                except Exception as img_err:
-                    print(f"DEBUG: Erro ao inserir imagem para {row_data['codigo_produto']}: {img_err}")
-                    worksheet.write(row_num + 1, len(headers) - 1, "Erro na Imagem", default_text_format)
-            else:
-                worksheet.write(row_num + 1, len(headers) - 1, "Imagem não encontrada", default_text_format)
-
-
-        # Fecha o workbook
-        workbook.close()
-
+        save_catalog({'Sheet1': df}, output_excel_filename, miniaturas)
         print(f"\nCatálogo exportado com sucesso para '{output_excel_filename}', com imagens incorporadas e redimensionamento automático.")
     except Exception as e:
         print(f"Erro ao exportar para Excel: {e}")
 
+
+# ==========================================================
+# 📅 MODO LOTE: TODOS OS PERÍODOS EM UMA CONSULTA
+# ==========================================================
+
+def build_ranking_query(periodos: list, placeholder: str = '%s') -> str:
+    """
+    Ranking de todos os períodos em uma única consulta: agrega a staging por
+    (ano, mês, produto) e numera com ROW_NUMBER() por período. Funciona no
+    MySQL 8 e no SQLite (3.25+), mudando só o marcador de parâmetro.
+    """
+    pares = ", ".join(f"({placeholder}, {placeholder})" for _ in periodos)
+    return f"""
+        WITH vendas AS (
+            SELECT
+                chave_ano,
+                chave_mes,
+                codigo_produto,
+                MAX(referencia_produto) AS referencia_produto,
+                MAX(descricao_produto) AS descricao_produto,
+                SUM(quantidade_total_item) AS volume_vendido_total
+            FROM {STAGING_TABLE}
+            WHERE macrogrupo_produto = {placeholder}
+              AND quantidade_total_item > 0
+              AND (chave_ano, chave_mes) IN ({pares})
+            GROUP BY chave_ano, chave_mes, codigo_produto
+        ),
+        ranqueado AS (
+            SELECT
+                vendas.*,
+                ROW_NUMBER() OVER (
+                    PARTITION BY chave_ano, chave_mes
+                    ORDER BY volume_vendido_total DESC, codigo_produto
+                ) AS ranking
+            FROM vendas
+        )
+        SELECT chave_ano, chave_mes, ranking, referencia_produto, descricao_produto,
+               codigo_produto, volume_vendido_total
+        FROM ranqueado
+        WHERE ranking <= {placeholder}
+        ORDER BY chave_ano, chave_mes, ranking
+    """
+
+
+def get_rankings_for_periods(conn, periodos: list, top_n: int = TOP_N, macrogrupo: str = MACROGRUPO) -> pd.DataFrame:
+    """Executa a consulta única; ``periodos`` é uma lista de (ano, 'MÊS')."""
+    placeholder = '?' if isinstance(conn, sqlite3.Connection) else '%s'
+    params = [macrogrupo] + [v for ano, mes in periodos for v in (int(ano), mes.upper())] + [int(top_n)]
+    cursor = conn.cursor()
+    try:
+        cursor.execute(build_ranking_query(periodos, placeholder), params)
+        colunas = [c[0] for c in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=colunas)
+    finally:
+        cursor.close()
+
+
+def connect(sqlite_path: str | None = None):
+    """MySQL do DW por padrão; um arquivo SQLite com a mesma staging serve de base local de teste."""
+    if sqlite_path:
+        return sqlite3.connect(sqlite_path)
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def generate_catalogs_batch(periodos: list, top_n: int = TOP_N, pasta_saida: str = PASTA_LOTE,
+                            sqlite_path: str | None = None, um_arquivo: bool = False, workers: int | None = None):
+    """
+    Gera os catálogos de vários períodos com uma consulta, um índice de imagens e
+    as miniaturas preparadas uma vez; os arquivos são gravados em paralelo.
+    """
+    t0 = time.perf_counter()
+    conn = connect(sqlite_path)
+    try:
+        rankings = get_rankings_for_periods(conn, periodos, top_n)
+    finally:
+        conn.close()
+    print(f"⏱️ Ranking de {len(periodos)} período(s) em uma consulta: {time.perf_counter() - t0:.2f}s "
+          f"({len(rankings)} linhas)")
+
+    if rankings.empty:
+        print("Nenhum produto encontrado para os períodos e critérios especificados.")
+        return []
+
+    indice = IndiceImagens(IMAGENS_FOLDER, extensoes=(IMAGEM_EXTENSAO,))
+    miniaturas = indice.miniaturas_em_memoria(rankings['codigo_produto'].unique(), *TAMANHO_FOTO)
+
+    # Um DataFrame por período, na ordem pedida (períodos sem venda são avisados)
+    grupos = {(int(ano), str(mes).upper()): df for (ano, mes), df in rankings.groupby(['chave_ano', 'chave_mes'], sort=False)}
+    por_periodo = {}
+    for ano, mes in periodos:
+        df = grupos.get((int(ano), mes.upper()))
+        if df is None:
+            print(f"⚠️ {mes.capitalize()}/{ano}: sem vendas de {MACROGRUPO}.")
+            continue
+        por_periodo[f"{mes.upper()} {ano}"] = df[CATALOG_COLUMNS].reset_index(drop=True)
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    if um_arquivo:
+        destino = os.path.join(pasta_saida, f"CatalogoTop{top_n}MaisVendidos_{len(por_periodo)}_periodos.xlsx")
+        arquivos = [save_catalog(por_periodo, destino, miniaturas)]
+    else:
+        # Cada processo recebe só as miniaturas dos produtos do seu período
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = []
+            for nome, df in por_periodo.items():
+                usadas = {c: miniaturas[c] for c in map(normalizar_codigo, df['codigo_produto']) if c in miniaturas}
+                destino = os.path.join(pasta_saida, f"CatalogoTop{top_n}MaisVendidos_{nome.replace(' ', '_')}.xlsx")
+                futuros.append(pool.submit(save_catalog, {nome: df}, destino, usadas))
+            arquivos = [f.result() for f in futuros]
+
+    print(f"✨ {len(arquivos)} catálogo(s) em '{pasta_saida}' ({time.perf_counter() - t0:.1f}s no total)")
+    return arquivos
+
+
+# ==========================================================
+# 🧪 BASE LOCAL DE TESTE (SQLITE)
+# ==========================================================
+
+def create_test_database(sqlite_path: str, linhas: int, anos=(2025,), seed: int = 42) -> str:
+    """Staging sintética com as colunas usadas no ranking, indexada por período."""
+    rng = np.random.default_rng(seed)
+    n_produtos = max(linhas // 200, 50)
+    produto = rng.zipf(1.3, linhas) % n_produtos
+    df = pd.DataFrame({
+        'chave_ano': rng.choice(list(anos), linhas),
+        'chave_mes': rng.choice(MESES, linhas),
+        'codigo_produto': 10_000 + produto,
+        'referencia_produto': [f"REF-{p:05d}" for p in produto],
+        'descricao_produto': [f"SAPATO MODELO {p}" for p in produto],
+        'macrogrupo_produto': rng.choice(['SAPATOS', 'BOLSAS', 'ACESSORIOS'], linhas, p=[0.5, 0.3, 0.2]),
+        'quantidade_total_item': rng.integers(-1, 12, linhas),
+    })
+    if os.path.exists(sqlite_path):
+        os.remove(sqlite_path)
+    with sqlite3.connect(sqlite_path) as conn:
+        df.to_sql(STAGING_TABLE, conn, index=False, chunksize=50_000)
+        conn.execute(f"CREATE INDEX ix_periodo ON {STAGING_TABLE} (macrogrupo_produto, chave_ano, chave_mes)")
+    conn.close()
+    print(f"🧪 Base de teste: {linhas} linhas de venda em '{sqlite_path}'")
+    return sqlite_path
+
+
+def benchmark_batch(sqlite_path: str, ano: int, top_n: int = TOP_N):
+    """Compara 12 consultas (uma por mês, como a SP) com a consulta única."""
+    periodos = [(ano, mes) for mes in MESES]
+    conn = connect(sqlite_path)
+    t0 = time.perf_counter()
+    separados = pd.concat([get_rankings_for_periods(conn, [p], top_n) for p in periodos], ignore_index=True)
+    t_separado = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    unico = get_rankings_for_periods(conn, periodos, top_n)
+    t_unico = time.perf_counter() - t0
+    conn.close()
+    iguais = separados.sort_values(['chave_ano', 'chave_mes', 'ranking']).reset_index(drop=True).equals(
+        unico.sort_values(['chave_ano', 'chave_mes', 'ranking']).reset_index(drop=True))
+    print(f"12 consultas: {t_separado:.2f}s | consulta única: {t_unico:.2f}s | resultados iguais: {iguais}")
+
+
 # --- Execução Principal ---
 if __name__ == "__main__":
-    mes_consulta = 'julho'
-    ano_consulta = 2025
-    
-    # Define o nome do arquivo Excel de saída
-    output_file = 'CatalogoTop10MaisVendidos.xlsx'
+    parser = argparse.ArgumentParser(description="Catálogo dos mais vendidos (SAPATOS)")
+    parser.add_argument("--lote", action="store_true", help="gera os catálogos de vários meses em uma consulta")
+    parser.add_argument("--ano", type=int, default=2025)
+    parser.add_argument("--meses", nargs="+", default=MESES, help="meses do lote (padrão: o ano inteiro)")
+    parser.add_argument("--top", type=int, default=TOP_N)
+    parser.add_argument("--pasta-saida", default=PASTA_LOTE)
+    parser.add_argument("--um-arquivo", action="store_true", help="uma aba por período em um único arquivo")
+    parser.add_argument("--sqlite", help="usa uma base SQLite local no lugar do MySQL")
+    parser.add_argument("--gerar-base-teste", type=int, metavar="LINHAS",
+                        help="cria a base SQLite de teste (--sqlite) com LINHAS vendas sintéticas")
+    parser.add_argument("--benchmark", action="store_true", help="compara 12 consultas com a consulta única")
+    args = parser.parse_args()
 
-    generate_product_catalog(mes_consulta, ano_consulta, output_file)
+    if args.gerar_base_teste:
+        create_test_database(args.sqlite or ARQUIVO_TESTE, args.gerar_base_teste, anos=(args.ano,))
+    if args.benchmark:
+        benchmark_batch(args.sqlite or ARQUIVO_TESTE, args.ano, args.top)
+    elif args.lote:
+        generate_catalogs_batch([(args.ano, m) for m in args.meses], args.top, args.pasta_saida,
+                                args.sqlite, args.um_arquivo)
+    elif not args.gerar_base_teste:
+        mes_consulta = 'julho'
+        ano_consulta = 2025
 
+        # Define o nome do arquivo Excel de saída
+        output_file = 'CatalogoTop10MaisVendidos.xlsx'
 
+        generate_product_catalog(mes_consulta, ano_consulta, output_file)
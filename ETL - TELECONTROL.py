@@ -1,9 +1,10 @@
+import argparse
 import pandas as pd
 import numpy as np
 import os
-from sqlalchemy import create_engine, text
-from sqlalchemy.types import Integer, DateTime, String, Numeric, Text
-from sqlalchemy.schema import Table, Column, MetaData
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.types import BigInteger, Integer, DateTime, String, Numeric, Text
+from sqlalchemy.schema import Table, Column, Index, MetaData
 
 # --- Seção 1: Configurações ---
 EXCEL_FILE = "TELECONTROL ETL.xlsx"
@@ -46,6 +47,185 @@ COLUMN_MAPPING_AND_TYPES = {
     'DIAS_FINALIZAÇÃO': {'new_name': 'dias_finalizacao', 'type': Integer}
 }
 
+# --- Seção 4: Prazos e SLA ---
+# SLA em dias úteis por categoria de defeito (valores de COLUNA_CATEGORIA_SLA, em maiúsculas)
+COLUNA_CATEGORIA_SLA = 'agrupamento'
+SLA_PADRAO_DIAS_UTEIS = 22   # ~30 dias corridos
+SLA_POR_CATEGORIA = {
+    # 'TELA': 15,
+    # 'PLACA': 22,
+}
+FERIADOS = []                # ex.: ['2025-01-01', '2025-04-21'] (fora dos fins de semana)
+
+# Colunas calculadas aqui (além de dias_finalizacao) e o hash de controle da carga incremental
+DERIVED_COLUMNS_TYPES = {
+    'dias_conserto': Integer,
+    'dias_uteis_finalizacao': Integer,
+    'dias_uteis_em_aberto': Integer,
+    'sla_dias_uteis': Integer,
+    'sla_estourado': Integer,
+    'hash_os': BigInteger,
+}
+LOTE_DELETE = 1000
+
+# =========================
+#   Prazos (vetorizado)
+# =========================
+def dias_uteis(inicio, fim, feriados=FERIADOS):
+    """Dias úteis (seg-sex, sem feriados) de ``inicio`` até ``fim``, de uma vez; <NA> onde falta data."""
+    validos = (inicio.notna() & fim.notna()).to_numpy()
+    resultado = np.full(len(inicio), np.nan)
+    if validos.any():
+        a = inicio.to_numpy(dtype='datetime64[D]')[validos]
+        b = fim.to_numpy(dtype='datetime64[D]')[validos]
+        resultado[validos] = np.busday_count(a, b, holidays=np.array(feriados, dtype='datetime64[D]'))
+    return pd.Series(resultado, index=inicio.index).astype('Int64')
+
+def calcular_prazos(df, hoje=None):
+    """Lead times e SLA das OS: abertura->finalização/conserto, dias úteis e estouro de SLA por categoria."""
+    hoje = pd.Timestamp.now().normalize() if hoje is None else pd.Timestamp(hoje)
+    abertura = df['data_abertura']
+    finalizacao = df['data_finalizacao'] if 'data_finalizacao' in df.columns else pd.Series(pd.NaT, index=df.index)
+
+    df['dias_finalizacao'] = (finalizacao - abertura).dt.days.fillna(0).astype(int)
+    if 'data_conserto' in df.columns:
+        df['dias_conserto'] = (df['data_conserto'] - abertura).dt.days.astype('Int64')
+    df['dias_uteis_finalizacao'] = dias_uteis(abertura, finalizacao)
+
+    # OS em aberto: idade em dias úteis até hoje
+    em_aberto = finalizacao.isna() & abertura.notna()
+    df['dias_uteis_em_aberto'] = dias_uteis(abertura, pd.Series(hoje, index=df.index)).where(em_aberto)
+
+    if COLUNA_CATEGORIA_SLA in df.columns:
+        categoria = df[COLUNA_CATEGORIA_SLA].astype('string').str.strip().str.upper()
+        sla = categoria.map(SLA_POR_CATEGORIA).astype('Int64').fillna(SLA_PADRAO_DIAS_UTEIS)
+    else:
+        sla = pd.Series(SLA_PADRAO_DIAS_UTEIS, index=df.index, dtype='Int64')
+    df['sla_dias_uteis'] = sla
+    prazo = df['dias_uteis_finalizacao'].fillna(df['dias_uteis_em_aberto'])
+    df['sla_estourado'] = (prazo > sla).fillna(False).astype(int)
+    return df
+
+# =========================
+#   Carga incremental por OS
+# =========================
+def hash_por_os(df, colunas):
+    """
+    Hash de cada OS (igual em todas as linhas dela): soma, módulo 2^64, dos hashes
+    das linhas, então não depende da ordem das linhas no Excel. Guardado como
+    BIGINT com sinal.
+    """
+    h = pd.util.hash_pandas_object(df[colunas].astype('string'), index=False).to_numpy()
+    codigos, _ = pd.factorize(df['numero_os'])
+    ordem = np.argsort(codigos, kind='stable')
+    inicios = np.flatnonzero(np.r_[True, np.diff(codigos[ordem]) != 0]) if len(ordem) else np.empty(0, dtype=np.int64)
+    por_os = np.add.reduceat(h[ordem], inicios) if len(ordem) else np.empty(0, dtype=np.uint64)
+    return pd.Series(por_os.view(np.int64)[codigos], index=df.index)
+
+def os_para_atualizar(conn, staging_table, df):
+    """
+    numero_os novas, com hash diferente do que está na staging e as que estão
+    na staging mas sumiram do Excel (removidas).
+    """
+    salvos = pd.DataFrame(
+        conn.execute(
+            select(staging_table.c.numero_os, staging_table.c.hash_os)
+            .where(staging_table.c.numero_os.is_not(None)).distinct()
+        ).fetchall(),
+        columns=['numero_os', 'hash_os'],
+    )
+    # Int64 nos dois lados: com NaN no merge um int64 viraria float e perderia bits do hash
+    salvos = salvos.astype({'numero_os': 'string', 'hash_os': 'Int64'})
+    atuais = df.loc[df['numero_os'].notna(), ['numero_os', 'hash_os']].drop_duplicates()
+    comparado = atuais.merge(salvos, on='numero_os', how='outer', suffixes=('', '_salvo'), indicator=True)
+    novas = comparado.loc[comparado['_merge'] == 'left_only', 'numero_os']
+    diferente = (comparado['hash_os'] != comparado['hash_os_salvo']).fillna(True).astype(bool)
+    alteradas = comparado.loc[(comparado['_merge'] == 'both') & diferente, 'numero_os']
+    removidas = comparado.loc[comparado['_merge'] == 'right_only', 'numero_os']
+    return novas.tolist(), alteradas.tolist(), removidas.tolist()
+
+def definir_staging(metadata):
+    """Estrutura da staging: ID PK auto-increment, colunas do Excel, calculadas e índice por OS."""
+    table_columns = [
+        Column('id', Integer, primary_key=True, autoincrement=True)
+    ]
+
+    for v in COLUMN_MAPPING_AND_TYPES.values():
+        table_columns.append(Column(v['new_name'], v['type']))
+    for nome, tipo in DERIVED_COLUMNS_TYPES.items():
+        table_columns.append(Column(nome, tipo))
+
+    table_columns.append(Column('data_carga_dw', DateTime))
+    return Table(STAGING_TABLE_NAME, metadata, *table_columns,
+                 Index(f'ix_{STAGING_TABLE_NAME}_numero_os', 'numero_os'))
+
+def transformar(df, hoje=None):
+    """Renomeia/tipa as colunas do Excel, calcula prazos e o hash de cada OS."""
+    existing_cols = {k: v['new_name'] for k, v in COLUMN_MAPPING_AND_TYPES.items() if k in df.columns}
+    df = df[list(existing_cols.keys())].rename(columns=existing_cols)
+
+    date_cols = ['data_abertura', 'data_finalizacao', 'data_conserto', 'data_compra']
+    for col in date_cols:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # numero_os é a chave da carga incremental: sempre texto, como na staging (123.0 -> '123')
+    if pd.api.types.is_numeric_dtype(df['numero_os']):
+        df['numero_os'] = df['numero_os'].astype('Int64')
+    df['numero_os'] = df['numero_os'].astype('string').str.strip().replace('', pd.NA)
+
+    if 'data_abertura' in df.columns:
+        df = calcular_prazos(df, hoje)
+
+    # Hash por OS sobre tudo o que vem do Excel ou é calculado (status, datas, prazos...).
+    # Linhas sem numero_os ficam sem hash: não têm chave e são recarregadas em toda execução.
+    df = df.reset_index(drop=True)
+    com_os = df['numero_os'].notna()
+    df['hash_os'] = pd.Series(pd.NA, index=df.index, dtype='Int64')
+    if com_os.any():
+        df.loc[com_os, 'hash_os'] = hash_por_os(df[com_os], [c for c in df.columns if c not in ('numero_os', 'hash_os')])
+    df['data_carga_dw'] = pd.Timestamp.now()
+    return df
+
+def carregar_staging(conn, staging_table, df, completo=False):
+    """
+    Grava ``df`` na staging. Carga completa (DROP + CREATE) na primeira vez, com
+    ``completo`` ou se a tabela é da versão sem hash; senão troca só as linhas das
+    OS novas/alteradas, apaga as OS que saíram do Excel e recarrega as linhas sem
+    numero_os. Devolve o DataFrame efetivamente inserido.
+    """
+    nomes_colunas = {c.name for c in staging_table.columns}
+    colunas_salvas = ({c['name'] for c in inspect(conn).get_columns(STAGING_TABLE_NAME)}
+                      if inspect(conn).has_table(STAGING_TABLE_NAME) else set())
+    sem_os = df['numero_os'].isna()
+    if sem_os.any():
+        print(f"⚠️ Linhas sem Numero_OS: {int(sem_os.sum())} (recarregadas a cada execução, fora do incremental)")
+
+    if completo or not nomes_colunas <= colunas_salvas:
+        print(f"🗑️ Removendo tabela antiga: {STAGING_TABLE_NAME}")
+        conn.execute(text(f"DROP TABLE IF EXISTS {STAGING_TABLE_NAME}"))
+
+        print(f"🔨 Criando nova estrutura com ID PK...")
+        staging_table.create(conn)
+        carga = df
+        print(f"📤 Carga completa: {df['numero_os'].nunique()} OS...")
+    else:
+        novas, alteradas, removidas = os_para_atualizar(conn, staging_table, df)
+        print(f"🔎 OS novas: {len(novas)} | alteradas: {len(alteradas)} | removidas: {len(removidas)} | "
+              f"inalteradas: {df['numero_os'].nunique() - len(novas) - len(alteradas)}")
+        # Upsert por OS: as linhas (peças) das OS alteradas são trocadas pelas atuais;
+        # OS que não estão mais no Excel saem da staging, como na recarga completa
+        apagar = alteradas + removidas
+        for i in range(0, len(apagar), LOTE_DELETE):
+            conn.execute(staging_table.delete().where(staging_table.c.numero_os.in_(apagar[i:i + LOTE_DELETE])))
+        conn.execute(staging_table.delete().where(staging_table.c.numero_os.is_(None)))
+        carga = df[df['numero_os'].isin(set(novas) | set(alteradas)) | sem_os]
+
+    print(f"📤 Carregando {len(carga)} linhas...")
+    # index=False garante que o ID seja gerado pelo banco, não pelo Pandas
+    carga.to_sql(STAGING_TABLE_NAME, conn, if_exists='append', index=False, chunksize=5000, method='multi')
+    return carga
+
 def auditoria_e_insights(df):
     print("\n" + "🔍" + " —" * 25)
     print("RESUMO DE AUDITORIA E INSIGHTS PARA VALIDAÇÃO")
@@ -73,7 +253,8 @@ def auditoria_e_insights(df):
 
     print("\n" + "— " * 30 + "🚀")
 
-def run_etl():
+def run_etl(completo=False, hoje=None):
+    """Carrega na staging só as OS novas ou alteradas desde a última carga (``completo`` recria a tabela)."""
     try:
         print(f"--- Iniciando ETL Telecontrol: {DB_NAME} ---")
 
@@ -86,47 +267,15 @@ def run_etl():
         print(f"✅ Extração concluída: {len(df)} linhas encontradas.")
 
         # 2. Transformação
-        existing_cols = {k: v['new_name'] for k, v in COLUMN_MAPPING_AND_TYPES.items() if k in df.columns}
-        df = df[list(existing_cols.keys())].rename(columns=existing_cols)
-
-        date_cols = ['data_abertura', 'data_finalizacao', 'data_conserto', 'data_compra']
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-
-        if 'data_finalizacao' in df.columns and 'data_abertura' in df.columns:
-            df['dias_finalizacao'] = (df['data_finalizacao'] - df['data_abertura']).dt.days
-            df['dias_finalizacao'] = df['dias_finalizacao'].fillna(0).astype(int)
-
-        df['data_carga_dw'] = pd.Timestamp.now()
+        df = transformar(df, hoje)
 
         # 3. Conexão e Carga
         mysql_url = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
         engine = create_engine(mysql_url)
-        metadata = MetaData()
-        
-        # --- ESTRUTURA COM PRIMARY KEY E AUTO-INCREMENT ---
-        table_columns = [
-            Column('id', Integer, primary_key=True, autoincrement=True)
-        ]
-        
-        for v in COLUMN_MAPPING_AND_TYPES.values():
-            table_columns.append(Column(v['new_name'], v['type']))
-        
-        table_columns.append(Column('data_carga_dw', DateTime))
-        
+        staging_table = definir_staging(MetaData())
+
         with engine.begin() as conn:
-            print(f"🗑️ Removendo tabela antiga: {STAGING_TABLE_NAME}")
-            conn.execute(text(f"DROP TABLE IF EXISTS {STAGING_TABLE_NAME}"))
-            
-            print(f"🔨 Criando nova estrutura com ID PK...")
-            staging_table = Table(STAGING_TABLE_NAME, metadata, *table_columns)
-            staging_table.create(conn)
-            
-            print(f"📤 Carregando dados...")
-            # index=False garante que o ID seja gerado pelo MySQL, não pelo Pandas
-            df.to_sql(STAGING_TABLE_NAME, conn, if_exists='append', index=False)
-            
+            carregar_staging(conn, staging_table, df, completo)
             auditoria_e_insights(df)
 
         print(f"✅ ETL FINALIZADO COM SUCESSO! Tabela: {STAGING_TABLE_NAME}")
@@ -135,4 +284,7 @@ def run_etl():
         print(f"❌ ERRO FATAL NO PIPELINE: {e}")
 
 if __name__ == "__main__":
-    run_etl()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="ETL Telecontrol -> staging_telecontrol (incremental por OS)")
+    parser.add_argument("--completo", action="store_true", help="recria a tabela e recarrega todo o histórico")
+    args = parser.parse_args()
+    run_etl(completo=args.completo)
\ No newline at end of file
@@ -1,10 +1,11 @@
 import pandas as pd
 import os
 from openpyxl import load_workbook
-from openpyxl.drawing.image import Image as OpenpyxlImage
 from openpyxl.styles import Alignment
 import time
 
+from imagens_produtos import IndiceImagens, normalizar_codigo
+
 # ==========================================================
 # 🔧 CONFIGURAÇÕES E MAPEAMENTO
 # ==========================================================
@@ -22,6 +23,7 @@ COLUNAS_CHAVE = {
 DIRETORIO_BASE = os.path.abspath(r'C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\Scripts Python')
 ARQUIVO_BASE_SANKHYA = os.path.join(DIRETORIO_BASE, 'Base Temporária de Imagens.xlsx')
 DIRETORIO_IMAGENS = os.path.join(DIRETORIO_BASE, 'IMAGENS')
+TAMANHO_FOTO = (110, 110)  # pixels da célula da foto
 
 SUBGRUPOS_EXCLUIDOS = ['CHINELO', 'SACOLAS', 'REVENDA', 'MARY KAY']
 
@@ -81,26 +83,20 @@ def gerar_catalogo():
         ws.column_dimensions[col].width = width
 
     print("→ Vinculando imagens às referências...")
-    for index, row in df_filtrado.reset_index(drop=True).iterrows():
-        codigo = str(row[COLUNAS_CHAVE['COD_PRODUTO']]).strip()
+    # Índice da pasta (uma varredura) + miniaturas em cache, geradas em paralelo só quando faltam
+    indice = IndiceImagens(DIRETORIO_IMAGENS)
+    codigos = df_filtrado[COLUNAS_CHAVE['COD_PRODUTO']].astype(str).str.strip()
+    miniaturas = indice.miniaturas_em_memoria(codigos, *TAMANHO_FOTO)
+
+    for index, codigo in enumerate(codigos):
         row_excel = index + 3 
         ws.row_dimensions[row_excel].height = 90 
 
-        # Busca imagem
-        img_path = None
-        for ext in ['.jpg', '.png', '.jpeg']:
-            p = os.path.join(DIRETORIO_IMAGENS, f"{codigo}{ext}")
-            if os.path.exists(p):
-                img_path = p
-                break
-
-        if img_path:
-            try:
-                img = OpenpyxlImage(img_path)
-                img.width, img.height = 110, 110
-                ws.add_image(img, f'F{row_excel}')
-            except:
-                ws.cell(row=row_excel, column=6, value="Erro Img")
+        chave = normalizar_codigo(codigo)
+        if chave in miniaturas:
+            ws.add_image(miniaturas[chave].para_openpyxl(), f'F{row_excel}')
+        elif chave in indice:
+            ws.cell(row=row_excel, column=6, value="Erro Img")
         else:
             ws.cell(row=row_excel, column=6, value="N/A")
 
@@ -1,6 +1,13 @@
 import pandas as pd
 import warnings
 import os
+import argparse
+import json
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 # Silenciar avisos de validação do Excel
 warnings.filterwarnings("ignore", category=UserWarning, module='openpyxl')
@@ -8,69 +15,169 @@ warnings.filterwarnings("ignore", category=UserWarning, module='openpyxl')
 ARQUIVO_ENTRADA = 'PEDIDOS INVENTARIO 2026.xlsx'
 ABAS_ALVO = ['ERIKHA', 'OPEN', 'ISABELLA', 'JOSIANE', 'LUCIANA', 'MARCELA', 'ROBERTA']
 
+# Base local indexada por parceiro (reconstruída só quando a planilha muda)
+ARQUIVO_BASE = 'PEDIDOS INVENTARIO 2026.sqlite'
+VERSAO_BASE = 2  # muda quando a estrutura da tabela muda: bases antigas são reconstruídas
+PASTA_LOTE = 'Relatorios Parceiros'
+
+# Caracteres que o Windows não aceita em nome de arquivo
+CARACTERES_PROIBIDOS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
 # Colunas na ordem correta, incluindo agora 'Tamanho'
 COLUNAS_DESEJADAS = [
-    'Data Pedido', 'Vendedor', 'Nome Parceiro', 'Cód.Produto', 
+    'Data Pedido', 'Vendedor', 'Nome Parceiro', 'Cód.Produto',
     'Desc. Produto', 'Tamanho', 'GRADE DISPONÍVEL', 'QTDE', 'Total'
 ]
 
-def gerar_relatorio_final():
+# ==============================================================================
+# 🗄️ BASE LOCAL (SQLITE)
+# ==============================================================================
+
+def assinatura_planilha(caminho=ARQUIVO_ENTRADA):
+    st = os.stat(caminho)
+    return json.dumps({"arquivo": os.path.abspath(caminho), "tamanho": st.st_size, "mtime": st.st_mtime,
+                       "versao": VERSAO_BASE})
+
+def base_atualizada(caminho_base=ARQUIVO_BASE, caminho_planilha=ARQUIVO_ENTRADA):
+    if not os.path.exists(caminho_base):
+        return False
+    try:
+        with sqlite3.connect(caminho_base) as con:
+            linha = con.execute("SELECT valor FROM meta WHERE chave = 'origem'").fetchone()
+    except sqlite3.Error:
+        return False
+    return linha is not None and linha[0] == assinatura_planilha(caminho_planilha)
+
+def construir_base(caminho_base=ARQUIVO_BASE, caminho_planilha=ARQUIVO_ENTRADA, forcar=False):
+    """
+    Converte as abas dos vendedores em uma tabela tipada com índice por parceiro.
+    A planilha é lida uma única vez (todas as abas na mesma chamada).
+    """
+    if not forcar and base_atualizada(caminho_base, caminho_planilha):
+        return False
+
+    print(f"🔨 Construindo base local a partir de '{caminho_planilha}'...")
+    t0 = time.perf_counter()
+    with pd.ExcelFile(caminho_planilha) as xls:
+        presentes = [aba for aba in ABAS_ALVO if aba in xls.sheet_names]
+        for aba in ABAS_ALVO:
+            if aba not in presentes:
+                print(f"⚠️ Aba {aba} não encontrada na planilha, ignorada.")
+        abas = xls.parse(presentes) if presentes else {}
+
+    frames = []
+    for aba, df in abas.items():
+        if 'Cód. Parceiro' not in df.columns or 'Vendedor' not in df.columns:
+            print(f"⚠️ Aba {aba} sem 'Cód. Parceiro'/'Vendedor', ignorada.")
+            continue
+
+        # Normalização de tipos para a busca
+        df['Cód. Parceiro'] = df['Cód. Parceiro'].astype(str).str.replace('.0', '', regex=False).str.strip()
+        df['Vendedor'] = df['Vendedor'].astype(str).str.strip().str.upper()
+
+        cols_atuais = [c for c in COLUNAS_DESEJADAS if c in df.columns and c != 'Vendedor']
+        df = df[['Cód. Parceiro', 'Vendedor'] + cols_atuais].copy()
+        df.insert(0, 'Aba', aba)
+        # posição da aba em ABAS_ALVO: o relatório segue a ordem das abas, não a alfabética
+        df.insert(1, 'Ordem_Aba', ABAS_ALVO.index(aba))
+        df.insert(2, 'Ordem', range(len(df)))
+        frames.append(df)
+
+    pedidos = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Aba', 'Ordem_Aba', 'Ordem', 'Cód. Parceiro', 'Vendedor'])
+    for col in ['QTDE', 'Total']:
+        if col in pedidos.columns:
+            pedidos[col] = pd.to_numeric(pedidos[col], errors='coerce')
+    if 'Data Pedido' in pedidos.columns:
+        pedidos['Data Pedido'] = pd.to_datetime(pedidos['Data Pedido'], errors='coerce')
+
+    # Grava em arquivo temporário e troca no final: uma busca concorrente nunca vê base pela metade
+    temporario = caminho_base + '.tmp'
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    with sqlite3.connect(temporario) as con:
+        pedidos.to_sql('pedidos', con, index=False, chunksize=10_000)
+        con.execute('CREATE INDEX ix_parceiro_vendedor ON pedidos ("Cód. Parceiro", "Vendedor")')
+        con.execute('CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT)')
+        con.execute("INSERT INTO meta VALUES ('origem', ?)", (assinatura_planilha(caminho_planilha),))
+        con.execute("INSERT INTO meta VALUES ('colunas', ?)", (json.dumps([c for c in COLUNAS_DESEJADAS if c in pedidos.columns]),))
+    con.close()
+    os.replace(temporario, caminho_base)
+
+    print(f"✅ Base pronta: {len(pedidos)} linhas em {time.perf_counter() - t0:.1f}s ({caminho_base})")
+    return True
+
+def _colunas_base(con):
+    return json.loads(con.execute("SELECT valor FROM meta WHERE chave = 'colunas'").fetchone()[0])
+
+def _ler_pedidos(con, where='', params=()):
+    colunas = _colunas_base(con)
+    selecao = ', '.join(f'"{c}"' for c in ['Cód. Parceiro'] + colunas)
+    sql = f'SELECT {selecao} FROM pedidos {where} ORDER BY "Cód. Parceiro", "Vendedor", Ordem_Aba, Ordem'
+    datas = ['Data Pedido'] if 'Data Pedido' in colunas else None
+    return pd.read_sql_query(sql, con, params=params, parse_dates=datas)
+
+def buscar_pedidos(p_busca, v_busca, caminho_base=ARQUIVO_BASE):
+    """Consulta pelo índice (parceiro, vendedor): milissegundos em vez de reler as 7 abas."""
+    with sqlite3.connect(caminho_base) as con:
+        df = _ler_pedidos(con, 'WHERE "Cód. Parceiro" = ? AND "Vendedor" = ?', (p_busca, v_busca))
+    con.close()
+    return df.drop(columns=['Cód. Parceiro'])
+
+# ==============================================================================
+# 📄 RELATÓRIO
+# ==============================================================================
+
+def montar_relatorio(df_consolidado):
+    df_consolidado = df_consolidado.copy()
+
+    # Garantir cálculos numéricos para o rodapé
+    df_consolidado['QTDE'] = pd.to_numeric(df_consolidado['QTDE'], errors='coerce').fillna(0)
+    df_consolidado['Total'] = pd.to_numeric(df_consolidado['Total'], errors='coerce').fillna(0)
+
+    # Linha de Rodapé com as somas
+    soma_qtde = df_consolidado['QTDE'].sum()
+    soma_total = df_consolidado['Total'].sum()
+
+    linha_total = pd.DataFrame({
+        'Data Pedido': ['TOTALIZADORES:'],
+        'Vendedor': [''],
+        'Nome Parceiro': [''],
+        'Cód.Produto': [''],
+        'Desc. Produto': [''],
+        'Tamanho': [''], # Coluna Tamanho vazia no rodapé
+        'GRADE DISPONÍVEL': [''],
+        'QTDE': [soma_qtde],
+        'Total': [soma_total]
+    })
+
+    df_final = pd.concat([df_consolidado, linha_total], ignore_index=True)
+    return df_final, soma_qtde, soma_total
+
+def salvar_relatorio(df_consolidado, nome_arquivo):
+    df_final, _, _ = montar_relatorio(df_consolidado)
+    df_final.to_excel(nome_arquivo, index=False)
+    return nome_arquivo
+
+def gerar_relatorio_final(p_busca=None, v_busca=None):
     if not os.path.exists(ARQUIVO_ENTRADA):
         print(f"Erro: O arquivo '{ARQUIVO_ENTRADA}' não foi encontrado.")
         return
 
-    p_busca = input("Digite o Cód. Parceiro: ").strip()
-    v_busca = input("Digite o nome do Vendedor: ").strip().upper()
-    
-    lista_frames = []
+    construir_base()
+
+    if p_busca is None:
+        p_busca = input("Digite o Cód. Parceiro: ").strip()
+    if v_busca is None:
+        v_busca = input("Digite o nome do Vendedor: ")
+    v_busca = v_busca.strip().upper()
 
     print(f"\n🔍 Buscando dados para {p_busca} - {v_busca}...")
+    t0 = time.perf_counter()
+    df_consolidado = buscar_pedidos(p_busca, v_busca)
+    print(f"⏱️ Consulta em {(time.perf_counter() - t0) * 1000:.1f} ms")
 
-    for aba in ABAS_ALVO:
-        try:
-            df = pd.read_excel(ARQUIVO_ENTRADA, sheet_name=aba)
-            
-            # Normalização de tipos para a busca
-            df['Cód. Parceiro'] = df['Cód. Parceiro'].astype(str).str.replace('.0', '', regex=False).str.strip()
-            df['Vendedor'] = df['Vendedor'].astype(str).str.strip().str.upper()
-            
-            filtro = (df['Cód. Parceiro'] == p_busca) & (df['Vendedor'] == v_busca)
-            
-            # Filtramos garantindo que 'Tamanho' e as outras colunas existam
-            cols_atuais = [c for c in COLUNAS_DESEJADAS if c in df.columns]
-            df_filtrado = df.loc[filtro, cols_atuais].copy()
-            
-            if not df_filtrado.empty:
-                lista_frames.append(df_filtrado)
-                print(f"✅ Dados extraídos da aba: {aba}")
-
-        except Exception as e:
-            print(f"⚠️ Erro na aba {aba}: {e}")
-
-    if lista_frames:
-        df_consolidado = pd.concat(lista_frames, ignore_index=True)
-
-        # Garantir cálculos numéricos para o rodapé
-        df_consolidado['QTDE'] = pd.to_numeric(df_consolidado['QTDE'], errors='coerce').fillna(0)
-        df_consolidado['Total'] = pd.to_numeric(df_consolidado['Total'], errors='coerce').fillna(0)
-
-        # Linha de Rodapé com as somas
-        soma_qtde = df_consolidado['QTDE'].sum()
-        soma_total = df_consolidado['Total'].sum()
-
-        linha_total = pd.DataFrame({
-            'Data Pedido': ['TOTALIZADORES:'],
-            'Vendedor': [''],
-            'Nome Parceiro': [''],
-            'Cód.Produto': [''],
-            'Desc. Produto': [''],
-            'Tamanho': [''], # Coluna Tamanho vazia no rodapé
-            'GRADE DISPONÍVEL': [''],
-            'QTDE': [soma_qtde],
-            'Total': [soma_total]
-        })
-
-        df_final = pd.concat([df_consolidado, linha_total], ignore_index=True)
+    if not df_consolidado.empty:
+        df_final, soma_qtde, soma_total = montar_relatorio(df_consolidado)
 
         # Resumo visual no console
         print("\n" + "="*50)
@@ -84,5 +191,65 @@ def gerar_relatorio_final():
     else:
         print(f"\n❌ Nenhum registro encontrado para {p_busca} / {v_busca}.")
 
+def parte_nome_arquivo(valor, vazio):
+    """Parceiro/vendedor como trecho de nome de arquivo: sem / \\ : * ? etc.; vazio/"nan" vira ``vazio``."""
+    texto = "" if pd.isna(valor) else str(valor).strip()
+    if texto.upper() in ("", "NAN", "NONE"):
+        return vazio
+    return CARACTERES_PROIBIDOS.sub("_", texto).strip(" .")[:80] or vazio
+
+def nomes_relatorios(chaves):
+    """Um nome de arquivo por (parceiro, vendedor); nomes que colidem após a limpeza ganham sufixo."""
+    usados = {}
+    nomes = []
+    for parceiro, vendedor in chaves:
+        nome = f"Relatorio_{parte_nome_arquivo(parceiro, 'SEM_PARCEIRO')}_{parte_nome_arquivo(vendedor, 'SEM_VENDEDOR')}"
+        usados[nome] = usados.get(nome, 0) + 1
+        nomes.append(nome if usados[nome] == 1 else f"{nome}_{usados[nome]}")
+    return [n + ".xlsx" for n in nomes]
+
+def gerar_lote(pasta_saida=PASTA_LOTE, workers=None):
+    """Uma leitura da base inteira e um relatório por (parceiro, vendedor), gravados em paralelo."""
+    if not os.path.exists(ARQUIVO_ENTRADA):
+        print(f"Erro: O arquivo '{ARQUIVO_ENTRADA}' não foi encontrado.")
+        return
+
+    construir_base()
+    t0 = time.perf_counter()
+    with sqlite3.connect(ARQUIVO_BASE) as con:
+        todos = _ler_pedidos(con)
+    con.close()
+
+    Path(pasta_saida).mkdir(parents=True, exist_ok=True)
+    # dropna=False: linhas sem vendedor/parceiro também saem (em SEM_VENDEDOR / SEM_PARCEIRO)
+    grupos = list(todos.groupby(['Cód. Parceiro', 'Vendedor'], sort=False, dropna=False))
+    nomes = nomes_relatorios([chave for chave, _ in grupos])
+    print(f"📦 Gerando {len(grupos)} relatórios em '{pasta_saida}'...")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [
+            pool.submit(salvar_relatorio, df.drop(columns=['Cód. Parceiro']).reset_index(drop=True),
+                        os.path.join(pasta_saida, nome))
+            for (_, df), nome in zip(grupos, nomes)
+        ]
+        for futuro in futuros:
+            futuro.result()
+
+    print(f"✨ {len(futuros)} arquivos gerados em {time.perf_counter() - t0:.1f}s")
+
 if __name__ == "__main__":
-    gerar_relatorio_final()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Lista de pedidos do inventário por parceiro")
+    parser.add_argument("--parceiro", help="Cód. Parceiro (sem informar, pergunta no console)")
+    parser.add_argument("--vendedor", help="nome do vendedor")
+    parser.add_argument("--lote", action="store_true", help="gera o relatório de todos os parceiros")
+    parser.add_argument("--pasta-saida", default=PASTA_LOTE)
+    parser.add_argument("--reconstruir", action="store_true", help="força a reconstrução da base local")
+    args = parser.parse_args()
+
+    if args.reconstruir and os.path.exists(ARQUIVO_ENTRADA):
+        construir_base(forcar=True)
+
+    if args.lote:
+        gerar_lote(args.pasta_saida)
+    else:
+        gerar_relatorio_final(args.parceiro, args.vendedor)
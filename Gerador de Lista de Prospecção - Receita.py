@@ -0,0 +1,322 @@
+# ===============================================================
+# 🎯 GERADOR DE LISTA DE PROSPECÇÃO - DADOS ABERTOS DA RECEITA
+# ===============================================================
+# Varre o ESTABELECIMENTO.parquet com os filtros empurrados para o
+# leitor Parquet (pyarrow.dataset), exclui CNPJs que já estão no CRM
+# e grava a lista de prospects com a contagem de concorrentes por
+# município. Tudo em Arrow: o pandas só entra na leitura do CRM em
+# Excel e na escrita do XLSX, bloco a bloco.
+# ===============================================================
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from cnpj_local import COLUNAS_CHAVE, SITUACAO_CADASTRAL
+from excel_writer import escrever_excel_em_blocos
+
+# ===============================================================
+# 🎯 CONFIGURAÇÕES
+# ===============================================================
+
+PARQUET_RECEITA = Path("ESTABELECIMENTO.parquet")
+CRM_FILE = Path("CRM_TRATADO.csv")  # saída do "ETL - CRM.py"
+OUTPUT_FILE = Path("PROSPECTS_RECEITA.xlsx")
+LINHAS_POR_BLOCO = 100_000  # escrita do .xlsx em blocos
+
+# Tabela MUNICÍPIOS da Receita (código;nome) e saída do extrator de mesorregiões do IBGE
+MUNICIPIOS_RECEITA = Path("MUNICIPIOS.csv")
+MESORREGIOES_IBGE = Path("mesorregioes_municipios.xlsx")
+
+# Varejo de calçados e vestuário
+CNAES_PADRAO = [
+    "4781400",  # Comércio varejista de artigos do vestuário e acessórios
+    "4782201",  # Comércio varejista de calçados
+    "4782202",  # Comércio varejista de artigos de viagem
+]
+
+SITUACAO_PADRAO = ["02"]  # ATIVA
+
+COLUNAS_SAIDA = [
+    "cnpj", "nome_fantasia", "situacao_cadastral", "data_inicio_atividade",
+    "cnae_fiscal_principal", "tipo_logradouro", "logradouro", "numero",
+    "complemento", "bairro", "cep", "uf", "municipio",
+    "ddd_1", "telefone_1", "correio_eletronico",
+]
+
+
+# ===============================================================
+# 🧩 FUNÇÕES AUXILIARES
+# ===============================================================
+
+def normalizar_nome(texto: str) -> str:
+    texto = re.sub(r"\s*\([A-Z]{2}\)\s*$", "", str(texto or "").strip().upper())
+    nfkd = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in nfkd if not unicodedata.combining(c))
+
+
+def _valores_no_tipo(tipo: pa.DataType, valores: Iterable) -> pa.Array:
+    """Converte os valores do filtro para o tipo físico da coluna (string ou inteiro)."""
+    valores = [str(v).strip() for v in valores]
+    if pa.types.is_integer(tipo):
+        return pa.array([int(v) for v in valores], type=tipo)
+    return pa.array(valores, type=pa.string())
+
+
+def _campo_zfill(tipo: pa.DataType, valores: Iterable, largura: int) -> List[str]:
+    if pa.types.is_integer(tipo):
+        return [str(int(v)) for v in valores]
+    return [str(v).strip().zfill(largura) for v in valores]
+
+
+def montar_filtro(
+    schema: pa.Schema,
+    cnaes: Sequence[str],
+    ufs: Sequence[str],
+    municipios: Sequence[str],
+    situacoes: Sequence[str],
+    abertura_de: Optional[str],
+    abertura_ate: Optional[str],
+) -> ds.Expression:
+    """Expressão Arrow aplicada pelo leitor Parquet (poda row groups pelas estatísticas)."""
+    filtro = ds.field("cnae_fiscal_principal").isin(
+        _valores_no_tipo(schema.field("cnae_fiscal_principal").type, cnaes)
+    )
+
+    if ufs:
+        filtro &= ds.field("uf").isin(pa.array([u.upper() for u in ufs]))
+
+    if municipios:
+        tipo = schema.field("municipio").type
+        filtro &= ds.field("municipio").isin(_valores_no_tipo(tipo, _campo_zfill(tipo, municipios, 4)))
+
+    if situacoes:
+        tipo = schema.field("situacao_cadastral").type
+        filtro &= ds.field("situacao_cadastral").isin(_valores_no_tipo(tipo, _campo_zfill(tipo, situacoes, 2)))
+
+    tipo_data = schema.field("data_inicio_atividade").type
+    for limite, op in ((abertura_de, "ge"), (abertura_ate, "le")):
+        if not limite:
+            continue
+        valor = re.sub(r"\D", "", limite)
+        valor = int(valor) if pa.types.is_integer(tipo_data) else valor
+        campo = ds.field("data_inicio_atividade")
+        filtro &= (campo >= valor) if op == "ge" else (campo <= valor)
+
+    return filtro
+
+
+def municipios_da_mesorregiao(
+    mesorregioes: Sequence[str],
+    municipios_receita: Path,
+    mesorregioes_ibge: Path,
+) -> pa.Table:
+    """
+    Traduz nomes de mesorregião para pares (uf, código de município da Receita).
+    O cruzamento é por nome normalizado + UF, pois a Receita usa código próprio (TOM).
+    """
+    import pandas as pd
+
+    alvo = {normalizar_nome(m) for m in mesorregioes}
+
+    ibge = pd.read_excel(mesorregioes_ibge, dtype=str)
+    ibge = ibge[ibge["Nome_Mesorregiao"].map(normalizar_nome).isin(alvo)]
+    ibge_chaves = set(zip(ibge["Nome_Municipio"].map(normalizar_nome), ibge["Estado"].str.upper()))
+    ufs_por_nome: Dict[str, set] = {}
+    for nome, uf in ibge_chaves:
+        ufs_por_nome.setdefault(nome, set()).add(uf)
+
+    receita = pacsv.read_csv(
+        municipios_receita,
+        read_options=pacsv.ReadOptions(column_names=["codigo", "nome"], encoding="latin-1"),
+        parse_options=pacsv.ParseOptions(delimiter=";"),
+        convert_options=pacsv.ConvertOptions(column_types={"codigo": pa.string(), "nome": pa.string()}),
+    )
+
+    ufs, codigos = [], []
+    for codigo, nome in zip(receita.column("codigo").to_pylist(), receita.column("nome").to_pylist()):
+        for uf in ufs_por_nome.get(normalizar_nome(nome), ()):
+            ufs.append(uf)
+            codigos.append(codigo.zfill(4))
+
+    return pa.table({"uf": ufs, "municipio": codigos})
+
+
+def carregar_cnpjs_crm(crm_file: Path) -> pa.Array:
+    """CNPJs (14 dígitos) já presentes no CRM tratado, para exclusão."""
+    if not crm_file.exists():
+        print(f"⚠ CRM '{crm_file}' não encontrado: nenhum lead será excluído.")
+        return pa.array([], type=pa.string())
+
+    if crm_file.suffix.lower() in (".xlsx", ".xls"):
+        import pandas as pd
+
+        df = pd.read_excel(crm_file, dtype=str)
+        col = "CNPJ_limpo" if "CNPJ_limpo" in df.columns else "CNPJ"
+        serie = pa.array(df[col].dropna().tolist(), type=pa.string())
+    else:
+        tabela = pacsv.read_csv(
+            crm_file,
+            parse_options=pacsv.ParseOptions(delimiter=";"),
+            convert_options=pacsv.ConvertOptions(
+                column_types={"CNPJ_limpo": pa.string(), "CNPJ": pa.string()},
+            ),
+        )
+        col = "CNPJ_limpo" if "CNPJ_limpo" in tabela.column_names else "CNPJ"
+        serie = pc.drop_null(tabela.column(col)).combine_chunks()
+
+    digitos = pc.replace_substring_regex(serie, r"\D", "")
+    digitos = pc.utf8_lpad(digitos, 14, "0")
+    return pc.unique(digitos)
+
+
+def coluna_cnpj(tabela: pa.Table) -> pa.Array:
+    """Monta o CNPJ de 14 dígitos a partir de básico/ordem/DV (zero-padded)."""
+    if "cnpj" in tabela.column_names:
+        return pc.utf8_lpad(pc.cast(tabela.column("cnpj"), pa.string()), 14, "0")
+
+    partes = [
+        pc.utf8_lpad(pc.cast(tabela.column(c), pa.string()), largura, "0")
+        for c, largura in zip(COLUNAS_CHAVE, (8, 4, 2))
+    ]
+    return pc.binary_join_element_wise(*partes, "")
+
+
+def deduplicar(tabela: pa.Table, chave: str) -> pa.Table:
+    """Mantém a primeira ocorrência de cada chave (group_by sobre o índice da linha)."""
+    tabela = tabela.append_column("__linha", pa.array(range(len(tabela)), type=pa.int64()))
+    linhas = tabela.group_by(chave).aggregate([("__linha", "min")]).column("__linha_min").combine_chunks()
+    linhas = pc.take(linhas, pc.sort_indices(linhas))
+    return tabela.take(linhas).drop_columns(["__linha"])
+
+
+# ===============================================================
+# 🚀 PIPELINE
+# ===============================================================
+
+def gerar_prospects(
+    parquet: Path,
+    cnaes: Sequence[str],
+    ufs: Sequence[str] = (),
+    municipios: Sequence[str] = (),
+    mesorregioes: Sequence[str] = (),
+    situacoes: Sequence[str] = SITUACAO_PADRAO,
+    abertura_de: Optional[str] = None,
+    abertura_ate: Optional[str] = None,
+    crm_file: Path = CRM_FILE,
+) -> pa.Table:
+    dataset = ds.dataset(parquet, format="parquet")
+    schema = dataset.schema
+
+    pares_meso = None
+    if mesorregioes:
+        pares_meso = municipios_da_mesorregiao(mesorregioes, MUNICIPIOS_RECEITA, MESORREGIOES_IBGE)
+        if not ufs:
+            ufs = sorted(set(pares_meso.column("uf").to_pylist()))
+        municipios = list(municipios) + pares_meso.column("municipio").to_pylist()
+        print(f"Mesorregiões -> {len(pares_meso)} municípios da Receita")
+
+    filtro = montar_filtro(schema, cnaes, ufs, municipios, situacoes, abertura_de, abertura_ate)
+    colunas = [c for c in dict.fromkeys(list(COLUNAS_CHAVE) + ["cnpj"] + COLUNAS_SAIDA) if c in schema.names]
+
+    t0 = time.perf_counter()
+    tabela = dataset.to_table(columns=colunas, filter=filtro)
+    print(f"Varredura com filtros: {len(tabela)} estabelecimentos ({time.perf_counter() - t0:.1f}s)")
+
+    if pares_meso is not None:
+        pares_meso = pares_meso.cast(pa.schema([
+            ("uf", tabela.schema.field("uf").type),
+            ("municipio", tabela.schema.field("municipio").type),
+        ]))
+        tabela = tabela.join(pares_meso, keys=["uf", "municipio"], join_type="left semi")
+
+    cnpj = coluna_cnpj(tabela)
+    tabela = tabela.drop_columns([c for c in ("cnpj",) + COLUNAS_CHAVE if c in tabela.column_names])
+    tabela = tabela.add_column(0, "cnpj", cnpj)
+    tabela = deduplicar(tabela, "cnpj")
+
+    # Concorrentes por município: todos os estabelecimentos do recorte, inclusive os do CRM
+    concorrentes = tabela.group_by(["uf", "municipio"]).aggregate([("cnpj", "count")])
+    concorrentes = concorrentes.rename_columns(["uf", "municipio", "concorrentes_municipio"])
+
+    conhecidos = carregar_cnpjs_crm(crm_file)
+    ja_no_crm = pc.is_in(tabela.column("cnpj"), value_set=conhecidos)
+    print(f"Já presentes no CRM: {pc.sum(ja_no_crm).as_py() or 0}")
+    tabela = tabela.filter(pc.invert(ja_no_crm))
+
+    tabela = tabela.join(concorrentes, keys=["uf", "municipio"], join_type="left outer")
+
+    situacao = pc.cast(tabela.column("situacao_cadastral"), pa.string())
+    situacao = pc.utf8_lpad(situacao, 2, "0")
+    descricao = pa.array([SITUACAO_CADASTRAL.get(s) for s in situacao.to_pylist()], type=pa.string())
+    tabela = tabela.set_column(tabela.schema.get_field_index("situacao_cadastral"), "situacao_cadastral", descricao)
+
+    return tabela.sort_by([("uf", "ascending"), ("municipio", "ascending"), ("cnpj", "ascending")])
+
+
+def salvar(tabela: pa.Table, destino: Path) -> None:
+    sufixo = destino.suffix.lower()
+    if sufixo == ".parquet":
+        pq.write_table(tabela, destino)
+    elif sufixo == ".csv":
+        pacsv.write_csv(tabela, destino, write_options=pacsv.WriteOptions(delimiter=";"))
+    else:
+        # Em blocos e em memória constante; acima de 1.048.576 linhas continua em "Prospects (2)"...
+        # (date_as_object=False: datas como datetime64, que o writer formata como data)
+        blocos = (
+            tabela.slice(inicio, LINHAS_POR_BLOCO).to_pandas(date_as_object=False)
+            for inicio in range(0, max(len(tabela), 1), LINHAS_POR_BLOCO)
+        )
+        abas = escrever_excel_em_blocos(blocos, destino, aba="Prospects")
+        if len(abas) > 1:
+            print(f"ℹ️ Mais linhas que o limite do Excel: dividido em {len(abas)} abas")
+    print(f"✅ Lista de prospects gerada: {destino.resolve()} ({len(tabela)} linhas)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lista de prospects a partir do ESTABELECIMENTO.parquet da Receita")
+    parser.add_argument("--parquet", type=Path, default=PARQUET_RECEITA)
+    parser.add_argument("--cnae", nargs="+", default=CNAES_PADRAO)
+    parser.add_argument("--uf", nargs="*", default=[])
+    parser.add_argument("--municipio", nargs="*", default=[], help="códigos de município da Receita")
+    parser.add_argument("--mesorregiao", nargs="*", default=[])
+    parser.add_argument("--situacao", nargs="*", default=SITUACAO_PADRAO)
+    parser.add_argument("--abertura-de", default=None, help="AAAA-MM-DD")
+    parser.add_argument("--abertura-ate", default=None, help="AAAA-MM-DD")
+    parser.add_argument("--crm", type=Path, default=CRM_FILE)
+    parser.add_argument("--saida", type=Path, default=OUTPUT_FILE, help=".xlsx, .csv ou .parquet")
+    args = parser.parse_args()
+
+    print("===================================================")
+    print("🎯 GERADOR DE PROSPECTS - RECEITA FEDERAL")
+    print("===================================================")
+
+    t0 = time.perf_counter()
+    tabela = gerar_prospects(
+        args.parquet,
+        cnaes=args.cnae,
+        ufs=args.uf,
+        municipios=args.municipio,
+        mesorregioes=args.mesorregiao,
+        situacoes=args.situacao,
+        abertura_de=args.abertura_de,
+        abertura_ate=args.abertura_ate,
+        crm_file=args.crm,
+    )
+    salvar(tabela, args.saida)
+    print(f"⏱ Tempo total: {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
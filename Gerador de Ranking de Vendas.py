@@ -1,18 +1,12 @@
 import pandas as pd
-import os
 from openpyxl import load_workbook
-from openpyxl.drawing.image import Image as ExcelImage
+
+from imagens_produtos import IndiceImagens, normalizar_codigo
 
 ARQUIVO_BASE = "Base de Produtos Mais Vendidos.xlsx"
 PASTA_IMAGENS = "IMAGENS"
 EXCLUIR_SUBGRUPOS = ['CHINELO', 'SACOLAS', 'REVENDA', 'MARY KAY']
-
-def buscar_imagem(codigo):
-    for ext in ['jpg', 'png', 'jpeg']:
-        caminho = os.path.join(PASTA_IMAGENS, f"{codigo}.{ext}")
-        if os.path.exists(caminho):
-            return caminho
-    return None
+TAMANHO_FOTO = (70, 70)  # pixels da célula da foto
 
 def criar_relatorio():
     df = pd.read_excel(ARQUIVO_BASE, sheet_name='BASE PRODUTOS')
@@ -52,15 +46,16 @@ def criar_relatorio():
     ws.insert_cols(3)
     ws.cell(row=2, column=3, value="FOTO")
 
+    # Miniaturas do tamanho da célula, vindas do cache (só as novas são geradas)
+    miniaturas = IndiceImagens(PASTA_IMAGENS).miniaturas_em_memoria(top10['Cód. Produto'], *TAMANHO_FOTO)
+
     for i, cod in enumerate(top10['Cód. Produto'], start=3):
         ws.row_dimensions[i].height = 60
         ws.column_dimensions['C'].width = 15
         
-        caminho_img = buscar_imagem(str(cod))
-        if caminho_img:
-            img = ExcelImage(caminho_img)
-            img.width, img.height = 70, 70
-            ws.add_image(img, f'C{i}')
+        miniatura = miniaturas.get(normalizar_codigo(cod))
+        if miniatura:
+            ws.add_image(miniatura.para_openpyxl(), f'C{i}')
         else:
             ws.cell(row=i, column=3, value="Sem Foto")
 
@@ -1,8 +1,13 @@
+import re
+import time
+
 import pandas as pd
+from copy import copy
+from openpyxl import load_workbook
 
 # --- CONFIGURAÇÃO ---
 ARQUIVO_ALVO_PATH = r"C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\HUB MULTIMARCAS\Controle de Agendamentos - Showroom Inverno 2026.xlsx"
-ARQUIVO_MATRIZ_PATH = "Modelo de Motor de Crédito 6.xlsx" 
+ARQUIVO_MATRIZ_PATH = "Modelo de Motor de Crédito 6.xlsx"
 ARQUIVO_SAIDA_PATH = ARQUIVO_ALVO_PATH.replace(".xlsx", "_PROCESSADO.xlsx") # Novo nome
 
 ABAS_ALVO = ['ERIKHA', 'GLENDA', 'ISABELLA', 'JOSIANE', 'LUCIANA', 'MARCELA', 'NELIANE']
@@ -12,77 +17,162 @@ COLUNA_CHAVE_ALVO = 'COD. PAR.'
 COLUNA_CHAVE_MATRIZ = 'Cód Parceiro'
 COLUNA_RETORNO_MATRIZ = 'Limite Sugerido'
 
-NOME_COLUNA_DESTINO = 'LIMITE DISP. AJUSTADO' 
+# Chave alternativa: se as duas planilhas tiverem CNPJ, ele é usado quando o código não casa
+COLUNA_CNPJ_ALVO = 'CNPJ'
+COLUNA_CNPJ_MATRIZ = 'CNPJ'
+
+NOME_COLUNA_DESTINO = 'LIMITE DISP. AJUSTADO'
+FORMATO_MOEDA = 'R$ #,##0.00'
+
+# Mesmo comportamento do PROCX/merge antigo: parceiro fora da matriz fica com o limite vazio
+LIMPAR_SEM_CORRESPONDENCIA = True
+
+# --- FUNÇÕES ---
+
+def normalizar_chave(valor):
+    """Código de parceiro/CNPJ só com dígitos e sem zeros à esquerda (123, '0123', 123.0 -> '123')."""
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    digitos = re.sub(r"\D", "", str(valor)).lstrip("0")
+    return digitos or None
+
+def carregar_indice_matriz():
+    """Lê a matriz uma vez e monta os dicionários chave normalizada -> limite."""
+    colunas = pd.read_excel(ARQUIVO_MATRIZ_PATH, nrows=0).columns
+    usecols = [COLUNA_CHAVE_MATRIZ, COLUNA_RETORNO_MATRIZ]
+    if COLUNA_CNPJ_MATRIZ in colunas:
+        usecols.append(COLUNA_CNPJ_MATRIZ)
+
+    df_matriz = pd.read_excel(ARQUIVO_MATRIZ_PATH, usecols=usecols)
+    valores = pd.to_numeric(df_matriz[COLUNA_RETORNO_MATRIZ], errors='coerce')
+    valores = valores.astype(object).where(valores.notna(), None)
+
+    indices = {}
+    for nome, coluna in (('codigo', COLUNA_CHAVE_MATRIZ), ('cnpj', COLUNA_CNPJ_MATRIZ)):
+        if coluna not in df_matriz.columns:
+            continue
+        chaves = df_matriz[coluna].map(normalizar_chave)
+        validos = chaves.notna()
+        duplicadas = chaves[validos].duplicated()
+        if duplicadas.any():
+            print(f"   -> AVISO: {int(duplicadas.sum())} chave(s) repetida(s) em '{coluna}'; vale a primeira.")
+        # Primeira ocorrência vence (o merge antigo duplicaria a linha do parceiro)
+        indices[nome] = dict(zip(chaves[validos][::-1], valores[validos][::-1]))
+    return indices
+
+def localizar_colunas(ws):
+    """Mapeia cabeçalho -> índice (1-based) lendo apenas a primeira linha."""
+    cabecalho = next(ws.iter_rows(min_row=1, max_row=1), ())
+    return {str(c.value).strip(): c.column for c in cabecalho if c.value is not None}
+
+def coluna_destino(ws, colunas):
+    """Usa a coluna de destino existente ou cria ao final copiando o estilo do cabeçalho da chave."""
+    if NOME_COLUNA_DESTINO in colunas:
+        return colunas[NOME_COLUNA_DESTINO], False
+
+    nova = ws.max_column + 1
+    modelo = ws.cell(row=1, column=colunas[COLUNA_CHAVE_ALVO])
+    celula = ws.cell(row=1, column=nova, value=NOME_COLUNA_DESTINO)
+    if modelo.has_style:
+        celula._style = copy(modelo._style)
+    return nova, True
+
+def aplicar_aba(ws, indices):
+    """Compara o limite atual com o da matriz e altera só as células diferentes."""
+    colunas = localizar_colunas(ws)
+    if COLUNA_CHAVE_ALVO not in colunas:
+        return None
+
+    col_chave = colunas[COLUNA_CHAVE_ALVO]
+    col_cnpj = colunas.get(COLUNA_CNPJ_ALVO) if 'cnpj' in indices else None
+    col_destino, criada = coluna_destino(ws, colunas)
+
+    idx_codigo = indices.get('codigo', {})
+    idx_cnpj = indices.get('cnpj', {})
+
+    # Lê só as colunas envolvidas (chave, CNPJ, destino), não a aba inteira
+    min_col = min(c for c in (col_chave, col_cnpj, col_destino) if c)
+    max_col = max(c for c in (col_chave, col_cnpj, col_destino) if c)
+    alteradas = sem_match = 0
+
+    for linha in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=min_col, max_col=max_col):
+        chave = linha[col_chave - min_col].value
+        if chave is None:
+            continue
+
+        codigo = normalizar_chave(chave)
+        encontrado = codigo in idx_codigo
+        novo = idx_codigo.get(codigo)
+        if not encontrado and col_cnpj:
+            cnpj = normalizar_chave(linha[col_cnpj - min_col].value)
+            encontrado = cnpj in idx_cnpj
+            novo = idx_cnpj.get(cnpj)
+
+        if not encontrado:
+            sem_match += 1
+            if not LIMPAR_SEM_CORRESPONDENCIA:
+                continue
+
+        celula = linha[col_destino - min_col] if col_destino <= max_col else ws.cell(row=linha[0].row, column=col_destino)
+        if celula.value == novo:
+            continue
+
+        celula.value = novo
+        if novo is not None and celula.number_format == 'General':
+            celula.number_format = FORMATO_MOEDA
+        alteradas += 1
+
+    return {'alteradas': alteradas, 'sem_match': sem_match, 'coluna_criada': criada}
 
 # --- LÓGICA DE EXECUÇÃO ---
 
-# 1. Carregar a Matriz de Dados (Caminho e Colunas OK)
-print(f"1. Carregando Matriz de Dados de: {ARQUIVO_MATRIZ_PATH}")
+def main():
+    t0 = time.perf_counter()
 
-df_matriz = pd.read_excel(
-    ARQUIVO_MATRIZ_PATH,
-    usecols=[COLUNA_CHAVE_MATRIZ, COLUNA_RETORNO_MATRIZ]
-)
-df_matriz.columns = [COLUNA_CHAVE_ALVO, NOME_COLUNA_DESTINO] # Renomeia para o merge
+    # 1. Índice da matriz (hash por código de parceiro e, se houver, CNPJ)
+    print(f"1. Carregando Matriz de Dados de: {ARQUIVO_MATRIZ_PATH}")
+    indices = carregar_indice_matriz()
+    print(f"   -> {len(indices.get('codigo', {}))} parceiros indexados")
 
-# 2. Processar e Agrupar todas as abas
-print("2. Iniciando PROCX/Merge nas abas alvo...")
+    # 2. Uma única abertura do arquivo alvo para todas as abas (formatação preservada)
+    print("2. Comparando e atualizando as abas alvo...")
+    wb = load_workbook(ARQUIVO_ALVO_PATH)
+    total = 0
 
-# Dicionário para armazenar todas as abas processadas
-abas_processadas = {}
+    for sheet_name in ABAS_ALVO:
+        if sheet_name not in wb.sheetnames:
+            print(f"   -> ERRO: Aba '{sheet_name}' não encontrada. Pulando.")
+            continue
+        try:
+            resultado = aplicar_aba(wb[sheet_name], indices)
+        except Exception as e:
+            print(f"   -> ERRO INESPERADO ao processar {sheet_name}: {e}. Pulando.")
+            continue
 
-for sheet_name in ABAS_ALVO:
-    try:
-        print(f"   -> Processando aba: {sheet_name}")
-        
-        # Leitura da Aba Alvo usando Pandas (mais estável)
-        df_aba = pd.read_excel(
-            ARQUIVO_ALVO_PATH,
-            sheet_name=sheet_name,
-            header=0
-        )
-        
-        # Validação de Chave
-        if COLUNA_CHAVE_ALVO not in df_aba.columns:
+        if resultado is None:
             print(f"   -> ERRO: Chave '{COLUNA_CHAVE_ALVO}' não encontrada em {sheet_name}. Pulando.")
-            abas_processadas[sheet_name] = df_aba # Salva a aba sem modificação
             continue
-            
-        # O PROCX (Merge)
-        df_aba_merged = pd.merge(
-            df_aba, 
-            df_matriz, 
-            on=COLUNA_CHAVE_ALVO, 
-            how='left'
-        )
-        
-        # Se a coluna de destino existir no original, o Pandas criará uma cópia (Ex: LIMITE DISP. AJUSTADO_x)
-        # Vamos garantir que apenas a coluna nova fique com o nome final
-        colunas_a_deletar = [col for col in df_aba_merged.columns if col.endswith('_x')]
-        df_aba_merged = df_aba_merged.drop(columns=colunas_a_deletar, errors='ignore')
-        
-        # Armazena o resultado
-        abas_processadas[sheet_name] = df_aba_merged
-        
-    except Exception as e:
-        print(f"   -> ERRO INESPERADO ao processar {sheet_name}: {e}. Pulando.")
 
+        total += resultado['alteradas']
+        extra = " (coluna criada)" if resultado['coluna_criada'] else ""
+        print(f"   -> {sheet_name}: {resultado['alteradas']} célula(s) alterada(s), "
+              f"{resultado['sem_match']} parceiro(s) fora da matriz{extra}")
 
-# 3. Salvar todas as abas processadas em um NOVO ARQUIVO
-print("\n3. Salvando resultados em NOVO ARQUIVO...")
+    # 3. Um único save, só se algo mudou
+    if not total:
+        print("\nNenhuma célula mudou; arquivo não regravado.")
+        return
 
-try:
-    with pd.ExcelWriter(ARQUIVO_SAIDA_PATH, engine='xlsxwriter') as writer:
-        for sheet_name, df in abas_processadas.items():
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-            
-            # ATENÇÃO: A formatação de moeda deve ser feita manualmente no novo arquivo.
-            # O ExcelWriter não tem controle sobre a formatação da célula como openpyxl.
-
-    print("\nPROCESSO CONCLUÍDO COM SUCESSO!")
-    print(f"O novo arquivo '{ARQUIVO_SAIDA_PATH}' foi criado.")
-    print("\nAVISO: A formatação de Moeda deve ser aplicada manualmente na Coluna 'LIMITE DISP. AJUSTADO'.")
+    print(f"\n3. Salvando {total} alteração(ões) em NOVO ARQUIVO...")
+    try:
+        wb.save(ARQUIVO_SAIDA_PATH)
+        print("\nPROCESSO CONCLUÍDO COM SUCESSO!")
+        print(f"O novo arquivo '{ARQUIVO_SAIDA_PATH}' foi criado ({time.perf_counter() - t0:.1f}s).")
+    except Exception as e:
+        print(f"\nERRO ao salvar o arquivo: {e}")
+        print("Verifique se o caminho de destino está correto.")
 
-except Exception as e:
-    print(f"\nERRO ao salvar o arquivo: {e}")
-    print("Verifique se o caminho de destino está correto.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,21 @@
+import argparse
+import heapq
 import re
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
 from pathlib import Path
-import shutil
-import xlwings as xw
+
+import numpy as np
+import pandas as pd
 
 # ====== CONFIGURAÇÕES ======
 CAMINHO_ARQUIVO = r"C:\Users\lucasbarros\OneDrive - CTC FRANCHISING S A\Área de Trabalho\Scripts Python\Controle de Agendamentos - Showroom Inverno 2026.xlsx"  # <-- AJUSTE AQUI
 
-NOME_ABA_DIAGNOSTICO = "Controle de Agendamentos - Showroom Inverno 2026 - Diagnósticov"
-
-# Apenas essas abas serão analisadas:
+# Apenas essas abas serão analisadas (lista vazia = todas):
 ABAS_ANALISAR = [
     "BASE",
     "TABELA",
@@ -27,148 +34,523 @@ ABAS_ANALISAR = [
     "FATURAMENTO HISTÓRICO",
 ]
 
-# ====== PADRÕES (REGEX) ======
-
-# Coluna inteira: $A:$A, A:A, 'BASE'!$S:$S, BASE!A:A, etc.
-PADRAO_COLUNA_INTEIRA = re.compile(
-    r"((?:'[^']+'!)?)\$?(?P<col>[A-Z]+):\$?(?P=col)",
-    re.IGNORECASE
+TOP_PIORES = 50
+LIMITE_OCORRENCIAS = 100_000  # linhas da aba "Ocorrências" do relatório
+
+MAX_LINHAS = 1_048_576
+MAX_COLUNAS = 16_384
+
+# ====== XML DO XLSX ======
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+TAG_C = NS_MAIN + "c"
+TAG_F = NS_MAIN + "f"
+TAG_ROW = NS_MAIN + "row"
+TAG_DIMENSION = NS_MAIN + "dimension"
+
+# ====== PADRÕES (TOKENIZADOR) ======
+
+# Funções voláteis/pesadas (o XML guarda os nomes em inglês; pt-BR por segurança)
+FUNCOES_VOLATEIS = {
+    "INDIRECT", "OFFSET", "TODAY", "NOW", "RAND", "RANDBETWEEN", "CELL", "INFO",
+    "INDIRETO", "DESLOC", "HOJE", "AGORA", "ALEATÓRIO", "ALEATÓRIOENTRE",
+}
+
+# Um único regex varre a fórmula: strings e erros são consumidos (e ignorados),
+# funções são reconhecidas pelo "(" e referências podem vir qualificadas por aba.
+TOKEN = re.compile(
+    r"""
+      (?P<str>"(?:[^"]|"")*")
+    | (?P<err>\#[A-Z0-9/!?]+)
+    | (?P<func>(?:_xlfn\.|_xlws\.)?[A-Za-z][A-Za-z0-9._]*)\(
+    | (?<![A-Za-z0-9_.$])
+      (?:(?P<sheet>'(?:[^']|'')+'|\[\d+\][^!'"(),;]+|[A-Za-z_][A-Za-z0-9_.]*)!)?
+      (?:
+          (?P<cols>\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3})(?![A-Za-z0-9_(])
+        | (?P<rows>\$?\d+:\$?\d+)(?![0-9])
+        | (?P<area>\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)(?![A-Za-z0-9_(])
+      )
+    """,
+    re.VERBOSE,
 )
 
-# Linha inteira: $1:$1, 1:1, 'BASE'!$3:$3, etc.
-PADRAO_LINHA_INTEIRA = re.compile(
-    r"((?:'[^']+'!)?)\$?(?P<row>\d+):\$?(?P=row)",
-    re.IGNORECASE
-)
+PARTE_CELULA = re.compile(r"(\$?)([A-Za-z]{1,3})(\$?)(\d+)")
+
+
+def coluna_para_numero(letras):
+    n = 0
+    for ch in letras.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def numero_para_coluna(n):
+    letras = ""
+    while n:
+        n, resto = divmod(n - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def endereco(linha, coluna):
+    return f"{numero_para_coluna(coluna)}{linha}"
+
+
+def _parse_ref(m):
+    """
+    Converte um match de referência em (aba, r1, c1, r2, c2, absolutos, tipo).
+    ``absolutos`` indica quais das 4 coordenadas têm "$" (não deslocam em fórmulas compartilhadas).
+    """
+    sheet = m.group("sheet")
+    if sheet:
+        sheet = sheet[1:-1].replace("''", "'") if sheet.startswith("'") else sheet
+
+    if m.group("cols"):
+        a, b = m.group("cols").split(":")
+        c1, c2 = coluna_para_numero(a.lstrip("$")), coluna_para_numero(b.lstrip("$"))
+        return sheet, 1, c1, MAX_LINHAS, c2, (True, a.startswith("$"), True, b.startswith("$")), "coluna_inteira"
+
+    if m.group("rows"):
+        a, b = m.group("rows").split(":")
+        r1, r2 = int(a.lstrip("$")), int(b.lstrip("$"))
+        return sheet, r1, 1, r2, MAX_COLUNAS, (a.startswith("$"), True, b.startswith("$"), True), "linha_inteira"
+
+    partes = PARTE_CELULA.findall(m.group("area"))
+    (ac1, col1, ar1, lin1) = partes[0]
+    (ac2, col2, ar2, lin2) = partes[-1]
+    absolutos = (bool(ar1), bool(ac1), bool(ar2), bool(ac2))
+    tipo = "celula" if len(partes) == 1 else "intervalo"
+    return (sheet, int(lin1), coluna_para_numero(col1), int(lin2), coluna_para_numero(col2), absolutos, tipo)
+
+
+@lru_cache(maxsize=200_000)
+def tokenizar(formula):
+    """Retorna (funções, referências) de uma fórmula. Cacheado: fórmulas repetidas são comuns."""
+    funcoes = []
+    refs = []
+    for m in TOKEN.finditer(formula):
+        if m.group("func"):
+            nome = m.group("func").upper()
+            funcoes.append(nome.split(".", 1)[1] if nome.startswith(("_XLFN.", "_XLWS.")) else nome)
+        elif m.group("cols") or m.group("rows") or m.group("area"):
+            refs.append(_parse_ref(m))
+    return tuple(funcoes), tuple(refs)
+
+
+def deslocar_refs(refs, dl, dc):
+    """Aplica o deslocamento de uma fórmula compartilhada (filhas não trazem o texto)."""
+    if not dl and not dc:
+        return refs
+    novas = []
+    for sheet, r1, c1, r2, c2, (ar1, ac1, ar2, ac2), tipo in refs:
+        novas.append((
+            sheet,
+            r1 if ar1 else r1 + dl,
+            c1 if ac1 else c1 + dc,
+            r2 if ar2 else r2 + dl,
+            c2 if ac2 else c2 + dc,
+            (ar1, ac1, ar2, ac2),
+            tipo,
+        ))
+    return tuple(novas)
+
+
+def _area(ref_str):
+    partes = PARTE_CELULA.findall(ref_str or "")
+    if not partes:
+        return 1
+    (_, col1, _, lin1), (_, col2, _, lin2) = partes[0], partes[-1]
+    return (int(lin2) - int(lin1) + 1) * (coluna_para_numero(col2) - coluna_para_numero(col1) + 1)
+
+
+# ====== LEITURA DO PACOTE ======
+
+def listar_abas(zf):
+    """[(nome, caminho do XML)] na ordem do workbook."""
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    alvos = {}
+    for rel in rels.iter(NS_PKG_REL + "Relationship"):
+        alvo = rel.get("Target")
+        alvo = alvo.lstrip("/") if alvo.startswith("/") else "xl/" + alvo
+        alvos[rel.get("Id")] = alvo
+
+    wb = ET.fromstring(zf.read("xl/workbook.xml"))
+    abas = []
+    for sh in wb.iter(NS_MAIN + "sheet"):
+        caminho = alvos.get(sh.get(NS_REL + "id"))
+        if caminho and "worksheets/" in caminho:
+            abas.append((sh.get("name"), caminho))
+    return abas
+
+
+class Diagnostico:
+    """Acumula fórmulas, referências e estatísticas em arrays compactos (escala para milhões)."""
+
+    def __init__(self):
+        self.abas = []            # nomes na ordem de varredura
+        self.idx_aba = {}
+        self.dimensoes = {}       # aba -> (linhas, colunas) do used range
+
+        # Uma entrada por fórmula
+        self.f_aba = array("i")
+        self.f_linha = array("i")
+        self.f_coluna = array("i")
+        self.f_volatil = array("b")
+        self.f_custo = array("d")
+
+        # Uma entrada por referência (precedente) de fórmula
+        self.r_formula = array("q")
+        self.r_aba = array("i")
+        self.r_coords = array("i")  # r1, c1, r2, c2 intercalados
+
+        self.stats = defaultdict(Counter)
+        self.cadeias = defaultdict(Counter)  # aba -> Counter(aba referenciada)
+        self.piores = []                      # heap (custo, seq, aba, célula, fórmula)
+        self.ocorrencias = []
+        self._seq = 0
+
+    def id_aba(self, nome):
+        if nome not in self.idx_aba:
+            self.idx_aba[nome] = len(self.abas)
+            self.abas.append(nome)
+        return self.idx_aba[nome]
+
+    def registrar(self, aba, linha, coluna, formula, funcoes, refs, tipo_f, area_array, top):
+        fid = len(self.f_aba)
+        ia = self.id_aba(aba)
+        st = self.stats[aba]
+        st["formulas"] += 1
+
+        volatil = any(f in FUNCOES_VOLATEIS for f in funcoes)
+        celulas_lidas = 0
+
+        for sheet, r1, c1, r2, c2, _, tipo in refs:
+            alvo = aba
+            if sheet:
+                if sheet.startswith("["):
+                    st["refs_externas"] += 1
+                    continue
+                alvo = sheet
+                if alvo != aba:
+                    st["refs_outras_abas"] += 1
+                    self.cadeias[aba][alvo] += 1
+
+            ib = self.id_aba(alvo)
+            self.r_formula.append(fid)
+            self.r_aba.append(ib)
+            self.r_coords.extend((r1, c1, r2, c2))
+
+            lin_usadas, col_usadas = self.dimensoes.get(alvo, (MAX_LINHAS, MAX_COLUNAS))
+            celulas_lidas += max(0, min(r2, lin_usadas) - r1 + 1) * max(0, min(c2, col_usadas) - c1 + 1)
+
+            if tipo in ("coluna_inteira", "linha_inteira"):
+                st[tipo] += 1
+                self._ocorrencia(aba, endereco(linha, coluna), "Coluna inteira" if tipo == "coluna_inteira" else "Linha inteira",
+                                 f"{numero_para_coluna(c1)}:{numero_para_coluna(c2)}" if tipo == "coluna_inteira"
+                                 else f"{r1}:{r2}", formula)
+
+        if volatil:
+            st["volateis"] += 1
+            for f in funcoes:
+                if f in FUNCOES_VOLATEIS:
+                    self._ocorrencia(aba, endereco(linha, coluna), "Função volátil/pesada", f, formula)
+
+        if tipo_f == "array":
+            st["matriciais"] += 1
+
+        custo = (1 + celulas_lidas) * max(1, area_array)
+        self.f_aba.append(ia)
+        self.f_linha.append(linha)
+        self.f_coluna.append(coluna)
+        self.f_volatil.append(1 if volatil else 0)
+        self.f_custo.append(custo)
+
+        self._seq += 1
+        if len(self.piores) < top:
+            heapq.heappush(self.piores, (custo, self._seq, aba, endereco(linha, coluna), formula))
+        elif custo > self.piores[0][0]:
+            heapq.heapreplace(self.piores, (custo, self._seq, aba, endereco(linha, coluna), formula))
+
+    def _ocorrencia(self, aba, celula, tipo, detalhe, formula):
+        if len(self.ocorrencias) < LIMITE_OCORRENCIAS:
+            self.ocorrencias.append((aba, celula, tipo, detalhe, formula))
+
+
+def varrer_aba(zf, nome, caminho, diag, top):
+    """Percorre o XML da aba em streaming; só células com <f> são analisadas."""
+    compartilhadas = {}  # si -> (linha, coluna, texto) da fórmula mestre
+    linha = coluna = 0
+
+    for _, elem in ET.iterparse(zf.open(caminho)):
+        if elem.tag == TAG_C:
+            f = elem.find(TAG_F)
+            if f is not None:
+                m = PARTE_CELULA.match(elem.get("r", ""))
+                if m:
+                    linha, coluna = int(m.group(4)), coluna_para_numero(m.group(2))
+                tipo_f = f.get("t", "normal")
+                texto = f.text
+
+                if tipo_f == "shared":
+                    si = f.get("si")
+                    if texto:
+                        compartilhadas[si] = (linha, coluna, texto)
+                        funcoes, refs = tokenizar(texto)
+                    elif si in compartilhadas:
+                        l0, c0, texto = compartilhadas[si]
+                        funcoes, refs = tokenizar(texto)
+                        refs = deslocar_refs(refs, linha - l0, coluna - c0)
+                    else:
+                        texto = None
+                elif texto:
+                    funcoes, refs = tokenizar(texto)
+
+                if texto and tipo_f != "dataTable":
+                    area_array = _area(f.get("ref")) if tipo_f == "array" else 1
+                    diag.registrar(nome, linha, coluna, "=" + texto, funcoes, refs, tipo_f, area_array, top)
+            elem.clear()
+        elif elem.tag == TAG_ROW:
+            elem.clear()
+        elif elem.tag == TAG_DIMENSION:
+            partes = PARTE_CELULA.findall(elem.get("ref", "A1").split(":")[-1])
+            if partes:
+                _, col, _, lin = partes[0]
+                diag.dimensoes[nome] = (int(lin), coluna_para_numero(col))
+
+
+# ====== GRAFO DE DEPENDÊNCIAS ======
+
+def fechamento_volatil(diag):
+    """
+    Fórmulas recalculadas a cada edição: as voláteis e todos os seus dependentes.
+
+    Nós = fórmulas + um nó por intervalo distinto (A:A referenciado por 1M de
+    fórmulas vira um único nó), então o grafo cresce de forma linear.
+    """
+    n = len(diag.f_aba)
+    if not n:
+        return np.zeros(0, dtype=bool)
+
+    f_aba = np.frombuffer(diag.f_aba, dtype=np.int32)
+    f_lin = np.frombuffer(diag.f_linha, dtype=np.int32).astype(np.int64)
+    f_col = np.frombuffer(diag.f_coluna, dtype=np.int32).astype(np.int64)
+
+    # Posições das fórmulas ordenadas por (aba, coluna, linha) para busca por intervalo
+    chave = (f_aba.astype(np.int64) * (MAX_COLUNAS + 1) + f_col) * (MAX_LINHAS + 1) + f_lin
+    ordem = np.argsort(chave, kind="stable")
+    chave_ord = chave[ordem]
+
+    r_formula = np.frombuffer(diag.r_formula, dtype=np.int64)
+    r_aba = np.frombuffer(diag.r_aba, dtype=np.int32).astype(np.int64)
+    coords = np.frombuffer(diag.r_coords, dtype=np.int32).reshape(-1, 4).astype(np.int64)
+
+    origem, destino = [], []
+    nos_intervalo = {}
+    cols_por_aba = {}
+
+    for fid, ab, (r1, c1, r2, c2) in zip(r_formula.tolist(), r_aba.tolist(), coords.tolist()):
+        if r1 == r2 and c1 == c2:
+            k = (ab * (MAX_COLUNAS + 1) + c1) * (MAX_LINHAS + 1) + r1
+            p = np.searchsorted(chave_ord, k)
+            if p < n and chave_ord[p] == k:
+                origem.append(int(ordem[p]))
+                destino.append(fid)
+            continue
+
+        key = (ab, r1, c1, r2, c2)
+        no = nos_intervalo.get(key)
+        if no is None:
+            no = n + len(nos_intervalo)
+            nos_intervalo[key] = no
+            if ab not in cols_por_aba:
+                cols_por_aba[ab] = np.unique(f_col[f_aba == ab])
+            for c in cols_por_aba[ab][(cols_por_aba[ab] >= c1) & (cols_por_aba[ab] <= c2)].tolist():
+                base = (ab * (MAX_COLUNAS + 1) + c) * (MAX_LINHAS + 1)
+                ini, fim = np.searchsorted(chave_ord, [base + r1, base + r2 + 1])
+                if fim > ini:
+                    origem.extend(ordem[ini:fim].tolist())
+                    destino.extend([no] * int(fim - ini))
+        origem.append(no)
+        destino.append(fid)
+
+    total_nos = n + len(nos_intervalo)
+    origem = np.asarray(origem, dtype=np.int64)
+    destino = np.asarray(destino, dtype=np.int64)
+    ordem_e = np.argsort(origem, kind="stable")
+    destino = destino[ordem_e]
+    inicio = np.searchsorted(origem[ordem_e], np.arange(total_nos + 1))
+
+    sujo = np.zeros(total_nos, dtype=bool)
+    fronteira = np.flatnonzero(np.frombuffer(diag.f_volatil, dtype=np.int8))
+    sujo[fronteira] = True
+    while fronteira.size:
+        vizinhos = np.concatenate([destino[inicio[i]:inicio[i + 1]] for i in fronteira]) if fronteira.size else fronteira
+        vizinhos = np.unique(vizinhos)
+        fronteira = vizinhos[~sujo[vizinhos]]
+        sujo[fronteira] = True
+    return sujo[:n]
+
+
+def maior_cadeia(diag, aba, visitando=None, memo=None):
+    """Profundidade da cadeia de referências entre abas a partir de ``aba`` (ciclos contam uma vez)."""
+    visitando = visitando if visitando is not None else set()
+    memo = memo if memo is not None else {}
+    if aba in memo:
+        return memo[aba]
+    if aba in visitando:
+        return 0
+    visitando.add(aba)
+    profundidade = 0
+    for alvo in diag.cadeias.get(aba, {}):
+        profundidade = max(profundidade, 1 + maior_cadeia(diag, alvo, visitando, memo))
+    visitando.discard(aba)
+    memo[aba] = profundidade
+    return profundidade
+
+
+# ====== PIPELINE ======
+
+def diagnosticar(caminho, abas=None, top=TOP_PIORES):
+    diag = Diagnostico()
+    with zipfile.ZipFile(caminho) as zf:
+        for nome, xml in listar_abas(zf):
+            if abas and nome not in abas:
+                continue
+            t0 = time.perf_counter()
+            antes = len(diag.f_aba)
+            diag.id_aba(nome)
+            varrer_aba(zf, nome, xml, diag, top)
+            print(f"  Aba {nome}: {len(diag.f_aba) - antes} fórmulas ({time.perf_counter() - t0:.2f}s)")
+
+    sujo = fechamento_volatil(diag)
+    f_aba = np.frombuffer(diag.f_aba, dtype=np.int32)
+    custo = np.frombuffer(diag.f_custo, dtype=np.float64)
+
+    resumo = []
+    memo = {}
+    for ia, nome in enumerate(diag.abas):
+        st = diag.stats.get(nome)
+        if not st:
+            continue
+        mascara = f_aba == ia
+        resumo.append({
+            "Planilha": nome,
+            "Formulas": st["formulas"],
+            "Coluna_Inteira": st["coluna_inteira"],
+            "Linha_Inteira": st["linha_inteira"],
+            "Volateis": st["volateis"],
+            "Matriciais": st["matriciais"],
+            "Refs_Outras_Abas": st["refs_outras_abas"],
+            "Refs_Externas": st["refs_externas"],
+            "Cadeia_Entre_Abas": maior_cadeia(diag, nome, memo=memo),
+            "Recalculadas_Por_Edicao": int(sujo[mascara].sum()),
+            "Custo_Estimado_Recalculo": float(custo[mascara].sum()),
+            "Custo_Volatil_Por_Edicao": float(custo[mascara & sujo].sum()),
+        })
+
+    resumo = pd.DataFrame(resumo)
+    if not resumo.empty:
+        resumo = resumo.sort_values("Custo_Estimado_Recalculo", ascending=False)
+
+    piores = pd.DataFrame(
+        [(aba, cel, custo_f, formula) for custo_f, _, aba, cel, formula in sorted(diag.piores, reverse=True)],
+        columns=["Planilha", "Celula", "Custo_Estimado", "Formula"],
+    )
+    ocorrencias = pd.DataFrame(diag.ocorrencias, columns=["Planilha", "Celula", "Tipo_Problema", "Detalhe", "Formula"])
+    return resumo, piores, ocorrencias
 
-# Funções voláteis/pesadas (pt-BR e en-US)
-PADRAO_FUNCOES_VOLATEIS = re.compile(
-    r"\b(HOJE|AGORA|DESLOC|INDIRETO|TODAY|NOW|OFFSET|INDIRECT)\b",
-    re.IGNORECASE
-)
 
+def salvar_relatorio(destino, resumo, piores, ocorrencias):
+    # Fórmulas vão como texto (sem isso o xlsxwriter as gravaria como fórmulas vivas)
+    with pd.ExcelWriter(destino, engine="xlsxwriter", engine_kwargs={"options": {"strings_to_formulas": False}}) as writer:
+        resumo.to_excel(writer, sheet_name="Resumo por Aba", index=False)
+        piores.to_excel(writer, sheet_name="Piores Fórmulas", index=False)
+        if ocorrencias.empty:
+            ocorrencias = pd.DataFrame({"Aviso": ["Nenhum problema encontrado pelos padrões configurados."]})
+        ocorrencias.to_excel(writer, sheet_name="Ocorrências", index=False)
 
-def main():
-    caminho_original = Path(CAMINHO_ARQUIVO)
 
-    if not caminho_original.exists():
-        print(f"Arquivo não encontrado: {caminho_original}")
-        return
+# ====== BENCHMARK ======
 
-    # Backup do arquivo original (só por segurança)
-    backup = caminho_original.with_suffix(".backup" + caminho_original.suffix)
-    if not backup.exists():
-        shutil.copy2(caminho_original, backup)
-        print(f"Backup criado em: {backup}")
+def gerar_planilha_sintetica(destino, n_formulas):
+    """Workbook com dados + fórmulas variadas (coluna inteira, voláteis, entre abas, matriciais)."""
+    import xlsxwriter
 
-    # Novo arquivo com diagnóstico (mesma extensão do original)
-    novo_caminho = caminho_original.with_name(
-        caminho_original.stem + "_diagnostico" + caminho_original.suffix
-    )
+    wb = xlsxwriter.Workbook(str(destino), {"constant_memory": True})
+    dados = wb.add_worksheet("Dados")
+    calc = wb.add_worksheet("Calculo")
+    painel = wb.add_worksheet("Painel")
 
-    # Abre o Excel via xlwings
-    app = xw.App(visible=False)
-    app.display_alerts = False
-    app.screen_updating = False
+    n_linhas = max(1, n_formulas // 5)  # 2 fórmulas/linha em Dados e Calculo, o resto no Painel
+    for r in range(n_linhas):
+        dados.write_number(r, 0, r)
+        dados.write_formula(r, 1, f"=A{r + 1}*2")
+        dados.write_formula(r, 2, f"=B{r + 1}+SUM(A:A)" if r % 50 == 0 else f"=B{r + 1}+1")
 
-    try:
-        wb = app.books.open(str(caminho_original))
+    for r in range(n_linhas):
+        if r % 100 == 0:
+            calc.write_formula(r, 0, f'=INDIRECT("Dados!A"&ROW())+TODAY()')
+        else:
+            calc.write_formula(r, 0, f"=Dados!C{r + 1}*1.1")
+        calc.write_formula(r, 1, f"=A{r + 1}+OFFSET(A1,1,0)" if r % 200 == 0 else f"=A{r + 1}")
 
-        diagnosticos = []
+    # constant_memory grava linha a linha: a matricial (B1:B10) entra antes das linhas seguintes
+    painel.write_array_formula(0, 1, 9, 1, "{=Calculo!A1:A10*2}")
+    for r in range(max(1, n_formulas - 4 * n_linhas)):
+        painel.write_formula(r, 0, f"=Calculo!B{r + 1}+SUMIF(Dados!A:A,\">0\",Dados!B:B)" if r % 20 == 0
+                             else f"=Calculo!B{r + 1}")
+    wb.close()
+    return destino
 
-        print("Iniciando diagnóstico de fórmulas...")
 
-        # Percorre apenas as abas indicadas
-        for sh in wb.sheets:
-            if sh.name not in ABAS_ANALISAR:
-                continue
+def benchmark(n_formulas):
+    destino = Path(f"benchmark_formulas_{n_formulas}.xlsx")
+    t0 = time.perf_counter()
+    gerar_planilha_sintetica(destino, n_formulas)
+    print(f"Planilha sintética gerada em {time.perf_counter() - t0:.1f}s: {destino}")
 
-            print(f"  Analisando aba: {sh.name}")
-            used = sh.used_range
-
-            # Percorre todas as células usadas
-            for cell in used:
-                formula = cell.formula
-                if not formula:
-                    continue  # célula sem fórmula
-
-                endereco = cell.get_address(row_absolute=False, column_absolute=False)
-
-                # 1) Coluna inteira
-                for match in PADRAO_COLUNA_INTEIRA.finditer(formula):
-                    referencia = match.group(0)
-                    diagnosticos.append({
-                        "Planilha": sh.name,
-                        "Celula": endereco,
-                        "Tipo_Problema": "Coluna inteira",
-                        "Detalhe": referencia,
-                        "Formula": formula
-                    })
-
-                # 2) Linha inteira
-                for match in PADRAO_LINHA_INTEIRA.finditer(formula):
-                    referencia = match.group(0)
-                    diagnosticos.append({
-                        "Planilha": sh.name,
-                        "Celula": endereco,
-                        "Tipo_Problema": "Linha inteira",
-                        "Detalhe": referencia,
-                        "Formula": formula
-                    })
-
-                # 3) Funções voláteis / pesadas
-                for match in PADRAO_FUNCOES_VOLATEIS.finditer(formula):
-                    funcao = match.group(1)
-                    diagnosticos.append({
-                        "Planilha": sh.name,
-                        "Celula": endereco,
-                        "Tipo_Problema": "Função volátil/pesada",
-                        "Detalhe": funcao.upper(),
-                        "Formula": formula
-                    })
-
-        # Remove aba de diagnóstico antiga, se existir
-        for sh in wb.sheets:
-            if sh.name == NOME_ABA_DIAGNOSTICO:
-                sh.delete()
-                break
-
-        # Cria nova aba de diagnóstico
-        ws_diag = wb.sheets.add(NOME_ABA_DIAGNOSTICO, before=wb.sheets[0])
-
-        # Cabeçalhos
-        cabecalhos = ["Planilha", "Celula", "Tipo_Problema", "Detalhe", "Formula"]
-        ws_diag.range("A1").value = cabecalhos
-
-        # Corpo
-        if diagnosticos:
-            linhas = [
-                [
-                    d["Planilha"],
-                    d["Celula"],
-                    d["Tipo_Problema"],
-                    d["Detalhe"],
-                    d["Formula"]
-                ]
-                for d in diagnosticos
-            ]
-            ws_diag.range("A2").value = linhas
-            ws_diag.autofit()
-        else:
-            ws_diag.range("A2").value = "Nenhum problema encontrado pelos padrões configurados."
+    t0 = time.perf_counter()
+    resumo, piores, _ = diagnosticar(destino, top=10)
+    dt = time.perf_counter() - t0
+    total = int(resumo["Formulas"].sum()) if not resumo.empty else 0
+    print(resumo.to_string(index=False))
+    print(f"\n{total} fórmulas analisadas em {dt:.2f}s ({total / dt:,.0f} fórmulas/s)")
+
+
+# ====== MAIN ======
+
+def main():
+    parser = argparse.ArgumentParser(description="Diagnóstico de fórmulas lendo o XML do xlsx (sem Excel)")
+    parser.add_argument("arquivo", nargs="?", default=CAMINHO_ARQUIVO)
+    parser.add_argument("--abas", nargs="*", default=ABAS_ANALISAR, help="abas a analisar (vazio = todas)")
+    parser.add_argument("--top", type=int, default=TOP_PIORES)
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N", help="gera e analisa uma planilha com N fórmulas")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+
+    caminho_original = Path(args.arquivo)
+    if not caminho_original.exists():
+        print(f"Arquivo não encontrado: {caminho_original}")
+        return
 
-        # Salva novo arquivo com diagnóstico
-        wb.save(str(novo_caminho))
-        wb.close()
+    # Relatório em arquivo separado: o original nunca é aberto para escrita
+    novo_caminho = caminho_original.with_name(caminho_original.stem + "_diagnostico.xlsx")
 
-        print()
-        print(f"Diagnóstico concluído. Ocorrências encontradas: {len(diagnosticos)}")
-        print(f"Arquivo com diagnóstico salvo em: {novo_caminho}")
+    print("Iniciando diagnóstico de fórmulas...")
+    t0 = time.perf_counter()
+    resumo, piores, ocorrencias = diagnosticar(caminho_original, abas=args.abas, top=args.top)
+    salvar_relatorio(novo_caminho, resumo, piores, ocorrencias)
 
-    finally:
-        app.display_alerts = True
-        app.screen_updating = True
-        app.quit()
+    print()
+    if not resumo.empty:
+        print(resumo.head(10).to_string(index=False))
+    print(f"\nDiagnóstico concluído em {time.perf_counter() - t0:.1f}s. Ocorrências encontradas: {len(ocorrencias)}")
+    print(f"Relatório salvo em: {novo_caminho}")
 
 
 if __name__ == "__main__":
@@ -1,47 +1,38 @@
+import argparse
 import os
-import pandas as pd
+from consolidador_abas import consolidar_abas
+from excel_writer import escrever_excel_formatado
 
 # 1. Definição dos caminhos e nomes dos arquivos
 diretorio = r"C:\Users\lucas.barros\OneDrive - BELMICRO TECNOLOGIA SA\Área de Trabalho\Scripts Python"
 arquivo_entrada = os.path.join(diretorio, "RELATÓRIO ATENDIMENTO AO CLIENTE - VENTTOS.xlsx")
 arquivo_saida = os.path.join(diretorio, "RELATÓRIO ATENDIMENTO AO CLIENTE FORMATADO.xlsx")
 
-print("Carregando o arquivo Excel...")
-# 2. Carrega o arquivo Excel para ler os nomes de todas as abas
-excel_file = pd.ExcelFile(arquivo_entrada)
-todas_as_abas = excel_file.sheet_names
+# Abas que começam com ATENDIMENTO, ATENDIMENTOS ou ATEND. (ignorando maiúsculas/minúsculas e acentos)
+PREFIXOS_ABA = ("ATENDIMENTO", "ATENDIMENTOS", "ATEND.")
 
-# Lista para armazenar os DataFrames de cada dia
-dataframes_a_juntar = []
+def juntar_abas(arquivos, saida=arquivo_saida, workers=None):
+    print("Varrendo as abas para consolidação...")
+    # 2. Cada arquivo é aberto uma vez e todas as abas saem do mesmo handle;
+    #    com vários arquivos, cada um é lido em um processo.
+    #    Colunas com grafia diferente entre abas (caixa, acento, espaços) são alinhadas.
+    df_consolidado = consolidar_abas(arquivos, prefixos=PREFIXOS_ABA, coluna_origem="Aba_Origem", workers=workers)
 
-print("Varrendo as abas para consolidação...")
-# 3. Loop pelas abas procurando os padrões informados (Ignorando maiúsculas/minúsculas)
-for aba in todas_as_abas:
-    aba_upper = aba.upper().strip()
-    
-    # Verifica se começa com ATENDIMENTO, ATENDIMENTOS ou ATEND.
-    if aba_upper.startswith("ATENDIMENTO") or aba_upper.startswith("ATENDIMENTOS") or aba_upper.startswith("ATEND."):
-        print(f"-> Lendo aba ativa: {aba}")
-        
-        # Lê os dados da aba atual
-        df_aba = pd.read_excel(arquivo_entrada, sheet_name=aba)
-        
-        # Opcional: Adiciona uma coluna para saber de qual aba veio o dado (caso precise validar a data depois)
-        df_aba['Aba_Origem'] = aba
-        
-        dataframes_a_juntar.append(df_aba)
+    # 3. Salva tudo de uma vez, já formatado, na aba "BASE"
+    if df_consolidado.empty:
+        print("\n[ERRO] Nenhuma aba correspondente aos padrões foi encontrada. Verifique os nomes.")
+        return None
 
-# 4. Junta tudo se houver abas encontradas
-if dataframes_a_juntar:
-    print("\nEmpilhando os dados na tabela única...")
-    # concat junta tudo por colunas idênticas automaticamente
-    df_consolidado = pd.concat(dataframes_a_juntar, ignore_index=True)
-    
-    print(f"Salvando o novo arquivo em: {arquivo_saida}")
-    # 5. Salva na nova planilha criando a aba "BASE"
-    with pd.ExcelWriter(arquivo_saida, engine='openpyxl') as writer:
-        df_consolidado.to_excel(writer, sheet_name="BASE", index=False)
-        
+    print(f"\nEmpilhadas {len(df_consolidado)} linhas. Salvando o novo arquivo em: {saida}")
+    # BASE como tabela do Excel: filtro e referência estruturada prontos para dinâmicas
+    escrever_excel_formatado(df_consolidado, saida, aba="BASE", tabela=True)
     print("Processo concluído com sucesso! A aba BASE está pronta.")
-else:
-    print("\n[ERRO] Nenhuma aba correspondente aos padrões foi encontrada. Verifique os nomes.")
\ No newline at end of file
+    return df_consolidado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Junta as abas de ATENDIMENTO em uma única aba BASE")
+    parser.add_argument("arquivos", nargs="*", default=[arquivo_entrada], help="um ou mais arquivos de entrada")
+    parser.add_argument("--saida", default=arquivo_saida)
+    parser.add_argument("--workers", type=int, default=None, help="processos para ler vários arquivos")
+    args = parser.parse_args()
+    juntar_abas(args.arquivos, args.saida, args.workers)
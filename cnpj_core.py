@@ -49,6 +49,10 @@ def format_cnpj(cnpj: str) -> str:
 # =========================
 #   Cliente HTTP robusto
 # =========================
+# Campos que a base local pode não ter (EMPRESAS/MUNICIPIOS ausentes): completados pelo HTTP
+CAMPOS_ESSENCIAIS = ("razao_social", "municipio")
+
+
 @dataclass
 class FetchResult:
     source: str
@@ -65,6 +69,7 @@ class CNPJClient:
         max_retries: int = 4,
         backoff_base: float = 0.8,
         user_agent: str = "BIA-CNPJ-Streamlit/1.0",
+        local_index: Optional[Any] = None,
     ):
         self.timeout = timeout
         self.sleep_seconds = sleep_seconds
@@ -72,6 +77,8 @@ class CNPJClient:
         self.backoff_base = backoff_base
         self.sess = requests.Session()
         self.sess.headers.update({"User-Agent": user_agent})
+        # Provedor offline (ex.: cnpj_local.LocalCNPJIndex), consultado antes do HTTP
+        self.local_index = local_index
 
     def _request_json(self, url: str, source: str) -> FetchResult:
         last_err = None
@@ -101,6 +108,23 @@ class CNPJClient:
     def fetch(self, cnpj: str, prefer: str = "brasilapi") -> FetchResult:
         cnpj_d = only_digits(cnpj)
 
+        # Base local primeiro: HTTP só para CNPJs que não estão nela
+        # ou cujo registro local veio sem razão social / nome do município
+        if self.local_index is not None:
+            local = self.local_index.fetch(cnpj_d)
+            if local.data is not None:
+                faltando = [k for k in CAMPOS_ESSENCIAIS if local.data.get(k) in (None, "")]
+                if not faltando:
+                    return local
+                remoto = self._fetch_remote(cnpj_d, prefer)
+                if remoto.data is None:
+                    return local
+                return FetchResult(f"{local.source} + {remoto.source}", local.status_code,
+                                   {**remoto.data, **local.data}, None)
+
+        return self._fetch_remote(cnpj_d, prefer)
+
+    def _fetch_remote(self, cnpj_d: str, prefer: str) -> FetchResult:
         if prefer.lower() == "minhareceita":
             order = ["minhareceita", "brasilapi"]
         else:
@@ -324,13 +348,14 @@ def consultar_cnpj(
     cnpj_input: str,
     prefer: str = "brasilapi",
     client: Optional[CNPJClient] = None,
+    local_index: Optional[Any] = None,
 ) -> Dict[str, Any]:
     """
     Retorna um dict padrão:
     {
       "ok": bool,
       "cnpj": "...",
-      "source": "BrasilAPI|MinhaReceita",
+      "source": "Receita (local)|BrasilAPI|MinhaReceita",
       "summary": {...},
       "error": "..."
     }
@@ -347,7 +372,7 @@ def consultar_cnpj(
         }
 
     if client is None:
-        client = CNPJClient()
+        client = CNPJClient(local_index=local_index)
 
     res = client.fetch(cnpj_digits, prefer=prefer)
     if res.data is None:
@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from cnpj_core import FetchResult, format_cnpj, only_digits
+
+
+# =========================
+#   Configurações
+# =========================
+FONTE_LOCAL = "Receita (local)"
+
+# Layout dos dados abertos da Receita (tabela ESTABELECIMENTOS)
+COLUNAS_CHAVE = ("cnpj_basico", "cnpj_ordem", "cnpj_dv")
+
+# Tabelas auxiliares procuradas ao lado do ESTABELECIMENTO.parquet:
+# EMPRESAS (razão social, por cnpj_basico) e MUNICIPIOS (código;nome, CSV da Receita)
+EMPRESAS_PADRAO = "EMPRESAS.parquet"
+MUNICIPIOS_PADRAO = "MUNICIPIOS.csv"
+COLUNAS_EMPRESA = ("razao_social", "capital_social")
+
+SITUACAO_CADASTRAL = {
+    "01": "NULA",
+    "02": "ATIVA",
+    "03": "SUSPENSA",
+    "04": "INAPTA",
+    "08": "BAIXADA",
+}
+
+# Linhas por row group da cópia reorganizada.
+# Row groups pequenos = cada consulta decodifica só uma fatia pequena.
+ROW_GROUP_REORGANIZADO = 2048
+# Acima disso (o arquivo original da Receita tem ~1 milhão de linhas por row group)
+# o build_index grava a cópia reorganizada por padrão
+ROW_GROUP_MAXIMO = 16 * ROW_GROUP_REORGANIZADO
+
+# Teto de memória do cache de row groups decodificados (por índice)
+CACHE_BYTES_PADRAO = 256 * 1024 * 1024
+
+
+# =========================
+#   Construção do índice
+# =========================
+def _chaves_row_group(tabela: pa.Table) -> np.ndarray:
+    """
+    Converte as colunas de CNPJ de um row group em chaves int64 de 14 dígitos
+    (ou de 8 dígitos, na tabela EMPRESAS, que só tem ``cnpj_basico``).
+    """
+    if "cnpj" in tabela.column_names:
+        return pc.cast(tabela.column("cnpj"), pa.int64()).to_numpy(zero_copy_only=False)
+    if "cnpj_ordem" not in tabela.column_names:
+        return pc.cast(tabela.column("cnpj_basico"), pa.int64()).to_numpy(zero_copy_only=False)
+
+    basico, ordem, dv = (
+        pc.cast(tabela.column(c), pa.int64()).to_numpy(zero_copy_only=False) for c in COLUNAS_CHAVE
+    )
+    return basico * 1_000_000 + ordem * 100 + dv
+
+
+def _colunas_chave(schema: pa.Schema) -> List[str]:
+    if "cnpj" in schema.names:
+        return ["cnpj"]
+    if "cnpj_ordem" not in schema.names:
+        return ["cnpj_basico"]
+    return list(COLUNAS_CHAVE)
+
+
+def default_index_dir(parquet_path: Path) -> Path:
+    return parquet_path.with_suffix(".idx")
+
+
+def _assinatura(parquet_path: Path) -> Dict[str, Any]:
+    st = parquet_path.stat()
+    return {"arquivo": str(parquet_path.resolve()), "tamanho": st.st_size, "mtime": st.st_mtime}
+
+
+def maior_row_group(parquet_path: str | Path) -> int:
+    """Linhas do maior row group do arquivo (0 se vazio)."""
+    meta = pq.ParquetFile(parquet_path).metadata
+    return max((meta.row_group(i).num_rows for i in range(meta.num_row_groups)), default=0)
+
+
+def reorganizar_parquet(parquet_path: Path, destino: Path, row_group_size: int = ROW_GROUP_REORGANIZADO) -> Path:
+    """
+    Grava uma cópia do Parquet com row groups pequenos, lote a lote (a memória
+    não depende do tamanho do arquivo). A ordem das linhas é a do original: o
+    índice já ordena as chaves, o que importa é o tamanho de cada row group.
+    """
+    pf = pq.ParquetFile(parquet_path)
+    temporario = destino.with_suffix(".tmp")
+    with pq.ParquetWriter(temporario, pf.schema_arrow) as writer:
+        for lote in pf.iter_batches(batch_size=row_group_size * 16):
+            writer.write_table(pa.Table.from_batches([lote]), row_group_size=row_group_size)
+    temporario.replace(destino)
+    return destino
+
+
+def build_index(
+    parquet_path: str | Path,
+    index_dir: Optional[str | Path] = None,
+    reorganizar: Optional[bool] = None,
+) -> Path:
+    """
+    Constrói o índice ordenado (CNPJ -> row group/offset) ao lado do Parquet.
+
+    ``reorganizar`` grava antes uma cópia com row groups de ROW_GROUP_REORGANIZADO
+    linhas. Sem ele, cada consulta fria decodifica o row group inteiro (no arquivo
+    da Receita, ~1 milhão de linhas para devolver uma). None (padrão) reorganiza
+    quando algum row group passa de ROW_GROUP_MAXIMO linhas.
+
+    Arquivos gerados em ``index_dir``:
+      - chaves.npy : int64 ordenado com os CNPJs de 14 dígitos
+      - row_group.npy / offset.npy : posição de cada chave no Parquet
+      - meta.json : assinatura do Parquet de origem (invalidação)
+    """
+    parquet_path = Path(parquet_path)
+    index_dir = Path(index_dir) if index_dir else default_index_dir(parquet_path)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    maior = maior_row_group(parquet_path)
+    if reorganizar is None:
+        reorganizar = maior > ROW_GROUP_MAXIMO
+        if reorganizar:
+            print(f"⚠️ {parquet_path.name} tem row groups de até {maior:,} linhas: gravando cópia com "
+                  f"row groups de {ROW_GROUP_REORGANIZADO:,} em {index_dir} (uma vez por carga da Receita).")
+    elif not reorganizar and maior > ROW_GROUP_MAXIMO:
+        print(f"⚠️ {parquet_path.name} tem row groups de até {maior:,} linhas e não será reorganizado: "
+              f"cada consulta fria decodifica um row group inteiro.")
+
+    origem = parquet_path
+    if reorganizar:
+        origem = reorganizar_parquet(parquet_path, index_dir / "dados.parquet", ROW_GROUP_REORGANIZADO)
+
+    pf = pq.ParquetFile(origem)
+    colunas = _colunas_chave(pf.schema_arrow)
+
+    partes_chave: List[np.ndarray] = []
+    partes_rg: List[np.ndarray] = []
+    partes_off: List[np.ndarray] = []
+
+    for rg in range(pf.num_row_groups):
+        chaves = _chaves_row_group(pf.read_row_group(rg, columns=colunas))
+        partes_chave.append(chaves)
+        partes_rg.append(np.full(len(chaves), rg, dtype=np.int32))
+        partes_off.append(np.arange(len(chaves), dtype=np.int32))
+
+    chaves = np.concatenate(partes_chave) if partes_chave else np.empty(0, dtype=np.int64)
+    row_groups = np.concatenate(partes_rg) if partes_rg else np.empty(0, dtype=np.int32)
+    offsets = np.concatenate(partes_off) if partes_off else np.empty(0, dtype=np.int32)
+
+    ordem = np.argsort(chaves, kind="stable")
+    np.save(index_dir / "chaves.npy", chaves[ordem])
+    np.save(index_dir / "row_group.npy", row_groups[ordem])
+    np.save(index_dir / "offset.npy", offsets[ordem])
+
+    meta = {
+        "origem": _assinatura(parquet_path),
+        "dados": str(Path(origem).resolve()),
+        "total": int(len(chaves)),
+    }
+    (index_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    return index_dir
+
+
+def carregar_municipios(csv_path: str | Path) -> Dict[str, str]:
+    """Tabela MUNICIPIOS da Receita (``codigo;nome``, latin-1) como {código de 4 dígitos: nome}."""
+    tabela = pacsv.read_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(column_names=["codigo", "nome"], encoding="latin-1"),
+        parse_options=pacsv.ParseOptions(delimiter=";"),
+        convert_options=pacsv.ConvertOptions(column_types={"codigo": pa.string(), "nome": pa.string()}),
+    )
+    return {
+        str(codigo).strip().zfill(4): str(nome).strip()
+        for codigo, nome in zip(tabela.column("codigo").to_pylist(), tabela.column("nome").to_pylist())
+        if codigo and nome
+    }
+
+
+# =========================
+#   Consulta local
+# =========================
+def receita_para_payload(
+    row: Dict[str, Any],
+    empresa: Optional[Dict[str, Any]] = None,
+    municipios: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Converte uma linha do ESTABELECIMENTO para as chaves que ``normalize_company``
+    já entende (mesmo formato aproximado da BrasilAPI).
+
+    ``empresa`` é a linha da tabela EMPRESAS da mesma raiz (razão social, capital)
+    e ``municipios`` o mapa código -> nome: o ESTABELECIMENTO só traz o código TOM.
+    """
+    data = {k: v for k, v in row.items() if v not in (None, "")}
+    for campo in COLUNAS_EMPRESA:
+        if empresa and empresa.get(campo) not in (None, ""):
+            data[campo] = empresa[campo]
+
+    codigo = only_digits(str(row.get("municipio") or ""))
+    if codigo:
+        nome = (municipios or {}).get(codigo.zfill(4))
+        if nome:
+            data["municipio"] = nome
+        else:
+            data.pop("municipio", None)  # código sem nome não serve como cidade
+            data["codigo_municipio"] = codigo.zfill(4)
+
+    if row.get("cnpj"):
+        cnpj_d = only_digits(str(row["cnpj"])).zfill(14)
+    else:
+        basico, ordem, dv = (only_digits(str(row.get(c) or "")) for c in COLUNAS_CHAVE)
+        cnpj_d = basico.zfill(8) + ordem.zfill(4) + dv.zfill(2)
+    data["cnpj"] = format_cnpj(cnpj_d)
+
+    situ = str(row.get("situacao_cadastral") or "").zfill(2)
+    if situ in SITUACAO_CADASTRAL:
+        data["descricao_situacao_cadastral"] = SITUACAO_CADASTRAL[situ]
+
+    abertura = str(row.get("data_inicio_atividade") or "")
+    if len(abertura) == 8 and abertura.isdigit():
+        data["data_inicio_atividade"] = f"{abertura[:4]}-{abertura[4:6]}-{abertura[6:]}"
+
+    tipo = row.get("tipo_logradouro")
+    logradouro = row.get("logradouro")
+    if logradouro:
+        data["logradouro"] = f"{tipo} {logradouro}".strip() if tipo else logradouro
+
+    if row.get("cnae_fiscal_principal"):
+        data["cnae_fiscal"] = row["cnae_fiscal_principal"]
+
+    return data
+
+
+def _chave_para_str(chave: int) -> str:
+    return str(int(chave)).zfill(14)
+
+
+class LocalCNPJIndex:
+    """
+    Backend offline de consulta de CNPJ sobre o ESTABELECIMENTO.parquet.
+
+    As chaves ficam em arrays NumPy memory-mapped; a busca é um
+    ``searchsorted`` e a leitura decodifica um único row group (pequeno, na
+    cópia reorganizada pelo build_index), guardado em um cache LRU limitado a
+    ``cache_bytes``.
+    """
+
+    def __init__(
+        self,
+        parquet_path: str | Path,
+        index_dir: Optional[str | Path] = None,
+        cache_bytes: int = CACHE_BYTES_PADRAO,
+        auto_build: bool = True,
+        empresas_path: Optional[str | Path] = None,
+        municipios_path: Optional[str | Path] = None,
+    ):
+        self.parquet_path = Path(parquet_path)
+        self.index_dir = Path(index_dir) if index_dir else default_index_dir(self.parquet_path)
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[int, pa.Table]" = OrderedDict()
+        self._cache_usado = 0
+
+        if self.is_stale():
+            if not auto_build:
+                raise FileNotFoundError(f"Índice ausente ou desatualizado em {self.index_dir}")
+            build_index(self.parquet_path, self.index_dir)
+
+        meta = json.loads((self.index_dir / "meta.json").read_text(encoding="utf-8"))
+        self.chaves = np.load(self.index_dir / "chaves.npy", mmap_mode="r")
+        self.row_groups = np.load(self.index_dir / "row_group.npy", mmap_mode="r")
+        self.offsets = np.load(self.index_dir / "offset.npy", mmap_mode="r")
+        self._pf = pq.ParquetFile(meta["dados"], memory_map=True)
+
+        # Razão social e nome do município vêm de outras tabelas da Receita;
+        # sem elas o payload sai parcial e o CNPJClient completa pelo HTTP.
+        empresas_path = Path(empresas_path) if empresas_path else self.parquet_path.with_name(EMPRESAS_PADRAO)
+        municipios_path = Path(municipios_path) if municipios_path else self.parquet_path.with_name(MUNICIPIOS_PADRAO)
+        self.empresas: Optional[LocalCNPJIndex] = None
+        self.municipios: Dict[str, str] = {}
+        if _colunas_chave(self._pf.schema_arrow) != ["cnpj_basico"]:  # o próprio índice da EMPRESAS não tem auxiliares
+            if empresas_path.exists():
+                self.empresas = LocalCNPJIndex(empresas_path, cache_bytes=cache_bytes, auto_build=auto_build)
+            if municipios_path.exists():
+                self.municipios = carregar_municipios(municipios_path)
+
+    def lookup_chave(self, chave: int) -> Optional[Dict[str, Any]]:
+        """Linha bruta pela chave numérica do índice (CNPJ de 14 dígitos ou raiz, na EMPRESAS)."""
+        pos = int(np.searchsorted(self.chaves, chave))
+        if pos >= len(self.chaves) or int(self.chaves[pos]) != chave:
+            return None
+        return self._ler_posicao(pos)
+
+    def is_stale(self) -> bool:
+        meta_path = self.index_dir / "meta.json"
+        if not meta_path.exists():
+            return True
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return meta.get("origem") != _assinatura(self.parquet_path)
+
+    def __len__(self) -> int:
+        return len(self.chaves)
+
+    def _row_group(self, rg: int) -> pa.Table:
+        tabela = self._cache.get(rg)
+        if tabela is not None:
+            self._cache.move_to_end(rg)
+            return tabela
+
+        tabela = self._pf.read_row_group(rg)
+        if tabela.nbytes > self.cache_bytes:
+            return tabela  # maior que o cache inteiro: usa e descarta
+        self._cache[rg] = tabela
+        self._cache_usado += tabela.nbytes
+        while self._cache_usado > self.cache_bytes:
+            _, antiga = self._cache.popitem(last=False)
+            self._cache_usado -= antiga.nbytes
+        return tabela
+
+    def _ler_posicao(self, pos: int) -> Dict[str, Any]:
+        tabela = self._row_group(int(self.row_groups[pos]))
+        return tabela.slice(int(self.offsets[pos]), 1).to_pylist()[0]
+
+    def lookup(self, cnpj: str) -> Optional[Dict[str, Any]]:
+        """Retorna a linha bruta do estabelecimento ou None se não estiver na base."""
+        cnpj_d = only_digits(cnpj)
+        if len(cnpj_d) != 14:
+            return None
+
+        return self.lookup_chave(int(cnpj_d))
+
+    def lookup_root(self, raiz: str) -> List[Dict[str, Any]]:
+        """Retorna todos os estabelecimentos (matriz e filiais) de uma raiz de 8 dígitos."""
+        raiz_d = only_digits(raiz)[:8]
+        if len(raiz_d) != 8:
+            return []
+
+        inicio = int(raiz_d) * 1_000_000
+        ini = int(np.searchsorted(self.chaves, inicio, side="left"))
+        fim = int(np.searchsorted(self.chaves, inicio + 1_000_000, side="left"))
+        return [self._ler_posicao(p) for p in range(ini, fim)]
+
+    def fetch(self, cnpj: str) -> FetchResult:
+        """Interface de provedor compatível com ``CNPJClient.fetch``."""
+        row = self.lookup(cnpj)
+        if row is None:
+            return FetchResult(FONTE_LOCAL, 404, None, "CNPJ não encontrado na base local")
+        empresa = self.empresas.lookup_chave(int(only_digits(cnpj)[:8])) if self.empresas else None
+        return FetchResult(FONTE_LOCAL, 200, receita_para_payload(row, empresa, self.municipios), None)
+
+
+# =========================
+#   CLI
+# =========================
+def _benchmark(idx: LocalCNPJIndex, n: int) -> None:
+    if not len(idx):
+        print("Índice vazio, nada a medir.")
+        return
+
+    rng = np.random.default_rng(42)
+    amostra = [_chave_para_str(idx.chaves[p]) for p in rng.integers(0, len(idx), size=n)]
+
+    t0 = time.perf_counter()
+    for c in amostra:
+        idx.lookup(c)
+    dt = time.perf_counter() - t0
+    print(f"{n} consultas em {dt:.3f}s ({n / dt:,.0f} consultas/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Índice local de CNPJ sobre o ESTABELECIMENTO.parquet da Receita")
+    parser.add_argument("parquet", nargs="?", default="ESTABELECIMENTO.parquet")
+    parser.add_argument("--index-dir", default=None)
+    parser.add_argument("--reorganizar", action=argparse.BooleanOptionalAction, default=None,
+                        help="grava cópia com row groups pequenos (padrão: só se os row groups forem grandes)")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N", help="mede N consultas aleatórias")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    destino = build_index(args.parquet, args.index_dir, reorganizar=args.reorganizar)
+    print(f"✅ Índice gerado em {destino} ({time.perf_counter() - t0:.1f}s)")
+
+    if args.benchmark:
+        _benchmark(LocalCNPJIndex(args.parquet, destino, auto_build=False), args.benchmark)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# =========================
+#   Configurações
+# =========================
+# Regra de coluna: (termos que o nome normalizado precisa conter, nome final)
+RegraColuna = Tuple[Tuple[str, ...], str]
+
+
+# =========================
+#   Helpers
+# =========================
+def normalizar_nome(nome) -> str:
+    """Maiúsculo, sem acento e com espaços simples: 'Capacidade  Média ' -> 'CAPACIDADE MEDIA'."""
+    texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(texto.upper().split())
+
+
+def selecionar_abas(
+    nomes: Sequence[str],
+    abas: Optional[Sequence[str]] = None,
+    prefixos: Optional[Sequence[str]] = None,
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    [(rótulo, nome real da aba)] comparando nomes normalizados.
+
+    - ``abas``: lista pedida, na ordem pedida; o rótulo é o nome pedido e o
+      nome real é None quando a aba não existe.
+    - ``prefixos``: abas do arquivo (na ordem do arquivo) que começam com algum
+      dos prefixos; o rótulo é o nome real.
+    - sem nenhum dos dois: todas as abas.
+    """
+    reais = {normalizar_nome(n): n for n in nomes}
+    if abas is not None:
+        return [(aba, reais.get(normalizar_nome(aba))) for aba in abas]
+    if prefixos is not None:
+        chaves = tuple(normalizar_nome(p) for p in prefixos)
+        return [(n, n) for n in nomes if normalizar_nome(n).startswith(chaves)]
+    return [(n, n) for n in nomes]
+
+
+class AlinhadorColunas:
+    """
+    Alinha os esquemas das abas por um mapa de nomes normalizados.
+
+    Cada coluna recebe o nome final da primeira ``regra`` cujos termos estão
+    todos no nome normalizado; sem regra, variações de caixa/acento/espaço de
+    uma coluna já vista recebem a grafia da primeira ocorrência. Dentro de uma
+    aba, só a primeira coluna de cada nome final é mantida.
+    """
+
+    def __init__(self, regras: Sequence[RegraColuna] = ()):
+        self.regras = [(tuple(normalizar_nome(t) for t in termos), final) for termos, final in regras]
+        self.canonicos: Dict[str, str] = {}
+
+    def nome_final(self, coluna) -> str:
+        chave = normalizar_nome(coluna)
+        for termos, final in self.regras:
+            if all(t in chave for t in termos):
+                return final
+        return self.canonicos.setdefault(chave, str(coluna).strip())
+
+    def alinhar(self, df: pd.DataFrame) -> pd.DataFrame:
+        nomes = [self.nome_final(c) for c in df.columns]
+        df = df.set_axis(nomes, axis=1)
+        return df.loc[:, ~df.columns.duplicated()]
+
+
+# =========================
+#   Leitura (uma abertura por arquivo)
+# =========================
+def ler_abas_arquivo(
+    caminho: str | Path,
+    abas: Optional[Sequence[str]] = None,
+    prefixos: Optional[Sequence[str]] = None,
+) -> List[Tuple[str, Optional[pd.DataFrame]]]:
+    """Abre o arquivo uma vez e lê todas as abas selecionadas pelo mesmo handle."""
+    with pd.ExcelFile(caminho) as xls:
+        return [
+            (rotulo, xls.parse(real) if real is not None else None)
+            for rotulo, real in selecionar_abas(xls.sheet_names, abas, prefixos)
+        ]
+
+
+def _ler_arquivo(args):
+    caminho, abas, prefixos = args
+    t0 = time.perf_counter()
+    return str(caminho), ler_abas_arquivo(caminho, abas, prefixos), time.perf_counter() - t0
+
+
+def consolidar_abas(
+    arquivos: Sequence[str | Path],
+    abas: Optional[Sequence[str]] = None,
+    prefixos: Optional[Sequence[str]] = None,
+    regras: Sequence[RegraColuna] = (),
+    colunas: Optional[Sequence[str]] = None,
+    coluna_origem: Optional[str] = "Aba_Origem",
+    coluna_arquivo: Optional[str] = "Arquivo_Origem",
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Empilha as abas selecionadas de um ou mais arquivos em uma tabela.
+
+    Cada arquivo é aberto uma vez (todas as abas saem do mesmo handle) e
+    arquivos diferentes são lidos em processos paralelos. Os esquemas são
+    alinhados com AlinhadorColunas, na ordem dos arquivos e das abas.
+    ``colunas`` restringe (e ordena) as colunas mantidas de cada aba, comparando
+    nomes normalizados e usando a grafia pedida; ``coluna_arquivo`` só é criada
+    quando há mais de um arquivo.
+    """
+    tarefas = [(arquivo, abas, prefixos) for arquivo in arquivos]
+    if len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            lidos = list(pool.map(_ler_arquivo, tarefas))
+    else:
+        lidos = [_ler_arquivo(t) for t in tarefas]
+
+    alinhador = AlinhadorColunas(regras)
+    if colunas is not None:
+        # as colunas pedidas definem a grafia final, qualquer que seja a da 1ª aba
+        colunas = [alinhador.nome_final(c) for c in colunas]
+    partes = []
+    for caminho, lidas, segundos in lidos:
+        nome_arquivo = Path(caminho).name
+        print(f"📂 {nome_arquivo}: {sum(df is not None for _, df in lidas)} aba(s) lidas em uma abertura ({segundos:.1f}s)")
+        for rotulo, df in lidas:
+            if df is None:
+                print(f"⚠️ Aba {rotulo} não encontrada em {nome_arquivo}. Verifique se há espaços extras no Excel.")
+                continue
+            print(f"-> {rotulo}: {len(df)} linhas")
+            df = alinhador.alinhar(df)
+            if colunas is not None:
+                df = df[[c for c in colunas if c in df.columns]]
+            if coluna_origem:
+                df = df.assign(**{coluna_origem: rotulo})
+            if coluna_arquivo and len(arquivos) > 1:
+                df = df.assign(**{coluna_arquivo: nome_arquivo})
+            partes.append(df)
+
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True)
+
+
+# =========================
+#   Benchmark
+# =========================
+def _pasta_sintetica(destino: Path, abas: int, linhas: int) -> List[str]:
+    rng = np.random.default_rng(0)
+    nomes = [f"MES{i + 1:02d}" for i in range(abas)]
+    with pd.ExcelWriter(destino, engine="xlsxwriter") as writer:
+        for i, nome in enumerate(nomes):
+            pd.DataFrame({
+                "Data": pd.date_range("2025-01-01", periods=linhas, freq="h"),
+                # grafias variando entre abas, como nas planilhas manuais
+                "Linha" if i % 2 else " LINHA ": rng.integers(1, 5, linhas),
+                "Capacidade Produtiva Média" if i % 3 else "Capacidade  produtiva media": rng.random(linhas) * 100,
+                "Tipo produção": rng.choice(["A", "B", "C"], linhas),
+            }).to_excel(writer, sheet_name=nome, index=False)
+    return nomes
+
+
+def _benchmark(abas: int, linhas: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = Path(tmp) / "mensal.xlsx"
+        nomes = _pasta_sintetica(arquivo, abas, linhas)
+
+        t0 = time.perf_counter()
+        pd.read_excel(arquivo, sheet_name=None)
+        t_uma_leitura = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        antigo = pd.concat([pd.read_excel(arquivo, sheet_name=n) for n in nomes], ignore_index=True)
+        t_antigo = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        novo = consolidar_abas([arquivo], abas=nomes)
+        t_novo = time.perf_counter() - t0
+
+    print(f"\n[BENCHMARK] {abas} abas x {linhas} linhas")
+    print(f"  uma leitura do arquivo inteiro:      {t_uma_leitura:6.2f}s")
+    print(f"  read_excel por aba (como antes):     {t_antigo:6.2f}s  ({len(antigo.columns)} colunas desalinhadas)")
+    print(f"  consolidar_abas (uma abertura):      {t_novo:6.2f}s  ({len(novo.columns)} colunas)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Empilha abas de uma ou mais pastas de trabalho")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--abas", type=int, default=12)
+    parser.add_argument("--linhas", type=int, default=5000)
+    args = parser.parse_args()
+    if args.benchmark:
+        _benchmark(args.abas, args.linhas)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
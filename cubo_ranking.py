@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# =========================
+#   Configurações
+# =========================
+NIVEL_TODOS = "(TODOS)"          # valor da dimensão no nível "sem filtro"
+COLUNA_ESTOQUE = "SO_COM_ESTOQUE"
+VERSAO_CUBO = 1
+# textos que o astype(str).str.upper() deixa no lugar de valores vazios
+VALORES_VAZIOS = {"", "NAN", "NONE", "NAT", "<NA>"}
+CARACTERES_PROIBIDOS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+# =========================
+#   Helpers
+# =========================
+def assinatura_arquivo(caminho: str | Path) -> Dict[str, float]:
+    st = os.stat(caminho)
+    return {"arquivo": os.path.abspath(caminho), "tamanho": st.st_size, "mtime": st.st_mtime}
+
+
+def trecho_nome_arquivo(valor) -> str:
+    """Valor de filtro usado em nome de arquivo, sem separadores de caminho nem caracteres proibidos."""
+    return CARACTERES_PROIBIDOS.sub("_", str(valor).strip()).strip(" .") or "_"
+
+
+def _conjuntos_agrupamento(dimensoes: Sequence[str]):
+    """Todas as combinações de dimensões filtradas (do cubo inteiro ao nível "todos")."""
+    for k in range(len(dimensoes), -1, -1):
+        yield from itertools.combinations(dimensoes, k)
+
+
+def _candidatos_top(grupo: np.ndarray, valores: np.ndarray, top: int) -> np.ndarray:
+    """
+    Posições que podem entrar no top-N do seu grupo: grupos pequenos entram
+    inteiros; nos grandes, argpartition acha o N-ésimo maior valor sem ordenar
+    o grupo e ficam os itens >= ele (empates incluídos, para o rank denso).
+    """
+    ordem = np.argsort(grupo, kind="stable")
+    g = grupo[ordem]
+    v = valores[ordem]
+    inicios = np.flatnonzero(np.r_[True, g[1:] != g[:-1]]) if len(g) else np.empty(0, dtype=np.int64)
+    fins = np.r_[inicios[1:], len(g)]
+
+    manter = np.ones(len(g), dtype=bool)
+    for ini, fim in zip(inicios[fins - inicios > top], fins[fins - inicios > top]):
+        bloco = v[ini:fim]
+        corte = bloco[np.argpartition(-bloco, top - 1)[top - 1]]
+        manter[ini:fim] = bloco >= corte
+    return ordem[manter]
+
+
+# =========================
+#   Construção
+# =========================
+def construir_cubo(
+    df: pd.DataFrame,
+    dimensoes: Sequence[str],
+    produto: Sequence[str],
+    categoria: str,
+    medida: str,
+    top: int,
+    desempate: Sequence[str] = (),
+    estoque: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """
+    Top-``top`` de ``produto`` por ``categoria`` para toda combinação de valores
+    de ``dimensoes`` (cada uma também no nível NIVEL_TODOS).
+
+    - A base é agregada uma vez no grão mais fino (dimensões + categoria +
+      produto); cada conjunto de agrupamento reagrega essa base, não as vendas.
+    - ``estoque`` (máscara booleana das linhas com estoque) gera a segunda fatia
+      do cubo, SO_COM_ESTOQUE=True.
+    - RANKING é sequencial (medida desc, depois ``desempate``); RANK_DENSO é o
+      rank denso da medida no mesmo grupo.
+    """
+    chaves_finas = [*dimensoes, categoria, *produto]
+    # Produto/categoria vazios saem (como no groupby dos relatórios); dimensão vazia
+    # continua contando nos níveis NIVEL_TODOS
+    validas = df[[categoria, *produto]].notna().all(axis=1).to_numpy()
+    fatias = [(False, df[validas])]
+    if estoque is not None:
+        fatias.append((True, df[validas & estoque.to_numpy(dtype=bool)]))
+
+    partes = []
+    for so_estoque, dados in fatias:
+        base = dados.groupby(chaves_finas, sort=False, dropna=False)[medida].sum().reset_index()
+        for conjunto in _conjuntos_agrupamento(dimensoes):
+            agg = base.groupby([*conjunto, categoria, *produto], sort=False, dropna=False)[medida].sum().reset_index()
+            for dim in dimensoes:
+                if dim not in conjunto:
+                    agg[dim] = NIVEL_TODOS
+            agg[COLUNA_ESTOQUE] = so_estoque
+            partes.append(agg)
+
+    colunas = [COLUNA_ESTOQUE, *dimensoes, categoria, *produto, medida, "RANKING", "RANK_DENSO"]
+    cubo = pd.concat(partes, ignore_index=True)
+    if cubo.empty:
+        return cubo.assign(RANKING=pd.Series(dtype=np.int32), RANK_DENSO=pd.Series(dtype=np.int32))[colunas]
+
+    grupo_cols = [COLUNA_ESTOQUE, *dimensoes, categoria]
+    grupo = cubo.groupby(grupo_cols, sort=False, dropna=False).ngroup().to_numpy()
+    valores = cubo[medida].to_numpy(dtype=np.float64)
+
+    cand = _candidatos_top(grupo, valores, top)
+    cubo = cubo.iloc[cand].reset_index(drop=True)
+    grupo, valores = grupo[cand], valores[cand]
+
+    # Ordem final: grupo, medida desc, desempate (lexsort: última chave é a principal)
+    chaves = [pd.factorize(cubo[c], sort=True)[0] for c in reversed(list(desempate))]
+    ordem = np.lexsort([*chaves, -valores, grupo])
+    cubo = cubo.iloc[ordem].reset_index(drop=True)
+    grupo, valores = grupo[ordem], valores[ordem]
+
+    novo_grupo = np.r_[True, grupo[1:] != grupo[:-1]]
+    inicio = np.maximum.accumulate(np.where(novo_grupo, np.arange(len(grupo)), 0))
+    cubo["RANKING"] = (np.arange(len(grupo)) - inicio + 1).astype(np.int32)
+    mudou = novo_grupo | np.r_[True, valores[1:] != valores[:-1]]
+    denso = np.cumsum(mudou)
+    cubo["RANK_DENSO"] = (denso - denso[inicio] + 1).astype(np.int32)
+
+    cubo = cubo[cubo["RANKING"] <= top].reset_index(drop=True)
+    return cubo[colunas]
+
+
+# =========================
+#   Persistência (Parquet)
+# =========================
+def salvar_cubo(cubo: pd.DataFrame, caminho: str | Path, metadados: dict) -> Path:
+    """Parquet com dimensões em dicionário (categorias) e os metadados de origem no schema."""
+    caminho = Path(caminho)
+    compacto = cubo.copy()
+    for col in compacto.columns:
+        if compacto[col].dtype == object or pd.api.types.is_string_dtype(compacto[col]):
+            # códigos mistos (número e texto) viram texto para caber numa coluna Parquet
+            compacto[col] = compacto[col].astype(str).astype("category")
+
+    tabela = pa.Table.from_pandas(compacto, preserve_index=False)
+    meta = dict(tabela.schema.metadata or {})
+    meta[b"cubo_ranking"] = json.dumps({"versao": VERSAO_CUBO, **metadados}, ensure_ascii=False).encode("utf-8")
+    temporario = caminho.with_suffix(".tmp")
+    pq.write_table(tabela.replace_schema_metadata(meta), temporario, compression="zstd")
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def ler_metadados(caminho: str | Path) -> Optional[dict]:
+    try:
+        meta = pq.read_schema(caminho).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    bruto = meta.get(b"cubo_ranking")
+    if not bruto:
+        return None
+    dados = json.loads(bruto)
+    return dados if dados.get("versao") == VERSAO_CUBO else None
+
+
+def carregar_cubo(caminho: str | Path) -> pd.DataFrame:
+    cubo = pd.read_parquet(caminho)
+    for col in cubo.columns:
+        if isinstance(cubo[col].dtype, pd.CategoricalDtype):
+            cubo[col] = cubo[col].astype(str)
+    return cubo
+
+
+def cubo_atualizado(caminho: str | Path, metadados: dict) -> bool:
+    """Cubo existe e foi gerado a partir da mesma origem/parâmetros."""
+    salvos = ler_metadados(caminho) if os.path.exists(caminho) else None
+    # compara já na forma do JSON (chaves int viram str, tuplas viram listas)
+    esperados = json.loads(json.dumps(metadados, ensure_ascii=False))
+    return salvos is not None and all(salvos.get(k) == v for k, v in esperados.items())
+
+
+def obter_cubo(caminho: str | Path, metadados: dict, construir, forcar: bool = False,
+               descricao: str = "Cubo de ranking") -> pd.DataFrame:
+    """Lê o cubo salvo ou chama ``construir()`` e grava, se a origem mudou."""
+    if not forcar and cubo_atualizado(caminho, metadados):
+        t0 = time.perf_counter()
+        cubo = carregar_cubo(caminho)
+        print(f"🧊 {descricao} lido de '{caminho}' ({len(cubo)} linhas, {time.perf_counter() - t0:.2f}s)")
+        return cubo
+
+    t0 = time.perf_counter()
+    cubo = construir()
+    salvar_cubo(cubo, caminho, metadados)
+    print(f"🧊 {descricao} gerado: {len(cubo)} linhas em {time.perf_counter() - t0:.1f}s "
+          f"({os.path.getsize(caminho) / 1e6:.1f} MB em '{caminho}')")
+    # relido do Parquet: mesmos tipos (colunas de texto como str) que nas execuções seguintes
+    return carregar_cubo(caminho)
+
+
+# =========================
+#   Consulta
+# =========================
+def consultar_cubo(
+    cubo: pd.DataFrame,
+    dimensoes: Sequence[str],
+    filtros: Dict[str, str],
+    categoria_col: str,
+    categoria: Optional[str] = None,
+    so_com_estoque: bool = False,
+    top_n: Optional[int] = None,
+) -> pd.DataFrame:
+    """Fatia do cubo para a combinação pedida (dimensão sem filtro = NIVEL_TODOS)."""
+    mascara = cubo[COLUNA_ESTOQUE].to_numpy() == so_com_estoque
+    for dim in dimensoes:
+        valor = str(filtros.get(dim) or "").upper().strip() or NIVEL_TODOS
+        mascara &= cubo[dim].to_numpy() == valor
+    if categoria:
+        mascara &= cubo[categoria_col].to_numpy() == str(categoria).upper().strip()
+    if top_n:
+        mascara &= cubo["RANKING"].to_numpy() <= top_n
+    return cubo[mascara].reset_index(drop=True)
+
+
+def combinacoes_filtro(cubo: pd.DataFrame, dimensoes: Sequence[str]) -> list:
+    """
+    Todas as combinações de filtro que o cubo guarda (geral, cada dimensão sozinha e os
+    cruzamentos, ex.: UF × Região × Inside Sales): [{dim: valor, ...}, ...].
+    Só entram combinações com linhas no cubo; níveis vazios ("NAN" etc.) ficam de fora:
+    não são um filtro que alguém escolheria.
+    """
+    dimensoes = list(dimensoes)
+    niveis = cubo[dimensoes].drop_duplicates()
+    vazio = np.zeros(len(niveis), dtype=bool)
+    for dim in dimensoes:
+        valores = niveis[dim].astype(str).str.strip().str.upper()
+        vazio |= niveis[dim].isna().to_numpy() | valores.isin(VALORES_VAZIOS).to_numpy()
+
+    combinacoes = {(): {}}
+    for linha in niveis[~vazio].itertuples(index=False, name=None):
+        filtros = {dim: v for dim, v in zip(dimensoes, linha) if v != NIVEL_TODOS}
+        combinacoes[tuple(filtros.items())] = filtros
+    # geral, depois uma dimensão, depois cruzamentos; na ordem das dimensões e dos valores
+    return sorted(combinacoes.values(), key=lambda f: (
+        len(f), [dim not in f for dim in dimensoes], [str(f.get(dim, "")) for dim in dimensoes]))
+
+
+def rotulo_filtros(filtros: Dict[str, str], dimensoes: Sequence[str], padrao: str = "GERAL") -> str:
+    """Trecho de nome de arquivo com os valores filtrados, na ordem das dimensões."""
+    partes = [trecho_nome_arquivo(filtros[dim]) for dim in dimensoes if filtros.get(dim)]
+    return "_".join(partes) or padrao
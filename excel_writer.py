@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import datetime as dt
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from xlsxwriter.utility import xl_col_to_name as xl_col
+
+
+# =========================
+#   Padrão visual (Calibri 9, cabeçalho preto)
+# =========================
+FMT_BASE = {"font_name": "Calibri", "font_size": 9, "valign": "vcenter"}
+FMT_CABECALHO = {**FMT_BASE, "bold": True, "bg_color": "#000000", "font_color": "#FFFFFF", "align": "center", "border": 1}
+
+FORMATOS_NUMERO = {
+    "moeda": "R$ #,##0.00",
+    "percentual": "0.00%",
+    "data": "DD/MM/YYYY",
+    "data_hora": "DD/MM/YYYY HH:MM:SS",
+    "hora": "HH:MM:SS",
+    "inteiro": "#,##0",
+    "decimal": "#,##0.00",
+}
+
+LARGURA_MAXIMA = 50
+AMOSTRA_LARGURA = 1000
+LIMITE_LINHAS_EXCEL = 1_048_576   # linhas por aba no .xlsx, cabeçalho incluído
+
+
+# =========================
+#   Helpers
+# =========================
+def num_format(formato: Optional[str]) -> Optional[str]:
+    """Aceita um apelido de FORMATOS_NUMERO ou um num_format do Excel."""
+    if not formato:
+        return None
+    return FORMATOS_NUMERO.get(formato, formato)
+
+
+def _tipo_temporal(serie: pd.Series) -> Optional[str]:
+    """"datetime64", "datetime", "date" ou "time" para colunas de data/hora; None nas demais."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return "datetime64"
+    if serie.dtype != object:
+        return None
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+    return tipo if tipo in ("datetime", "date", "time") else None
+
+
+def _tem_horario(datas: pd.Series) -> bool:
+    datas = datas.dropna()
+    return bool((datas != datas.dt.normalize()).any())
+
+
+def inferir_formato(serie: pd.Series) -> Optional[str]:
+    """
+    Formato da coluna a partir do dtype (uma vez por coluna). Só datas e horas
+    ganham formato automático: números ficam no Geral, como o pandas grava
+    (códigos numéricos não ganham separador de milhar). Datas com horário fora
+    da meia-noite usam "data_hora", como o pandas/openpyxl exibiam.
+    """
+    tipo = _tipo_temporal(serie)
+    if tipo == "time":
+        return "hora"
+    if tipo == "date":
+        return "data"
+    if tipo == "datetime":
+        serie = pd.to_datetime(serie, errors="coerce")
+    if tipo in ("datetime", "datetime64"):
+        return "data_hora" if _tem_horario(serie) else "data"
+    return None
+
+
+def larguras_por_amostra(
+    df: pd.DataFrame,
+    folga: int = 3,
+    largura_max: int = LARGURA_MAXIMA,
+    amostra: int = AMOSTRA_LARGURA,
+) -> List[int]:
+    """Largura de cada coluna pelo maior texto de uma amostra (não varre o arquivo inteiro)."""
+    if len(df) > amostra:
+        df = pd.concat([df.head(amostra // 2), df.sample(amostra // 2, random_state=0)])
+
+    larguras = []
+    for col in df.columns:
+        tamanho = df[col].astype(str).str.len().max() if len(df) else 0
+        # coluna toda vazia: no pandas 3 o astype(str) mantém NaN e o max() vira NaN
+        tamanho = max(0 if pd.isna(tamanho) else int(tamanho), len(str(col)))
+        larguras.append(min(tamanho + folga, largura_max))
+    return larguras
+
+
+EPOCA_EXCEL = pd.Timestamp("1899-12-30")
+
+
+def valores_para_escrita(serie: pd.Series) -> np.ndarray:
+    """
+    Converte a coluna para objetos Python aceitos pelo xlsxwriter (NaN/NaT -> None).
+    Datas e horas (datetime64 ou objetos date/datetime/time) viram o número
+    serial do Excel; o num_format da coluna faz a exibição (evita a conversão
+    valor a valor do xlsxwriter, que sem formato deixaria só o número).
+    """
+    tipo = _tipo_temporal(serie)
+    if tipo == "time":
+        segundos = [None if pd.isna(t) else t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+                    for t in serie]
+        valores = (pd.Series(segundos, index=serie.index, dtype=float) / 86400).to_numpy(dtype=object)
+    elif tipo is not None:
+        datas = serie if tipo == "datetime64" else pd.to_datetime(serie, errors="coerce")
+        if getattr(datas.dt, "tz", None) is not None:
+            datas = datas.dt.tz_localize(None)
+        seriais = (datas - EPOCA_EXCEL) / pd.Timedelta(days=1)
+        valores = seriais.to_numpy(dtype=object)
+    else:
+        valores = serie.to_numpy(dtype=object, copy=True)
+    valores[pd.isna(serie).to_numpy()] = None
+    return valores
+
+
+def adicionar_tabela(ws, colunas: Sequence, ultima_linha: int, fmt_cabecalho) -> bool:
+    """
+    Declara A1:<ultima_linha> como tabela do Excel. Exige workbook sem
+    constant_memory (o xlsxwriter recusa add_table em streaming).
+    Devolve False quando o Excel não aceitaria a tabela (ex.: cabeçalhos repetidos).
+    """
+    retorno = ws.add_table(0, 0, ultima_linha, len(colunas) - 1, {
+        "columns": [{"header": str(c), "header_format": fmt_cabecalho} for c in colunas],
+        "style": None,
+    })
+    return retorno in (None, 0)
+
+
+# =========================
+#   Writer compartilhado
+# =========================
+def escrever_excel_formatado(
+    df: pd.DataFrame,
+    caminho: str | Path,
+    aba: str = "Dados",
+    formatos: Optional[Dict[str, str]] = None,
+    alinhamento: str = "center",
+    texto_longo_esquerda: Optional[int] = 15,
+    tabela: bool = False,
+    autofiltro: bool = False,
+    congelar_cabecalho: bool = False,
+    folga_largura: int = 3,
+    largura_max: int = LARGURA_MAXIMA,
+    largura_fixa: Optional[int] = None,
+    constant_memory: bool = True,
+    mostrar_grade: bool = False,
+) -> Path:
+    """
+    Grava ``df`` já formatado em uma única passada com xlsxwriter.
+
+    - formatos: {coluna: apelido de FORMATOS_NUMERO ou num_format}; colunas sem
+      entrada usam o formato inferido pelo dtype.
+    - texto_longo_esquerda: colunas cujo texto (amostrado) passa desse tamanho
+      ficam alinhadas à esquerda; None mantém tudo em ``alinhamento``.
+    - tabela: os dados viram uma tabela do Excel (com filtro próprio). O
+      xlsxwriter não cria tabelas em constant_memory, então com tabela o
+      arquivo é montado em memória (como em exportar_relatorio).
+    - autofiltro / congelar_cabecalho: opcionais, desligados por padrão.
+
+    Em constant_memory (padrão) as linhas são emitidas em ordem e descartadas,
+    então a memória não depende do número de linhas. Relatórios com linha de
+    TOTAL e destaques condicionais usam exportar_relatorio.
+    """
+    caminho = Path(caminho)
+    formatos = formatos or {}
+
+    wb = xlsxwriter.Workbook(
+        str(caminho),
+        {"constant_memory": constant_memory and not tabela, "nan_inf_to_errors": True, "strings_to_numbers": False},
+    )
+    ws = wb.add_worksheet(aba[:31])
+    if not mostrar_grade:
+        ws.hide_gridlines(2)
+
+    n_linhas, n_cols = df.shape
+    larguras = larguras_por_amostra(df, folga=folga_largura, largura_max=largura_max)
+    texto_longo = [
+        texto_longo_esquerda is not None and largura - folga_largura > texto_longo_esquerda
+        for largura in larguras
+    ]
+    if largura_fixa is not None:
+        larguras = [largura_fixa] * n_cols
+    fmt_cabecalho = wb.add_format(FMT_CABECALHO)
+
+    # Formato por coluna (uma vez), aplicado a cada célula da coluna
+    fmts_coluna = []
+    for i, col in enumerate(df.columns):
+        props = {**FMT_BASE, "align": alinhamento}
+        nf = num_format(formatos.get(col) or inferir_formato(df[col]))
+        if nf:
+            props["num_format"] = nf
+        elif texto_longo[i]:
+            props["align"] = "left"
+        fmt = wb.add_format(props)
+        fmts_coluna.append(fmt)
+        ws.set_column(i, i, larguras[i], fmt)
+
+    com_tabela = tabela and n_cols and adicionar_tabela(ws, df.columns, max(n_linhas, 1), fmt_cabecalho)
+    ws.write_row(0, 0, [str(c) for c in df.columns], fmt_cabecalho)
+
+    colunas = [valores_para_escrita(df[col]) for col in df.columns]
+    for linha, valores in enumerate(zip(*colunas), start=1):
+        for c, valor in enumerate(valores):
+            if valor is not None:
+                ws.write(linha, c, valor, fmts_coluna[c])
+
+    if autofiltro and n_cols and not com_tabela:
+        ws.autofilter(0, 0, max(n_linhas, 1), n_cols - 1)
+
+    if congelar_cabecalho:
+        ws.freeze_panes(1, 0)
+
+    wb.close()
+    return caminho
+
+
+def escrever_excel_em_blocos(
+    blocos: Iterable[pd.DataFrame],
+    caminho: str | Path,
+    aba: str = "Dados",
+    formatos: Optional[Dict[str, str]] = None,
+    alinhamento: str = "center",
+    texto_longo_esquerda: Optional[int] = 15,
+    autofiltro: bool = False,
+    congelar_cabecalho: bool = False,
+    folga_largura: int = 3,
+    largura_max: int = LARGURA_MAXIMA,
+    linhas_por_aba: int = LIMITE_LINHAS_EXCEL - 1,
+    mostrar_grade: bool = False,
+) -> List[Tuple[str, int]]:
+    """
+    Versão em blocos de escrever_excel_formatado para arquivos maiores que a
+    memória: cada bloco (ex.: ``pd.read_csv(..., chunksize=...)``) é gravado
+    em constant_memory e descartado.
+
+    - Larguras e formatos saem do primeiro bloco; os demais devem ter as
+      mesmas colunas (dtypes explícitos na leitura evitam tipos trocados).
+    - Ao chegar em ``linhas_por_aba`` linhas de dados, uma nova aba
+      "<aba> (2)", "<aba> (3)"... é aberta com o mesmo cabeçalho.
+
+    Devolve [(nome da aba, linhas de dados)].
+    """
+    caminho = Path(caminho)
+    formatos = formatos or {}
+
+    wb = xlsxwriter.Workbook(
+        str(caminho),
+        {"constant_memory": True, "nan_inf_to_errors": True, "strings_to_numbers": False},
+    )
+    fmt_cabecalho = wb.add_format(FMT_CABECALHO)
+    abas: List[list] = []   # [nome, worksheet, linhas de dados]
+    colunas: List = []
+    larguras: List[int] = []
+    fmts_coluna: List = []
+
+    def nova_aba():
+        sufixo = f" ({len(abas) + 1})" if abas else ""
+        nome = aba[:31 - len(sufixo)] + sufixo
+        ws = wb.add_worksheet(nome)
+        if not mostrar_grade:
+            ws.hide_gridlines(2)
+        for i, largura in enumerate(larguras):
+            ws.set_column(i, i, largura, fmts_coluna[i])
+        ws.write_row(0, 0, [str(c) for c in colunas], fmt_cabecalho)
+        if congelar_cabecalho:
+            ws.freeze_panes(1, 0)
+        abas.append([nome, ws, 0])
+
+    for bloco in blocos:
+        if not abas:
+            colunas = list(bloco.columns)
+            larguras = larguras_por_amostra(bloco, folga=folga_largura, largura_max=largura_max)
+            for i, col in enumerate(colunas):
+                props = {**FMT_BASE, "align": alinhamento}
+                nf = num_format(formatos.get(col) or inferir_formato(bloco[col]))
+                if nf:
+                    props["num_format"] = nf
+                elif texto_longo_esquerda is not None and larguras[i] - folga_largura > texto_longo_esquerda:
+                    props["align"] = "left"
+                fmts_coluna.append(wb.add_format(props))
+            nova_aba()
+
+        valores = [valores_para_escrita(bloco[col]) for col in colunas]
+        inicio = 0
+        while inicio < len(bloco):
+            if abas[-1][2] >= linhas_por_aba:
+                nova_aba()
+            _, ws, usadas = abas[-1]
+            fim = min(len(bloco), inicio + linhas_por_aba - usadas)
+            for linha, linha_valores in enumerate(zip(*(v[inicio:fim] for v in valores)), start=usadas + 1):
+                for c, valor in enumerate(linha_valores):
+                    if valor is not None:
+                        ws.write(linha, c, valor, fmts_coluna[c])
+            abas[-1][2] = usadas + fim - inicio
+            inicio = fim
+
+    if not abas:
+        nova_aba()
+    if autofiltro and colunas:
+        for _, ws, linhas in abas:
+            ws.autofilter(0, 0, max(linhas, 1), len(colunas) - 1)
+
+    wb.close()
+    return [(nome, linhas) for nome, _, linhas in abas]
+
+
+# =========================
+#   Exportador vetorizado (relatórios com linha de TOTAL)
+# =========================
+SUBTOTAL_SOMA = 109   # SUM ignorando linhas ocultas/filtradas
+SUBTOTAL_MEDIA = 101  # AVERAGE ignorando linhas ocultas/filtradas
+
+
+def exportar_relatorio(
+    df: pd.DataFrame,
+    caminho: str | Path,
+    aba: str = "Sheet1",
+    formatos: Optional[Dict[str, str]] = None,
+    total_soma: Sequence[str] = (),
+    total_media: Sequence[str] = (),
+    rotulo_total: Optional[str] = None,
+    coluna_rotulo: Optional[str] = None,
+    formatos_condicionais: Optional[Dict[str, Sequence[Dict[str, Any]]]] = None,
+    folga_largura: int = 2,
+    largura_fixa: Optional[int] = None,
+    mostrar_grade: bool = True,
+) -> Path:
+    """
+    Exporta ``df`` coluna a coluna (``write_column``) com o formato de cada coluna
+    decidido uma única vez, destaques como formatação condicional nativa e a linha
+    de TOTAL como fórmulas ``SUBTOTAL`` (com o valor já calculado em cache).
+
+    - total_soma / total_media: colunas totalizadas com SUBTOTAL(109) / SUBTOTAL(101).
+    - rotulo_total / coluna_rotulo: texto da linha de total (padrão: 1ª coluna).
+    - formatos_condicionais: {coluna: [regras do conditional_format]}; células
+      vazias ficam sem destaque (o Excel as trata como 0 em ``cell < x``).
+    """
+    caminho = Path(caminho)
+    formatos = formatos or {}
+    formatos_condicionais = formatos_condicionais or {}
+
+    # write_column não é compatível com constant_memory (escrita fora de ordem)
+    wb = xlsxwriter.Workbook(str(caminho), {"nan_inf_to_errors": True, "strings_to_numbers": False})
+    ws = wb.add_worksheet(aba[:31])
+    if not mostrar_grade:
+        ws.hide_gridlines(2)
+
+    n_linhas, n_cols = df.shape
+    if largura_fixa is not None:
+        larguras = [largura_fixa] * n_cols
+    else:
+        larguras = larguras_por_amostra(df, folga=folga_largura, largura_max=255)
+
+    fmt_cabecalho = wb.add_format(FMT_CABECALHO)
+    ws.write_row(0, 0, [str(c) for c in df.columns], fmt_cabecalho)
+
+    linha_total = n_linhas + 1
+    coluna_rotulo = coluna_rotulo if coluna_rotulo is not None else (df.columns[0] if n_cols else None)
+
+    for i, col in enumerate(df.columns):
+        nf = num_format(formatos.get(col) or inferir_formato(df[col]))
+        props = {**FMT_BASE, "align": "center"}
+        if nf:
+            props["num_format"] = nf
+        fmt = wb.add_format(props)
+        ws.set_column(i, i, larguras[i])
+
+        ws.write_column(1, i, valores_para_escrita(df[col]).tolist(), fmt)
+
+        if not (total_soma or total_media or rotulo_total):
+            continue
+
+        fmt_total = wb.add_format({**FMT_CABECALHO, **({"num_format": nf} if nf else {})})
+        faixa = f"{xl_col(i)}2:{xl_col(i)}{n_linhas + 1}"
+        serie = pd.to_numeric(df[col], errors="coerce") if col in total_soma or col in total_media else None
+        if col in total_soma:
+            ws.write_formula(linha_total, i, f"=SUBTOTAL({SUBTOTAL_SOMA},{faixa})", fmt_total, float(serie.sum()))
+        elif col in total_media:
+            media = serie.mean()
+            ws.write_formula(linha_total, i, f"=SUBTOTAL({SUBTOTAL_MEDIA},{faixa})", fmt_total,
+                             0 if pd.isna(media) else float(media))
+        elif col == coluna_rotulo and rotulo_total:
+            ws.write_string(linha_total, i, rotulo_total, fmt_total)
+        else:
+            ws.write_blank(linha_total, i, None, fmt_total)
+
+    for col, regras in formatos_condicionais.items():
+        if col not in df.columns or not n_linhas:
+            continue
+        i = df.columns.get_loc(col)
+        # primeira regra: vazio para aqui, sem formato (senão "< 0,50" pinta o vazio de vermelho)
+        ws.conditional_format(1, i, n_linhas, i, {"type": "blanks", "stop_if_true": True})
+        for regra in regras:
+            regra = dict(regra)
+            if isinstance(regra.get("format"), dict):
+                regra["format"] = wb.add_format(regra["format"])
+            ws.conditional_format(1, i, n_linhas, i, regra)
+
+    wb.close()
+    return caminho
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from openpyxl.drawing.image import Image as OpenpyxlImage
+from PIL import Image
+
+
+# =========================
+#   Configurações
+# =========================
+# Ordem de preferência quando o mesmo código tem mais de um arquivo
+EXTENSOES = (".jpg", ".png", ".jpeg")
+
+PASTA_CACHE = ".miniaturas"          # criada dentro da pasta de imagens
+ARQUIVO_INDICE = "indice.json"
+VERSAO_INDICE = 2
+
+# Miniaturas com o dobro dos pixels da célula continuam nítidas com zoom/tela HiDPI
+ESCALA_MINIATURA = 2
+QUALIDADE_JPEG = 85
+FUNDO_TRANSPARENCIA = (255, 255, 255)
+
+# Abaixo disso o custo de subir processos não compensa
+MINIMO_PARALELO = 16
+
+
+# =========================
+#   Helpers
+# =========================
+def normalizar_codigo(codigo) -> str:
+    """Código do produto como chave do índice: '00123', 123, 123.0 e 'abc' -> '123', '123', '123', 'ABC'."""
+    if isinstance(codigo, float) and codigo.is_integer():
+        codigo = int(codigo)
+    texto = str(codigo).strip().upper()
+    if texto.endswith(".0") and texto[:-2].isdigit():
+        texto = texto[:-2]
+    if texto.isdigit():
+        texto = texto.lstrip("0") or "0"
+    return texto
+
+
+def _dimensoes(caminho: str) -> Tuple[Optional[int], Optional[int]]:
+    """Largura/altura lendo só o cabeçalho do arquivo (o Pillow não decodifica os pixels aqui)."""
+    try:
+        with Image.open(caminho) as img:
+            return img.size
+    except (OSError, ValueError):
+        return None, None
+
+
+def gerar_miniatura(origem: str, destino: str, largura: int, altura: int) -> Optional[str]:
+    """
+    Reduz ``origem`` para caber em largura x altura (proporção mantida) e grava
+    em ``destino`` (JPEG; transparência vira fundo branco). Fica no nível do
+    módulo para rodar no ProcessPoolExecutor.
+    """
+    try:
+        with Image.open(origem) as img:
+            img.draft("RGB", (largura, altura))  # JPEG: decodifica já reduzido
+            img.thumbnail((largura, altura), Image.LANCZOS)
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                fundo = Image.new("RGB", img.size, FUNDO_TRANSPARENCIA)
+                fundo.paste(img, mask=img.getchannel("A"))
+                img = fundo
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            temporario = destino + ".tmp"
+            img.save(temporario, "JPEG", quality=QUALIDADE_JPEG, optimize=True)
+        os.replace(temporario, destino)
+        return destino
+    except (OSError, ValueError):
+        return None
+
+
+# =========================
+#   Índice de imagens
+# =========================
+class IndiceImagens:
+    """
+    Varre as pastas de imagens uma vez e monta ``código normalizado -> caminho,
+    mtime, dimensões``; o caminho, mtime e dimensões de cada arquivo ficam em
+    ``<pasta>/.miniaturas/indice.json``. Numa nova execução só arquivos novos
+    ou alterados são reabertos.
+
+    As miniaturas ficam no mesmo cache, nomeadas pelo tamanho, e valem enquanto
+    forem mais novas que o arquivo original.
+    """
+
+    def __init__(
+        self,
+        pastas,
+        pasta_cache: Optional[str | Path] = None,
+        extensoes: Tuple[str, ...] = EXTENSOES,
+    ):
+        if isinstance(pastas, (str, Path)):
+            pastas = [pastas]
+        self.pastas = [Path(os.path.abspath(p)) for p in pastas]
+        self.pasta_cache = Path(pasta_cache) if pasta_cache else self.pastas[0] / PASTA_CACHE
+        self.extensoes = tuple(e.lower() for e in extensoes)
+        self.entradas: Dict[str, dict] = {}
+        self._arquivos: Dict[str, dict] = {}   # todos os arquivos vistos, inclusive os preteridos
+        self._carregar()
+
+    # ----- índice -----
+    @property
+    def caminho_indice(self) -> Path:
+        return self.pasta_cache / ARQUIVO_INDICE
+
+    def _ler_salvo(self) -> Dict[str, dict]:
+        try:
+            with open(self.caminho_indice, encoding="utf-8") as f:
+                salvo = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if salvo.get("versao") != VERSAO_INDICE:
+            return {}
+        return {e["caminho"]: e for e in salvo.get("arquivos", [])}
+
+    def _carregar(self) -> None:
+        t0 = time.perf_counter()
+        anteriores = self._ler_salvo()
+        prioridade = {ext: i for i, ext in enumerate(self.extensoes)}
+        escolhidos: Dict[str, Tuple[int, int, dict]] = {}
+        arquivos: Dict[str, dict] = {}
+        reabertos = 0
+
+        for ordem_pasta, pasta in enumerate(self.pastas):
+            if not pasta.is_dir():
+                print(f"⚠️ Pasta de imagens não encontrada: {pasta}")
+                continue
+            with os.scandir(pasta) as itens:
+                for item in itens:
+                    nome, ext = os.path.splitext(item.name)
+                    ext = ext.lower()
+                    if ext not in prioridade or not item.is_file():
+                        continue
+                    mtime = item.stat().st_mtime
+                    anterior = anteriores.get(item.path)
+                    if anterior and anterior["mtime"] == mtime:
+                        entrada = anterior
+                    else:
+                        largura, altura = _dimensoes(item.path)
+                        entrada = {"caminho": item.path, "mtime": mtime, "largura": largura, "altura": altura}
+                        reabertos += 1
+                    arquivos[item.path] = entrada
+
+                    codigo = normalizar_codigo(nome)
+                    rank = (ordem_pasta, prioridade[ext])
+                    atual = escolhidos.get(codigo)
+                    if atual is None or rank < atual[:2]:
+                        escolhidos[codigo] = (*rank, entrada)
+
+        self.entradas = {codigo: entrada for codigo, (_, _, entrada) in escolhidos.items()}
+        self._arquivos = arquivos
+        # arquivos preteridos (mesmo código em outra extensão/pasta) também ficam salvos,
+        # senão seriam reabertos e o índice regravado a cada execução
+        if reabertos or anteriores.keys() != arquivos.keys():
+            self._salvar()
+        print(f"🖼️ Índice de imagens: {len(self.entradas)} produtos "
+              f"({reabertos} arquivo(s) novos/alterados) em {time.perf_counter() - t0:.2f}s")
+
+    def _salvar(self) -> None:
+        self.pasta_cache.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho_indice.with_suffix(".tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"versao": VERSAO_INDICE, "arquivos": list(self._arquivos.values())}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho_indice)
+
+    # ----- consultas -----
+    def __len__(self) -> int:
+        return len(self.entradas)
+
+    def __contains__(self, codigo) -> bool:
+        return normalizar_codigo(codigo) in self.entradas
+
+    def caminho(self, codigo) -> Optional[str]:
+        entrada = self.entradas.get(normalizar_codigo(codigo))
+        return entrada["caminho"] if entrada else None
+
+    def dimensoes(self, codigo) -> Tuple[Optional[int], Optional[int]]:
+        entrada = self.entradas.get(normalizar_codigo(codigo))
+        return (entrada["largura"], entrada["altura"]) if entrada else (None, None)
+
+    # ----- miniaturas -----
+    def _caminho_miniatura(self, codigo: str, largura: int, altura: int) -> Path:
+        return self.pasta_cache / f"{largura}x{altura}" / f"{codigo}.jpg"
+
+    def preparar_miniaturas(
+        self,
+        codigos: Iterable,
+        largura: int,
+        altura: int,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Path]:
+        """
+        Garante a miniatura de cada código (caixa largura x altura em pixels da
+        célula, vezes ESCALA_MINIATURA) e devolve ``código normalizado -> arquivo``.
+        Só as ausentes ou desatualizadas são geradas, em paralelo.
+        """
+        largura_px, altura_px = largura * ESCALA_MINIATURA, altura * ESCALA_MINIATURA
+
+        prontas, pendentes = {}, []
+        for codigo in dict.fromkeys(normalizar_codigo(c) for c in codigos):
+            entrada = self.entradas.get(codigo)
+            if entrada is None:
+                continue
+            destino = self._caminho_miniatura(codigo, largura_px, altura_px)
+            try:
+                valida = destino.stat().st_mtime >= entrada["mtime"]
+            except OSError:
+                valida = False
+            if valida:
+                prontas[codigo] = destino
+            else:
+                pendentes.append((codigo, entrada["caminho"], destino))
+
+        if pendentes:
+            t0 = time.perf_counter()
+            (self.pasta_cache / f"{largura_px}x{altura_px}").mkdir(parents=True, exist_ok=True)
+            args = ([o for _, o, _ in pendentes], [str(d) for _, _, d in pendentes],
+                    [largura_px] * len(pendentes), [altura_px] * len(pendentes))
+            if len(pendentes) >= MINIMO_PARALELO:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    resultados = list(pool.map(gerar_miniatura, *args, chunksize=8))
+            else:
+                resultados = list(map(gerar_miniatura, *args))
+            for (codigo, _, destino), ok in zip(pendentes, resultados):
+                if ok:
+                    prontas[codigo] = destino
+            print(f"🖼️ {len(pendentes)} miniatura(s) {largura_px}x{altura_px} geradas em "
+                  f"{time.perf_counter() - t0:.1f}s ({len(prontas)} prontas)")
+
+        return prontas
+
+    def miniaturas_em_memoria(
+        self,
+        codigos: Iterable,
+        largura: int,
+        altura: int,
+        workers: Optional[int] = None,
+    ) -> Dict[str, "Miniatura"]:
+        """Como preparar_miniaturas, mas já com os bytes lidos para os writers (xlsxwriter/openpyxl)."""
+        prontas = self.preparar_miniaturas(codigos, largura, altura, workers)
+        miniaturas = {}
+        for codigo, arquivo in prontas.items():
+            dados = arquivo.read_bytes()
+            with Image.open(io.BytesIO(dados)) as img:
+                w, h = img.size
+            # Exibida ocupando a caixa da célula (foto pequena na origem também é ampliada)
+            miniaturas[codigo] = Miniatura(dados, min(largura / w, altura / h), w, h)
+        return miniaturas
+
+
+class Miniatura:
+    """Bytes da miniatura + escala de exibição para caber na célula."""
+
+    __slots__ = ("dados", "escala", "largura", "altura")
+
+    def __init__(self, dados: bytes, escala: float, largura_px: int, altura_px: int):
+        self.dados = dados
+        self.escala = escala
+        self.largura = round(largura_px * escala)
+        self.altura = round(altura_px * escala)
+
+    def buffer(self) -> io.BytesIO:
+        """Buffer novo a cada uso (os writers leem o stream até o fim)."""
+        return io.BytesIO(self.dados)
+
+    def para_openpyxl(self) -> OpenpyxlImage:
+        img = OpenpyxlImage(self.buffer())
+        img.width, img.height = self.largura, self.altura
+        return img
+
+    def opcoes_xlsxwriter(self, **extras) -> dict:
+        """Opções do ``insert_image``: bytes em memória exibidos no tamanho da célula."""
+        return {"image_data": self.buffer(), "x_scale": self.escala, "y_scale": self.escala, **extras}
+
+
+# =========================
+#   Benchmark
+# =========================
+def _fotos_sinteticas(pasta: Path, n: int, tamanho: Tuple[int, int] = (1200, 1600)) -> None:
+    """Fotos no tamanho típico de câmera/celular, com ruído para o JPEG não comprimir demais."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    pasta.mkdir(parents=True, exist_ok=True)
+    ruido = rng.integers(0, 255, (tamanho[1], tamanho[0], 3), dtype=np.uint8)
+    for k in range(n):
+        cor = rng.integers(0, 255, 3, dtype=np.uint8)
+        pixels = (ruido // 4 + cor // 4 * 3).astype(np.uint8)
+        Image.fromarray(pixels).save(pasta / f"{k:05d}.jpg", quality=90)
+
+
+def _catalogo(destino: Path, codigos, imagem) -> float:
+    from openpyxl import Workbook
+
+    t0 = time.perf_counter()
+    wb = Workbook()
+    ws = wb.active
+    for linha, codigo in enumerate(codigos, start=1):
+        ws.cell(row=linha, column=1, value=codigo)
+        img = imagem(codigo)
+        if img is not None:
+            ws.add_image(img, f"B{linha}")
+    wb.save(destino)
+    return time.perf_counter() - t0
+
+
+def _benchmark(n: int, pasta: Path) -> None:
+    if not pasta.is_dir() or len(list(pasta.glob("*.jpg"))) < n:
+        print(f"Gerando {n} fotos sintéticas em '{pasta}'...")
+        _fotos_sinteticas(pasta, n)
+    codigos = [str(k) for k in range(n)]
+    largura, altura = 110, 110
+
+    def original(codigo):
+        img = OpenpyxlImage(str(pasta / f"{int(codigo):05d}.jpg"))
+        img.width, img.height = largura, altura
+        return img
+
+    t_antigo = _catalogo(pasta.parent / "catalogo_original.xlsx", codigos, original)
+
+    t0 = time.perf_counter()
+    miniaturas = IndiceImagens(pasta).miniaturas_em_memoria(codigos, largura, altura)
+    t_miniaturas = time.perf_counter() - t0
+    t_novo = _catalogo(pasta.parent / "catalogo_miniaturas.xlsx", codigos,
+                       lambda c: miniaturas[normalizar_codigo(c)].para_openpyxl())
+
+    mb = lambda nome: (pasta.parent / nome).stat().st_size / 1e6
+    print(f"\n{n} produtos | fotos originais: {t_antigo:.1f}s, {mb('catalogo_original.xlsx'):.1f} MB | "
+          f"miniaturas: {t_miniaturas:.1f}s (índice + cache) + {t_novo:.1f}s, {mb('catalogo_miniaturas.xlsx'):.1f} MB")
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Índice de imagens de produtos e cache de miniaturas")
+    parser.add_argument("pasta", nargs="?", help="pasta de imagens a indexar")
+    parser.add_argument("--tamanho", type=int, nargs=2, default=(110, 110), metavar=("LARGURA", "ALTURA"),
+                        help="gera as miniaturas de todos os produtos nesse tamanho de célula")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="compara um catálogo de N fotos originais com o de miniaturas")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _benchmark(args.benchmark, Path(args.pasta or "benchmark_imagens") / "fotos")
+    elif args.pasta:
+        indice = IndiceImagens(args.pasta)
+        indice.preparar_miniaturas(list(indice.entradas), *args.tamanho)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# =========================
+#   Configurações
+# =========================
+ABREVIACOES = {
+    "CX": "CAIXA",
+    "PCT": "PACOTE",
+    "PC": "PECA",
+    "UN": "UNIDADE",
+    "UND": "UNIDADE",
+    "UNID": "UNIDADE",
+    "KIT": "KIT",
+    "C": "COM",
+    "S": "SEM",
+    "PT": "PRETO",
+    "PRT": "PRETO",
+    "BR": "BRANCO",
+    "BCO": "BRANCO",
+    "AZ": "AZUL",
+    "VM": "VERMELHO",
+    "VERM": "VERMELHO",
+    "AM": "AMARELO",
+    "CZ": "CINZA",
+    "MASC": "MASCULINO",
+    "FEM": "FEMININO",
+    "INF": "INFANTIL",
+    "TAM": "TAMANHO",
+    "REF": "REFERENCIA",
+    "ALUM": "ALUMINIO",
+    "INOX": "INOXIDAVEL",
+    "MOD": "MODELO",
+}
+
+STOPWORDS = {"DE", "DA", "DO", "DAS", "DOS", "E", "EM", "PARA", "P", "COM", "SEM", "A", "O"}
+
+PLACEHOLDERS = {"", "NAO INFORMADO", "NAN", "NONE", "SEM DESCRICAO"}
+
+# Medidas viram um token canônico (1L e 1000ML caem no mesmo bloco e não conflitam)
+PADRAO_MEDIDA = re.compile(
+    r"(?<![A-Z0-9])(\d+(?:[.,]\d+)?)\s?(ML|LT|L|KG|G|MG|MM|CM|M|W|V|POL|GB|TB)(?![A-Z])"
+)
+CONVERSAO_MEDIDA = {
+    "L": ("ML", 1000), "LT": ("ML", 1000), "KG": ("G", 1000), "MG": ("G", 0.001),
+    "CM": ("MM", 10), "M": ("MM", 1000), "TB": ("GB", 1024),
+}
+
+# Letras coladas em número (MOD12, REF300) viram dois tokens: "MOD12" e "MODELO 12" têm o mesmo código
+PADRAO_LETRAS_NUMERO = re.compile(r"(?<![A-Z0-9])([A-Z]+)(\d+)(?![A-Z])")
+
+TAMANHO_PREFIXO = 4      # caracteres do prefixo de token usado como chave de bloco
+TOKENS_BLOCO = 3         # quantos tokens iniciais geram chave de prefixo
+MAX_BLOCO = 300          # acima disso o bloco é genérico demais para comparar todos com todos
+JANELA_VIZINHANCA = 8    # em blocos grandes, cada descrição é comparada com as N seguintes na ordem do texto
+LIMIAR_PADRAO = 0.72
+PARES_POR_LOTE = 250_000
+
+
+# =========================
+#   Normalização
+# =========================
+def _medida_canonica(valor: str, unidade: str) -> str:
+    numero = float(valor.replace(",", "."))
+    unidade, fator = CONVERSAO_MEDIDA.get(unidade, (unidade, 1))
+    numero *= fator
+    return f"{numero:g}{unidade}"
+
+
+def normalizar_descricoes(descricoes: pd.Series) -> pd.Series:
+    """Maiúsculas, sem acentos/pontuação, medidas canônicas e abreviações expandidas."""
+    s = (
+        descricoes.astype("string").fillna("")
+        .str.upper()
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("ascii")
+    )
+    s = s.str.replace(PADRAO_MEDIDA, lambda m: " " + _medida_canonica(m.group(1), m.group(2)) + " ", regex=True)
+    s = s.str.replace(r"[^A-Z0-9.]+", " ", regex=True).str.replace(r"(?<!\d)\.|\.(?!\d)", " ", regex=True)
+    s = s.str.replace(PADRAO_LETRAS_NUMERO, r"\1 \2", regex=True)
+    s = s.str.split().map(
+        lambda toks: " ".join(ABREVIACOES.get(t, t) for t in toks), na_action="ignore"
+    )
+    return s.fillna("").astype(str)
+
+
+def _tokens(texto: str) -> list:
+    return [t for t in texto.split() if t not in STOPWORDS]
+
+
+def _medidas(texto: str) -> frozenset:
+    return frozenset(t for t in texto.split() if PADRAO_MEDIDA.fullmatch(t))
+
+
+def _codigos(texto: str) -> frozenset:
+    """Tokens com dígito (medidas, modelos, referências): identificam o produto."""
+    return frozenset(t for t in texto.split() if any(ch.isdigit() for ch in t))
+
+
+def _features(texto: str) -> set:
+    """Tokens + trigramas do texto compactado (cobre espaçamento diferente: COCA COLA x COCACOLA)."""
+    toks = _tokens(texto)
+    compacto = "".join(toks)
+    return {"t:" + t for t in toks} | {compacto[i:i + 3] for i in range(max(len(compacto) - 2, 0))}
+
+
+# =========================
+#   Blocking
+# =========================
+def chaves_bloqueio(textos: pd.Series) -> pd.DataFrame:
+    """
+    Uma linha (id, chave, ordem) por chave de bloco de cada descrição única:
+      - P: prefixo dos primeiros tokens significativos
+      - T: medida + prefixo do 1º token
+    Só descrições que dividem alguma chave são comparadas. ``ordem`` é o texto
+    a partir do token que gerou a chave: em blocos grandes, descrições com o
+    mesmo "resto" ficam vizinhas (ver pares_candidatos).
+    """
+    linhas = []
+    for i, texto in enumerate(textos):
+        toks = _tokens(texto)
+        if not toks:
+            continue
+        primeiro = toks[0][:TAMANHO_PREFIXO]
+        inteiro = " ".join(toks)
+        for k, t in enumerate(toks[:TOKENS_BLOCO]):
+            if not t.isdigit():
+                linhas.append((i, "P:" + t[:TAMANHO_PREFIXO], " ".join(toks[k:])))
+        for medida in _medidas(texto):
+            linhas.append((i, f"T:{medida}:{primeiro}", inteiro))
+    return pd.DataFrame(linhas, columns=["id", "chave", "ordem"]).drop_duplicates(["id", "chave"])
+
+
+def pares_candidatos(
+    chaves: pd.DataFrame,
+    max_bloco: int = MAX_BLOCO,
+    janela: int = JANELA_VIZINHANCA,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pares (i < j) que dividem pelo menos um bloco.
+
+    Blocos de até ``max_bloco`` membros geram todos os pares (triu_indices por
+    tamanho de bloco). Blocos maiores, com a coluna ``ordem``, são ordenados
+    por ela e cada membro é comparado com os ``janela`` seguintes (sorted
+    neighbourhood); sem ``ordem`` eles são ignorados.
+    """
+    vazio = np.empty(0, dtype=np.int64)
+    if chaves.empty:
+        return vazio, vazio
+
+    codigo, _ = pd.factorize(chaves["chave"])
+    ids = chaves["id"].to_numpy(dtype=np.int64)
+    tem_ordem = "ordem" in chaves.columns
+    rank = pd.factorize(chaves["ordem"], sort=True)[0] if tem_ordem else ids
+    ordem = np.lexsort((ids, rank, codigo))
+    codigo, ids = codigo[ordem], ids[ordem]
+
+    inicios = np.flatnonzero(np.r_[True, codigo[1:] != codigo[:-1]])
+    tamanhos = np.diff(np.r_[inicios, len(codigo)])
+
+    partes_i, partes_j = [], []
+    for k in np.unique(tamanhos):
+        if k < 2 or k > max_bloco:
+            continue
+        blocos = inicios[tamanhos == k]
+        membros = ids[blocos[:, None] + np.arange(k)]          # (n_blocos, k)
+        a, b = np.triu_indices(k, 1)
+        partes_i.append(membros[:, a].ravel())
+        partes_j.append(membros[:, b].ravel())
+
+    if tem_ordem and (tamanhos > max_bloco).any():
+        posicoes = np.flatnonzero(np.repeat(tamanhos > max_bloco, tamanhos))
+        for d in range(1, janela + 1):
+            p = posicoes[posicoes + d < len(codigo)]
+            p = p[codigo[p + d] == codigo[p]]
+            partes_i.append(ids[p])
+            partes_j.append(ids[p + d])
+
+    if not partes_i:
+        return vazio, vazio
+
+    i = np.concatenate(partes_i)
+    j = np.concatenate(partes_j)
+    n = int(ids.max()) + 1
+    unicos = np.unique(np.minimum(i, j) * n + np.maximum(i, j))
+    unicos = unicos[unicos // n != unicos % n]
+    return unicos // n, unicos % n
+
+
+# =========================
+#   Pontuação vetorizada
+# =========================
+def _csr(conjuntos: list) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR "manual": ids dos elementos de cada conjunto, linha a linha (indptr, indices)."""
+    conjuntos = [sorted(c) for c in conjuntos]
+    tamanhos = np.fromiter((len(c) for c in conjuntos), dtype=np.int64, count=len(conjuntos))
+    indptr = np.r_[0, np.cumsum(tamanhos)]
+    planos = pd.Series([f for c in conjuntos for f in c], dtype=object)
+    indices, _ = pd.factorize(planos) if len(planos) else (np.empty(0, dtype=np.int64), None)
+    return indptr, np.asarray(indices, dtype=np.int64)
+
+
+def matriz_features(textos: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Features (tokens + trigramas) de cada descrição em CSR."""
+    return _csr([_features(t) for t in textos])
+
+
+def matriz_codigos(textos: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Códigos (tokens com dígito) de cada descrição em CSR, para o veto de pontuar_pares."""
+    return _csr([_codigos(t) for t in textos])
+
+
+def _intersecao(i: np.ndarray, j: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Quantos elementos as linhas i e j têm em comum, em lotes: explode os
+    elementos de cada lado como (par, elemento) e conta os repetidos.
+    """
+    tamanhos = np.diff(indptr)
+    n_elementos = int(indices.max()) + 1 if len(indices) else 1
+    intersecao = np.zeros(len(i), dtype=np.int64)
+
+    for ini in range(0, len(i), PARES_POR_LOTE):
+        li, lj = i[ini:ini + PARES_POR_LOTE], j[ini:ini + PARES_POR_LOTE]
+        pares = np.arange(len(li), dtype=np.int64)
+        lados = []
+        for lado in (li, lj):
+            rep = tamanhos[lado]
+            par = np.repeat(pares, rep)
+            # posição de cada elemento dentro de indices: início da linha + deslocamento
+            desloc = np.arange(rep.sum()) - np.repeat(np.cumsum(rep) - rep, rep)
+            lados.append(par * n_elementos + indices[np.repeat(indptr[lado], rep) + desloc])
+        todas = np.sort(np.concatenate(lados))
+        repetidas = todas[1:][todas[1:] == todas[:-1]]
+        intersecao[ini:ini + len(li)] = np.bincount(repetidas // n_elementos, minlength=len(li))
+    return intersecao
+
+
+def pontuar_pares(
+    i: np.ndarray,
+    j: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    codigos: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Similaridade de conjuntos (Dice) entre as features de i e j.
+    Códigos incompatíveis (500ML x 1000ML, MOD12 x MOD13) zeram o score; um
+    lado sem o código do outro (ex.: sem a medida) não conta como conflito.
+    ``codigos`` é o CSR de matriz_codigos; sem ele (ex.: nomes de clientes)
+    o veto não é aplicado.
+    """
+    tamanhos = np.diff(indptr)
+    soma = tamanhos[i] + tamanhos[j]
+    intersecao = _intersecao(i, j, indptr, indices)
+    scores = np.where(soma > 0, 2 * intersecao / np.maximum(soma, 1), 0.0)
+
+    if codigos is None:
+        return scores
+
+    # conflito = nenhum dos conjuntos de códigos contém o outro: |A ∩ B| < min(|A|, |B|)
+    indptr_cod, indices_cod = codigos
+    n_codigos = np.diff(indptr_cod)
+    conflito = _intersecao(i, j, indptr_cod, indices_cod) < np.minimum(n_codigos[i], n_codigos[j])
+    scores[conflito] = 0.0
+    return scores
+
+
+# =========================
+#   Componentes conexos
+# =========================
+def componentes(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Rótulo mínimo por componente via propagação + pointer jumping (sem scipy)."""
+    rotulo = np.arange(n, dtype=np.int64)
+    if not len(i):
+        return rotulo
+    while True:
+        menor = np.minimum(rotulo[i], rotulo[j])
+        novo = rotulo.copy()
+        np.minimum.at(novo, i, menor)
+        np.minimum.at(novo, j, menor)
+        while True:
+            saltado = novo[novo]
+            if np.array_equal(saltado, novo):
+                break
+            novo = saltado
+        if np.array_equal(novo, rotulo):
+            return rotulo
+        rotulo = novo
+
+
+# =========================
+#   API
+# =========================
+def agrupar_similares(
+    descricoes: pd.Series,
+    skus: Optional[pd.Series] = None,
+    limiar: float = LIMIAR_PADRAO,
+) -> pd.DataFrame:
+    """
+    Agrupa linhas que representam o mesmo produto.
+
+    Retorna um DataFrame alinhado ao índice de ``descricoes`` com:
+      - CLUSTER_PRODUTO: id do grupo (0..n)
+      - CONFIANCA_MATCH: melhor similaridade que ligou a linha ao grupo
+        (1.0 para descrição idêntica após normalização, SKU igual ou sem par)
+
+    Descrições idênticas após a normalização viram um único nó; mesmos SKUs
+    são ligados com confiança 1.0; descrições vazias/placeholder só se
+    agrupam pelo SKU.
+    """
+    normal = normalizar_descricoes(descricoes)
+    sem_texto = normal.isin(PLACEHOLDERS).to_numpy()
+    sku_norm = (
+        skus.astype("string").str.strip().str.upper().fillna("").to_numpy(dtype=object)
+        if skus is not None else np.full(len(normal), "", dtype=object)
+    )
+
+    # Sem descrição o nó é o SKU; sem SKU também, a linha fica sozinha. As chaves
+    # são tuplas (não colidem com texto; prefixo "\x00" o factorize trunca)
+    chave_no = normal.to_numpy(dtype=object).copy()
+    for k in np.flatnonzero(sem_texto):
+        chave_no[k] = ("SKU", sku_norm[k]) if sku_norm[k] else ("LINHA", int(k))
+    no, valores = pd.factorize(pd.Series(chave_no, dtype=object))
+    n_nos = len(valores)
+
+    com_texto = np.ones(n_nos, dtype=bool)
+    com_texto[no[sem_texto]] = False
+    textos = pd.Series(valores, dtype=object).where(com_texto, "")
+
+    i, j = pares_candidatos(chaves_bloqueio(textos))
+    indptr, indices = matriz_features(textos)
+    scores = pontuar_pares(i, j, indptr, indices, matriz_codigos(textos))
+
+    aceitos = scores >= limiar
+    ei, ej, es = i[aceitos], j[aceitos], scores[aceitos]
+
+    if skus is not None:
+        pares_sku = pd.DataFrame({"sku": sku_norm, "no": no})
+        pares_sku = pares_sku[pares_sku["sku"] != ""].drop_duplicates()
+        primeiro = pares_sku.groupby("sku")["no"].transform("first").to_numpy()
+        outros = pares_sku["no"].to_numpy()
+        liga = primeiro != outros
+        ei = np.r_[ei, primeiro[liga]]
+        ej = np.r_[ej, outros[liga]]
+        es = np.r_[es, np.ones(int(liga.sum()))]
+
+    rotulo = componentes(n_nos, ei, ej)
+    cluster_no = pd.factorize(rotulo)[0]
+
+    confianca_no = np.ones(n_nos, dtype=np.float64)
+    if len(ei):
+        melhor = np.zeros(n_nos, dtype=np.float64)
+        np.maximum.at(melhor, ei, es)
+        np.maximum.at(melhor, ej, es)
+        ligado = np.zeros(n_nos, dtype=bool)
+        ligado[ei] = ligado[ej] = True
+        confianca_no[ligado] = melhor[ligado]
+
+    return pd.DataFrame(
+        {"CLUSTER_PRODUTO": cluster_no[no], "CONFIANCA_MATCH": confianca_no[no].round(3)},
+        index=descricoes.index,
+    )
+
+
+# =========================
+#   Benchmark
+# =========================
+def _descricoes_sinteticas(n: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Descrições de ``n // 3`` produtos com ruído real de cadastro: abreviações,
+    MOD12 x MODELO 12, caractere faltando, acentos, caixa e espaços.
+    """
+    rng = np.random.default_rng(seed)
+    tipos = ["CAMISETA", "BERMUDA", "TENIS", "MOCHILA", "GARRAFA", "CANECA", "MONITOR", "TECLADO", "MOUSE", "CABO"]
+    cores = ["PRETO", "BRANCO", "AZUL", "VERMELHO", "CINZA"]
+    extras = ["MASCULINO", "FEMININO", "INFANTIL", "PREMIUM", "BASICO", "SLIM", "GAMER", "USB", "ALGODAO"]
+    medidas = ["500ML", "1L", "2L", "24 POL", "1,5M", "2M", "32GB", "64GB"]
+
+    def sem_um_caractere(s: str) -> str:
+        # apaga uma letra de uma palavra sem dígitos (o código/medida continua igual)
+        palavras = s.split(" ")
+        alvos = [k for k, p in enumerate(palavras) if len(p) > 4 and p.isalpha()]
+        if not alvos:
+            return s
+        k = alvos[rng.integers(len(alvos))]
+        pos = rng.integers(1, len(palavras[k]))
+        palavras[k] = palavras[k][:pos] + palavras[k][pos + 1:]
+        return " ".join(palavras)
+
+    variacoes = [
+        lambda s: s,
+        lambda s: s.lower(),
+        lambda s: s.replace("PRETO", "PT").replace("BRANCO", "BCO"),
+        lambda s: s.replace(" ", "  ", 1),
+        lambda s: s.replace("TENIS", "TÊNIS").replace("BASICO", "BÁSICO"),
+        lambda s: s.replace("MASCULINO", "MASC").replace("FEMININO", "FEM"),
+        lambda s: re.sub(r"MOD(\d+)", r"MODELO \1", s),
+        sem_um_caractere,
+        lambda s: sem_um_caractere(s.replace("PRETO", "PT")),
+    ]
+
+    n_produtos = max(1, n // 3)
+    base = [
+        f"{rng.choice(tipos)} {rng.choice(extras)} {rng.choice(cores)} {rng.choice(medidas)} MOD{k}"
+        for k in range(n_produtos)
+    ]
+    produto = rng.integers(0, n_produtos, size=n)
+    desc = [variacoes[rng.integers(len(variacoes))](base[p]) for p in produto]
+    return pd.DataFrame({"DESCRICAO": desc, "PRODUTO": produto})
+
+
+def avaliar_agrupamento(produto: pd.Series, cluster: pd.Series) -> Tuple[float, float]:
+    """(precisão, recall) por pares de linhas: pares no mesmo cluster x pares do mesmo produto."""
+    def pares(contagens: pd.Series) -> float:
+        c = contagens.to_numpy(dtype=np.float64)
+        return float((c * (c - 1) / 2).sum())
+
+    juntos = pares(pd.DataFrame({"p": produto.to_numpy(), "c": cluster.to_numpy()}).value_counts())
+    mesmo_produto = pares(produto.value_counts())
+    mesmo_cluster = pares(cluster.value_counts())
+    precisao = juntos / mesmo_cluster if mesmo_cluster else 1.0
+    recall = juntos / mesmo_produto if mesmo_produto else 1.0
+    return precisao, recall
+
+
+def _benchmark(n: int) -> None:
+    df = _descricoes_sinteticas(n)
+    distintas = normalizar_descricoes(df["DESCRICAO"]).nunique()
+    t0 = time.perf_counter()
+    res = agrupar_similares(df["DESCRICAO"])
+    dt = time.perf_counter() - t0
+
+    precisao, recall = avaliar_agrupamento(df["PRODUTO"], res["CLUSTER_PRODUTO"])
+    print(f"{n} descrições ({distintas} distintas após normalizar) em {dt:.2f}s | "
+          f"{res['CLUSTER_PRODUTO'].nunique()} clusters (produtos reais: {df['PRODUTO'].nunique()}) | "
+          f"precisão {precisao:.1%} | recall {recall:.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agrupamento de descrições similares (blocking + similaridade de conjuntos)")
+    parser.add_argument("--benchmark", type=int, default=20_000, metavar="N")
+    args = parser.parse_args()
+    _benchmark(args.benchmark)
+
+
+if __name__ == "__main__":
+    main()
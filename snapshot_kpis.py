@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cubo_ranking import assinatura_arquivo, obter_cubo
+
+
+# =========================
+#   Configurações
+# =========================
+MESES = np.arange(1, 13)
+COLUNAS_CHAVE = ["TIPO", "ANO", "MES", "NOME"]
+
+
+# =========================
+#   Leitura
+# =========================
+def ler_abas(arquivo: str | Path, abas: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """Abre a pasta de trabalho uma vez e lê só as abas pedidas."""
+    with pd.ExcelFile(arquivo) as xls:
+        return {aba: xls.parse(aba) for aba in abas}
+
+
+def converter_datas(serie: pd.Series) -> pd.Series:
+    """Coluna de data convertida uma vez para datetime (inválidas viram NaT)."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    return pd.to_datetime(serie, errors="coerce")
+
+
+def normalizar_nomes(serie: pd.Series) -> pd.Series:
+    return serie.astype(str).str.strip().str.upper()
+
+
+# =========================
+#   Vigências
+# =========================
+def mascara_vigencia(nomes: pd.Series, meses: pd.Series, vigencia: Dict[str, Tuple[int, int]]) -> np.ndarray:
+    """True onde o mês está dentro da vigência (inicio, fim) do nome; nomes fora do dicionário ficam False."""
+    inicio = nomes.map({nome: i for nome, (i, _) in vigencia.items()}).to_numpy(dtype=float)
+    fim = nomes.map({nome: f for nome, (_, f) in vigencia.items()}).to_numpy(dtype=float)
+    mes = meses.to_numpy(dtype=float)
+    return (inicio <= mes) & (mes <= fim)
+
+
+def vigentes_por_mes(vigencia: Dict[str, Tuple[int, int]]) -> pd.Series:
+    """Quantidade de pessoas vigentes em cada mês (índice 1..12)."""
+    if not vigencia:
+        return pd.Series(0, index=MESES)
+    inicio, fim = np.array(list(vigencia.values())).T
+    return pd.Series(((inicio[:, None] <= MESES) & (MESES <= fim[:, None])).sum(axis=0), index=MESES)
+
+
+# =========================
+#   Snapshot
+# =========================
+def obter_snapshot(caminho: str | Path, arquivo: str | Path, construir, parametros: dict,
+                   forcar: bool = False) -> pd.DataFrame:
+    """
+    Snapshot salvo em Parquet; é recalculado (uma leitura do Excel) só quando a
+    planilha de origem ou os ``parametros`` (metas, vigências) mudam.
+    """
+    metadados = {"origem": assinatura_arquivo(arquivo), **parametros}
+    return obter_cubo(caminho, metadados, construir, forcar, descricao="Snapshot de KPIs")
+
+
+def quadro_do_mes(snapshot: pd.DataFrame, tipo: str, ano: int, mes: int,
+                  colunas: Optional[list] = None) -> pd.DataFrame:
+    """Linhas de um tipo (ex.: VENDAS, SDR) no mês, com NOME como primeira coluna."""
+    filtro = (snapshot["TIPO"] == tipo) & (snapshot["ANO"] == int(ano)) & (snapshot["MES"] == int(mes))
+    colunas = colunas or [c for c in snapshot.columns if c not in COLUNAS_CHAVE]
+    return snapshot.loc[filtro, ["NOME", *colunas]].reset_index(drop=True)
@@ -0,0 +1,25 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+
+def carregar_script(nome_arquivo: str, modulo: str):
+    """Importa um script da raiz (nomes com espaços/acentos) como módulo, sem rodar o __main__."""
+    if modulo in sys.modules:
+        return sys.modules[modulo]
+    spec = importlib.util.spec_from_file_location(modulo, RAIZ / nome_arquivo)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[modulo] = mod  # permite picklar funções do script em ProcessPoolExecutor
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture
+def script():
+    return carregar_script
@@ -0,0 +1,171 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+pytest.importorskip("requests")  # cnpj_core
+
+from cnpj_core import CNPJClient, FetchResult, normalize_company
+import cnpj_local
+from cnpj_local import FONTE_LOCAL, LocalCNPJIndex, build_index, receita_para_payload
+
+# (básico, ordem, dv, nome, situação) fora de ordem e espalhados em row groups
+ESTABELECIMENTOS = [
+    ("33000167", "0001", "01", "MATRIZ A", "02"),
+    ("00000000", "0001", "91", "MATRIZ B", "08"),
+    ("33000167", "0035", "05", "FILIAL A2", "02"),
+    ("33000167", "0002", "82", "FILIAL A1", "04"),
+    ("33000168", "0001", "00", "VIZINHA", "02"),
+]
+
+
+def _parquet(caminho, linhas, row_group_size=2):
+    tabela = pa.table({
+        "cnpj_basico": [l[0] for l in linhas],
+        "cnpj_ordem": [l[1] for l in linhas],
+        "cnpj_dv": [l[2] for l in linhas],
+        "nome_fantasia": [l[3] for l in linhas],
+        "situacao_cadastral": [l[4] for l in linhas],
+        "data_inicio_atividade": ["20200131"] * len(linhas),
+        "municipio": ["7107"] * len(linhas),
+        "uf": ["SP"] * len(linhas),
+    })
+    pq.write_table(tabela, caminho, row_group_size=row_group_size)
+    return caminho
+
+
+@pytest.fixture
+def parquet(tmp_path):
+    return _parquet(tmp_path / "ESTABELECIMENTO.parquet", ESTABELECIMENTOS)
+
+
+@pytest.mark.parametrize("reorganizar", [False, True])
+def test_lookup_e_lookup_root(parquet, tmp_path, reorganizar):
+    build_index(parquet, tmp_path / "idx", reorganizar=reorganizar)
+    idx = LocalCNPJIndex(parquet, tmp_path / "idx", auto_build=False)
+
+    assert len(idx) == len(ESTABELECIMENTOS)
+    assert idx.lookup("33.000.167/0002-82")["nome_fantasia"] == "FILIAL A1"
+    assert idx.lookup("00000000000191")["nome_fantasia"] == "MATRIZ B"
+    assert idx.lookup("33000167000199") is None
+    assert idx.lookup("123") is None
+    assert [r["nome_fantasia"] for r in idx.lookup_root("33.000.167")] == ["MATRIZ A", "FILIAL A1", "FILIAL A2"]
+    assert idx.lookup_root("99999999") == []
+
+
+def test_row_groups_grandes_sao_reorganizados_por_padrao(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cnpj_local, "ROW_GROUP_REORGANIZADO", 2)
+    monkeypatch.setattr(cnpj_local, "ROW_GROUP_MAXIMO", 3)
+    grande = _parquet(tmp_path / "ESTABELECIMENTO.parquet", ESTABELECIMENTOS, row_group_size=5)
+
+    build_index(grande, tmp_path / "sem", reorganizar=False)
+    assert "não será reorganizado" in capsys.readouterr().out
+    assert not (tmp_path / "sem" / "dados.parquet").exists()
+
+    idx = LocalCNPJIndex(grande, tmp_path / "idx")
+    assert "gravando cópia" in capsys.readouterr().out
+    dados = pq.ParquetFile(tmp_path / "idx" / "dados.parquet")
+    assert [dados.metadata.row_group(i).num_rows for i in range(dados.num_row_groups)] == [2, 2, 1]
+    assert idx.lookup("33.000.167/0002-82")["nome_fantasia"] == "FILIAL A1"
+    assert [r["nome_fantasia"] for r in idx.lookup_root("33000167")] == ["MATRIZ A", "FILIAL A1", "FILIAL A2"]
+
+
+def test_cache_limitado_por_bytes(parquet):
+    um_grupo = pq.ParquetFile(parquet).read_row_group(0).nbytes
+    idx = LocalCNPJIndex(parquet, cache_bytes=um_grupo * 2)
+    for basico, ordem, dv, _, _ in ESTABELECIMENTOS:
+        idx.lookup(basico + ordem + dv)
+        assert idx._cache_usado <= idx.cache_bytes
+    assert 0 < len(idx._cache) < pq.ParquetFile(parquet).num_row_groups  # o LRU descartou grupos
+
+    sem_cache = LocalCNPJIndex(parquet, cache_bytes=0)
+    assert sem_cache.lookup("00000000000191")["nome_fantasia"] == "MATRIZ B" and not sem_cache._cache
+
+
+def test_fetch_monta_payload(parquet):
+    idx = LocalCNPJIndex(parquet)
+
+    achado = idx.fetch("33000167000101")
+    assert (achado.source, achado.status_code) == (FONTE_LOCAL, 200)
+    assert achado.data["cnpj"] == "33.000.167/0001-01"
+    assert achado.data["descricao_situacao_cadastral"] == "ATIVA"
+    assert achado.data["data_inicio_atividade"] == "2020-01-31"
+
+    ausente = idx.fetch("33000167000199")
+    assert ausente.status_code == 404 and ausente.data is None
+
+
+def test_indice_desatualizado_e_reconstruido(parquet, tmp_path):
+    idx_dir = tmp_path / "idx"
+    LocalCNPJIndex(parquet, idx_dir)
+
+    _parquet(parquet, ESTABELECIMENTOS + [("11111111", "0001", "11", "NOVA", "02")])
+    os.utime(parquet, (0, 1))  # garante mtime diferente mesmo em sistemas de arquivos grosseiros
+    with pytest.raises(FileNotFoundError):
+        LocalCNPJIndex(parquet, idx_dir, auto_build=False)
+    assert LocalCNPJIndex(parquet, idx_dir).lookup("11111111000111")["nome_fantasia"] == "NOVA"
+
+
+def test_parquet_vazio(tmp_path):
+    idx = LocalCNPJIndex(_parquet(tmp_path / "vazio.parquet", []))
+    assert len(idx) == 0
+    assert idx.lookup("33000167000101") is None
+    assert idx.lookup_root("33000167") == []
+
+
+def _tabelas_auxiliares(pasta):
+    pq.write_table(pa.table({
+        "cnpj_basico": ["33000168", "33000167"],
+        "razao_social": ["VIZINHA LTDA", "EMPRESA A S.A."],
+        "capital_social": ["1000,00", "5000,00"],
+    }), pasta / "EMPRESAS.parquet", row_group_size=1)
+    (pasta / "MUNICIPIOS.csv").write_bytes("7107;SAO PAULO\n0001;GUAJARA-MIRIM\n".encode("latin-1"))
+
+
+def test_payload_normalizado_tem_razao_social_e_municipio():
+    row = {"cnpj_basico": "33000167", "cnpj_ordem": "0001", "cnpj_dv": "01",
+           "nome_fantasia": "MATRIZ A", "municipio": "7107", "uf": "SP"}
+    payload = receita_para_payload(row, {"razao_social": "EMPRESA A S.A."}, {"7107": "SAO PAULO"})
+    resumo = normalize_company(payload, "33000167000101")
+    assert resumo["razao_social"] == "EMPRESA A S.A."
+    assert resumo["municipio"] == "SAO PAULO"
+
+    # sem as tabelas auxiliares o código TOM não vira nome de cidade
+    parcial = normalize_company(receita_para_payload(row), "33000167000101")
+    assert parcial["razao_social"] is None and parcial["municipio"] is None
+
+
+def test_fetch_junta_empresas_e_municipios(parquet, tmp_path):
+    _tabelas_auxiliares(tmp_path)
+    idx = LocalCNPJIndex(parquet)
+    assert idx.empresas is not None and idx.municipios["7107"] == "SAO PAULO"
+
+    resumo = normalize_company(idx.fetch("33000167000282").data, "33000167000282")
+    assert (resumo["razao_social"], resumo["nome_fantasia"], resumo["municipio"]) == (
+        "EMPRESA A S.A.", "FILIAL A1", "SAO PAULO")
+    assert normalize_company(idx.fetch("00000000000191").data, "00000000000191")["razao_social"] is None
+
+
+def test_cliente_completa_registro_local_parcial_pelo_http(parquet, monkeypatch):
+    chamadas = []
+
+    def remoto(self, url, source):
+        chamadas.append(url)
+        return FetchResult(source, 200, {"razao_social": "EMPRESA A S.A.", "municipio": "SAO PAULO",
+                                         "nome_fantasia": "OUTRO NOME"}, None)
+
+    monkeypatch.setattr(CNPJClient, "_request_json", remoto)
+    client = CNPJClient(sleep_seconds=0, local_index=LocalCNPJIndex(parquet))
+
+    res = client.fetch("33000167000101")
+    assert len(chamadas) == 1 and res.source.startswith(FONTE_LOCAL)
+    assert res.data["razao_social"] == "EMPRESA A S.A." and res.data["municipio"] == "SAO PAULO"
+    assert res.data["nome_fantasia"] == "MATRIZ A"  # o dado local prevalece
+
+
+def test_cliente_nao_chama_http_com_registro_local_completo(parquet, tmp_path, monkeypatch):
+    _tabelas_auxiliares(tmp_path)
+    monkeypatch.setattr(CNPJClient, "_request_json", lambda *a: pytest.fail("HTTP não deveria ser chamado"))
+    res = CNPJClient(local_index=LocalCNPJIndex(parquet)).fetch("33000167000101")
+    assert res.source == FONTE_LOCAL and res.data["municipio"] == "SAO PAULO"
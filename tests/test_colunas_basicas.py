@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def expedidos(script):
+    return script("Algoritmo de Dados - Colunas Basicas Excel.py", "colunas_basicas")
+
+
+def laco_original(df_raw):
+    """Laço com iloc que o desempilhamento substituiu (referência de comportamento)."""
+    lista = []
+    for col_idx in range(0, df_raw.shape[1], 2):
+        referencia_data = df_raw.iloc[0, col_idx]
+        if pd.isna(referencia_data):
+            continue
+        for row_idx in range(2, len(df_raw)):
+            cod_prod = df_raw.iloc[row_idx, col_idx]
+            qtd = df_raw.iloc[row_idx, col_idx + 1] if col_idx + 1 < df_raw.shape[1] else np.nan
+            if pd.notna(cod_prod):
+                lista.append({'DATA': referencia_data, 'CODPROD': int(cod_prod), 'QUANTIDADE': qtd if pd.notna(qtd) else 0})
+    return pd.DataFrame(lista)
+
+
+def test_desempilhar_igual_ao_laco(expedidos):
+    rng = np.random.default_rng(1)
+    dias, linhas = 12, 15
+    matriz = np.full((linhas + 2, dias * 2 - 1), np.nan, dtype=object)  # termina no meio de um bloco
+    matriz[0, ::2] = list(pd.date_range("2025-01-01", periods=dias))
+    matriz[0, 4] = np.nan  # bloco sem data é ignorado
+    matriz[1, ::2], matriz[1, 1::2] = "CÓDIGO", "QTD"
+    preenchidas = rng.random((linhas, dias)) < 0.6
+    matriz[2:, ::2] = np.where(preenchidas, rng.integers(1000, 9999, (linhas, dias)).astype(float), np.nan)
+    qtds = np.where(rng.random((linhas, dias - 1)) < 0.9, rng.integers(1, 50, (linhas, dias - 1)), np.nan)
+    matriz[2:, 1::2] = qtds
+    df_raw = pd.DataFrame(matriz)
+
+    novo = expedidos.desempilhar_expedidos(df_raw)
+    ref = laco_original(df_raw)
+
+    assert len(novo) == len(ref) > 0
+    assert novo["DATA"].tolist() == ref["DATA"].tolist()
+    assert novo["CODPROD"].tolist() == ref["CODPROD"].tolist()
+    assert novo["QUANTIDADE"].tolist() == pd.to_numeric(ref["QUANTIDADE"]).tolist()
+
+
+@pytest.mark.parametrize("forma", [(0, 0), (1, 4), (2, 4)])
+def test_aba_vazia_devolve_colunas_tipadas(expedidos, forma):
+    df_raw = pd.DataFrame(np.full(forma, np.nan, dtype=object))
+    if forma[0]:
+        df_raw.iloc[0, 0] = pd.Timestamp("2025-01-01")
+    resultado = expedidos.desempilhar_expedidos(df_raw)
+    assert resultado.empty
+    assert resultado.dtypes.astype(str).tolist() == ["datetime64[ns]", "int64", "float64"]
@@ -0,0 +1,117 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from consolidador_abas import AlinhadorColunas, consolidar_abas, normalizar_nome, selecionar_abas
+
+pytest.importorskip("openpyxl")
+
+
+def _pasta(caminho, abas):
+    with pd.ExcelWriter(caminho) as writer:
+        for nome, df in abas.items():
+            df.to_excel(writer, sheet_name=nome, index=False)
+    return caminho
+
+
+@pytest.fixture
+def mensal(tmp_path):
+    return _pasta(tmp_path / "mensal.xlsx", {
+        "Atendimento Jan": pd.DataFrame({"Cliente": ["A", "B"], "Capacidade Média": [1.0, 2.0], "Obs": [np.nan, np.nan]}),
+        "ATEND. FEV": pd.DataFrame({" CLIENTE ": ["C"], "capacidade  media": [3.0], "Obs": [np.nan]}),
+        "Resumo": pd.DataFrame({"Total": [6.0]}),
+    })
+
+
+def test_normalizar_nome():
+    assert normalizar_nome("  Capacidade  Média ") == "CAPACIDADE MEDIA"
+    assert normalizar_nome(2025) == "2025"
+
+
+def test_selecionar_abas():
+    nomes = ["Atendimento Jan", "ATEND. FEV", "Resumo"]
+    assert selecionar_abas(nomes, abas=["resumo", "MARÇO"]) == [("resumo", "Resumo"), ("MARÇO", None)]
+    assert selecionar_abas(nomes, prefixos=["atendimento", "ATEND."]) == [
+        ("Atendimento Jan", "Atendimento Jan"), ("ATEND. FEV", "ATEND. FEV")]
+    assert [real for _, real in selecionar_abas(nomes)] == nomes
+
+
+def test_alinhador_regras_e_grafias():
+    alinhador = AlinhadorColunas(regras=[(("CAPACIDADE",), "Capacidade")])
+    a = alinhador.alinhar(pd.DataFrame([[1, 2, 3]], columns=["Linha", "Capacidade Média", "LINHA "]))
+    b = alinhador.alinhar(pd.DataFrame([[4, 5]], columns=[" linha", "capacidade produtiva"]))
+    assert list(a.columns) == ["Linha", "Capacidade"] and a.iloc[0].tolist() == [1, 2]
+    assert list(b.columns) == ["Linha", "Capacidade"]
+
+
+def test_consolidar_por_prefixo_mantem_coluna_vazia(mensal):
+    df = consolidar_abas([mensal], prefixos=["ATENDIMENTO", "ATEND."])
+    assert list(df.columns) == ["Cliente", "Capacidade Média", "Obs", "Aba_Origem"]
+    assert df["Cliente"].tolist() == ["A", "B", "C"]
+    assert df["Capacidade Média"].tolist() == [1.0, 2.0, 3.0]
+    assert df["Obs"].isna().all()
+    assert df["Aba_Origem"].tolist() == ["Atendimento Jan"] * 2 + ["ATEND. FEV"]
+
+
+def test_consolidar_aba_ausente_e_ignorada(mensal, capsys):
+    df = consolidar_abas([mensal], abas=["ATEND. FEV", "MARÇO"], colunas=["Cliente", "Inexistente"])
+    assert df.to_dict("list") == {"Cliente": ["C"], "Aba_Origem": ["ATEND. FEV"]}
+    assert "Aba MARÇO não encontrada" in capsys.readouterr().out
+
+
+def test_consolidar_sem_abas_encontradas(mensal):
+    assert consolidar_abas([mensal], abas=["MARÇO"]).empty
+
+
+def test_consolidar_varios_arquivos_igual_leitura_por_aba(tmp_path, mensal):
+    outro = _pasta(tmp_path / "outro.xlsx", {
+        "Atendimento Mar": pd.DataFrame({"CLIENTE": ["D"], "Capacidade Media": [4.0], "Obs": ["ok"]}),
+    })
+    df = consolidar_abas([mensal, outro], prefixos=["ATEND"], workers=2)
+
+    # referência: uma leitura por aba, renomeando à mão
+    partes = []
+    for arquivo, aba in [(mensal, "Atendimento Jan"), (mensal, "ATEND. FEV"), (outro, "Atendimento Mar")]:
+        lida = pd.read_excel(arquivo, sheet_name=aba)
+        lida.columns = ["Cliente", "Capacidade Média", "Obs"]
+        partes.append(lida.assign(Aba_Origem=aba, Arquivo_Origem=arquivo.name))
+    pd.testing.assert_frame_equal(df, pd.concat(partes, ignore_index=True), check_dtype=False)
+
+
+def test_juntar_abas_grava_base_com_coluna_vazia(script, mensal, tmp_path):
+    juntar = script("Utilitário - Juntar Abas em Arquivo Único.py", "juntar_abas")
+    saida = tmp_path / "BASE.xlsx"
+    juntar.juntar_abas([mensal], saida)
+    lida = pd.read_excel(saida, sheet_name="BASE")
+    assert list(lida.columns) == ["Cliente", "Capacidade Média", "Obs", "Aba_Origem"]
+    assert len(lida) == 3 and lida["Obs"].isna().all()
+
+    openpyxl = pytest.importorskip("openpyxl")
+    assert [t.ref for t in openpyxl.load_workbook(saida)["BASE"].tables.values()] == ["A1:D4"]
+
+
+def test_tabela_fato_grava_hora_como_hora(script, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    fato = script("Ferramenta de Extração - TabelaFato.py", "tabela_fato")
+    origem = openpyxl.Workbook()
+    for nome, linhas in [("JANEIRO25", [[dt.datetime(2025, 1, 2), dt.time(8, 30), "L1", 10.5, "A"]]),
+                         ("FEVEREIRO25", [[dt.datetime(2025, 2, 3), dt.time(14, 0), "L2", 7.0, "B"],
+                                          [dt.datetime(2025, 2, 3), "sem registro", "L2", 6.0, "B"]])]:
+        ws = origem.create_sheet(nome)
+        ws.append(["DATA", "Hora ", "Linha", "Capacidade Produtiva Media", "Tipo produção"])
+        for linha in linhas:
+            ws.append(linha)
+    origem.save(tmp_path / "paradas.xlsx")
+
+    saida = tmp_path / "fato.xlsx"
+    fato.consolidar_paradas_2025(str(tmp_path / "paradas.xlsx"), str(saida))
+
+    ws = openpyxl.load_workbook(saida).active
+    assert [c.value for c in ws[1]] == ["Data", "Hora", "Linha", "Capacidade Produtiva Média",
+                                       "Tipo produção", "Mes_Referencia"]
+    assert [(ws.cell(row=r, column=2).value, ws.cell(row=r, column=2).number_format) for r in (2, 3)] == [
+        (dt.time(8, 30), "HH:MM:SS"), (dt.time(14, 0), "HH:MM:SS")]
+    assert ws["B4"].value == "sem registro"
+    assert (ws["A2"].value, ws["A2"].number_format) == (dt.datetime(2025, 1, 2), "DD/MM/YYYY")
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def conversor(script):
+    return script("Conversor CSV para Excel - Universal.py", "conversor_csv_universal")
+
+
+def _csv(caminho, df):
+    df.to_csv(caminho, sep=";", index=False, encoding="latin-1")
+    return caminho
+
+
+def test_coluna_em_branco_no_primeiro_bloco(tmp_path, conversor):
+    df = pd.DataFrame({"CNAE": ["0111-3/01", "0112-1/01", "0113-0/00", "0115-6/00"],
+                       "Descrição": ["Cultivo de arroz", "Cultivo de algodão", "Cana", "Soja"],
+                       "Obs": [np.nan, np.nan, np.nan, "revisar"],
+                       "Qtd": [1, 2, 3, 4]})
+    csv = _csv(tmp_path / "cnae.csv", df)
+    conversor.converter_csv_para_excel(str(csv), str(tmp_path / "cnae.xlsx"), "CNAE", ";", "latin-1",
+                                       chunksize=2, parquet_path=str(tmp_path / "cnae.parquet"))
+    lido = pd.read_excel(tmp_path / "cnae.xlsx", sheet_name="CNAE")
+    assert lido["Descrição"].tolist() == df["Descrição"].tolist()
+    assert lido["Obs"].iloc[:3].isna().all()
+    assert lido["Obs"].iloc[3] == "revisar"
+    assert pd.read_parquet(tmp_path / "cnae.parquet")["Qtd"].tolist() == [1, 2, 3, 4]
+
+
+def test_divide_abas_no_limite(tmp_path, conversor):
+    csv = _csv(tmp_path / "n.csv", pd.DataFrame({"n": range(7)}))
+    conversor.converter_csv_para_excel(str(csv), str(tmp_path / "n.xlsx"), "N", ";", "latin-1",
+                                       chunksize=3, linhas_por_aba=3)
+    abas = pd.read_excel(tmp_path / "n.xlsx", sheet_name=None)
+    assert list(abas) == ["N", "N (2)", "N (3)"]
+    assert pd.concat(abas.values())["n"].tolist() == list(range(7))
+
+
+def test_tipo_trocado_depois_do_primeiro_bloco_mostra_dica(tmp_path, conversor, capsys):
+    csv = _csv(tmp_path / "t.csv", pd.DataFrame({"cod": ["1", "2", "3", "ABC"]}))
+    conversor.converter_csv_para_excel(str(csv), str(tmp_path / "t.xlsx"), "T", ";", "latin-1", chunksize=2)
+    saida = capsys.readouterr().out
+    assert "tipos_colunas" in saida
+    assert "linha 3" in saida
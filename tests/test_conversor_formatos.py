@@ -0,0 +1,77 @@
+import codecs
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def conversor(script):
+    pytest.importorskip("openpyxl")
+    return script("Conversor de Formatos.py", "conversor_formatos")
+
+
+@pytest.mark.parametrize("amostra, esperado", [
+    (codecs.BOM_UTF8 + "Descrição;Preço".encode("utf-8"), "utf-8-sig"),
+    ("Descrição;Preço".encode("utf-16"), "utf-16"),
+    ("Descrição;Preço".encode("utf-8"), "utf-8"),
+    ("Descrição;Preço".encode("utf-8")[:-2], "utf-8"),          # amostra corta o 'ç' ao meio
+    ("Descrição;Preço".encode("cp1252"), "cp1252"),
+    (b"Descri\xe7\xe3o;\x81", "iso-8859-1"),                    # 0x81 não existe no cp1252
+])
+def test_detectar_encoding(conversor, amostra, esperado):
+    assert conversor.detectar_encoding(amostra) == esperado
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("produto;preço\nCABO, HDMI;1,50\nMOUSE;2,75\n", ";"),     # vírgula decimal e no texto
+    ("produto,preço\nCABO;HDMI,1.50\nMOUSE,2.75\n", ","),
+    ("produto\tpreço\nCABO\t1,50\n", "\t"),
+    ("produto;preço;sku", ";"),                                 # só o cabeçalho: candidato mais frequente
+])
+def test_detectar_separador(conversor, texto, esperado):
+    assert conversor.detectar_separador(texto) == esperado
+
+
+def test_erro_de_decodificacao_depois_da_amostra(conversor, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(conversor, "TAMANHO_AMOSTRA", 64)
+    caminho = tmp_path / "misto.csv"
+    inicio = "DESCRICAO;VALOR\n" + "".join(f"Informação {i};{i}\n" for i in range(5))
+    caminho.write_bytes(inicio.encode("utf-8") + "Preço final;9\n".encode("cp1252"))
+
+    df = conversor.ler_csv_com_varredura(str(caminho))
+
+    saida = capsys.readouterr().out
+    assert "Encoding: utf-8 | separador: ';'" in saida
+    assert "relendo com cp1252" in saida and "Sucesso ao ler com encoding: cp1252" in saida
+    assert df["VALOR"].tolist() == [0, 1, 2, 3, 4, 9]
+    # o começo em UTF-8 lido como cp1252 vira mojibake, que o tratamento desfaz
+    assert df["DESCRICAO"].iloc[0] == "InformaÃ§Ã£o 0" and df["DESCRICAO"].iloc[-1] == "Preço final"
+    tratado = conversor.tratar_erros_e_caracteres(df)
+    assert tratado["DESCRICAO"].tolist() == [f"Informação {i}" for i in range(5)] + ["Preço final"]
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("informa??o", "Informação"),
+    ("Informa?o", "Informação"),
+    ("pre??o", "Preço"),
+    ("Pre?o unitário", "Preço unitário"),
+    ("rota?o", "rotação"),
+    ("inclina?o do braço", "inclinação do braço"),
+    ("ergon?mico", "Ergonômico"),
+    ("Ã§Ã£o", "ção"),
+    ("ConfiguraÃ§Ã£o", "Configuração"),
+    ("Ã¡gua a 40Â°C", "água a 40°C"),
+    ("S?o Paulo", "S?o Paulo"),                                 # sem padrão conhecido: fica como está
+    ("Cabo HDMI", "Cabo HDMI"),
+])
+def test_regex_correcao(conversor, texto, esperado):
+    assert conversor.REGEX_CORRECAO.sub(conversor._substituir, texto) == esperado
+
+
+def test_corrigir_coluna_so_nas_linhas_suspeitas(conversor):
+    serie = pd.Series(["  Cabo HDMI ", None, "Pre?o", "ConfiguraÃ§Ã£o", "Pre?o"], dtype=object)
+    corrigida = conversor.corrigir_coluna(serie)
+    assert corrigida.drop(1).tolist() == ["Cabo HDMI", "Preço", "Configuração", "Preço"] and pd.isna(corrigida[1])
+    # ida e volta cp1252 -> UTF-8 só quando vale para todos os valores distintos
+    assert conversor.corrigir_textos(["aÃ§Ã£o", "InformaÃ§Ã£o"]) == ["ação", "Informação"]
+    assert conversor.corrigir_textos(["aÃ§Ã£o", "ação"]) == ["ação", "ação"]
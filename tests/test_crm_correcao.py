@@ -0,0 +1,103 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def crm(script):
+    pytest.importorskip("openpyxl")
+    return script("ETL - CRM - Algoritmo de Correção.py", "crm_correcao")
+
+
+def test_para_datas_formatos_aceitos(crm):
+    resultado = crm.para_datas([datetime(2025, 1, 2, 15, 30), date(2025, 1, 3), 45000, 45000.7,
+                                "04/01/2025", "2025-01-05", "06-01-2025"])
+    assert resultado.tolist() == [
+        pd.Timestamp("2025-01-02"), pd.Timestamp("2025-01-03"), pd.Timestamp("2023-03-15"),
+        pd.Timestamp("2023-03-15"), pd.Timestamp("2025-01-04"), pd.Timestamp("2025-01-05"),
+        pd.Timestamp("2025-01-06"),
+    ]
+
+
+def test_para_datas_numero_fora_da_faixa_vira_nat(crm):
+    # telefone digitado na coluna de data não pode derrubar a correção
+    resultado = crm.para_datas([11987654321, -5, 0, 45000])
+    assert resultado.isna().tolist() == [True, False, False, False]
+    # 0 e negativos são datas de 1899 (congeladas), não linhas novas
+    assert resultado.iloc[1:3].tolist() == [pd.Timestamp("1899-12-25"), pd.Timestamp("1899-12-30")]
+
+
+def test_para_datas_texto_numerico_nao_e_serial(crm):
+    assert crm.para_datas(["45000", " ", None, "abc"]).isna().all()
+
+
+def _bloco(crm, linhas):
+    """(DATA, nome, próx. contato, status agenda, SLA, status lead, prioridade, motivo) -> bloco C..Z."""
+    df = crm.bloco_para_dataframe([[None] * 24 for _ in linhas])
+    for i, (data, nome, prox, agenda, sla, status, prioridade, motivo) in enumerate(linhas):
+        for col, valor in zip("CEUVWXYZ", (data, nome, prox, agenda, sla, status, prioridade, motivo)):
+            df.at[i, col] = valor
+    return df
+
+
+def test_corrigir_bloco_regras(crm):
+    hoje = "2025-03-10"
+    df = _bloco(crm, [
+        (None, "LOJA NOVA", None, None, None, None, "ALTA", None),                  # linha nova
+        (datetime(2025, 3, 8), "LOJA B", None, None, None, None, "BAIXA", None),   # contato recente
+        (datetime(2025, 1, 1), "LOJA C", date(2025, 1, 5), "ATRASADO", date(2025, 1, 3),
+         "LEAD MORTO", "MÉDIA", None),                                             # já atualizada
+        ("01/03/2025", "LOJA D", None, None, None, None, None, "sem interesse"),
+        (None, None, None, None, None, None, "ALTA", None),                        # sem nome: ignorada
+        (0, "LOJA E", None, None, None, None, None, None),                         # serial 0 não é linha nova
+    ])
+    novos, mascara = crm.corrigir_bloco(df, hoje)
+
+    assert mascara["C"].tolist() == [True, False, False, False, False, False]
+    assert novos.at[0, "C"] == pd.Timestamp(hoje)
+    assert novos.at[0, "U"] == pd.Timestamp("2025-03-13") and novos.at[1, "U"] == pd.Timestamp("2025-03-25")
+    assert mascara["U"].tolist() == [True, True, False, False, False, False]
+    assert novos["V"].tolist()[:4] == ["AGUARDAR PROX. CONTATO", "AGUARDAR PROX. CONTATO", "ATRASADO", "ATRASADO"]
+    assert mascara["V"].tolist() == [True, True, False, True, False, True]
+    assert novos.at[3, "W"] == pd.Timestamp("2025-03-03") and not mascara.at[2, "W"]
+    assert novos["X"].tolist()[:4] == ["LEAD ATIVO", "LEAD ATIVO", "LEAD MORTO", "LEAD MORTO"]
+    assert mascara["X"].tolist() == [True, True, False, True, False, True]
+
+
+def test_blocos_contiguos(crm):
+    assert crm.blocos_contiguos([False, True, True, False, True, False, True, True, True]) == [(1, 2), (4, 4), (6, 8)]
+    assert crm.blocos_contiguos([True]) == [(0, 0)]
+    assert crm.blocos_contiguos([False, False]) == []
+    assert crm.blocos_contiguos([]) == []
+
+
+def test_salvar_com_troca_preserva_original_em_backup(crm, tmp_path):
+    from openpyxl import Workbook, load_workbook
+
+    arquivo = tmp_path / "CRM.xlsx"
+    wb = Workbook()
+    wb.active["A1"] = "original"
+    wb.save(arquivo)
+
+    wb = load_workbook(arquivo)
+    wb.active["A1"] = "corrigido"
+    crm.salvar_com_troca(wb, arquivo)
+
+    assert load_workbook(arquivo).active["A1"].value == "corrigido"
+    assert load_workbook(crm.caminho_backup(arquivo)).active["A1"].value == "original"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["CRM - backup.xlsx", "CRM.xlsx"]
+
+
+def test_salvar_com_troca_falha_nao_toca_no_original(crm, tmp_path, monkeypatch):
+    from openpyxl import Workbook
+
+    arquivo = tmp_path / "CRM.xlsx"
+    arquivo.write_bytes(b"conteudo original")
+    wb = Workbook()
+    monkeypatch.setattr(wb, "save", lambda destino: (_ for _ in ()).throw(OSError("disco cheio")))
+
+    with pytest.raises(OSError):
+        crm.salvar_com_troca(wb, arquivo)
+    assert arquivo.read_bytes() == b"conteudo original"
+    assert [p.name for p in tmp_path.iterdir()] == ["CRM.xlsx"]
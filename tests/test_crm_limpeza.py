@@ -0,0 +1,111 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def limpeza(script):
+    pytest.importorskip("openpyxl")
+    return script("CRM - Algorítimo de Limpeza e Edição de Dados.py", "crm_limpeza")
+
+
+def _serial(dia: date) -> float:
+    return float((pd.Timestamp(dia) - pd.Timestamp("1899-12-30")).days)
+
+
+@pytest.fixture
+def crm(tmp_path):
+    """CRM como o Excel salva: fórmulas com o valor calculado em cache."""
+    xlsxwriter = pytest.importorskip("xlsxwriter")
+    hoje = date.today()
+    caminho = tmp_path / "crm.xlsx"
+    wb = xlsxwriter.Workbook(str(caminho))
+    fmt_data = wb.add_format({"num_format": "dd/mm/yyyy"})
+
+    ws = wb.add_worksheet("ANDRÉ")
+    ws.write_row(0, 0, ["Nome do Cliente", "DATA", "Contato", "Total", "Status do Lead"])
+    ws.write_row(1, 0, [" loja a "])
+    ws.write_formula(1, 1, "=TODAY()", fmt_data, _serial(hoje))
+    ws.write_row(1, 2, ["nan"])
+    ws.write_formula(1, 3, "=1+1", None, 2)
+    ws.write_string(1, 4, "FECHADO")
+
+    ws.write_row(2, 0, ["LOJA B"])
+    ws.write_datetime(2, 1, datetime.combine(hoje - timedelta(days=5), datetime.min.time()), fmt_data)
+    ws.write_row(2, 2, ["-"])
+    ws.write_formula(2, 3, "=2+2", None, 4)
+    ws.write_string(2, 4, "PROSPECÇÃO")
+
+    ws.write_row(3, 0, ["loja c"])
+    ws.write_formula(3, 1, "=TODAY()-3", fmt_data, _serial(hoje - timedelta(days=3)))
+    ws.write_row(3, 2, ["11 9999"])
+    ws.write_formula(3, 3, "=3+3", None, 6)
+
+    ws.write_row(4, 0, ["LOJA D", "sem data", "11 8888"])
+    ws.write_formula(4, 3, "=4+4", None, 8)
+    ws.write_string(4, 4, "PROSPECÇÃO")
+
+    sem_mudanca = wb.add_worksheet("DUDA")
+    sem_mudanca.write_row(0, 0, ["Nome do Cliente", "Contato"])
+    sem_mudanca.write_row(1, 0, ["LOJA E", "11 7777"])
+    wb.close()
+    return caminho
+
+
+def test_aplicar_correcoes_e_limpeza(limpeza):
+    df = pd.DataFrame({"Nome do Cliente": [" loja a ", "n/a", None], "Status do Lead": ["fechado", "perdi", "-"],
+                       "Outra": [" x ", "nan", None]})
+    limpo = limpeza.aplicar_correcoes_e_limpeza(df)
+    assert list(limpo.columns) == ["NOME DO CLIENTE", "STATUS DO LEAD", "OUTRA"]
+    assert limpo["NOME DO CLIENTE"].tolist()[:1] == ["LOJA A"] and limpo["NOME DO CLIENTE"].iloc[1:].isna().all()
+    assert limpo["STATUS DO LEAD"].tolist()[:2] == ["CONVERTIDO", "PERDIDO"] and pd.isna(limpo["STATUS DO LEAD"].iloc[2])
+    assert limpo["OUTRA"].tolist()[:2] == [" x ", "nan"]  # só as colunas manuais são limpas
+
+
+def test_congelar_datas_hoje_vira_ontem(limpeza):
+    hoje = datetime.now()
+    df = pd.DataFrame({"DATA": [hoje, hoje - timedelta(days=3), "sem data", None]})
+    congelado = limpeza.congelar_datas(df, "DATA")["DATA"].tolist()
+    assert congelado[0] == (hoje - timedelta(days=1)).date()
+    assert congelado[1] == hoje - timedelta(days=3)
+    assert congelado[2:] == [None, None]
+
+
+def test_valores_diferentes_e_escrever_coluna(limpeza):
+    openpyxl = pytest.importorskip("openpyxl")
+    novos = np.array(["A", None, date(2025, 1, 2), "D", None], dtype=object)
+    antigos = ["A", np.nan, datetime(2025, 1, 2), "X", "Y"]
+    mascara = limpeza.valores_diferentes(novos, antigos)
+    assert mascara.tolist() == [False, False, False, True, True]
+
+    ws = openpyxl.Workbook().active
+    for linha, valor in enumerate(antigos, start=2):
+        ws.cell(row=linha, column=1, value=valor if isinstance(valor, str) else None)
+    assert limpeza.escrever_coluna(ws, 1, novos, mascara) == 2
+    assert [ws.cell(row=r, column=1).value for r in range(2, 7)] == ["A", None, None, "D", None]
+
+
+def test_processar_crm_altera_so_o_necessario(limpeza, crm, tmp_path, monkeypatch, capsys):
+    openpyxl = pytest.importorskip("openpyxl")
+    monkeypatch.chdir(tmp_path)  # o backup é gravado na pasta atual
+    ontem = date.today() - timedelta(days=1)
+
+    limpeza.processar_crm_com_formatacao(str(crm))
+
+    saida = capsys.readouterr().out
+    assert "Corrigindo dados na aba: ANDRÉ...\n   8 célula(s) alterada(s)" in saida
+    assert "Corrigindo dados na aba: DUDA...\n   0 célula(s) alterada(s)" in saida
+    assert len(list(tmp_path.glob("CRM_BACKUP_*.xlsx"))) == 1
+
+    ws = openpyxl.load_workbook(crm)["ANDRÉ"]
+    valores = [[c.value for c in linha] for linha in ws.iter_rows(min_row=2, max_col=5)]
+    datas = [v[1].date() if isinstance(v[1], datetime) else v[1] for v in valores]
+    assert [v[0] for v in valores] == ["LOJA A", "LOJA B", "LOJA C", "LOJA D"]
+    # hoje -> ontem; data fixa intocada; fórmula de outra data congelada no valor; texto inválido -> vazio
+    assert datas == [ontem, date.today() - timedelta(days=5), date.today() - timedelta(days=3), None]
+    assert [v[2] for v in valores] == [None, None, "11 9999", "11 8888"]  # "nan" e "-" viram vazio
+    assert [v[4] for v in valores] == ["CONVERTIDO", "PROSPECÇÃO", None, "PROSPECÇÃO"]
+    # fórmulas de colunas que não são manuais nem de data continuam fórmulas
+    assert [v[3] for v in valores] == ["=1+1", "=2+2", "=3+3", "=4+4"]
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubo_ranking import (
+    NIVEL_TODOS,
+    carregar_cubo,
+    combinacoes_filtro,
+    construir_cubo,
+    consultar_cubo,
+    cubo_atualizado,
+    obter_cubo,
+    rotulo_filtros,
+    salvar_cubo,
+    trecho_nome_arquivo,
+)
+
+DIMENSOES = ["UF", "REGIAO"]
+TOP = 3
+
+
+@pytest.fixture
+def vendas():
+    rng = np.random.default_rng(0)
+    n = 2000
+    return pd.DataFrame({
+        "UF": rng.choice(["SP", "RJ", "MG", "NAN"], n),
+        "REGIAO": rng.choice(["SUDESTE", "SUL"], n),
+        "CATEGORIA": rng.choice(["BOLSA", "SAPATO"], n),
+        "COD": rng.integers(1, 40, n),
+        "QTD": rng.integers(1, 5, n),
+        "ESTOQUE": rng.random(n) < 0.5,
+    })
+
+
+def ranking_direto(vendas, filtros, so_com_estoque=False):
+    """Ranking como os relatórios faziam a cada execução: filtra, agrupa e ordena."""
+    df = vendas[vendas["ESTOQUE"]] if so_com_estoque else vendas
+    for dim, valor in filtros.items():
+        df = df[df[dim] == valor]
+    agg = df.groupby(["CATEGORIA", "COD"], as_index=False)["QTD"].sum()
+    agg = agg.sort_values(["CATEGORIA", "QTD", "COD"], ascending=[True, False, True])
+    return agg.groupby("CATEGORIA").head(TOP).reset_index(drop=True)
+
+
+@pytest.fixture
+def cubo(vendas):
+    return construir_cubo(vendas, DIMENSOES, ["COD"], "CATEGORIA", "QTD", TOP,
+                          desempate=["COD"], estoque=vendas["ESTOQUE"])
+
+
+@pytest.mark.parametrize("so_com_estoque", [False, True])
+def test_cubo_igual_ao_ranking_direto(vendas, cubo, so_com_estoque):
+    for filtros in [{}, {"UF": "SP"}, {"REGIAO": "SUL"}, {"UF": "MG", "REGIAO": "SUDESTE"}]:
+        fatia = consultar_cubo(cubo, DIMENSOES, filtros, "CATEGORIA", so_com_estoque=so_com_estoque)
+        fatia = fatia.sort_values(["CATEGORIA", "RANKING"]).reset_index(drop=True)
+        esperado = ranking_direto(vendas, filtros, so_com_estoque)
+        assert fatia[["CATEGORIA", "COD", "QTD"]].astype(str).equals(esperado.astype(str)), filtros
+        assert (fatia.groupby("CATEGORIA")["RANKING"].apply(list) == [list(range(1, TOP + 1))] * 2).all()
+
+
+def test_rank_denso_com_empates():
+    df = pd.DataFrame({"UF": "SP", "CATEGORIA": "BOLSA", "COD": [1, 2, 3, 4], "QTD": [5, 5, 3, 1]})
+    cubo = construir_cubo(df, ["UF"], ["COD"], "CATEGORIA", "QTD", 3, desempate=["COD"])
+    fatia = consultar_cubo(cubo, ["UF"], {}, "CATEGORIA")
+    assert fatia["COD"].tolist() == [1, 2, 3]
+    assert fatia["RANKING"].tolist() == [1, 2, 3]
+    assert fatia["RANK_DENSO"].tolist() == [1, 1, 2]
+
+
+def test_cubo_vazio():
+    df = pd.DataFrame({"UF": [], "CATEGORIA": [], "COD": [], "QTD": []})
+    cubo = construir_cubo(df, ["UF"], ["COD"], "CATEGORIA", "QTD", 3)
+    assert cubo.empty
+    assert "RANKING" in cubo.columns and "RANK_DENSO" in cubo.columns
+    assert combinacoes_filtro(cubo, ["UF"]) == [{}]
+
+
+def test_combinacoes_filtro_grade_completa(vendas, cubo):
+    combinacoes = combinacoes_filtro(cubo, DIMENSOES)
+    assert combinacoes[:6] == [{}, {"UF": "MG"}, {"UF": "RJ"}, {"UF": "SP"},
+                               {"REGIAO": "SUDESTE"}, {"REGIAO": "SUL"}]
+    assert combinacoes[6:] == [{"UF": uf, "REGIAO": regiao}
+                               for uf in ["MG", "RJ", "SP"] for regiao in ["SUDESTE", "SUL"]]
+    assert NIVEL_TODOS not in [v for filtro in combinacoes for v in filtro.values()]
+
+    # cada combinação tem linhas no cubo e bate com o ranking direto
+    for filtros in combinacoes:
+        fatia = consultar_cubo(cubo, DIMENSOES, filtros, "CATEGORIA")
+        assert len(fatia) == len(ranking_direto(vendas, filtros)) > 0, filtros
+
+
+def test_combinacoes_filtro_so_cruzamentos_existentes():
+    df = pd.DataFrame({"UF": ["SP", "RS", "NAN"], "REGIAO": ["SUDESTE", "SUL", "SUL"],
+                       "CATEGORIA": "BOLSA", "COD": [1, 2, 3], "QTD": 1})
+    cubo = construir_cubo(df, DIMENSOES, ["COD"], "CATEGORIA", "QTD", TOP)
+    assert combinacoes_filtro(cubo, DIMENSOES) == [
+        {}, {"UF": "RS"}, {"UF": "SP"}, {"REGIAO": "SUDESTE"}, {"REGIAO": "SUL"},
+        {"UF": "RS", "REGIAO": "SUL"}, {"UF": "SP", "REGIAO": "SUDESTE"}]
+
+
+def test_rotulo_filtros():
+    assert rotulo_filtros({}, DIMENSOES) == "GERAL"
+    assert rotulo_filtros({"REGIAO": "SUL"}, DIMENSOES) == "SUL"
+    assert rotulo_filtros({"REGIAO": "SUL/SUDESTE", "UF": "RS"}, DIMENSOES) == "RS_SUL_SUDESTE"
+
+
+def test_salvar_e_carregar_cubo(tmp_path, cubo):
+    caminho = tmp_path / "cubo.parquet"
+    meta = {"origem": "vendas.xlsx", "top": TOP}
+    salvar_cubo(cubo, caminho, meta)
+
+    assert cubo_atualizado(caminho, meta)
+    assert not cubo_atualizado(caminho, {**meta, "top": TOP + 1})
+    lido = carregar_cubo(caminho)
+    assert lido.astype(str).equals(cubo.astype(str))
+
+
+def test_obter_cubo_mesmos_tipos_ao_gerar_e_ao_ler(tmp_path, vendas):
+    vendas = vendas.assign(REFERENCIA=np.where(vendas["COD"] % 2 == 0, vendas["COD"], "REF-" + vendas["COD"].astype(str)))
+    caminho = tmp_path / "cubo.parquet"
+    meta = {"origem": "vendas.xlsx"}
+
+    def construir():
+        return construir_cubo(vendas, DIMENSOES, ["COD", "REFERENCIA"], "CATEGORIA", "QTD", TOP)
+
+    gerado = obter_cubo(caminho, meta, construir)
+    lido = obter_cubo(caminho, meta, lambda: pytest.fail("cubo deveria vir do Parquet"))
+    pd.testing.assert_frame_equal(gerado, lido)
+    assert gerado["REFERENCIA"].map(type).eq(str).all()
+
+
+def test_trecho_nome_arquivo():
+    assert trecho_nome_arquivo("SP") == "SP"
+    assert trecho_nome_arquivo("SUL/SUDESTE") == "SUL_SUDESTE"
+    assert trecho_nome_arquivo('a\\b:c*?"d') == "a_b_c_d"
+    assert trecho_nome_arquivo(" .. ") == "_"
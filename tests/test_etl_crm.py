@@ -0,0 +1,305 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def etl(script):
+    pytest.importorskip("openpyxl")
+    return script("ETL - CRM.py", "etl_crm")
+
+
+def _aba(ids, **extras):
+    base = {
+        "ID": ids,
+        "DATA": [pd.Timestamp("2025-01-01")] * len(ids),
+        "Nome do Cliente": [f"CLIENTE {i}" for i in ids],
+        "Contato": ["(11) 98765-4321"] * len(ids),
+        "CNPJ": [None] * len(ids),
+        "Cidade": ["SÃO PAULO"] * len(ids),
+        "UF": ["SP"] * len(ids),
+    }
+    base.update(extras)
+    return pd.DataFrame(base)
+
+
+def test_coluna_vazia_em_todas_as_abas_e_mantida(etl, tmp_path):
+    arquivo = tmp_path / "crm.xlsx"
+    with pd.ExcelWriter(arquivo, engine="xlsxwriter") as writer:
+        _aba([1, 2]).to_excel(writer, sheet_name="ANDRÉ", index=False)
+        _aba([3]).rename(columns={"CNPJ": "cnpj "}).to_excel(writer, sheet_name="DUDA", index=False)
+
+    df = etl.load_and_concatenate_sdr_sheets(arquivo, ["ANDRÉ", "DUDA"])
+    assert "CNPJ" in df.columns and df["CNPJ"].isna().all()
+
+    limpo = etl.basic_cleaning(etl.filter_real_leads(df))
+    assert limpo["CNPJ_limpo"].isna().all()
+    assert len(limpo) == 3
+
+
+def test_coluna_vazia_so_numa_aba_nao_rebaixa_tipo(etl):
+    frames = {
+        "ANDRÉ": _aba([1], CNPJ=["12345678000199"]),
+        "DUDA": _aba([2], DATA=[None]),
+    }
+    ajustados = etl.harmonize_dtypes(frames)
+    assert "CNPJ" not in ajustados["DUDA"].columns
+    assert "DATA" not in ajustados["DUDA"].columns
+    full = pd.concat(ajustados.values(), ignore_index=True)
+    assert pd.api.types.is_datetime64_any_dtype(full["DATA"])
+    assert full["CNPJ"].tolist()[0] == "12345678000199" and pd.isna(full["CNPJ"].iloc[1])
+
+
+def _leads(linhas):
+    """(SDR, ID, nome, telefone, cnpj, cidade|uf, data) -> leads já limpos."""
+    df = pd.DataFrame(linhas, columns=["NomeSDR", "ID", "Nome do Cliente", "Contato_limpo", "CNPJ_limpo",
+                                       "CHAVE_CIDADE_UF", "DATA"])
+    df["DATA"] = pd.to_datetime(df["DATA"])
+    df["Status do Lead"] = "PROSPECÇÃO"
+    return df
+
+
+def test_chaves_de_bloco_por_cnpj_telefone_e_fonetica(etl):
+    cnpj = pd.Series(["12345678000199", None], dtype="string")
+    fone = pd.Series(["87654321", "87654321"], dtype="string")
+    cidade = pd.Series(["SAO PAULO|SP", None], dtype="string")
+    fonetica = etl.phonetic_key(pd.Series(["BELLA MODA", "BELA"], dtype=object))
+    chaves = etl.lead_blocking_keys(cnpj, fone, cidade, fonetica)
+
+    por_lead = chaves.groupby("id")["chave"].apply(set).to_dict()
+    assert por_lead[0] == {"C:12345678000199", "F:87654321", "N:SAO PAULO|SP|BL", "N:SAO PAULO|SP|MD"}
+    assert por_lead[1] == {"F:87654321"}  # sem CNPJ e sem cidade: só o telefone
+    assert fonetica.iloc[0, 0] == fonetica.iloc[1, 0]  # BELLA e BELA caem no mesmo bloco
+
+
+def test_sobrevivente_e_o_contato_mais_recente(etl):
+    df = _leads([
+        ("ANDRÉ", 1, "Bella Moda Ltda", "11987654321", None, "SAO PAULO|SP", "2025-01-10"),
+        ("DUDA", 7, "BELLA", "987654321", "12345678000199", "SAO PAULO|SP", "2025-03-01"),
+        ("RAIANE", 3, "Outra Loja", "11911112222", "12345678000199", "CAMPINAS|SP", "2025-02-01"),
+        ("ROBERTA", 4, "Loja Nova", "11933334444", "99887766000155", "SANTOS|SP", "2025-02-01"),
+    ])
+    resultado = etl.deduplicate_leads(df)
+
+    assert resultado["LEAD_CANONICO"].tolist()[:3] == ["DUDA-7"] * 3
+    assert resultado["LEAD_SOBREVIVENTE"].tolist() == [False, True, False, True]
+    assert resultado["QTD_REGISTROS_LEAD"].tolist() == [3, 3, 3, 1]
+    assert resultado["REGRA_DUPLICIDADE"].tolist() == ["TELEFONE", "CNPJ", "CNPJ", ""]
+
+
+def test_cnpjs_validos_diferentes_nunca_se_ligam(etl):
+    df = _leads([
+        ("ANDRÉ", 1, "Bella Moda", "11987654321", "12345678000199", "SAO PAULO|SP", "2025-01-10"),
+        ("DUDA", 2, "Bella Moda", "11987654321", "99887766000155", "SAO PAULO|SP", "2025-01-11"),
+    ])
+    assert etl.deduplicate_leads(df)["LEAD_SOBREVIVENTE"].all()
+
+
+def test_metricas_contam_um_registro_por_lead(etl, tmp_path):
+    df = _leads([
+        ("ANDRÉ", 1, "Bella Moda", "11987654321", None, "SAO PAULO|SP", "2025-01-10"),
+        ("DUDA", 7, "Bella Moda", "11987654321", "12345678000199", "SAO PAULO|SP", "2025-01-05"),
+        ("DUDA", 8, "Loja Nova", "11933334444", None, "SANTOS|SP", "2025-02-01"),
+    ])
+    registros = etl.deduplicate_leads(df)
+    unicos = etl.consolidate_leads(registros)
+
+    assert unicos["LEAD_CANONICO"].tolist() == ["ANDRÉ-1", "DUDA-8"]
+    assert unicos["CNPJ_limpo"].tolist()[0] == "12345678000199"  # completado pelo duplicado
+
+    tarefas = []
+    etl.generate_reports(unicos, None, tmp_path / "rel.txt", tmp_path / "rel.xlsx", tarefas, registros=registros)
+    texto = (tmp_path / "rel.txt").read_text(encoding="utf-8")
+    assert "Total de registros tratados: 3" in texto and "Leads únicos (após deduplicação): 2" in texto
+    assert "  - ANDRÉ: 1" in texto and "  - DUDA: 1" in texto and "  - PROSPECÇÃO: 2" in texto
+    (_, _, abas, _), = tarefas
+    assert abas["Duplicados"]["LEAD_CANONICO"].tolist() == ["ANDRÉ-1", "ANDRÉ-1"]
+
+
+def test_crm_tratado_e_fato_mantem_todos_os_registros(etl):
+    df = _leads([
+        ("ANDRÉ", 1, "Bella Moda", "11987654321", None, "SAO PAULO|SP", "2025-01-10"),
+        ("DUDA", 7, "Bella Moda", "11987654321", "12345678000199", "SAO PAULO|SP", "2025-01-05"),
+        ("DUDA", 8, "Loja Nova", "11933334444", None, "SANTOS|SP", "2025-02-01"),
+    ])
+    df["Dias desde o Ultim. Contato"] = [40, 3, 10]  # o duplicado sozinho pontuaria diferente
+    df["POPULAÇÃO ESTIMADA"] = [200000, 200000, 20000]
+    registros = etl.deduplicate_leads(df)
+    unicos = etl.compute_priority(etl.consolidate_leads(registros))
+    todos = etl.apply_lead_priority(registros, unicos)
+
+    tarefas = []
+    limpo = etl.export_clean(todos, tarefas)
+    etl.export_pbi_bases(limpo, tarefas, "csv")
+    saidas = {caminho.name: dados for _, _, dados, caminho in tarefas}
+
+    for nome in (etl.OUTPUT_EXCEL.name, etl.OUTPUT_CSV.name, etl.caminho_pbi(etl.PBI_FATO, "csv").name):
+        assert saidas[nome]["ID"].tolist() == [1, 7, 8], nome
+        assert saidas[nome]["LEAD_CANONICO"].tolist() == ["ANDRÉ-1", "ANDRÉ-1", "DUDA-8"], nome
+        assert saidas[nome]["LEAD_SOBREVIVENTE"].tolist() == [True, False, True], nome
+
+    # o registro duplicado recebe a prioridade do lead (calculada sobre o consolidado)
+    assert limpo["SCORE_FINAL_INTERNAL"].tolist()[:2] == [unicos["SCORE_FINAL_INTERNAL"].iloc[0]] * 2
+    por_lead = unicos.set_index("LEAD_CANONICO")
+    for coluna in ["SCORE_FINAL_INTERNAL", "PRIORIDADE_CATEGORIA", "FAROL", "MOTIVO_SCORE"]:
+        assert limpo[coluna].tolist() == por_lead.loc[limpo["LEAD_CANONICO"], coluna].tolist()
+    assert limpo.loc[limpo["LEAD_SOBREVIVENTE"], "LEAD_CANONICO"].nunique() == len(unicos) == 2
+
+
+def _score_iterrows(row):
+    """Referência: o laço linha a linha que REGRAS_PRIORIDADE substituiu."""
+    sc = 0
+    dias = row["Dias desde o Ultim. Contato"]
+    if pd.isna(dias):
+        sc += 4
+    elif dias > 30:
+        sc += 3
+    elif 15 <= dias <= 30:
+        sc += 2
+    elif 7 <= dias < 15:
+        sc += 1
+
+    st = str(row["Status do Lead"]).upper()
+    if "PROSPEC" in st:
+        sc += 3
+    elif "NEGOCIA" in st:
+        sc += 2
+    elif "CADAST" in st or "CRÉDITO" in st:
+        sc += 1
+    elif "RESTRI" in st:
+        sc -= 2
+    elif "SEM PERFIL" in st or "SEM INTERESSE" in st or "DESIST" in st:
+        sc -= 5
+
+    pop = row["POPULAÇÃO ESTIMADA"]
+    if pd.notna(pop):
+        if pop > 100000:
+            sc += 3
+        elif 50000 <= pop <= 100000:
+            sc += 2
+        elif 30000 <= pop < 50000:
+            sc += 1
+        elif pop < 10000:
+            sc -= 2
+
+    franq = str(row.get("TEM FRANQUIA", "")).upper()
+    mm = str(row.get("TEM MULTIMARCAS?", "")).upper()
+    if franq != "SIM" and mm != "SIM":
+        sc += 3
+    elif franq == "SIM" and mm == "SIM":
+        sc -= 3
+    elif franq == "SIM":
+        sc -= 3
+    elif mm == "SIM":
+        sc -= 2
+    return sc
+
+
+@pytest.fixture
+def leads_prioridade():
+    # (dias, status, população, franquia, multimarcas): cada regra casa em pelo menos um lead
+    return pd.DataFrame([
+        (None, "PROSPECÇÃO", 150000, "não", "não"),
+        (45, "EM NEGOCIAÇÃO", 100000, "sim", "sim"),
+        (30, "CADASTRO", 50000, "SIM", "NÃO"),
+        (15, "ANÁLISE DE CRÉDITO", 49999, "NÃO", "SIM"),
+        (14, "RESTRIÇÃO", 30000, None, None),
+        (7, "SEM PERFIL", 9999, "NÃO", "SIM"),
+        (6, "SEM INTERESSE", 10000, "NÃO", "NÃO"),
+        (0, "DESISTIU", None, "SIM", "SIM"),
+        (None, None, 20000, "", ""),
+    ], columns=["Dias desde o Ultim. Contato", "Status do Lead", "POPULAÇÃO ESTIMADA",
+                "TEM FRANQUIA", "TEM MULTIMARCAS?"])
+
+
+def test_prioridade_igual_ao_laco_linha_a_linha(etl, leads_prioridade):
+    df = etl.compute_priority(leads_prioridade)
+
+    assert df["SCORE_FINAL_INTERNAL"].tolist() == [_score_iterrows(r) for _, r in leads_prioridade.iterrows()]
+    assert df["SCORE_FINAL_INTERNAL"].tolist() == [13, 4, 2, 2, 3, -8, -2, -8, 7]
+    assert df["PRIORIDADE_CATEGORIA"].tolist() == ["ALTA", "MÉDIA", "BAIXA", "BAIXA", "MÉDIA",
+                                                   "BAIXA", "BAIXA", "BAIXA", "ALTA"]
+    assert df["FAROL"].tolist() == ["VERMELHO", "AMARELO", "VERDE", "VERDE", "AMARELO",
+                                    "VERDE", "VERDE", "VERDE", "VERMELHO"]
+
+    pts = df[[f"PTS_{g}" for g in ("DIAS", "STATUS", "POPULACAO", "CONCORRENCIA")]]
+    assert pts.values.tolist() == [
+        [4, 3, 3, 3], [3, 2, 2, -3], [2, 1, 2, -3], [2, 1, 1, -2], [1, -2, 1, 3],
+        [1, -5, -2, -2], [0, -5, 0, 3], [0, -5, 0, -3], [4, 0, 0, 3],
+    ]
+    assert (pts.sum(axis=1) == df["SCORE_FINAL_INTERNAL"]).all()
+
+
+def test_motivo_score_lista_as_regras_aplicadas(etl, leads_prioridade):
+    motivos = etl.compute_priority(leads_prioridade)["MOTIVO_SCORE"].tolist()
+
+    assert motivos[0] == "sem data de contato (+4); prospecção (+3); mais de 100 mil hab. (+3); sem concorrência (+3)"
+    assert motivos[6] == "sem perfil/interesse (-5); sem concorrência (+3)"
+    assert motivos[7] == "sem perfil/interesse (-5); franquia e multimarcas (-3)"
+    aplicadas = {m.rsplit(" (", 1)[0] for linha in motivos for m in linha.split("; ")}
+    assert aplicadas == {nome for _, nome, _, _ in etl.REGRAS_PRIORIDADE}
+
+
+def test_prioridade_sem_colunas_de_concorrencia(etl, leads_prioridade):
+    sem_concorrencia = leads_prioridade.drop(columns=["TEM FRANQUIA", "TEM MULTIMARCAS?"])
+    df = etl.compute_priority(sem_concorrencia)
+    assert df["SCORE_FINAL_INTERNAL"].tolist() == [_score_iterrows(r) for _, r in sem_concorrencia.iterrows()]
+    assert (df["PTS_CONCORRENCIA"] == 3).all()
+
+
+@pytest.fixture
+def saida_mista():
+    return pd.DataFrame({
+        "ID": [1, 2, 3],
+        "CNPJ": [12345678000199, "00.123.456/0001-00", None],  # número e texto na mesma coluna
+        "Cidade": ["SÃO PAULO", "SANTOS", None],
+        "DATA": pd.to_datetime(["2025-01-01", "2025-02-15", None]),
+        "SCORE_FINAL_INTERNAL": [13, -8, 0],
+    })
+
+
+def test_executar_exportacao_grava_cada_formato(etl, saida_mista, tmp_path, capsys):
+    pytest.importorskip("pyarrow")
+    from openpyxl import load_workbook
+
+    tarefas = [
+        ("Excel", etl.gravar_tabela, saida_mista, tmp_path / "tratado.xlsx"),
+        ("CSV", etl.gravar_tabela, saida_mista, tmp_path / "tratado.csv"),
+        ("Parquet", etl.gravar_tabela, saida_mista, tmp_path / "fato.parquet"),
+        ("Relatório", etl.gravar_relatorio_excel, {"Resumo": saida_mista[["ID"]], "Cidades": saida_mista[["Cidade"]]},
+         tmp_path / "relatorio.xlsx"),
+    ]
+    etl.executar_exportacao(tarefas, workers=2)
+
+    saida = capsys.readouterr().out
+    for rotulo, _, _, caminho in tarefas:
+        assert f"{rotulo}: {caminho.resolve()} (" in saida
+    assert "para 4 arquivos" in saida
+
+    ws = load_workbook(tmp_path / "tratado.xlsx").active
+    assert [c.value for c in ws[1]] == list(saida_mista.columns)
+    assert [c.value for c in ws["B"][1:]] == [12345678000199, "00.123.456/0001-00", None]
+    assert ws["D2"].is_date and ws["D2"].value.date().isoformat() == "2025-01-01" and ws["D4"].value is None
+
+    bruto = (tmp_path / "tratado.csv").read_bytes()
+    assert bruto.startswith(b"\xef\xbb\xbf")
+    assert bruto.decode("utf-8-sig").splitlines() == [
+        "ID;CNPJ;Cidade;DATA;SCORE_FINAL_INTERNAL",
+        "1;12345678000199;SÃO PAULO;2025-01-01;13",
+        "2;00.123.456/0001-00;SANTOS;2025-02-15;-8",
+        "3;;;;0",
+    ]
+
+    fato = pd.read_parquet(tmp_path / "fato.parquet")
+    assert fato["CNPJ"].iloc[:2].tolist() == ["12345678000199", "00.123.456/0001-00"] and pd.isna(fato["CNPJ"].iloc[2])
+    assert fato["ID"].tolist() == [1, 2, 3] and fato["DATA"].iloc[1] == pd.Timestamp("2025-02-15")
+    assert saida_mista["CNPJ"].dtype == object  # o cast para texto não altera o DataFrame original
+
+    relatorio = pd.read_excel(tmp_path / "relatorio.xlsx", sheet_name=None)
+    assert list(relatorio) == ["Resumo", "Cidades"] and relatorio["Resumo"]["ID"].tolist() == [1, 2, 3]
+
+
+def test_gravar_tabela_formato_desconhecido(etl, saida_mista, tmp_path):
+    with pytest.raises(ValueError, match="não suportado"):
+        etl.gravar_tabela(saida_mista, tmp_path / "fato.json")
+    with pytest.raises(ValueError, match="não suportado"):
+        etl.executar_exportacao([("JSON", etl.gravar_tabela, saida_mista, tmp_path / "fato.json")], workers=1)
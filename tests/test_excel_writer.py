@@ -0,0 +1,142 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_writer import (
+    escrever_excel_em_blocos,
+    escrever_excel_formatado,
+    exportar_relatorio,
+    larguras_por_amostra,
+)
+
+
+@pytest.fixture
+def df_com_coluna_vazia():
+    return pd.DataFrame({
+        "Cliente": ["A", "B", "C"],
+        "Valor": [1.5, 2.0, np.nan],
+        "Obs": [np.nan, np.nan, np.nan],
+        "Texto vazio": pd.Series([None, None, None], dtype="str"),
+        "Float vazio": pd.Series([np.nan] * 3, dtype=float),
+    })
+
+
+def test_larguras_coluna_toda_vazia_usa_cabecalho(df_com_coluna_vazia):
+    larguras = larguras_por_amostra(df_com_coluna_vazia, folga=3)
+    assert larguras[2] == len("Obs") + 3
+    assert larguras[3] == len("Texto vazio") + 3
+
+
+def test_larguras_df_vazio():
+    assert larguras_por_amostra(pd.DataFrame({"Coluna": []}), folga=2) == [len("Coluna") + 2]
+
+
+def test_escrever_excel_formatado_com_coluna_vazia(tmp_path, df_com_coluna_vazia):
+    caminho = escrever_excel_formatado(df_com_coluna_vazia, tmp_path / "saida.xlsx", aba="BASE")
+    lido = pd.read_excel(caminho, sheet_name="BASE")
+    assert list(lido.columns) == list(df_com_coluna_vazia.columns)
+    assert lido["Cliente"].tolist() == ["A", "B", "C"]
+    assert lido["Obs"].isna().all()
+
+
+def test_exportar_relatorio_com_coluna_vazia(tmp_path, df_com_coluna_vazia):
+    caminho = exportar_relatorio(df_com_coluna_vazia, tmp_path / "rel.xlsx", total_soma=["Valor"])
+    lido = pd.read_excel(caminho)
+    assert lido["Valor"].iloc[:3].tolist()[:2] == [1.5, 2.0]
+
+
+def test_escrever_em_blocos_divide_abas(tmp_path):
+    blocos = [pd.DataFrame({"n": range(i, i + 4), "vazia": [np.nan] * 4}) for i in range(0, 12, 4)]
+    abas = escrever_excel_em_blocos(iter(blocos), tmp_path / "blocos.xlsx", aba="Dados", linhas_por_aba=5)
+    assert abas == [("Dados", 5), ("Dados (2)", 5), ("Dados (3)", 2)]
+    lido = pd.concat(pd.read_excel(tmp_path / "blocos.xlsx", sheet_name=None).values(), ignore_index=True)
+    assert lido["n"].tolist() == list(range(12))
+
+
+def test_escrever_em_blocos_sem_blocos(tmp_path):
+    assert escrever_excel_em_blocos(iter([]), tmp_path / "vazio.xlsx", aba="Dados") == [("Dados", 0)]
+
+
+def test_datas_viram_data_do_excel(tmp_path):
+    df = pd.DataFrame({"Data": pd.to_datetime(["2025-01-31", None, "2025-02-01"])})
+    escrever_excel_formatado(df, tmp_path / "datas.xlsx")
+    lido = pd.read_excel(tmp_path / "datas.xlsx")
+    assert lido["Data"].iloc[0] == pd.Timestamp("2025-01-31")
+    assert pd.isna(lido["Data"].iloc[1])
+    assert lido["Data"].iloc[2] == pd.Timestamp("2025-02-01")
+
+
+def test_horas_e_data_hora_com_formato_proprio(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame({
+        "Hora": [dt.time(8, 30), None, dt.time(17, 45, 10)],
+        "Data e hora": pd.to_datetime(["2025-01-01 08:00", None, "2025-01-02 00:00"]),
+        "Objeto data e hora": [dt.datetime(2025, 1, 1, 8, 0), None, dt.datetime(2025, 1, 2)],
+        "Só data": [dt.datetime(2025, 1, 1), None, dt.datetime(2025, 1, 2)],
+    })
+    caminho = escrever_excel_formatado(df, tmp_path / "horas.xlsx")
+
+    ws = openpyxl.load_workbook(caminho).active
+    assert [ws.cell(row=2, column=c).number_format for c in range(1, 5)] == [
+        "HH:MM:SS", "DD/MM/YYYY HH:MM:SS", "DD/MM/YYYY HH:MM:SS", "DD/MM/YYYY"]
+    assert ws["A2"].value == dt.time(8, 30) and ws["A4"].value == dt.time(17, 45, 10)
+    assert ws["B2"].value == ws["C2"].value == dt.datetime(2025, 1, 1, 8, 0)
+    assert ws["D4"].value == dt.datetime(2025, 1, 2)
+    assert ws["A3"].value is None and ws["B3"].value is None
+
+
+def test_exportar_relatorio_com_hora(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame({"Hora": [dt.time(8, 30)], "Qtd": [1]})
+    ws = openpyxl.load_workbook(exportar_relatorio(df, tmp_path / "rel_hora.xlsx")).active
+    assert (ws["A2"].value, ws["A2"].number_format) == (dt.time(8, 30), "HH:MM:SS")
+
+
+def test_farol_nao_pinta_celula_vazia(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame({"Filial": ["A", "B", "C"], "Atingimento": [0.3, np.nan, 0.95]})
+    caminho = exportar_relatorio(df, tmp_path / "farol.xlsx", formatos_condicionais={"Atingimento": [
+        {"type": "cell", "criteria": "<", "value": 0.50, "format": {"bg_color": "#FFC7CE"}, "stop_if_true": True},
+        {"type": "cell", "criteria": ">=", "value": 0.90, "format": {"bg_color": "#C6EFCE"}},
+    ]})
+
+    faixas = openpyxl.load_workbook(caminho).active.conditional_formatting
+    regras = sorted((r for faixa in faixas for r in faixa.rules), key=lambda r: r.priority)
+    assert [faixa.sqref for faixa in faixas] == ["B2:B4"]
+    assert regras[0].type == "containsBlanks" and regras[0].stopIfTrue
+    assert [r.operator for r in regras[1:]] == ["lessThan", "greaterThanOrEqual"]
+
+
+def test_tabela_do_excel(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame({"Cliente": ["A", "B", "C"], "Valor": [1.5, np.nan, 3.0]})
+    caminho = escrever_excel_formatado(df, tmp_path / "tabela.xlsx", aba="BASE", tabela=True)
+
+    ws = openpyxl.load_workbook(caminho)["BASE"]
+    assert [(t.ref, [c.name for c in t.tableColumns]) for t in ws.tables.values()] == [("A1:B4", ["Cliente", "Valor"])]
+    assert ws.auto_filter.ref is None  # o filtro é o da tabela
+    lido = pd.read_excel(caminho)
+    assert lido["Cliente"].tolist() == ["A", "B", "C"] and lido["Valor"].iloc[2] == 3.0
+
+
+def test_tabela_com_cabecalho_repetido_vira_autofiltro(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame([[1, 2]], columns=["Valor", "valor"])
+    with pytest.warns(UserWarning):
+        escrever_excel_formatado(df, tmp_path / "dup.xlsx", tabela=True, autofiltro=True)
+    ws = openpyxl.load_workbook(tmp_path / "dup.xlsx").active
+    assert not ws.tables and ws.auto_filter.ref == "A1:B2"
+    assert [c.value for c in ws[1]] == ["Valor", "valor"]
+
+
+def test_filtro_e_congelamento_sao_opcionais(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame({"n": [1, 2]})
+    ws = openpyxl.load_workbook(escrever_excel_formatado(df, tmp_path / "simples.xlsx")).active
+    assert ws.auto_filter.ref is None and ws.freeze_panes is None
+
+    ws = openpyxl.load_workbook(escrever_excel_formatado(
+        df, tmp_path / "filtro.xlsx", autofiltro=True, congelar_cabecalho=True)).active
+    assert ws.auto_filter.ref == "A1:A3" and ws.freeze_panes == "A2"
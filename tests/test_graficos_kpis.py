@@ -0,0 +1,83 @@
+import io
+import multiprocessing
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+from PIL import ImageChops, ImageDraw, ImageFont
+
+
+@pytest.fixture
+def graficos(script):
+    return script("Algoritmo de Dados (Versão com Graficos).py", "graficos_kpis")
+
+
+def desenho_original(df, col_valor, titulo, meta, meta_display, prefix, sufixo, formatar_brl):
+    """Renderizador anterior ao cache (fontes e textbbox a cada gráfico/linha), como referência."""
+    df_plot = df.sort_values(by=col_valor, ascending=False)
+    largura, recuo_x = 1100, 320
+    img = Image.new('RGB', (largura, 160 + len(df_plot) * 65), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    try:
+        f_sub = ImageFont.truetype("arial.ttf", 34); f_lab = ImageFont.truetype("arial.ttf", 24); f_val = ImageFont.truetype("arialbd.ttf", 22)
+    except OSError:
+        f_sub = f_lab = f_val = ImageFont.load_default()
+    draw.text((40, 35), f"{titulo} | Meta: {meta_display}", fill=(0, 80, 0), font=f_sub)
+    y, max_v = 110, max(df_plot[col_valor].max(), meta * 1.1, 1)
+    espaco = largura - recuo_x - 220
+    for row in df_plot.itertuples():
+        val = getattr(row, col_valor)
+        larg_b = (val / max_v) * espaco
+        draw.rectangle([recuo_x, y, recuo_x + larg_b, y + 40], fill=(0, 128, 0) if val >= meta else (200, 0, 0))
+        nome = str(row[1])[:20]
+        draw.text((recuo_x - 15 - draw.textbbox((0, 0), nome, font=f_lab)[2], y + 5), nome, (0, 0, 0), font=f_lab)
+        texto = f"{prefix}{formatar_brl(val)}{sufixo}" if prefix == "R$ " else f"{val:.1f}{sufixo}" if sufixo == "%" else f"{int(val)}"
+        draw.text((recuo_x + larg_b + 15, y + 7), texto, (0, 0, 0), font=f_val)
+        y += 65
+    return img
+
+
+def _tarefas(n):
+    rng = np.random.default_rng(3)
+    nomes = ["ERIKHA", "GLENDASOUZA", "NOME MUITO LONGO DE VENDEDORA", "ANA"]
+    return [{'arquivo': f"g{k:02d}.png", 'nomes': nomes, 'valores': rng.random(len(nomes)) * 100,
+             'titulo': "SDR: % CONV.", 'meta': 50.0, 'meta_display': "50.0%", 'prefix': "", 'sufixo': "%"}
+            for k in range(n)]
+
+
+@pytest.mark.parametrize("coluna, prefix, sufixo, meta", [
+    ("Faturado", "R$ ", "", 250000.0), ("Conv", "", "%", 22.0), ("Lojas", "", "", 5.0),
+])
+def test_grafico_identico_ao_renderizador_original(graficos, coluna, prefix, sufixo, meta):
+    df = pd.DataFrame({"NOME": ["ERIKHA", "GLENDASOUZA", "NOME MUITO LONGO DE VENDEDORA", "ANA"],
+                       coluna: [310000.5, 12.25, 199999.0, 7.0]})
+    for _ in range(2):  # segunda vez com fontes, larguras e cabeçalho já em cache
+        novo = graficos.renderizar_grafico(df["NOME"].tolist(), df[coluna].to_numpy(), "TÍTULO", meta, "X", prefix, sufixo)
+        ref = desenho_original(df, coluna, "TÍTULO", meta, "X", prefix, sufixo, graficos.formatar_brl)
+        assert novo.size == ref.size
+        assert ImageChops.difference(novo, ref).getbbox() is None
+
+
+def test_lote_zip_igual_a_pasta(graficos, tmp_path):
+    tarefas = _tarefas(3)
+    caminhos = graficos.renderizar_lote(tarefas, str(tmp_path / "pasta"))
+    buffer = io.BytesIO()
+    graficos.renderizar_lote(tarefas, arquivo_zip=buffer)
+    with zipfile.ZipFile(buffer) as zf:
+        assert zf.namelist() == [t['arquivo'] for t in tarefas]
+        for caminho, t in zip(caminhos, tarefas):
+            assert zf.read(t['arquivo']) == open(caminho, "rb").read()
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="funções do script carregado pelo caminho só chegam ao pool via fork")
+def test_lote_paralelo_igual_ao_serial(graficos):
+    tarefas = _tarefas(graficos.MINIMO_PARALELO)
+    buffer = io.BytesIO()
+    graficos.renderizar_lote(tarefas, arquivo_zip=buffer, workers=2)
+    with zipfile.ZipFile(buffer) as zf:
+        for t in tarefas:
+            assert zf.read(t['arquivo']) == graficos._png_grafico(t)[1]
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("openpyxl")
+
+from imagens_produtos import ESCALA_MINIATURA, IndiceImagens, normalizar_codigo
+
+
+def _foto(caminho, tamanho=(400, 600), cor=(200, 30, 30), modo="RGB"):
+    Image.new(modo, tamanho, cor).save(caminho)
+    return caminho
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    pasta = tmp_path / "fotos"
+    pasta.mkdir()
+    _foto(pasta / "00123.jpg")
+    _foto(pasta / "123.png", (50, 50))        # mesmo código: .jpg tem preferência
+    _foto(pasta / "abc.jpeg", (300, 100))
+    _foto(pasta / "logo.png", (200, 200), (0, 0, 0, 0), "RGBA")
+    (pasta / "quebrada.jpg").write_bytes(b"nao e imagem")
+    (pasta / "notas.txt").write_text("ignorar")
+    return pasta
+
+
+@pytest.mark.parametrize("codigo, esperado", [
+    ("00123", "123"), (123, "123"), (123.0, "123"), ("123.0", "123"), (" abc ", "ABC"), ("000", "0"),
+])
+def test_normalizar_codigo(codigo, esperado):
+    assert normalizar_codigo(codigo) == esperado
+
+
+def test_indice_escolhe_extensao_preferida(pasta):
+    indice = IndiceImagens(pasta)
+    assert len(indice) == 4
+    assert indice.caminho(123.0).endswith("00123.jpg")
+    assert indice.dimensoes("ABC") == (300, 100)
+    assert indice.dimensoes("QUEBRADA") == (None, None)
+    assert "999" not in indice
+
+
+def test_primeira_pasta_tem_prioridade(pasta, tmp_path):
+    outra = tmp_path / "outra"
+    outra.mkdir()
+    _foto(outra / "123.jpg", (10, 10))
+    _foto(outra / "777.jpg", (10, 10))
+    indice = IndiceImagens([pasta, outra])
+    assert indice.caminho("123").endswith(os.path.join("fotos", "00123.jpg"))
+    assert indice.caminho("777").endswith("777.jpg")
+
+
+def test_indice_salvo_so_reabre_alterados(pasta, capsys):
+    IndiceImagens(pasta)
+    assert "(5 arquivo(s) novos/alterados)" in capsys.readouterr().out  # .txt fica de fora
+
+    indice = IndiceImagens(pasta)
+    assert "(0 arquivo(s) novos/alterados)" in capsys.readouterr().out
+
+    _foto(pasta / "abc.jpeg", (30, 10))
+    os.utime(pasta / "abc.jpeg", (1, 1))
+    indice = IndiceImagens(pasta)
+    assert "(1 arquivo(s) novos/alterados)" in capsys.readouterr().out
+    assert indice.dimensoes("abc") == (30, 10)
+
+
+def test_miniaturas_cabem_na_caixa_e_usam_cache(pasta):
+    indice = IndiceImagens(pasta)
+    prontas = indice.preparar_miniaturas(["123", "abc", "logo", "quebrada", "999"], 60, 80)
+
+    assert set(prontas) == {"123", "ABC", "LOGO"}
+    with Image.open(prontas["123"]) as img:
+        # 400x600 na caixa 60x80 (x2): limitada pela altura, proporção mantida
+        assert img.size[1] == 80 * ESCALA_MINIATURA and img.size[0] == round(400 * 160 / 600)
+    with Image.open(prontas["LOGO"]) as img:
+        assert img.mode == "RGB" and img.getpixel((5, 5)) == (255, 255, 255)
+
+    mtime = prontas["123"].stat().st_mtime
+    assert indice.preparar_miniaturas(["123"], 60, 80)["123"].stat().st_mtime == mtime
+
+
+def test_miniaturas_em_memoria_escala_para_celula(pasta):
+    miniaturas = IndiceImagens(pasta).miniaturas_em_memoria(["abc"], 60, 80)
+    mini = miniaturas["ABC"]
+    assert mini.largura == 60 and mini.altura == 20
+    opcoes = mini.opcoes_xlsxwriter(object_position=1)
+    assert opcoes["x_scale"] == opcoes["y_scale"] == mini.escala
+    assert opcoes["image_data"].read() == mini.dados
+    assert (mini.para_openpyxl().width, mini.para_openpyxl().height) == (60, 20)
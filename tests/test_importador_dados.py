@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def importador(script):
+    pytest.importorskip("openpyxl")
+    return script("Importador Automático de Dados.py", "importador_dados")
+
+
+@pytest.fixture
+def indices(importador, tmp_path, monkeypatch):
+    matriz = tmp_path / "matriz.xlsx"
+    pd.DataFrame({
+        "Cód Parceiro": [101, 102, "0101", 103],
+        "Limite Sugerido": [1000, 200, 1, 300],
+        "CNPJ": [None, None, None, "11.222.333/0001-81"],
+    }).to_excel(matriz, index=False)
+    monkeypatch.setattr(importador, "ARQUIVO_MATRIZ_PATH", str(matriz))
+    return importador.carregar_indice_matriz()
+
+
+def test_indice_matriz_normaliza_chaves_e_primeira_vence(capsys, indices):
+    assert indices["codigo"] == {"101": 1000, "102": 200, "103": 300}
+    assert indices["cnpj"] == {"11222333000181": 300}
+    assert "1 chave(s) repetida(s) em 'Cód Parceiro'" in capsys.readouterr().out
+
+
+def test_aplicar_aba_altera_so_o_necessario(importador, indices):
+    from openpyxl import Workbook
+
+    ws = Workbook().active
+    ws.append(["COD. PAR.", "CNPJ", "NOME", "LIMITE DISP. AJUSTADO"])
+    ws.append([101.0, None, "MUDOU", 500])                       # limite diferente
+    ws.append(["0102", None, "IGUAL", 200])                      # mesmo limite: célula intacta
+    ws.append([999, "11222333000181", "PELO CNPJ", None])        # código fora da matriz, CNPJ casa
+    ws.append([555, None, "FORA DA MATRIZ", 50])                 # sem correspondência: limpa
+    ws.append([None, "11222333000181", "SEM CHAVE", 70])         # sem código: linha ignorada
+    ws["D3"].number_format = "0"
+
+    resultado = importador.aplicar_aba(ws, indices)
+
+    assert resultado == {"alteradas": 3, "sem_match": 1, "coluna_criada": False}
+    assert [ws.cell(row=r, column=4).value for r in range(2, 7)] == [1000, 200, 300, None, 70]
+    assert ws["D2"].number_format == importador.FORMATO_MOEDA
+    assert ws["D3"].number_format == "0"
+
+
+def test_aplicar_aba_cria_coluna_destino(importador, indices):
+    from openpyxl import Workbook
+
+    ws = Workbook().active
+    ws.append(["COD. PAR.", "NOME"])
+    ws.append([103, "NOVA COLUNA"])
+
+    assert importador.aplicar_aba(ws, indices) == {"alteradas": 1, "sem_match": 0, "coluna_criada": True}
+    assert (ws["C1"].value, ws["C2"].value) == ("LIMITE DISP. AJUSTADO", 300)
+
+
+def test_aplicar_aba_sem_coluna_chave(importador, indices):
+    from openpyxl import Workbook
+
+    ws = Workbook().active
+    ws.append(["NOME"])
+    assert importador.aplicar_aba(ws, indices) is None
@@ -0,0 +1,53 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def pedidos(script):
+    pytest.importorskip("openpyxl")
+    return script("Gerador de Lista de Pedidos (Inventário).py", "lista_pedidos")
+
+
+def test_construir_base_ignora_abas_ausentes(pedidos, tmp_path, capsys):
+    planilha = tmp_path / "inventario.xlsx"
+    with pd.ExcelWriter(planilha) as writer:
+        for aba, vendedor in [("OPEN", "ana"), ("LUCIANA", "luciana ")]:
+            pd.DataFrame({"Cód. Parceiro": [101.0, 102.0], "Vendedor": [vendedor, vendedor],
+                          "QTDE": [1, 2], "Total": [10.0, 20.0]}).to_excel(writer, sheet_name=aba, index=False)
+    base = str(tmp_path / "base.sqlite")
+
+    assert pedidos.construir_base(base, str(planilha), forcar=True)
+
+    with sqlite3.connect(base) as con:
+        lidos = pd.read_sql_query('SELECT Aba, "Cód. Parceiro", Vendedor FROM pedidos', con)
+    assert lidos["Aba"].tolist() == ["OPEN", "OPEN", "LUCIANA", "LUCIANA"]
+    assert lidos["Vendedor"].tolist() == ["ANA", "ANA", "LUCIANA", "LUCIANA"]
+    assert lidos["Cód. Parceiro"].tolist() == ["101", "102", "101", "102"]
+    saida = capsys.readouterr().out
+    assert "Aba ERIKHA não encontrada" in saida and "Aba OPEN não encontrada" not in saida
+
+
+def test_busca_segue_ordem_das_abas(pedidos, tmp_path):
+    planilha = tmp_path / "inventario.xlsx"
+    # gravadas fora da ordem de ABAS_ALVO, e a alfabética (JOSIANE, OPEN, ROBERTA) também difere
+    with pd.ExcelWriter(planilha) as writer:
+        for aba in ["ROBERTA", "JOSIANE", "OPEN"]:
+            pd.DataFrame({"Cód. Parceiro": [101, 101], "Vendedor": ["ANA", "ANA"], "Tamanho": [aba + "1", aba + "2"],
+                          "QTDE": [1, 1], "Total": [1.0, 1.0]}).to_excel(writer, sheet_name=aba, index=False)
+    base = str(tmp_path / "base.sqlite")
+    pedidos.construir_base(base, str(planilha), forcar=True)
+
+    assert pedidos.buscar_pedidos("101", "ANA", base)["Tamanho"].tolist() == [
+        "OPEN1", "OPEN2", "JOSIANE1", "JOSIANE2", "ROBERTA1", "ROBERTA2"]
+
+
+def test_nomes_relatorios_sem_caracteres_proibidos(pedidos):
+    nomes = pedidos.nomes_relatorios([
+        ("101", "ANA"), ("10/2", "A:B*?"), (float("nan"), None), ("103", "nan"), ("10\\2", "A:B?"),
+    ])
+    assert nomes == [
+        "Relatorio_101_ANA.xlsx", "Relatorio_10_2_A_B_.xlsx", "Relatorio_SEM_PARCEIRO_SEM_VENDEDOR.xlsx",
+        "Relatorio_103_SEM_VENDEDOR.xlsx", "Relatorio_10_2_A_B__2.xlsx",
+    ]
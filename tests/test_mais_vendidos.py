@@ -0,0 +1,120 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def vendas(script):
+    pytest.importorskip("mysql.connector")
+    pytest.importorskip("openpyxl")
+    return script("ETL - Mais Vendidos.py", "mais_vendidos")
+
+
+@pytest.fixture
+def base(vendas, tmp_path):
+    """Staging pequena: empate, devolução (quantidade <= 0), outro macrogrupo e outro ano."""
+    linhas = [
+        # ano, mês, código, macrogrupo, quantidade
+        (2025, "JANEIRO", 1, "SAPATOS", 5), (2025, "JANEIRO", 1, "SAPATOS", 3),
+        (2025, "JANEIRO", 2, "SAPATOS", 8),                                    # empata com o 1
+        (2025, "JANEIRO", 3, "SAPATOS", 10), (2025, "JANEIRO", 3, "SAPATOS", -4),
+        (2025, "JANEIRO", 4, "SAPATOS", 0), (2025, "JANEIRO", 4, "SAPATOS", 1),
+        (2025, "JANEIRO", 5, "BOLSAS", 100),
+        (2025, "JANEIRO", 6, "SAPATOS", -3),
+        (2025, "FEVEREIRO", 7, "SAPATOS", 4), (2025, "FEVEREIRO", 2, "SAPATOS", 4),
+        (2025, "FEVEREIRO", 1, "SAPATOS", 1),
+        (2024, "JANEIRO", 1, "SAPATOS", 50),
+    ]
+    df = pd.DataFrame(linhas, columns=["chave_ano", "chave_mes", "codigo_produto", "macrogrupo_produto",
+                                       "quantidade_total_item"])
+    df["codigo_produto"] += 10_000
+    df["referencia_produto"] = "REF-" + df["codigo_produto"].astype(str)
+    df["descricao_produto"] = "SAPATO " + df["codigo_produto"].astype(str)
+    caminho = tmp_path / "vendas.sqlite"
+    with sqlite3.connect(caminho) as conn:
+        df.to_sql(vendas.STAGING_TABLE, conn, index=False)
+    conn.close()
+    return caminho
+
+
+def _ranking_pandas(staging, ano, mes, top_n, macrogrupo="SAPATOS"):
+    """Referência: um mês por vez, como a SP fazia."""
+    vendas = staging[(staging["chave_ano"] == ano) & (staging["chave_mes"] == mes)
+                     & (staging["macrogrupo_produto"] == macrogrupo) & (staging["quantidade_total_item"] > 0)]
+    total = (vendas.groupby("codigo_produto", as_index=False)["quantidade_total_item"].sum()
+             .sort_values(["quantidade_total_item", "codigo_produto"], ascending=[False, True]).head(top_n))
+    return list(zip(total["codigo_produto"], total["quantidade_total_item"]))
+
+
+def test_ranking_por_periodo_com_empate_e_filtros(vendas, base):
+    with sqlite3.connect(base) as conn:
+        ranking = vendas.get_rankings_for_periods(conn, [(2025, "janeiro"), (2025, "FEVEREIRO")], top_n=2)
+    conn.close()
+
+    assert ranking[["chave_mes", "ranking", "codigo_produto", "volume_vendido_total"]].values.tolist() == [
+        ["FEVEREIRO", 1, 10002, 4], ["FEVEREIRO", 2, 10007, 4],   # empate: menor código primeiro
+        ["JANEIRO", 1, 10003, 10], ["JANEIRO", 2, 10001, 8],      # devolução do 10003 não desconta
+    ]
+    assert set(ranking["chave_ano"]) == {2025}
+    assert ranking["referencia_produto"].tolist()[:1] == ["REF-10002"]
+
+
+def test_consulta_unica_igual_a_um_mes_por_vez(vendas, tmp_path):
+    caminho = vendas.create_test_database(str(tmp_path / "sintetica.sqlite"), 20_000, anos=(2024, 2025))
+    periodos = [(ano, mes) for ano in (2024, 2025) for mes in vendas.MESES]
+    with sqlite3.connect(caminho) as conn:
+        staging = pd.read_sql(f"SELECT * FROM {vendas.STAGING_TABLE}", conn)
+        unico = vendas.get_rankings_for_periods(conn, periodos, top_n=5)
+        separados = pd.concat([vendas.get_rankings_for_periods(conn, [p], top_n=5) for p in periodos],
+                              ignore_index=True)
+    conn.close()
+
+    chave = ["chave_ano", "chave_mes", "ranking"]
+    pd.testing.assert_frame_equal(unico.sort_values(chave).reset_index(drop=True),
+                                  separados.sort_values(chave).reset_index(drop=True))
+    for (ano, mes), df in unico.groupby(["chave_ano", "chave_mes"]):
+        assert df["ranking"].tolist() == list(range(1, len(df) + 1))
+        assert list(zip(df["codigo_produto"], df["volume_vendido_total"])) == _ranking_pandas(staging, ano, mes, 5)
+
+
+def test_catalogos_em_lote_uma_aba_por_periodo(vendas, base, tmp_path, monkeypatch, capsys):
+    from openpyxl import load_workbook
+
+    fotos = tmp_path / "fotos"
+    fotos.mkdir()
+    Image.new("RGB", (300, 200), "red").save(fotos / "10003.png")
+    monkeypatch.setattr(vendas, "IMAGENS_FOLDER", str(fotos))
+    periodos = [(2025, "JANEIRO"), (2025, "MARÇO"), (2025, "FEVEREIRO")]
+
+    arquivos = vendas.generate_catalogs_batch(periodos, top_n=3, pasta_saida=str(tmp_path / "lote"),
+                                              sqlite_path=str(base), um_arquivo=True)
+
+    assert "Março/2025: sem vendas de SAPATOS" in capsys.readouterr().out
+    wb = load_workbook(arquivos[0])
+    assert wb.sheetnames == ["JANEIRO 2025", "FEVEREIRO 2025"]
+    cabecalho = vendas.CATALOG_COLUMNS + ["Imagem do Produto"]
+    janeiro = [[c.value for c in linha] for linha in wb["JANEIRO 2025"].iter_rows()]
+    assert janeiro[0] == cabecalho
+    assert [linha[:5] for linha in janeiro[1:]] == [
+        [1, "REF-10003", "SAPATO 10003", 10003, 10],
+        [2, "REF-10001", "SAPATO 10001", 10001, 8],
+        [3, "REF-10002", "SAPATO 10002", 10002, 8],
+    ]
+    assert janeiro[1][5] is None and janeiro[2][5] == "Imagem não encontrada"  # 10003 tem foto
+    assert len(wb["JANEIRO 2025"]._images) == 1
+    assert [linha[3] for linha in wb["FEVEREIRO 2025"].iter_rows(min_row=2, values_only=True)] == [10002, 10007, 10001]
+
+
+def test_catalogos_em_lote_um_arquivo_por_periodo(vendas, base, tmp_path, monkeypatch):
+    monkeypatch.setattr(vendas, "IMAGENS_FOLDER", str(tmp_path / "sem_fotos"))
+    arquivos = vendas.generate_catalogs_batch([(2025, "FEVEREIRO"), (2025, "JANEIRO")], top_n=1,
+                                              pasta_saida=str(tmp_path / "lote"), sqlite_path=str(base), workers=2)
+
+    assert [a.rsplit("_", 2)[-2:] for a in arquivos] == [["FEVEREIRO", "2025.xlsx"], ["JANEIRO", "2025.xlsx"]]
+    for arquivo, codigo in zip(arquivos, [10002, 10003]):
+        catalogo = pd.read_excel(arquivo, sheet_name=None)
+        assert len(catalogo) == 1
+        assert next(iter(catalogo.values()))["codigo_produto"].tolist() == [codigo]
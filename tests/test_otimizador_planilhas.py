@@ -0,0 +1,125 @@
+import zipfile
+
+import numpy as np
+import pytest
+
+NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+NS_R = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+
+
+@pytest.fixture
+def otimizador(script):
+    return script("Otimizador de Planilhas.py", "otimizador_planilhas")
+
+
+def _aba(dimensao, celulas):
+    """XML de uma aba: celulas = [(endereço, xml interno da <c>)], agrupadas por linha."""
+    linhas = {}
+    for ref, interno in celulas:
+        linhas.setdefault(int("".join(ch for ch in ref if ch.isdigit())), []).append(f'<c r="{ref}">{interno}</c>')
+    corpo = "".join(f'<row r="{n}">{"".join(cs)}</row>' for n, cs in sorted(linhas.items()))
+    return f'<worksheet {NS}><dimension ref="{dimensao}"/><sheetData>{corpo}</sheetData></worksheet>'
+
+
+def _xlsx(caminho, abas):
+    """Pacote mínimo (workbook + rels + abas) como o Excel grava, incluindo fórmulas compartilhadas."""
+    with zipfile.ZipFile(caminho, "w") as zf:
+        zf.writestr("xl/workbook.xml", f'<workbook {NS} {NS_R}><sheets>' + "".join(
+            f'<sheet name="{nome}" sheetId="{i}" r:id="rId{i}"/>' for i, nome in enumerate(abas, 1)
+        ) + "</sheets></workbook>")
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' + "".join(
+                        f'<Relationship Id="rId{i}" Target="worksheets/sheet{i}.xml" Type="worksheet"/>'
+                        for i in range(1, len(abas) + 1)) + "</Relationships>")
+        for i, xml in enumerate(abas.values(), 1):
+            zf.writestr(f"xl/worksheets/sheet{i}.xml", xml)
+    return caminho
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    dados = _aba("A1:C3", [
+        ("A1", "<v>1</v>"), ("B1", '<f t="shared" ref="B1:B3" si="0">A1*2</f><v>2</v>'), ("C1", "<f>SUM(A:A)</f>"),
+        ("A2", "<v>2</v>"), ("B2", '<f t="shared" si="0"/><v>4</v>'), ("C2", "<f>TODAY()</f>"),
+        ("A3", "<v>3</v>"), ("B3", '<f t="shared" si="0"/><v>6</v>'), ("C3", "<f>C2+1</f>"),
+    ])
+    painel = _aba("A1:B4", [
+        ("A1", "<f>Dados!B3+1</f>"), ("B1", '<f t="array" ref="B1:B2">Dados!A1:A2*2</f>'),
+        ("A2", "<f>'Dados'!C3*2</f>"), ("B2", "<v>4</v>"),
+        ("A3", "<f>SUM(1:1)</f>"),
+        ("A4", '<f>"Dados!A1"&amp;IFERROR(#N/A,0)</f>'),
+    ])
+    return _xlsx(tmp_path / "modelo.xlsx", {"Dados": dados, "Painel": painel})
+
+
+def test_tokenizar_referencias_e_funcoes(otimizador):
+    funcoes, refs = otimizador.tokenizar("_xlfn.XLOOKUP($A1,'Base Vendas'!B:B,Base!C$2:D10)+\"A1\"&IFERROR(#N/A,1:3)")
+    assert funcoes == ("XLOOKUP", "IFERROR")
+    assert [(aba, r1, c1, r2, c2, tipo) for aba, r1, c1, r2, c2, _, tipo in refs] == [
+        (None, 1, 1, 1, 1, "celula"),
+        ("Base Vendas", 1, 2, otimizador.MAX_LINHAS, 2, "coluna_inteira"),
+        ("Base", 2, 3, 10, 4, "intervalo"),
+        (None, 1, 1, 3, otimizador.MAX_COLUNAS, "linha_inteira"),
+    ]
+    assert refs[0][5] == (False, True, False, True) and refs[2][5] == (True, False, False, False)
+
+
+def test_deslocar_refs_respeita_absolutos(otimizador):
+    _, refs = otimizador.tokenizar("$A1+B$1+A:A")
+    deslocadas = otimizador.deslocar_refs(refs, 2, 1)
+    assert [r[1:5] for r in deslocadas] == [(3, 1, 3, 1), (1, 3, 1, 3), (1, 2, otimizador.MAX_LINHAS, 2)]
+    assert otimizador.deslocar_refs(refs, 0, 0) is refs
+
+
+def test_varrer_aba_formulas_compartilhadas_e_matriciais(otimizador, planilha):
+    diag = otimizador.Diagnostico()
+    with zipfile.ZipFile(planilha) as zf:
+        for nome, xml in otimizador.listar_abas(zf):
+            otimizador.varrer_aba(zf, nome, xml, diag, top=5)
+
+    assert diag.dimensoes == {"Dados": (3, 3), "Painel": (4, 2)}
+    celulas = list(zip(diag.f_aba, diag.f_linha, diag.f_coluna))
+    assert len(celulas) == 11 and (0, 2, 2) in celulas and (0, 3, 2) in celulas
+
+    # filhas da fórmula compartilhada B1 (=A1*2) leem A2 e A3
+    coords = np.frombuffer(diag.r_coords, dtype=np.int32).reshape(-1, 4)
+    por_formula = {int(f): tuple(c) for f, c in zip(diag.r_formula, coords)}
+    linhas_b = [i for i, (a, _, c) in enumerate(celulas) if a == 0 and c == 2]
+    assert [por_formula[i] for i in linhas_b] == [(1, 1, 1, 1), (2, 1, 2, 1), (3, 1, 3, 1)]
+
+    assert diag.stats["Dados"]["coluna_inteira"] == 1 and diag.stats["Dados"]["volateis"] == 1
+    assert diag.stats["Painel"]["linha_inteira"] == 1 and diag.stats["Painel"]["matriciais"] == 1
+    assert diag.stats["Painel"]["refs_outras_abas"] == 3 and diag.cadeias["Painel"] == {"Dados": 3}
+    assert {(aba, cel, tipo, det) for aba, cel, tipo, det, _ in diag.ocorrencias} == {
+        ("Dados", "C1", "Coluna inteira", "A:A"),
+        ("Dados", "C2", "Função volátil/pesada", "TODAY"),
+        ("Painel", "A3", "Linha inteira", "1:1"),
+    }
+
+
+def test_diagnosticar_fechamento_volatil_e_custo(otimizador, planilha):
+    resumo, piores, ocorrencias = otimizador.diagnosticar(planilha, top=3)
+    resumo = resumo.set_index("Planilha")
+
+    assert resumo.loc["Dados", "Formulas"] == 6 and resumo.loc["Painel", "Formulas"] == 5
+    # TODAY() em C2 suja C3 (=C2+1) e, entre abas, Painel!A2 (='Dados'!C3*2); SUM(A:A) só lê valores
+    assert resumo.loc["Dados", "Recalculadas_Por_Edicao"] == 2
+    assert resumo.loc["Painel", "Recalculadas_Por_Edicao"] == 1
+    # custo = (1 + células lidas, limitadas ao used range) x área da matricial
+    assert resumo.loc["Dados", "Custo_Estimado_Recalculo"] == 2 * 3 + (1 + 3) + 1 + 2
+    assert resumo.loc["Painel", "Custo_Estimado_Recalculo"] == 2 + 2 + (1 + 2) * 2 + (1 + 2) + 1
+    assert resumo.loc["Dados", "Custo_Volatil_Por_Edicao"] == 1 + 2
+    assert resumo.loc["Painel", "Custo_Volatil_Por_Edicao"] == 2
+    assert (resumo.loc["Painel", "Cadeia_Entre_Abas"], resumo.loc["Dados", "Cadeia_Entre_Abas"]) == (1, 0)
+
+    assert piores[["Planilha", "Celula", "Custo_Estimado"]].values.tolist()[0] == ["Painel", "B1", 6.0]
+    assert len(piores) == 3 and len(ocorrencias) == 3
+
+
+def test_fechamento_volatil_por_intervalo(otimizador):
+    diag = otimizador.Diagnostico()
+    diag.dimensoes["S"] = (10, 3)
+    for linha, coluna, formula in [(1, 1, "NOW()"), (5, 1, "A1+1"), (1, 2, "SUM(A1:A5)"), (1, 3, "SUM(A6:A9)")]:
+        funcoes, refs = otimizador.tokenizar(formula)
+        diag.registrar("S", linha, coluna, "=" + formula, funcoes, refs, "normal", 1, top=5)
+    assert otimizador.fechamento_volatil(diag).tolist() == [True, True, True, False]
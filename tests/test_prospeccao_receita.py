@@ -0,0 +1,115 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def prospeccao(script):
+    pytest.importorskip("openpyxl")
+    return script("Gerador de Lista de Prospecção - Receita.py", "prospeccao_receita")
+
+
+def _tabela(n):
+    import pyarrow as pa
+    return pa.table({
+        "cnpj": [f"{i:014d}" for i in range(n)],
+        "data_inicio_atividade": pa.array([date(2020, 1, 1 + i % 28) for i in range(n)], type=pa.date32()),
+        "concorrentes_municipio": list(range(n)),
+    })
+
+
+def test_salvar_xlsx_em_blocos_divide_abas(prospeccao, tmp_path, monkeypatch):
+    import excel_writer
+
+    # limite de linhas por aba reduzido para exercitar a divisão sem gerar 1 milhão de linhas
+    original = excel_writer.escrever_excel_em_blocos
+    monkeypatch.setattr(prospeccao, "LINHAS_POR_BLOCO", 4)
+    monkeypatch.setattr(prospeccao, "escrever_excel_em_blocos",
+                        lambda blocos, destino, aba: original(blocos, destino, aba=aba, linhas_por_aba=6))
+    destino = tmp_path / "prospects.xlsx"
+
+    prospeccao.salvar(_tabela(10), destino)
+
+    lidas = pd.read_excel(destino, sheet_name=None, dtype={"cnpj": str})
+    assert list(lidas) == ["Prospects", "Prospects (2)"]
+    juntas = pd.concat(lidas.values(), ignore_index=True)
+    assert juntas["cnpj"].tolist() == [f"{i:014d}" for i in range(10)]
+    assert juntas["concorrentes_municipio"].tolist() == list(range(10))
+    assert juntas["data_inicio_atividade"].iloc[3] == pd.Timestamp("2020-01-04")
+
+
+def test_salvar_xlsx_tabela_vazia_mantem_cabecalho(prospeccao, tmp_path):
+    destino = tmp_path / "vazio.xlsx"
+    prospeccao.salvar(_tabela(0), destino)
+    assert list(pd.read_excel(destino).columns) == ["cnpj", "data_inicio_atividade", "concorrentes_municipio"]
+
+
+def _estabelecimentos(caminho):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # (básico, ordem, dv, cnae, uf, município, situação, abertura)
+    linhas = [
+        ("11111111", "0001", "11", "4781400", "MG", "4123", "02", "20200101"),  # BH
+        ("11111111", "0001", "11", "4781400", "MG", "4123", "02", "20200101"),  # repetido
+        ("22222222", "0001", "22", "4782201", "MG", "4123", "02", "20210601"),  # BH, já no CRM
+        ("33333333", "0001", "33", "4781400", "MG", "5555", "02", "20190301"),  # outra mesorregião
+        ("44444444", "0001", "44", "4781400", "MG", "4123", "08", "20180101"),  # baixada
+        ("55555555", "0001", "55", "9999999", "MG", "4123", "02", "20200101"),  # outro CNAE
+        ("66666666", "0002", "66", "4782201", "SP", "7107", "02", "20150101"),  # outra UF
+        ("77777777", "0001", "77", "4781400", "MG", "4123", "02", "20240101"),  # aberta depois
+    ]
+    nomes = ["cnpj_basico", "cnpj_ordem", "cnpj_dv", "cnae_fiscal_principal", "uf", "municipio",
+             "situacao_cadastral", "data_inicio_atividade"]
+    tabela = pa.table({n: [l[i] for l in linhas] for i, n in enumerate(nomes)})
+    tabela = tabela.append_column("nome_fantasia", pa.array([f"LOJA {i}" for i in range(len(linhas))]))
+    pq.write_table(tabela, caminho, row_group_size=3)
+    return caminho
+
+
+@pytest.fixture
+def receita(tmp_path, prospeccao, monkeypatch):
+    parquet = _estabelecimentos(tmp_path / "ESTABELECIMENTO.parquet")
+    crm = tmp_path / "CRM_TRATADO.csv"
+    crm.write_text("ID;CNPJ_limpo\n1;22222222000122\n2;\n", encoding="utf-8")
+
+    municipios = tmp_path / "MUNICIPIOS.csv"
+    municipios.write_bytes("4123;BELO HORIZONTE\n5555;UBERLANDIA\n7107;SAO PAULO\n".encode("latin-1"))
+    ibge = tmp_path / "mesorregioes.xlsx"
+    pd.DataFrame({
+        "Nome_Municipio": ["Belo Horizonte", "Uberlândia"],
+        "Estado": ["MG", "MG"],
+        "Nome_Mesorregiao": ["Metropolitana de Belo Horizonte", "Triângulo Mineiro/Alto Paranaíba"],
+    }).to_excel(ibge, index=False)
+    monkeypatch.setattr(prospeccao, "MUNICIPIOS_RECEITA", municipios)
+    monkeypatch.setattr(prospeccao, "MESORREGIOES_IBGE", ibge)
+    return parquet, crm
+
+
+def test_gerar_prospects_filtra_exclui_crm_e_deduplica(prospeccao, receita):
+    parquet, crm = receita
+    tabela = prospeccao.gerar_prospects(
+        parquet, cnaes=["4781400", "4782201"], ufs=["mg"], abertura_ate="2023-12-31", crm_file=crm,
+    )
+    linhas = tabela.to_pylist()
+
+    assert [l["cnpj"] for l in linhas] == ["11111111000111", "33333333000133"]
+    assert {l["situacao_cadastral"] for l in linhas} == {"ATIVA"}
+    # concorrentes contam o recorte inteiro do município, inclusive quem já está no CRM
+    assert [l["concorrentes_municipio"] for l in linhas] == [2, 1]
+
+
+def test_gerar_prospects_por_mesorregiao(prospeccao, receita):
+    parquet, crm = receita
+    tabela = prospeccao.gerar_prospects(
+        parquet, cnaes=["4781400", "4782201"], mesorregioes=["metropolitana de belo horizonte"], crm_file=crm,
+    )
+    assert tabela.column("cnpj").to_pylist() == ["11111111000111", "77777777000177"]
+    assert set(tabela.column("municipio").to_pylist()) == {"4123"}
+
+
+def test_gerar_prospects_sem_crm_nao_exclui(prospeccao, receita, tmp_path):
+    parquet, _ = receita
+    tabela = prospeccao.gerar_prospects(parquet, cnaes=["4782201"], crm_file=tmp_path / "nao_existe.csv")
+    assert tabela.column("cnpj").to_pylist() == ["22222222000122", "66666666000266"]
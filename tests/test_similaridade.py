@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from similaridade import (
+    _codigos,
+    _descricoes_sinteticas,
+    agrupar_similares,
+    avaliar_agrupamento,
+    chaves_bloqueio,
+    matriz_codigos,
+    matriz_features,
+    normalizar_descricoes,
+    pares_candidatos,
+    pontuar_pares,
+)
+
+
+def test_normalizacao_medidas_abreviacoes_e_modelo():
+    normal = normalizar_descricoes(pd.Series(["Garrafa 1L pt MOD12", "GARRAFA 1000ml PRETO modelo 12"]))
+    assert normal.iloc[0] == normal.iloc[1] == "GARRAFA 1000ML PRETO MODELO 12"
+
+
+def test_agrupa_variacoes_e_separa_modelos():
+    descricoes = pd.Series([
+        "CAMISETA SLIM PRETO MOD12",
+        "camiseta slim pt modelo 12",
+        "CAMISETA SLM PRETO MOD12",      # caractere faltando
+        "CAMISETA SLIM PRETO MOD13",      # outro modelo
+        "MOCHILA USB AZUL 2L MOD7",
+    ])
+    cluster = agrupar_similares(descricoes)["CLUSTER_PRODUTO"].tolist()
+    assert cluster[0] == cluster[1] == cluster[2]
+    assert len({cluster[0], cluster[3], cluster[4]}) == 3
+
+
+def test_agrupa_por_sku_quando_descricao_vazia():
+    res = agrupar_similares(pd.Series(["", "nan", "TECLADO GAMER"]), skus=pd.Series(["A1", "A1", "B2"]))
+    assert res["CLUSTER_PRODUTO"].iloc[0] == res["CLUSTER_PRODUTO"].iloc[1] != res["CLUSTER_PRODUTO"].iloc[2]
+
+
+def test_bloco_grande_usa_vizinhanca_em_vez_de_descartar():
+    textos = pd.Series([f"CABO USB {k:04d}X" for k in range(50)] + ["CABO USB 0010X"])
+    chaves = chaves_bloqueio(textos)
+    i, j = pares_candidatos(chaves, max_bloco=10, janela=2)
+    pares = set(zip(i.tolist(), j.tolist()))
+    assert (10, 50) in pares
+    assert len(pares) < 50 * 49 // 2
+    # sem a coluna de ordem (ex.: chaves de leads), o bloco grande "P:CABO" continua
+    # ignorado e só sobra o bloco pequeno do código 0010X
+    i, j = pares_candidatos(chaves[["id", "chave"]], max_bloco=10)
+    assert list(zip(i.tolist(), j.tolist())) == [(10, 50)]
+
+
+def test_veto_de_codigos_igual_a_comparacao_de_conjuntos():
+    textos = normalizar_descricoes(_descricoes_sinteticas(600)["DESCRICAO"]).drop_duplicates().reset_index(drop=True)
+    i, j = pares_candidatos(chaves_bloqueio(textos))
+    indptr, indices = matriz_features(textos)
+    sem_veto = pontuar_pares(i, j, indptr, indices)
+    com_veto = pontuar_pares(i, j, indptr, indices, matriz_codigos(textos))
+
+    codigos = [_codigos(t) for t in textos]
+    conflito = np.array([not (codigos[a] <= codigos[b] or codigos[b] <= codigos[a]) for a, b in zip(i, j)])
+    assert conflito.any() and not conflito.all()
+    np.testing.assert_array_equal(com_veto, np.where(conflito, 0.0, sem_veto))
+
+
+def test_pares_candidatos_vazio():
+    i, j = pares_candidatos(pd.DataFrame(columns=["id", "chave"]))
+    assert len(i) == len(j) == 0
+
+
+def test_benchmark_sintetico_precisao_e_recall():
+    df = _descricoes_sinteticas(3000)
+    # o ruído precisa de fato gerar textos diferentes do mesmo produto
+    assert normalizar_descricoes(df["DESCRICAO"]).nunique() > df["PRODUTO"].nunique() * 1.3
+    res = agrupar_similares(df["DESCRICAO"])
+    precisao, recall = avaliar_agrupamento(df["PRODUTO"], res["CLUSTER_PRODUTO"])
+    assert precisao > 0.98
+    assert recall > 0.95
+
+
+def test_avaliar_agrupamento():
+    produto = pd.Series([1, 1, 2, 2])
+    assert avaliar_agrupamento(produto, pd.Series([0, 0, 1, 1])) == (1.0, 1.0)
+    precisao, recall = avaliar_agrupamento(produto, pd.Series([0, 1, 2, 2]))
+    assert (precisao, recall) == (1.0, 0.5)
+
+
+def test_sem_descricao_e_sem_sku_nao_agrupa():
+    res = agrupar_similares(pd.Series([None, "", "nan", "TECLADO"]), skus=pd.Series([None, np.nan, "a1 ", "A1"]))
+    cluster = res["CLUSTER_PRODUTO"].tolist()
+    assert cluster[0] != cluster[1]            # nada em comum: cada linha no seu grupo
+    assert cluster[2] == cluster[3]            # SKU igual (caixa/espaço ignorados)
+    assert agrupar_similares(pd.Series([], dtype=object)).empty
+
+
+def test_sem_descricao_skus_diferentes_nao_agrupam():
+    res = agrupar_similares(pd.Series(["", "", ""]), skus=pd.Series(["A1", "B2", "A1"]))
+    cluster = res["CLUSTER_PRODUTO"].tolist()
+    assert cluster[0] == cluster[2] != cluster[1]
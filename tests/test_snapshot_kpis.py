@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from snapshot_kpis import (
+    COLUNAS_CHAVE,
+    converter_datas,
+    ler_abas,
+    mascara_vigencia,
+    normalizar_nomes,
+    obter_snapshot,
+    quadro_do_mes,
+    vigentes_por_mes,
+)
+
+VIGENCIA = {"ANA": (1, 12), "BIA": (3, 12), "CAIO": (1, 6)}
+
+
+@pytest.fixture
+def faturado():
+    rng = np.random.default_rng(0)
+    n = 3000
+    return pd.DataFrame({
+        "Dt. Neg.": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, n), unit="D"),
+        "Apelido (Vendedor)": rng.choice(["ana", " ANA", "Bia", "CAIO", "DUDA"], n),
+        "Vlr. Nota": rng.integers(100, 5000, n).astype(float),
+        "Parceiro": rng.integers(1, 60, n),
+    })
+
+
+def calcular_snapshot(df):
+    """Uma passada agrupada, como nos quadros de vendas."""
+    datas = converter_datas(df["Dt. Neg."])
+    vendas = pd.DataFrame({
+        "NOME": normalizar_nomes(df["Apelido (Vendedor)"]), "ANO": datas.dt.year, "MES": datas.dt.month,
+        "Vlr. Nota": df["Vlr. Nota"], "Parceiro": df["Parceiro"],
+    })
+    vendas = vendas[mascara_vigencia(vendas["NOME"], vendas["MES"], VIGENCIA)]
+    quadro = vendas.groupby(["NOME", "ANO", "MES"]).agg(
+        Faturado=("Vlr. Nota", "sum"), Unicos=("Parceiro", "nunique")).reset_index()
+    quadro["TIPO"] = "VENDAS"
+    return quadro[COLUNAS_CHAVE + ["Faturado", "Unicos"]]
+
+
+def quadro_mes_a_mes(df, ano, mes):
+    """Cálculo antigo: filtra o texto da data a cada mês e testa a vigência nome a nome."""
+    df = df.copy()
+    df["NOME"] = df["Apelido (Vendedor)"].astype(str).str.strip().str.upper()
+    texto = df["Dt. Neg."].astype(str)
+    df = df[texto.str.contains(str(ano)) & texto.str.contains(f"-{mes:02d}-")]
+    df = df[[nome in VIGENCIA and VIGENCIA[nome][0] <= mes <= VIGENCIA[nome][1] for nome in df["NOME"]]]
+    return (df.groupby("NOME").agg(Faturado=("Vlr. Nota", "sum"), Unicos=("Parceiro", "nunique"))
+            .reset_index())
+
+
+def test_snapshot_igual_ao_calculo_por_mes(faturado):
+    snapshot = calcular_snapshot(faturado)
+    comparados = 0
+    for ano in (2024, 2025):
+        for mes in range(1, 13):
+            quadro = quadro_do_mes(snapshot, "VENDAS", ano, mes).sort_values("NOME").reset_index(drop=True)
+            esperado = quadro_mes_a_mes(faturado, ano, mes)
+            pd.testing.assert_frame_equal(quadro, esperado, check_dtype=False)
+            comparados += 1
+    assert comparados == 24
+    assert "DUDA" not in set(snapshot["NOME"])
+    assert set(snapshot.loc[snapshot["NOME"] == "CAIO", "MES"]) == set(range(1, 7))
+
+
+def test_mascara_vigencia_nome_desconhecido():
+    nomes = pd.Series(["ANA", "BIA", "BIA", "ZECA"])
+    meses = pd.Series([12, 2, 3, 5])
+    assert mascara_vigencia(nomes, meses, VIGENCIA).tolist() == [True, False, True, False]
+    assert not mascara_vigencia(pd.Series([], dtype=object), pd.Series([], dtype=float), VIGENCIA).size
+
+
+def test_vigentes_por_mes():
+    assert vigentes_por_mes(VIGENCIA).tolist() == [2, 2, 3, 3, 3, 3, 2, 2, 2, 2, 2, 2]
+    assert vigentes_por_mes({}).sum() == 0
+
+
+def test_converter_datas_invalidas_viram_nat():
+    convertidas = converter_datas(pd.Series(["2025-03-10", "sem data", None]))
+    assert convertidas.iloc[0] == pd.Timestamp("2025-03-10")
+    assert convertidas.iloc[1:].isna().all()
+
+
+def test_ler_abas_e_snapshot_recalculado_so_quando_muda(tmp_path, faturado):
+    pytest.importorskip("openpyxl")
+    arquivo = tmp_path / "BASE.xlsx"
+    with pd.ExcelWriter(arquivo) as writer:
+        faturado.head(200).to_excel(writer, sheet_name="FATURADO", index=False)
+        pd.DataFrame({"x": [1]}).to_excel(writer, sheet_name="OUTRA", index=False)
+    caminho = tmp_path / "snapshot.parquet"
+    chamadas = []
+
+    def construir():
+        chamadas.append(1)
+        return calcular_snapshot(ler_abas(arquivo, ["FATURADO"])["FATURADO"])
+
+    parametros = {"metas": {1: 10.0, 12: 20.0}, "vigencia": VIGENCIA}
+    primeiro = obter_snapshot(caminho, arquivo, construir, parametros)
+    segundo = obter_snapshot(caminho, arquivo, construir, parametros)  # chaves int/tuplas voltam do JSON iguais
+    assert len(chamadas) == 1
+    assert segundo.astype(str).equals(primeiro.astype(str))
+
+    obter_snapshot(caminho, arquivo, construir, {**parametros, "metas": {1: 11.0, 12: 20.0}})
+    assert len(chamadas) == 2
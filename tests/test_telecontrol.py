@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def etl(script):
+    pytest.importorskip("sqlalchemy")
+    return script("ETL - TELECONTROL.py", "etl_telecontrol")
+
+
+@pytest.fixture
+def banco(etl, tmp_path):
+    from sqlalchemy import MetaData, create_engine
+    return create_engine(f"sqlite:///{tmp_path / 'staging.db'}"), etl.definir_staging(MetaData())
+
+
+def _excel(*linhas):
+    """(Numero_OS, Status, CODIGO PEÇA) -> DataFrame no layout da aba BASE."""
+    return pd.DataFrame({
+        "Numero_OS": [l[0] for l in linhas],
+        "Status": [l[1] for l in linhas],
+        "CODIGO PEÇA": [l[2] for l in linhas],
+        "Data Abertura": ["2025-01-06"] * len(linhas),
+        "Data Finalização": ["2025-01-10"] * len(linhas),
+        "AGRUPAMENTO": ["TELA"] * len(linhas),
+    })
+
+
+def _carregar(etl, banco, excel, completo=False):
+    engine, tabela = banco
+    with engine.begin() as conn:
+        carga = etl.carregar_staging(conn, tabela, etl.transformar(excel, hoje="2025-02-03"), completo)
+    salvo = pd.read_sql(f"SELECT numero_os, status, codigo_peca FROM {etl.STAGING_TABLE_NAME}", engine)
+    salvo = salvo.astype(object).where(salvo.notna(), None)
+    linhas = sorted(salvo.itertuples(index=False, name=None), key=lambda l: tuple(str(v) for v in l))
+    return len(carga), linhas
+
+
+BASE = [(1000, "ABERTA", "P1"), (1000, "ABERTA", "P2"), (1001, "ABERTA", "P3"), (None, "SEM OS", "P9")]
+
+
+def test_primeira_carga_e_completa_e_mantem_linhas_sem_os(etl, banco):
+    inseridas, linhas = _carregar(etl, banco, _excel(*BASE))
+    assert inseridas == 4
+    assert ("1000", "ABERTA", "P1") in linhas and (None, "SEM OS", "P9") in linhas
+
+
+def test_incremental_sem_mudancas_nao_reinsere_os(etl, banco):
+    _carregar(etl, banco, _excel(*BASE))
+    inseridas, linhas = _carregar(etl, banco, _excel(*reversed(BASE)))  # ordem não muda o hash
+    assert inseridas == 1  # só a linha sem numero_os, recarregada a cada execução
+    assert len(linhas) == 4
+
+
+def test_incremental_alterada_nova_e_removida(etl, banco):
+    _carregar(etl, banco, _excel(*BASE))
+    inseridas, linhas = _carregar(etl, banco, _excel(
+        (1001, "FINALIZADA", "P3"),   # alterada
+        (1002, "ABERTA", "P4"),       # nova
+        (None, "SEM OS", "P9"),
+    ))                                # 1000 saiu do Excel
+    assert inseridas == 3
+    assert linhas == [("1001", "FINALIZADA", "P3"), ("1002", "ABERTA", "P4"), (None, "SEM OS", "P9")]
+
+
+def test_completo_recria_a_tabela(etl, banco):
+    _carregar(etl, banco, _excel(*BASE))
+    inseridas, linhas = _carregar(etl, banco, _excel((2000, "ABERTA", "X")), completo=True)
+    assert inseridas == 1 and linhas == [("2000", "ABERTA", "X")]
+
+
+def test_hash_por_os_ignora_ordem_das_linhas(etl):
+    df = etl.transformar(_excel(*BASE), hoje="2025-02-03")
+    invertido = etl.transformar(_excel(*reversed(BASE)), hoje="2025-02-03")
+    por_os = lambda d: d.dropna(subset=["numero_os"]).groupby("numero_os")["hash_os"].first().to_dict()
+    assert por_os(df) == por_os(invertido)
+    assert df.loc[df["numero_os"].isna(), "hash_os"].isna().all()
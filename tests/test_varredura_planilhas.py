@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def varredura(script):
+    return script("Algoritmo de Varredura - Planilhas.py", "varredura_planilhas")
+
+
+def _bruto(linhas):
+    """Aba como o read_excel(header=None) devolve: células brutas, colunas 0..n."""
+    largura = max(len(l) for l in linhas)
+    return pd.DataFrame([list(l) + [None] * (largura - len(l)) for l in linhas], dtype=object)
+
+
+def test_cabecalho_fora_da_primeira_linha(varredura):
+    bruto = _bruto([
+        ["INVENTÁRIO CD ESMERALDAS", None, None],
+        [None, None, None],
+        ["Código do Produto", "Descrição", "Quantidade"],
+        ["A1", "CAMISETA", 3],
+    ])
+    assert varredura.localizar_cabecalho(bruto) == (2, {0: "SKU", 1: "DESCRICAO", 2: "QTDE"})
+
+
+def test_cabecalho_ausente_ou_aba_vazia(varredura):
+    assert varredura.localizar_cabecalho(_bruto([["SKU", "Descrição"], ["A1", "X"]])) == (None, {})
+    assert varredura.localizar_cabecalho(pd.DataFrame()) == (None, {})
+
+
+def test_cabecalho_alem_do_limite_de_busca(varredura, monkeypatch):
+    monkeypatch.setattr(varredura, "LINHAS_BUSCA_CABECALHO", 2)
+    bruto = _bruto([["titulo"], [None], ["SKU", "QTDE"]])
+    assert varredura.localizar_cabecalho(bruto) == (None, {})
+
+
+def test_sinonimos_repetidos_primeira_coluna_vence(varredura):
+    # ID e CÓDIGO são ambos SKU; TOTAL e QTD ambos QTDE: a segunda ocorrência fica de fora
+    bruto = _bruto([["ID", "Código", "Total", "Qtd", "Filial"]])
+    assert varredura.localizar_cabecalho(bruto) == (0, {0: "SKU", 2: "QTDE", 4: "DEPOSITO"})
+
+
+@pytest.mark.parametrize("cabecalho, esperado", [
+    (["SKU", "Estoque"], {0: "SKU", 1: "QTDE"}),                                   # QTDE livre
+    (["SKU", "Qtde", "Estoque"], {0: "SKU", 1: "QTDE", 2: "DEPOSITO"}),            # QTDE já usada
+    (["SKU", "Estoque", "Estoque"], {0: "SKU", 1: "QTDE", 2: "DEPOSITO"}),         # uma de cada
+    (["Estoque", "SKU", "Depósito", "Estoque"], {0: "QTDE", 1: "SKU", 2: "DEPOSITO"}),
+])
+def test_estoque_fica_com_a_primeira_categoria_livre(varredura, cabecalho, esperado):
+    assert varredura.SINONIMOS["ESTOQUE"] == ("QTDE", "DEPOSITO")
+    assert varredura.localizar_cabecalho(_bruto([cabecalho])) == (0, esperado)
+
+
+def test_extrair_dados_fatia_o_corpo_do_mesmo_buffer(varredura):
+    bruto = _bruto([
+        ["Relatório de estoque"],
+        ["obs", "Referência", "Qtde"],
+        [None, "A1", 3],
+        ["x", "B2", 5],
+    ])
+    df = varredura.extrair_dados_aba(bruto, "LOJA 1")
+    assert list(df.columns) == ["SKU", "DESCRICAO", "DEPOSITO", "QTDE"]
+    assert df.values.tolist() == [["A1", "NÃO INFORMADO", "LOJA 1", 3], ["B2", "NÃO INFORMADO", "LOJA 1", 5]]
+    assert varredura.extrair_dados_aba(_bruto([["nada"]]), "VAZIA") is None
+
+
+def test_processar_arquivo_le_todas_as_abas(varredura, tmp_path):
+    pytest.importorskip("openpyxl")
+    arquivo = tmp_path / "inventario.xlsx"
+    with pd.ExcelWriter(arquivo) as writer:
+        pd.DataFrame([["CD SUL"], [None], ["SKU"], ["A1"]]).to_excel(writer, sheet_name="Sem qtde", header=False, index=False)
+        pd.DataFrame([["Inventário"], ["SKU", "Descrição", "Estoque", "Local"], ["A1", "CAMISETA", 3, "CD 1"]]
+                     ).to_excel(writer, sheet_name="CD", header=False, index=False)
+
+    df, mensagens, _, _ = varredura.processar_arquivo(str(arquivo))
+    assert df[["SKU", "DESCRICAO", "DEPOSITO", "QTDE", "ORIGEM_ABA", "ORIGEM_ARQUIVO"]].values.tolist() == [
+        ["A1", "CAMISETA", "CD 1", 3, "CD", "inventario.xlsx"]]
+    assert mensagens == ["⚠️ Aba 'Sem qtde': SKU/QTDE não localizados.", "✅ Aba 'CD': Extraída (1 linhas)."]